@@ -50,6 +50,21 @@ statement_argument_group.add_argument("--statement-namespace", dest="statement_n
 statement_argument_group.add_argument("--statement-output-dir", dest="statement_output_dir", type=str, required=False,
                                       help="The location where the tree files should go.")
 
+parser.add_argument("--visitor-pattern", dest="visitor_pattern", choices=VISITOR_PATTERNS, default="both",
+                    help="How visitors reach the trees: a virtual Accept method on every tree (the original "
+                         "pattern), a NodeKind tag with static dispatchers for struct visitors, or both "
+                         "(default: both).")
+
+arena_argument_group = parser.add_argument_group("Arena")
+arena_argument_group.add_argument("--generate-arena", dest="generate_arena", action="store_true",
+                                  required=False,
+                                  help="Generate the arena representation of the expression and statement trees. "
+                                       "Needs the AST and statement namespaces.")
+arena_argument_group.add_argument("--arena-namespace", dest="arena_namespace", type=str, required=False,
+                                  help="The namespace that contains the arena.")
+arena_argument_group.add_argument("--arena-output-dir", dest="arena_output_dir", type=str, required=False,
+                                  help="The location where the arena files should go.")
+
 args = parser.parse_args()
 
 generate_ast = args.generate_ast
@@ -58,8 +73,12 @@ ast_namespace = args.ast_namespace
 generate_statement = args.generate_statement
 statement_namespace = args.statement_namespace
 statement_output_dir = args.statement_output_dir
+generate_arena = args.generate_arena
+arena_namespace = args.arena_namespace
+arena_output_dir = args.arena_output_dir
+visitor_pattern = args.visitor_pattern
 
-if not generate_ast and not generate_statement:
+if not generate_ast and not generate_statement and not generate_arena:
     print("Nothing to generate. Exit.", file=sys.stderr)
     exit(1)
 
@@ -73,10 +92,16 @@ elif generate_statement and (statement_namespace is None or statement_output_dir
         f"Error: statement namespace and statement output directory must be specified to generate the statement tree.",
         file=sys.stderr)
     exit(1)
+elif generate_arena and (arena_namespace is None or arena_output_dir is None or ast_namespace is None
+                         or statement_namespace is None):
+    print(f"Error: arena namespace, arena output directory, AST namespace and statement namespace must be specified "
+          f"to generate the arena.", file=sys.stderr)
+    exit(1)
 
 
 def write_tree_to_file(output_dir: Path, confirmation_prompt: str, namespace: str, using_statements: List[str],
-                       visitor_interface_method_parameter: str, trees: List[SyntaxTree], base_class_name: str):
+                       visitor_interface_method_parameter: str, trees: List[SyntaxTree], base_class_name: str,
+                       node_kind_name: str, node_kinds: Optional[List[SyntaxTree]] = None):
     output_dir = output_dir.resolve()
     exists_and_is_directory_or_exit(output_dir)
 
@@ -98,9 +123,22 @@ def write_tree_to_file(output_dir: Path, confirmation_prompt: str, namespace: st
         "}"
     ], namespace)
 
-    base_class_methods = [
-        f"public abstract {GENERIC_PARAMETER} Accept<{GENERIC_PARAMETER}>({VISITOR_INTERFACE_NAME} visitor);"
-    ]
+    base_class_methods = []
+    if visitor_pattern != "virtual":
+        base_class_methods.extend([
+            f"public {node_kind_name} Kind {{ get; }}",
+            "",
+            f"protected {base_class_name}({node_kind_name} kind)",
+            "{",
+            *indent(["Kind = kind;"]),
+            "}",
+        ])
+    if visitor_pattern != "tagged":
+        if len(base_class_methods) > 0:
+            base_class_methods.append("")
+        base_class_methods.append(
+            f"public abstract {GENERIC_PARAMETER} Accept<{GENERIC_PARAMETER}>({VISITOR_INTERFACE_NAME} visitor);"
+        )
 
     base_class = add_namespace([
         f"public abstract class {base_class_name}",
@@ -125,6 +163,16 @@ def write_tree_to_file(output_dir: Path, confirmation_prompt: str, namespace: st
         f.write("\n\n")
         f.write("\n".join(base_class))
 
+    write_serializer_to_file(output_dir, namespace, using_statements, trees, base_class_name)
+
+    if visitor_pattern != "virtual":
+        write_dispatcher_to_file(output_dir, namespace, using_statements, visitor_interface_method_parameter, trees,
+                                 base_class_name, node_kind_name)
+
+    # The arena needs NodeKind whatever the visitor pattern is.
+    if node_kinds is not None:
+        write_node_kind_to_file(output_dir, namespace, using_statements, node_kinds)
+
     for tree in trees:
         output_file_path = output_dir / f"{tree.name}.cs"
         with open(output_file_path, "w") as f:
@@ -132,36 +180,283 @@ def write_tree_to_file(output_dir: Path, confirmation_prompt: str, namespace: st
             f.write(f"{GENERATED_CODE_WARNING}\n\n")
             f.writelines(using_statements)
             f.write("\n\n")
-            f.write(tree.generate_tree())
+            f.write(tree.generate_tree(visitor_pattern, node_kind_name))
 
 
-if generate_ast:
-    ast_namespace = str(ast_namespace).strip()
-    if len(ast_namespace) <= 0:
-        print(f"Error: AST namespace is empty", file=sys.stderr)
-        exit(1)
+def write_node_kind_to_file(output_dir: Path, namespace: str, using_statements: str, trees: List[SyntaxTree]):
+    # NodeKind.None is zero so that a default NodeKind is never mistaken for a tree.
+    node_kind = add_namespace([
+        f"public enum {NODE_KIND_NAME} : byte",
+        "{",
+        *indent(["None,", *[f"{tree.kind_name}," for tree in trees]]),
+        "}",
+    ], namespace)
 
-    statement_using_statements: List[str] = [
-        "using System;",
-        "using System.Collections.Generic;",
-        "using System.Linq;",
-        "using System.Text;",
-        "using Giosue;",
-        f"using {ast_namespace};"
+    with open(output_dir / f"{NODE_KIND_NAME}.cs", "w") as f:
+        f.write(f"{LICENSE_AGREEMENT}\n\n")
+        f.write(f"{GENERATED_CODE_WARNING}\n\n")
+        f.writelines(using_statements)
+        f.write("\n\n")
+        f.write("\n".join(node_kind))
+
+
+def write_dispatcher_to_file(output_dir: Path, namespace: str, using_statements: str, parameter_name: str,
+                             trees: List[SyntaxTree], base_class_name: str, node_kind_name: str):
+    # The visitors are structs passed by reference, so the JIT compiles the dispatcher once for each
+    # visitor and every Visit call is a direct call that can be inlined.
+    unknown_kind_message = f'$"Tipo di nodo sconosciuto: {{{parameter_name}.Kind}}."'
+
+    def dispatch_method(signature: List[str], returns_value: bool):
+        cases = [
+            line
+            for tree in trees
+            for line in tree.generate_dispatch_case(node_kind_name, parameter_name, "visitor", returns_value)
+        ]
+        return [
+            *signature,
+            "{",
+            *indent([
+                f"switch ({parameter_name}.Kind)",
+                "{",
+                *indent([
+                    *cases,
+                    "default:",
+                    *indent([
+                        "// Unknown node kind.",
+                        f"throw new NotSupportedException({unknown_kind_message});",
+                    ]),
+                ]),
+                "}",
+            ]),
+            "}",
+        ]
+
+    dispatcher_class = add_namespace([
+        f"public static class {base_class_name}Dispatcher",
+        "{",
+        *indent([
+            *dispatch_method([
+                f"public static {GENERIC_PARAMETER} Accept<{GENERIC_PARAMETER}, TVisitor>({base_class_name} {parameter_name}, ref TVisitor visitor)",
+                *indent([f"where TVisitor : struct, {VISITOR_INTERFACE_NAME}"]),
+            ], True),
+            "",
+            *dispatch_method([
+                f"public static void Accept<TVisitor>({base_class_name} {parameter_name}, ref TVisitor visitor)",
+                *indent([f"where TVisitor : struct, {VOID_VISITOR_INTERFACE_NAME}"]),
+            ], False),
+        ]),
+        "}",
+    ], namespace)
+
+    void_visitor_interface = add_namespace([
+        f"public interface {VOID_VISITOR_INTERFACE_NAME}",
+        "{",
+        *indent([tree.generate_void_visitor_method(parameter_name) for tree in trees]),
+        "}",
+    ], namespace)
+
+    dispatcher_using_statements = "\n".join([
+        using_statements,
+        "using System.Runtime.CompilerServices;",
+    ])
+
+    with open(output_dir / f"{base_class_name}Dispatcher.cs", "w") as f:
+        f.write(f"{LICENSE_AGREEMENT}\n\n")
+        f.write(f"{GENERATED_CODE_WARNING}\n\n")
+        f.writelines(dispatcher_using_statements)
+        f.write("\n\n")
+        f.write("\n".join(dispatcher_class))
+
+    with open(output_dir / f"{VOID_VISITOR_INTERFACE_NAME}.cs", "w") as f:
+        f.write(f"{LICENSE_AGREEMENT}\n\n")
+        f.write(f"{GENERATED_CODE_WARNING}\n\n")
+        f.writelines(using_statements)
+        f.write("\n\n")
+        f.write("\n".join(void_visitor_interface))
+
+
+def write_serializer_to_file(output_dir: Path, namespace: str, using_statements: str, trees: List[SyntaxTree],
+                             base_class_name: str):
+    # Tag 0 is a null tree; every other tree's tag is its position in the list plus one.
+    # Reordering or removing trees changes the format, so bump ScriptCache.FormatVersion when that happens.
+    write_cases = [
+        "case null:",
+        *indent([
+            "writer.WriteTag(0);",
+            "break;",
+        ]),
+    ]
+    read_cases = [
+        "case 0:",
+        *indent(["return null;"]),
+    ]
+    for tag, tree in enumerate(trees, start=1):
+        write_cases.extend(tree.generate_serializer_write_case(tag, "writer"))
+        read_cases.extend(tree.generate_serializer_read_case(tag, "reader"))
+
+    unknown_tree_message = f'$"Unknown {base_class_name.lower()} {{node.GetType()}}."'
+    unknown_tag_message = f'$"Unknown {base_class_name.lower()} tag {{tag}}."'
+
+    serializer_class = add_namespace([
+        f"public static class {base_class_name}Serializer",
+        "{",
+        *indent([
+            f"public static void Write({TREE_WRITER_NAME} writer, {base_class_name} node)",
+            "{",
+            *indent([
+                "switch (node)",
+                "{",
+                *indent([
+                    *write_cases,
+                    "default:",
+                    *indent([f"throw new NotSupportedException({unknown_tree_message});"]),
+                ]),
+                "}",
+            ]),
+            "}",
+            "",
+            f"public static {base_class_name} Read({TREE_READER_NAME} reader)",
+            "{",
+            *indent([
+                "var tag = reader.ReadTag();",
+                "switch (tag)",
+                "{",
+                *indent([
+                    *read_cases,
+                    "default:",
+                    *indent([f"throw new InvalidDataException({unknown_tag_message});"]),
+                ]),
+                "}",
+            ]),
+            "}",
+        ]),
+        "}",
+    ], namespace)
+
+    serializer_using_statements = "\n".join([
+        using_statements,
+        "using System.IO;",
+        f"using {SERIALIZER_NAMESPACE};",
+    ])
+
+    with open(output_dir / f"{base_class_name}Serializer.cs", "w") as f:
+        f.write(f"{LICENSE_AGREEMENT}\n\n")
+        f.write(f"{GENERATED_CODE_WARNING}\n\n")
+        f.writelines(serializer_using_statements)
+        f.write("\n\n")
+        f.write("\n".join(serializer_class))
+
+
+def write_arena_to_file(output_dir: Path, namespace: str, using_statements: List[str],
+                        expression_trees: List[SyntaxTree], statement_trees: List[SyntaxTree]):
+    output_dir = output_dir.resolve()
+    exists_and_is_directory_or_exit(output_dir)
+
+    if not prompt_yes_no(f"Writing arena to {output_dir}. OK?"):
+        print("Skip", file=sys.stderr)
+        return
+
+    prompt_to_remove_directory_contents(output_dir)
+
+    trees = [*expression_trees, *statement_trees]
+    using_statements = "\n".join(using_statements)
+
+    def write_file(name: str, lines: List[str]):
+        with open(output_dir / name, "w") as f:
+            f.write(f"{LICENSE_AGREEMENT}\n\n")
+            f.write(f"{GENERATED_CODE_WARNING}\n\n")
+            f.writelines(using_statements)
+            f.write("\n\n")
+            f.write("\n".join(lines))
+
+    # The arena uses the NodeKind that is generated with the AST.
+    write_file("IVisitor.cs", add_namespace([
+        f"public interface {ARENA_VISITOR_INTERFACE_NAME}",
+        "{",
+        *indent([tree.generate_arena_visitor_method() for tree in trees]),
+        "}",
+    ], namespace))
+
+    def builder_method(name: str, base_class: str, parameter_name: str, subtrees: List[SyntaxTree]):
+        cases = [
+            "case null:",
+            *indent(["return NoNode;"]),
+        ]
+        for tree in subtrees:
+            cases.extend(tree.generate_arena_builder_case())
+
+        unknown_tree_message = f'$"Unknown {base_class.split(".")[-1].lower()} {{{parameter_name}.GetType()}}."'
+        return [
+            f"public int {name}({base_class} {parameter_name})",
+            "{",
+            *indent([
+                f"switch ({parameter_name})",
+                "{",
+                *indent([
+                    *cases,
+                    "default:",
+                    *indent([f"throw new NotSupportedException({unknown_tree_message});"]),
+                ]),
+                "}",
+            ]),
+            "}",
+        ]
+
+    accept_cases = [line for tree in trees for line in tree.generate_arena_accept_case("visitor")]
+    unknown_kind_message = '$"Unknown node kind {Kinds[id]}."'
+    members = [
+        *[line for tree in trees for line in tree.generate_arena_storage()],
+        "",
+        f"public {GENERIC_PARAMETER} Accept<{GENERIC_PARAMETER}>(int id, {ARENA_VISITOR_INTERFACE_NAME} visitor)",
+        "{",
+        *indent([
+            "switch (Kinds[id])",
+            "{",
+            *indent([
+                *accept_cases,
+                "default:",
+                *indent([f"throw new InvalidOperationException({unknown_kind_message});"]),
+            ]),
+            "}",
+        ]),
+        "}",
+        "",
+        *builder_method("AddExpression", f"{expression_trees[0].namespace}.{BASE_EXPRESSION_CLASS_NAME}",
+                        "expression", expression_trees),
+        "",
+        *builder_method("AddStatement", f"{statement_trees[0].namespace}.{BASE_STATEMENT_CLASS_NAME}",
+                        "statement", statement_trees),
     ]
+    for tree in trees:
+        members.append("")
+        members.extend(tree.generate_arena_add_method())
+
+    write_file(f"{ARENA_CLASS_NAME}Nodes.cs", add_namespace([
+        f"public sealed partial class {ARENA_CLASS_NAME}",
+        "{",
+        *indent(members),
+        "}",
+    ], namespace))
 
-    syntax_trees: List[SyntaxTree] = [
+    for tree in trees:
+        write_file(f"{tree.kind_name}.cs", tree.generate_arena_file(namespace).split("\n"))
+
+
+def get_expression_trees(namespace: str) -> List[SyntaxTree]:
+    return [
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Assign",
             BASE_EXPRESSION_CLASS_NAME,
             [
                 Field("Token", "Name", "name"),
-                Field("Expression", "Value", "@value")
+                Field("Expression", "Value", "@value"),
+                Field("int", "Depth", None, "-1"),
+                Field("int", "Slot", None, "-1"),
             ]
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Binary",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -171,7 +466,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Call",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -181,7 +476,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Get",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -190,7 +485,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Grouping",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -198,7 +493,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Literal",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -206,7 +501,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Logical",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -216,7 +511,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Set",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -226,7 +521,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Super",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -235,7 +530,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "This",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -243,7 +538,7 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Unary",
             BASE_EXPRESSION_CLASS_NAME,
             [
@@ -252,38 +547,22 @@ if generate_ast:
             ],
         ),
         SyntaxTree(
-            ast_namespace,
+            namespace,
             "Variable",
             BASE_EXPRESSION_CLASS_NAME,
             [
                 Field("Token", "Name", "name"),
+                Field("int", "Depth", None, "-1"),
+                Field("int", "Slot", None, "-1"),
             ],
         ),
     ]
 
-    ast_output_dir = Path(ast_output_dir)
-    write_tree_to_file(ast_output_dir, f"Writing AST to {ast_output_dir.resolve()}. OK?", ast_namespace,
-                       statement_using_statements, "expression", syntax_trees, BASE_EXPRESSION_CLASS_NAME)
-
-if generate_statement:
-    statement_namespace = str(statement_namespace).strip()
 
-    if len(statement_namespace) <= 0:
-        print("Error: statement tree namespace is empty", file=sys.stderr)
-        exit(1)
-
-    statement_using_statements = [
-        "using System;",
-        "using System.Collections.Generic;",
-        "using System.Linq;",
-        "using System.Text;",
-        "using Giosue;",
-        f"using {statement_namespace};"
-    ]
-
-    statement_trees: List[SyntaxTree] = [
+def get_statement_trees(namespace: str) -> List[SyntaxTree]:
+    return [
         SyntaxTree(
-            statement_namespace,
+            namespace,
             "Expression",
             BASE_STATEMENT_CLASS_NAME,
             [
@@ -291,16 +570,17 @@ if generate_statement:
             ]
         ),
         SyntaxTree(
-            statement_namespace,
+            namespace,
             "Var",
             BASE_STATEMENT_CLASS_NAME,
             [
                 Field("Token", "Name", "name"),
-                Field("AST.Expression", "Initializer", "initializer")
+                Field("AST.Expression", "Initializer", "initializer"),
+                Field("int", "Slot", None, "-1"),
             ]
         ),
         SyntaxTree(
-            statement_namespace,
+            namespace,
             "Block",
             BASE_STATEMENT_CLASS_NAME,
             [
@@ -308,7 +588,7 @@ if generate_statement:
             ]
         ),
         SyntaxTree(
-            statement_namespace,
+            namespace,
             "If",
             BASE_STATEMENT_CLASS_NAME,
             [
@@ -318,30 +598,104 @@ if generate_statement:
             ]
         ),
         SyntaxTree(
-            statement_namespace,
+            namespace,
             "While",
             BASE_STATEMENT_CLASS_NAME,
             [
+                Field("Token", "Keyword", "keyword"),
                 Field("AST.Expression", "Condition", "condition"),
                 Field("Statements.Statement", "Body", "body"),
             ]
         ),
         SyntaxTree(
-            statement_namespace,
+            namespace,
+            "Return",
+            BASE_STATEMENT_CLASS_NAME,
+            [
+                Field("Token", "Keyword", "keyword"),
+                Field("AST.Expression", "Value", "value"),
+            ]
+        ),
+        SyntaxTree(
+            namespace,
             "Function",
             BASE_STATEMENT_CLASS_NAME,
             [
                 Field("Token", "Name", "name"),
                 Field("List<Token>", "Parameters", "parameters"),
                 Field("List<Statement>", "Body", "body"),
+                Field("int", "Slot", None, "-1"),
             ]
         ),
     ]
 
+
+if generate_ast:
+    ast_namespace = str(ast_namespace).strip()
+    if len(ast_namespace) <= 0:
+        print(f"Error: AST namespace is empty", file=sys.stderr)
+        exit(1)
+
+    statement_using_statements: List[str] = [
+        "using System;",
+        "using System.Collections.Generic;",
+        "using System.Linq;",
+        "using System.Text;",
+        "using Giosue;",
+        f"using {ast_namespace};"
+    ]
+
+    syntax_trees = get_expression_trees(ast_namespace)
+
+    ast_output_dir = Path(ast_output_dir)
+    # The NodeKind enum covers the statements too, so that the arena can use it.
+    write_tree_to_file(ast_output_dir, f"Writing AST to {ast_output_dir.resolve()}. OK?", ast_namespace,
+                       statement_using_statements, "expression", syntax_trees, BASE_EXPRESSION_CLASS_NAME,
+                       NODE_KIND_NAME, [*syntax_trees, *get_statement_trees(ast_namespace)])
+
+if generate_statement:
+    statement_namespace = str(statement_namespace).strip()
+
+    if len(statement_namespace) <= 0:
+        print("Error: statement tree namespace is empty", file=sys.stderr)
+        exit(1)
+
+    statement_using_statements = [
+        "using System;",
+        "using System.Collections.Generic;",
+        "using System.Linq;",
+        "using System.Text;",
+        "using Giosue;",
+        f"using {statement_namespace};"
+    ]
+
+    statement_trees = get_statement_trees(statement_namespace)
+
     statement_output_dir = Path(statement_output_dir)
     write_tree_to_file(statement_output_dir, f"Writing AST to {statement_output_dir.resolve()}. OK?",
                        statement_namespace, statement_using_statements, "statement",
-                       statement_trees, BASE_STATEMENT_CLASS_NAME)
+                       statement_trees, BASE_STATEMENT_CLASS_NAME, QUALIFIED_NODE_KIND_NAME)
+
+if generate_arena:
+    arena_namespace = str(arena_namespace).strip()
+    ast_namespace = str(ast_namespace).strip()
+    statement_namespace = str(statement_namespace).strip()
+
+    if len(arena_namespace) <= 0 or len(ast_namespace) <= 0 or len(statement_namespace) <= 0:
+        print("Error: arena, AST or statement namespace is empty", file=sys.stderr)
+        exit(1)
+
+    arena_using_statements = [
+        "using System;",
+        "using System.Collections.Generic;",
+        "using System.Linq;",
+        "using System.Text;",
+        "using Giosue;",
+        f"using {arena_namespace};"
+    ]
+
+    write_arena_to_file(Path(arena_output_dir), arena_namespace, arena_using_statements,
+                        get_expression_trees(ast_namespace), get_statement_trees(statement_namespace))
 
 
 print("OK.", file=sys.stderr)
@@ -28,6 +28,68 @@ BASE_EXPRESSION_CLASS_NAME = "Expression"
 BASE_STATEMENT_CLASS_NAME = "Statement"
 GENERIC_PARAMETER = "T"
 VISITOR_INTERFACE_NAME = f"IVisitor<{GENERIC_PARAMETER}>"
+SERIALIZER_NAMESPACE = "Giosue.Serialization"
+TREE_WRITER_NAME = "TreeWriter"
+TREE_READER_NAME = "TreeReader"
+VOID_VISITOR_INTERFACE_NAME = "IVoidVisitor"
+
+# The enum of every kind of tree is generated with the AST, so every other namespace refers to it
+# through the AST namespace.
+NODE_KIND_NAME = "NodeKind"
+QUALIFIED_NODE_KIND_NAME = f"AST.{NODE_KIND_NAME}"
+
+# "virtual" is a virtual Accept method on every tree. "tagged" is a NodeKind tag on every tree and
+# a static dispatcher that switches on it, calling struct visitors so that the calls are direct.
+VISITOR_PATTERNS = ("virtual", "tagged", "both")
+
+# The suffix of the TreeWriter.Write* and TreeReader.Read* methods for each field type.
+SERIALIZED_TYPE_METHOD_SUFFIXES = {
+    "int": "Int32",
+    "object": "Literal",
+    "Token": "Token",
+    "List<Token>": "TokenList",
+    "Expression": "Expression",
+    "AST.Expression": "Expression",
+    "List<Expression>": "ExpressionList",
+    "Statement": "Statement",
+    "Statements.Statement": "Statement",
+    "List<Statement>": "StatementList",
+    "List<Statements.Statement>": "StatementList",
+}
+
+ARENA_CLASS_NAME = "SyntaxArena"
+ARENA_VISITOR_INTERFACE_NAME = f"IVisitor<{GENERIC_PARAMETER}>"
+
+# How a SyntaxArena stores each field type: "node" is the id of another node, "token" an index
+# into the token table, "constant" an index into the constant table, the lists are ranges of
+# the arena's list items, and "value" is stored as it is.
+ARENA_FIELD_STORAGE = {
+    "int": "value",
+    "object": "constant",
+    "Token": "token",
+    "List<Token>": "token list",
+    "Expression": "node",
+    "AST.Expression": "node",
+    "List<Expression>": "node list",
+    "Statement": "node",
+    "Statements.Statement": "node",
+    "List<Statement>": "node list",
+    "List<Statements.Statement>": "node list",
+}
+
+# The SyntaxArena method that adds the value of a field of an object tree to the arena,
+# for field types that aren't passed as they are.
+ARENA_BUILDER_METHODS = {
+    "List<Token>": "AddTokens",
+    "Expression": "AddExpression",
+    "AST.Expression": "AddExpression",
+    "List<Expression>": "AddExpressions",
+    "Statement": "AddStatement",
+    "Statements.Statement": "AddStatement",
+    "List<Statement>": "AddStatements",
+    "List<Statements.Statement>": "AddStatements",
+}
+
 YES_RESPONSES = ("yes", "y")
 NO_RESPONSES = ("no", "n")
 ALL_YES_NO_RESPONSES = (*YES_RESPONSES, *NO_RESPONSES)
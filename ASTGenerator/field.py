@@ -17,11 +17,23 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
 
+from typing import Optional
+from common import SERIALIZED_TYPE_METHOD_SUFFIXES, ARENA_FIELD_STORAGE, ARENA_BUILDER_METHODS
+
+
 class Field:
-    def __init__(self, type_name: str, field_name: str, constructor_parameter_name: str):
+    def __init__(self, type_name: str, field_name: str, constructor_parameter_name: Optional[str],
+                 default_value: Optional[str] = None):
         self.type_name: str = type_name
         self.field_name: str = field_name
-        self.constructor_parameter_name: str = constructor_parameter_name
+        self.constructor_parameter_name: Optional[str] = constructor_parameter_name
+        self.default_value: Optional[str] = default_value
+
+    @property
+    def is_constructor_parameter(self) -> bool:
+        # Fields without a constructor parameter are filled in after the tree is built
+        # (for example, by the resolver) so they need a setter instead.
+        return self.constructor_parameter_name is not None
 
     def get_constructor_parameter(self):
         return f"{self.type_name} {self.constructor_parameter_name}"
@@ -29,5 +41,101 @@ class Field:
     def get_initializer(self):
         return f"this.{self.field_name} = {self.constructor_parameter_name};"
 
+    @property
+    def local_name(self) -> str:
+        # The name of the local variable that holds the field while a tree is being read.
+        if self.is_constructor_parameter:
+            return self.constructor_parameter_name
+        return self.field_name[0].lower() + self.field_name[1:]
+
+    @property
+    def serializer_method_suffix(self) -> str:
+        if self.type_name not in SERIALIZED_TYPE_METHOD_SUFFIXES:
+            raise ValueError(f"Don't know how to serialize a field of type {self.type_name}")
+        return SERIALIZED_TYPE_METHOD_SUFFIXES[self.type_name]
+
+    def get_write_statement(self, writer_name: str, node_name: str):
+        return f"{writer_name}.Write{self.serializer_method_suffix}({node_name}.{self.field_name});"
+
+    def get_read_statement(self, reader_name: str):
+        return f"var {self.local_name} = {reader_name}.Read{self.serializer_method_suffix}();"
+
     def get_field_name(self):
-        return f"public {self.type_name} {self.field_name} {{ get; }}"
+        if self.is_constructor_parameter:
+            return f"public {self.type_name} {self.field_name} {{ get; }}"
+
+        default_value = "" if self.default_value is None else f" = {self.default_value};"
+        return f"public {self.type_name} {self.field_name} {{ get; set; }}{default_value}"
+
+    @property
+    def arena_storage(self) -> str:
+        if self.type_name not in ARENA_FIELD_STORAGE:
+            raise ValueError(f"Don't know how to store a field of type {self.type_name} in an arena")
+        return ARENA_FIELD_STORAGE[self.type_name]
+
+    @property
+    def is_arena_list(self) -> bool:
+        return self.arena_storage in ("node list", "token list")
+
+    def get_arena_node_fields(self):
+        # Lists are a range of the arena's list items; everything else is one int.
+        if self.is_arena_list:
+            return [f"public int {self.field_name}Start;", f"public int {self.field_name}Count;"]
+        return [f"public int {self.field_name};"]
+
+    def get_arena_parameter(self):
+        type_name = {
+            "node": "int",
+            "token": "Token",
+            "constant": "object",
+            "node list": "NodeList",
+            "token list": "TokenList",
+            "value": self.type_name,
+        }[self.arena_storage]
+
+        if self.is_constructor_parameter or self.default_value is None:
+            return f"{type_name} {self.local_name}"
+        return f"{type_name} {self.local_name} = {self.default_value}"
+
+    def get_arena_initializers(self):
+        storage = self.arena_storage
+        if storage == "token":
+            return [f"{self.field_name} = AddToken({self.local_name}),"]
+        if storage == "constant":
+            return [f"{self.field_name} = AddConstant({self.local_name}),"]
+        if self.is_arena_list:
+            return [
+                f"{self.field_name}Start = {self.local_name}.Start,",
+                f"{self.field_name}Count = {self.local_name}.Count,",
+            ]
+        return [f"{self.field_name} = {self.local_name},"]
+
+    def get_arena_view_property(self, nodes_name: str):
+        node = f"Arena.{nodes_name}[Index]"
+        storage = self.arena_storage
+        if storage == "node":
+            return [f"public NodeRef {self.field_name} => new(Arena, {node}.{self.field_name});"]
+        if storage == "token":
+            return [f"public Token {self.field_name} => Arena.Tokens[{node}.{self.field_name}];"]
+        if storage == "constant":
+            return [f"public object {self.field_name} => Arena.Constants[{node}.{self.field_name}];"]
+        if self.is_arena_list:
+            list_type = "NodeList" if storage == "node list" else "TokenList"
+            return [
+                f"public {list_type} {self.field_name} => new(Arena, {node}.{self.field_name}Start, {node}.{self.field_name}Count);"
+            ]
+        if self.is_constructor_parameter:
+            return [f"public {self.type_name} {self.field_name} => {node}.{self.field_name};"]
+        return [
+            f"public {self.type_name} {self.field_name}",
+            "{",
+            f"    get => {node}.{self.field_name};",
+            f"    set => {node}.{self.field_name} = value;",
+            "}",
+        ]
+
+    def get_arena_builder_argument(self, node_name: str):
+        value = f"{node_name}.{self.field_name}"
+        if self.type_name in ARENA_BUILDER_METHODS:
+            return f"{ARENA_BUILDER_METHODS[self.type_name]}({value})"
+        return value
@@ -17,7 +17,7 @@
 # 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
 from common import *
-from typing import List
+from typing import List, Optional
 from field import Field
 
 
@@ -29,13 +29,13 @@ class SyntaxTree:
         self.fields: List[Field] = fields
 
     def generate_constructor_parameters(self):
-        return [field.get_constructor_parameter() for field in self.fields]
+        return [field.get_constructor_parameter() for field in self.fields if field.is_constructor_parameter]
 
     def generate_fields(self):
         return [field.get_field_name() for field in self.fields]
 
     def generate_field_initializers(self):
-        return [field.get_initializer() for field in self.fields]
+        return [field.get_initializer() for field in self.fields if field.is_constructor_parameter]
 
     def generate_visitor_pattern(self):
         visitor_call = indent([f"return visitor.Visit{self.name}{self.base_class_name}(this);"])
@@ -47,21 +47,66 @@ class SyntaxTree:
             "}"
         ]
 
-    def generate_constructor(self):
+    def generate_constructor(self, node_kind_name: Optional[str] = None):
         parameters = ", ".join(self.generate_constructor_parameters())
         initializers = indent(self.generate_field_initializers())
+        # Tagged trees pass their kind to the base class.
+        base_call = "" if node_kind_name is None else f" : base({node_kind_name}.{self.kind_name})"
 
         return [
-            f"public {self.name}({parameters})",
+            f"public {self.name}({parameters}){base_call}",
             "{",
             *initializers,
             "}"
         ]
 
-    def generate_class(self):
+    @property
+    def node_variable_name(self) -> str:
+        return f"{self.name[0].lower()}{self.name[1:]}Node"
+
+    def generate_serializer_write_case(self, tag: int, writer_name: str):
+        writes = [field.get_write_statement(writer_name, self.node_variable_name) for field in self.fields]
+
+        return [
+            f"case {self.name} {self.node_variable_name}:",
+            *indent([
+                f"{writer_name}.WriteTag({tag});",
+                *writes,
+                "break;",
+            ])
+        ]
+
+    def generate_serializer_read_case(self, tag: int, reader_name: str):
+        reads = [field.get_read_statement(reader_name) for field in self.fields]
+        parameters = ", ".join(field.local_name for field in self.fields if field.is_constructor_parameter)
+        settable_fields = [field for field in self.fields if not field.is_constructor_parameter]
+
+        if len(settable_fields) == 0:
+            construction = [f"return new {self.name}({parameters});"]
+        else:
+            construction = [
+                f"return new {self.name}({parameters})",
+                "{",
+                *indent([f"{field.field_name} = {field.local_name}," for field in settable_fields]),
+                "};",
+            ]
+
+        return [
+            f"case {tag}:",
+            *indent([
+                "{",
+                *indent([
+                    *reads,
+                    *construction,
+                ]),
+                "}",
+            ]),
+        ]
+
+    def generate_class(self, visitor_pattern: str, node_kind_name: str):
         fields = indent(self.generate_fields())
-        constructor = indent(self.generate_constructor())
-        visitor = indent(self.generate_visitor_pattern())
+        constructor = indent(self.generate_constructor(None if visitor_pattern == "virtual" else node_kind_name))
+        visitor = [] if visitor_pattern == "tagged" else ["", *indent(self.generate_visitor_pattern())]
 
         return [
             f"public class {self.name} : {self.base_class_name}",
@@ -69,13 +114,22 @@ class SyntaxTree:
             *fields,
             "",
             *constructor,
-            "",
             *visitor,
             "}"
         ]
 
-    def generate_namespace(self):
-        class_ = indent(self.generate_class())
+    def generate_void_visitor_method(self, parameter_name: str):
+        return f"public void Visit{self.kind_name}({self.name} {parameter_name});"
+
+    def generate_dispatch_case(self, node_kind_name: str, node_name: str, visitor_name: str, returns_value: bool):
+        visit = f"{visitor_name}.Visit{self.kind_name}(Unsafe.As<{self.name}>({node_name}))"
+        return [
+            f"case {node_kind_name}.{self.kind_name}:",
+            *indent([f"return {visit};"] if returns_value else [f"{visit};", "return;"]),
+        ]
+
+    def generate_namespace(self, visitor_pattern: str = "virtual", node_kind_name: str = NODE_KIND_NAME):
+        class_ = indent(self.generate_class(visitor_pattern, node_kind_name))
 
         return [
             f"namespace {self.namespace}",
@@ -84,5 +138,115 @@ class SyntaxTree:
             "}"
         ]
 
-    def generate_tree(self):
-        return "\n".join(self.generate_namespace())
+    def generate_tree(self, visitor_pattern: str = "virtual", node_kind_name: str = NODE_KIND_NAME):
+        return "\n".join(self.generate_namespace(visitor_pattern, node_kind_name))
+
+    @property
+    def kind_name(self) -> str:
+        # The name of the tree's NodeKind, which is also the name used in the visitors.
+        return f"{self.name}{self.base_class_name}"
+
+    @property
+    def arena_nodes_name(self) -> str:
+        return f"{self.kind_name}Nodes"
+
+    @property
+    def arena_count_name(self) -> str:
+        return f"{self.kind_name}Count"
+
+    @property
+    def arena_view_name(self) -> str:
+        return f"{self.kind_name}View"
+
+    @property
+    def arena_visitor_parameter_name(self) -> str:
+        return self.base_class_name.lower()
+
+    def generate_arena_node_struct(self):
+        fields = [line for field in self.fields for line in field.get_arena_node_fields()]
+
+        return [
+            f"internal struct {self.kind_name}Node",
+            "{",
+            *indent(fields),
+            "}",
+        ]
+
+    def generate_arena_view(self):
+        properties = [line for field in self.fields for line in field.get_arena_view_property(self.arena_nodes_name)]
+
+        return [
+            f"public readonly struct {self.arena_view_name}",
+            "{",
+            *indent([
+                f"private readonly {ARENA_CLASS_NAME} Arena;",
+                "private readonly int Index;",
+                "",
+                "public int Id { get; }",
+                "",
+                *properties,
+                "",
+                f"internal {self.arena_view_name}({ARENA_CLASS_NAME} arena, int id, int index)",
+                "{",
+                *indent([
+                    "Arena = arena;",
+                    "Id = id;",
+                    "Index = index;",
+                ]),
+                "}",
+            ]),
+            "}",
+        ]
+
+    def generate_arena_file(self, namespace: str):
+        return "\n".join(add_namespace([
+            *self.generate_arena_node_struct(),
+            "",
+            *self.generate_arena_view(),
+        ], namespace))
+
+    def generate_arena_storage(self):
+        return [
+            f"internal {self.kind_name}Node[] {self.arena_nodes_name} = new {self.kind_name}Node[InitialCapacity];",
+            f"private int {self.arena_count_name} = 0;",
+        ]
+
+    def generate_arena_add_method(self):
+        parameters = ", ".join(field.get_arena_parameter() for field in self.fields)
+        initializers = [line for field in self.fields for line in field.get_arena_initializers()]
+
+        return [
+            f"public int Add{self.kind_name}({parameters})",
+            "{",
+            *indent([
+                f"if ({self.arena_count_name} == {self.arena_nodes_name}.Length)",
+                "{",
+                *indent([f"Array.Resize(ref {self.arena_nodes_name}, {self.arena_count_name} * 2);"]),
+                "}",
+                "",
+                f"var index = {self.arena_count_name}++;",
+                f"{self.arena_nodes_name}[index] = new {self.kind_name}Node()",
+                "{",
+                *indent(initializers),
+                "};",
+                f"return AddNode({QUALIFIED_NODE_KIND_NAME}.{self.kind_name}, index);",
+            ]),
+            "}",
+        ]
+
+    def generate_arena_visitor_method(self):
+        return f"public {GENERIC_PARAMETER} Visit{self.kind_name}({self.arena_view_name} {self.arena_visitor_parameter_name});"
+
+    def generate_arena_accept_case(self, visitor_name: str):
+        return [
+            f"case {QUALIFIED_NODE_KIND_NAME}.{self.kind_name}:",
+            *indent([f"return {visitor_name}.Visit{self.kind_name}(new {self.arena_view_name}(this, id, Indices[id]));"]),
+        ]
+
+    def generate_arena_builder_case(self):
+        arguments = ", ".join(field.get_arena_builder_argument(self.node_variable_name) for field in self.fields)
+
+        return [
+            f"case {self.namespace}.{self.name} {self.node_variable_name}:",
+            *indent([f"return Add{self.kind_name}({arguments});"]),
+        ]
@@ -0,0 +1,153 @@
+# Giosue language interpreter
+# The interpreter for the Giosue programming language.
+# Copyright (C) 2021  Anthony Webster
+# 
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+# 
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+# 
+# You should have received a copy of the GNU General Public License along
+# with this program; if not, write to the Free Software Foundation, Inc.,
+# 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+# Writes the large inputs for the benchmarks in Giosue.Benchmarks. The same arguments always
+# write the same files, so results from different machines and commits can be compared.
+
+from typing import *
+from pathlib import Path
+import argparse
+import random
+import sys
+
+SEED = 20210501
+
+SIZES = {
+    "1KB": 1_000,
+    "10KB": 10_000,
+    "100KB": 100_000,
+    "1MB": 1_000_000,
+    "10MB": 10_000_000,
+    "100MB": 100_000_000,
+}
+
+NESTING_DEPTHS = [10, 100, 250]
+EXPRESSION_DEPTHS = [10, 100, 500]
+EXPRESSIONS_PER_INPUT = 100
+STATEMENT_COUNTS = [1_000, 10_000, 100_000]
+
+parser = argparse.ArgumentParser(description="Generate the inputs for the Giosue benchmarks.")
+parser.add_argument("--output-dir", dest="output_dir", type=str, required=False,
+                    default=str(Path(__file__).resolve().parent.parent / "BenchmarkInputs"),
+                    help="The directory to write the inputs to (default: BenchmarkInputs in the repository).")
+parser.add_argument("--sizes", dest="sizes", type=str, nargs="+", required=False, default=list(SIZES),
+                    choices=list(SIZES), help="The sizes of the scanner inputs to write.")
+
+
+def scanner_chunk(rng: random.Random, i: int) -> str:
+    """A few lines that use every kind of token."""
+    a = rng.randint(0, 100_000)
+    b = rng.randint(1, 1_000)
+    c = rng.randint(0, 10_000) / 100
+    return (
+        f"-- Blocco numero {i}\n"
+        f"var nome_{i} = {a} * ({b} + {b % 7}) - {b};\n"
+        f"var reale_{i} = {c} - {c / 2:.2f};\n"
+        f"se (nome_{i} >= {a // 2} && !(nome_{i} == {b})) {{ ScriveLina(\"testo {i}\" @ \"!\"); }}\n"
+        f"oppure {{ nome_{i} = nome_{i} - 1; }}\n"
+    )
+
+
+def write_scanner_input(path: Path, size: int):
+    """Writes at least `size` characters of code, stopping at the end of a chunk."""
+    rng = random.Random(SEED + size)
+    written = 0
+    i = 0
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        while written < size:
+            chunk = scanner_chunk(rng, i)
+            f.write(chunk)
+            written += len(chunk)
+            i += 1
+
+
+def write_nested_input(path: Path, depth: int):
+    """Writes blocks nested `depth` deep around an expression nested `depth` deep."""
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write("var x = 0;\n")
+        for level in range(depth):
+            f.write(" " * level + f"se (x < {level + 1}) {{\n")
+
+        expression = "x"
+        for level in range(depth):
+            expression = f"({expression} + {level}) * 1"
+        f.write(" " * depth + f"x = {expression};\n")
+
+        for level in reversed(range(depth)):
+            f.write(" " * level + "}\n")
+
+
+# Every binary and logical operator, so that every level of precedence is parsed.
+BINARY_OPERATORS = ["==", "!=", "^^", "||", "&&", ">", ">=", "<", "<=", "-", "+", "@", "/", "*", "&", "|", "^"]
+
+
+def write_expression_input(path: Path, depth: int):
+    """Writes expressions nested `depth` deep that mix every operator, unary operators and calls."""
+    rng = random.Random(SEED + depth)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for i in range(EXPRESSIONS_PER_INPUT):
+            expression = f"a_{i}"
+            for level in range(depth):
+                first, second = rng.sample(BINARY_OPERATORS, 2)
+                unary = rng.choice(["", "-", "!"])
+                expression = f"{unary}({expression} {first} {rng.randint(0, 99)}) {second} f(b, {level})"
+            f.write(f"var e_{i} = {expression};\n")
+
+
+def write_long_input(path: Path, count: int):
+    """Writes `count` top-level statements: variables, functions, loops and conditions."""
+    rng = random.Random(SEED + count)
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        for i in range(count):
+            kind = i % 4
+            n = rng.randint(0, 1_000)
+            if kind == 0:
+                f.write(f"var v_{i} = {n} + {n % 13} * 2;\n")
+            elif kind == 1:
+                f.write(f"fun f_{i}(a, b) {{ var c = a + b; se (c > {n}) {{ c = c - {n}; }} }}\n")
+            elif kind == 2:
+                f.write(f"mentre (v_{i - 2} < {n}) {{ v_{i - 2} = v_{i - 2} + 1; }}\n")
+            else:
+                f.write(f"se (v_{i - 3} == {n}) {{ f_{i - 2}(v_{i - 3}, {n}); }} oppure {{ v_{i - 3} = {n}; }}\n")
+
+
+args = parser.parse_args()
+output_dir = Path(args.output_dir).resolve()
+output_dir.mkdir(parents=True, exist_ok=True)
+
+for name in args.sizes:
+    path = output_dir / f"scan-{name}.gsu"
+    print(f"Writing {path}", file=sys.stderr)
+    write_scanner_input(path, SIZES[name])
+
+for depth in NESTING_DEPTHS:
+    path = output_dir / f"nested-{depth}.gsu"
+    print(f"Writing {path}", file=sys.stderr)
+    write_nested_input(path, depth)
+
+for depth in EXPRESSION_DEPTHS:
+    path = output_dir / f"expression-{depth}.gsu"
+    print(f"Writing {path}", file=sys.stderr)
+    write_expression_input(path, depth)
+
+for count in STATEMENT_COUNTS:
+    path = output_dir / f"long-{count}.gsu"
+    print(f"Writing {path}", file=sys.stderr)
+    write_long_input(path, count)
+
+print("OK.", file=sys.stderr)
@@ -0,0 +1,78 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Benchmarks
+{
+    // Design comments:
+    // BenchmarkDotNet runs every benchmark in a process of its own, built in a directory under
+    // bin, so the inputs can't be found relative to the current directory. They are looked up
+    // in GIOSUE_BENCHMARK_INPUTS if it's set, otherwise in the BenchmarkInputs directory next
+    // to Giosue.sln, which is where the generator writes them by default.
+    /// <summary>
+    /// Finds the inputs written by the benchmark input generator.
+    /// </summary>
+    static class BenchmarkInputs
+    {
+        public const string EnvironmentVariable = "GIOSUE_BENCHMARK_INPUTS";
+
+        private const string DirectoryName = "BenchmarkInputs";
+
+        private const string SolutionFileName = "Giosue.sln";
+
+        /// <summary>
+        /// Gets the path of an input.
+        /// </summary>
+        /// <param name="fileName">The name of the input file.</param>
+        /// <returns>The full path of the input.</returns>
+        /// <exception cref="FileNotFoundException">Thrown if the input hasn't been generated.</exception>
+        public static string GetPath(string fileName)
+        {
+            var path = Path.Combine(FindDirectory(), fileName);
+            if (!File.Exists(path))
+            {
+                throw new FileNotFoundException($"The benchmark input {fileName} doesn't exist. Run BenchmarkGenerator/GenerateBenchmarkInputs.py first.", path);
+            }
+            return path;
+        }
+
+        private static string FindDirectory()
+        {
+            var directory = System.Environment.GetEnvironmentVariable(EnvironmentVariable);
+            if (!string.IsNullOrEmpty(directory))
+            {
+                return directory;
+            }
+
+            for (var current = new DirectoryInfo(AppContext.BaseDirectory); current != null; current = current.Parent)
+            {
+                if (File.Exists(Path.Combine(current.FullName, SolutionFileName)))
+                {
+                    return Path.Combine(current.FullName, DirectoryName);
+                }
+            }
+
+            throw new DirectoryNotFoundException($"Unable to find {SolutionFileName}; set {EnvironmentVariable} to the directory of the benchmark inputs.");
+        }
+    }
+}
@@ -0,0 +1,74 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using BenchmarkDotNet.Attributes;
+
+namespace Giosue.Benchmarks
+{
+    /// <summary>
+    /// Measures the cost of calling Giosue functions with recursion that does almost no other work.
+    /// </summary>
+    [MemoryDiagnoser]
+    public class CallBenchmarks
+    {
+        private const string FibonacciCode = @"
+fun fib(n) {
+    se (n < 2) { ritorna n; }
+    ritorna fib(n - 1) + fib(n - 2);
+}
+var risultato = fib({0});";
+
+        private const string AckermannCode = @"
+fun ack(m, n) {
+    se (m == 0) { ritorna n + 1; }
+    se (n == 0) { ritorna ack(m - 1, 1); }
+    ritorna ack(m - 1, ack(m, n - 1));
+}
+var risultato = ack(2, {0});";
+
+        [Params(15, 22)]
+        public int N { get; set; }
+
+        private List<Statements.Statement> Fibonacci;
+
+        private List<Statements.Statement> Ackermann;
+
+        [GlobalSetup]
+        public void Setup()
+        {
+            Fibonacci = Workload.Prepare(FibonacciCode.Replace("{0}", N.ToString()));
+            Ackermann = Workload.Prepare(AckermannCode.Replace("{0}", N.ToString()));
+        }
+
+        [Benchmark]
+        public void RunFibonacci()
+        {
+            new Interpreter().Interpret(Fibonacci);
+        }
+
+        [Benchmark]
+        public void RunAckermann()
+        {
+            new Interpreter().Interpret(Ackermann);
+        }
+    }
+}
@@ -0,0 +1,113 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using BenchmarkDotNet.Attributes;
+
+namespace Giosue.Benchmarks
+{
+    // Design comments:
+    // The workloads are small enough to keep here instead of in the generated inputs. Each one
+    // is scanned, parsed and resolved once before the benchmarks run; every run interprets the
+    // resolved statements with a new `Interpreter`, so every run starts with fresh globals.
+    /// <summary>
+    /// Measures how fast the <see cref="Interpreter"/> runs recursion, tight loops and string building.
+    /// </summary>
+    [MemoryDiagnoser]
+    public class InterpreterBenchmarks
+    {
+        // Giosue functions don't return values, so the recursion counts its calls in a global.
+        private const string RecursionCode = @"
+var conto = 0;
+fun scendi(n) {
+    se (n > 0) {
+        conto = conto + 1;
+        scendi(n - 1);
+    }
+}
+var i = 0;
+mentre (i < {0}) {
+    scendi(100);
+    i = i + 100;
+}";
+
+        private const string LoopCode = @"
+var i = 0;
+var v = 0.0;
+mentre (i < {0}) {
+    i = i + 1;
+    v = v + 0.5;
+}";
+
+        private const string StringBuildingCode = @"
+var s = """";
+var i = 0;
+mentre (i < {0}) {
+    s = s @ ""x"";
+    i = i + 1;
+}";
+
+        [Params(1_000, 100_000)]
+        public int Iterations { get; set; }
+
+        private List<Statements.Statement> Recursion;
+
+        private List<Statements.Statement> Loop;
+
+        private List<Statements.Statement> StringBuilding;
+
+        [GlobalSetup]
+        public void Setup()
+        {
+            Recursion = Prepare(RecursionCode);
+            Loop = Prepare(LoopCode);
+            StringBuilding = Prepare(StringBuildingCode);
+        }
+
+        /// <summary>
+        /// Prepares a workload for the number of iterations.
+        /// </summary>
+        /// <param name="code">The code of the workload, with {0} in place of the number of iterations.</param>
+        /// <returns>The resolved statements.</returns>
+        private List<Statements.Statement> Prepare(string code)
+        {
+            return Workload.Prepare(code.Replace("{0}", Iterations.ToString()));
+        }
+
+        [Benchmark]
+        public void RunRecursion()
+        {
+            new Interpreter().Interpret(Recursion);
+        }
+
+        [Benchmark]
+        public void RunLoop()
+        {
+            new Interpreter().Interpret(Loop);
+        }
+
+        [Benchmark]
+        public void RunStringBuilding()
+        {
+            new Interpreter().Interpret(StringBuilding);
+        }
+    }
+}
@@ -0,0 +1,60 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using BenchmarkDotNet.Attributes;
+using SourceManager;
+
+namespace Giosue.Benchmarks
+{
+    /// <summary>
+    /// Measures how fast <see cref="Parser.TryParse"/> parses deeply nested blocks and expressions and very long programs.
+    /// </summary>
+    /// <remarks>
+    /// The code is scanned once before the benchmarks run, so only parsing is measured.
+    /// </remarks>
+    [MemoryDiagnoser]
+    public class ParserBenchmarks
+    {
+        [Params("nested-10", "nested-100", "nested-250", "expression-10", "expression-100", "expression-500", "long-1000", "long-10000", "long-100000")]
+        public string Input { get; set; }
+
+        private List<Token> Tokens;
+
+        [GlobalSetup]
+        public void Setup()
+        {
+            using var source = new StringSource(File.ReadAllText(BenchmarkInputs.GetPath($"{Input}.gsu")));
+            Tokens = new Scanner(source).ScanTokens();
+        }
+
+        [Benchmark]
+        public List<Statements.Statement> TryParse()
+        {
+            if (!new Parser(Tokens).TryParse(out var statements, out var exception))
+            {
+                throw exception;
+            }
+            return statements;
+        }
+    }
+}
@@ -0,0 +1,39 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using BenchmarkDotNet.Running;
+
+namespace Giosue.Benchmarks
+{
+    // Design comments:
+    // The inputs for the scanner and parser benchmarks are written by
+    // BenchmarkGenerator/GenerateBenchmarkInputs.py; run it before running the benchmarks.
+    // The arguments are passed to BenchmarkDotNet, so one class can be run with
+    // `--filter *ScannerBenchmarks*`.
+    class Program
+    {
+        static void Main(string[] args)
+        {
+            BenchmarkSwitcher.FromAssembly(typeof(Program).Assembly).Run(args);
+        }
+    }
+}
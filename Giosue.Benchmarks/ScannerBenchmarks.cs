@@ -0,0 +1,70 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using BenchmarkDotNet.Attributes;
+using SourceManager;
+
+namespace Giosue.Benchmarks
+{
+    /// <summary>
+    /// Measures how fast <see cref="Scanner.ScanTokens"/> scans the same code from each kind of <see cref="Source"/>.
+    /// </summary>
+    [MemoryDiagnoser]
+    public class ScannerBenchmarks
+    {
+        [Params("1KB", "10KB", "100KB", "1MB", "10MB", "100MB")]
+        public string Size { get; set; }
+
+        private string FilePath;
+
+        private string Code;
+
+        [GlobalSetup]
+        public void Setup()
+        {
+            FilePath = BenchmarkInputs.GetPath($"scan-{Size}.gsu");
+            Code = File.ReadAllText(FilePath);
+        }
+
+        [Benchmark(Baseline = true)]
+        public int ScanStringSource()
+        {
+            using var source = new StringSource(Code);
+            return new Scanner(source).ScanTokens().Count;
+        }
+
+        [Benchmark]
+        public int ScanFileSource()
+        {
+            using var source = new FileSource(new StreamReader(FilePath));
+            return new Scanner(source).ScanTokens().Count;
+        }
+
+        [Benchmark]
+        public int ScanMemorySource()
+        {
+            using var source = MemorySource.FromFile(FilePath);
+            return new Scanner(source).ScanTokens().Count;
+        }
+    }
+}
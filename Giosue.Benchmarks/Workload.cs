@@ -0,0 +1,49 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using SourceManager;
+
+namespace Giosue.Benchmarks
+{
+    /// <summary>
+    /// Prepares the code of a workload for the <see cref="Interpreter"/>.
+    /// </summary>
+    static class Workload
+    {
+        /// <summary>
+        /// Scans, parses and resolves the code of a workload.
+        /// </summary>
+        /// <param name="code">The code of the workload.</param>
+        /// <returns>The resolved statements.</returns>
+        public static List<Statements.Statement> Prepare(string code)
+        {
+            using var source = new StringSource(code);
+            var tokens = new Scanner(source).ScanTokens();
+            if (!new Parser(tokens).TryParse(out var statements, out var exception))
+            {
+                throw exception;
+            }
+            new Resolver().Resolve(statements);
+            return statements;
+        }
+    }
+}
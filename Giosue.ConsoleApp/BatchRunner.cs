@@ -0,0 +1,455 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Linq;
+using System.Threading;
+using Giosue.Arena;
+using Giosue.Bytecode;
+using Giosue.Exceptions;
+using SourceManager;
+
+namespace Giosue.ConsoleApp
+{
+    // Design comments:
+    // A batch runs many small, independent scripts in one process, so starting the runtime
+    // is paid for once instead of once per script. Every script gets its own `Session`, so
+    // scripts never see each other's globals, and its own writers for what it prints and for
+    // its errors, so scripts that run at the same time never interleave their output.
+    // The sessions are forked from one snapshot of the builtins, so the builtins are only
+    // registered once.
+    // The scripts are shared out between a fixed number of worker threads, which each take
+    // the next script from `NextScript` until there are none left. A finished script is
+    // written out as soon as every script listed before it has been written, so the output
+    // is in the same order as running the scripts one after another.
+    // The workers are threads of their own rather than thread pool threads so that they can
+    // have as much stack as the main thread; a deeply recursive script would otherwise
+    // overflow the stack in a batch but not on its own, and take every other script with it.
+    /// <summary>
+    /// Runs many scripts at once, each in its own <see cref="Session"/>.
+    /// </summary>
+    class BatchRunner
+    {
+        /// <summary>
+        /// The extension of the scripts that are run from a directory.
+        /// </summary>
+        private const string ScriptExtension = ".gsu";
+
+        /// <summary>
+        /// The stack size of a worker thread, which is the same as the main thread's on most systems.
+        /// </summary>
+        private const int WorkerStackSize = 8 * 1024 * 1024;
+
+        /// <summary>
+        /// The result of running one script.
+        /// </summary>
+        private class ScriptResult
+        {
+            public GiosueExceptionCategory Category { get; init; }
+
+            /// <summary>
+            /// What the script printed.
+            /// </summary>
+            public string Output { get; init; }
+
+            /// <summary>
+            /// The errors and warnings from running the script.
+            /// </summary>
+            public string Errors { get; init; }
+
+            /// <summary>
+            /// The number of <see cref="Stopwatch"/> ticks spent running the script.
+            /// </summary>
+            public long ElapsedTicks { get; init; }
+
+            public long AllocatedBytes { get; init; }
+        }
+
+        private readonly Options Options;
+
+        /// <summary>
+        /// The globals that every script starts with.
+        /// </summary>
+        private readonly GlobalsSnapshot Builtins = new Session().Snapshot();
+
+        /// <summary>
+        /// The writer that what the scripts print is written to.
+        /// </summary>
+        private readonly TextWriter Output;
+
+        /// <summary>
+        /// The paths of the scripts, in the order their results are written.
+        /// </summary>
+        private readonly string[] Paths;
+
+        /// <summary>
+        /// The result of each script in <see cref="Paths"/>, or null if it hasn't finished.
+        /// </summary>
+        private readonly ScriptResult[] Results;
+
+        /// <summary>
+        /// The index of the next script for a worker to run.
+        /// </summary>
+        private int NextScript = 0;
+
+        /// <summary>
+        /// The index of the next script whose result is written. Only used while holding <see cref="WriteLock"/>.
+        /// </summary>
+        private int NextResult = 0;
+
+        private readonly object WriteLock = new();
+
+        /// <summary>
+        /// The number of scripts that finished with each category.
+        /// </summary>
+        private readonly Dictionary<GiosueExceptionCategory, int> CategoryCounts = new();
+
+        /// <summary>
+        /// The category of the first script in <see cref="Paths"/> that failed, or <see cref="GiosueExceptionCategory.AllOK"/>.
+        /// </summary>
+        private GiosueExceptionCategory FirstFailure = GiosueExceptionCategory.AllOK;
+
+        private long TotalScriptTicks = 0;
+
+        private long TotalAllocatedBytes = 0;
+
+        /// <summary>
+        /// Creates a new <see cref="BatchRunner"/>.
+        /// </summary>
+        /// <param name="options">The options for running the scripts.</param>
+        /// <param name="paths">The paths of the scripts to run.</param>
+        /// <param name="output">The writer that what the scripts print is written to.</param>
+        public BatchRunner(Options options, IEnumerable<string> paths, TextWriter output)
+        {
+            Options = options;
+            Output = output;
+            Paths = paths.ToArray();
+            Results = new ScriptResult[Paths.Length];
+        }
+
+        /// <summary>
+        /// Finds the scripts named by a directory, a glob or a manifest.
+        /// </summary>
+        /// <remarks>
+        /// A directory means every <c>.gsu</c> file in it and its subdirectories. A glob may only
+        /// have wildcards in its file name, such as <c>scripts/*.gsu</c>. Any other file is a
+        /// manifest with one path on each line; blank lines and lines starting with <c>#</c>
+        /// are skipped, and relative paths are relative to the manifest's directory.
+        /// </remarks>
+        /// <param name="pattern">The directory, glob or manifest.</param>
+        /// <param name="paths">The paths of the scripts.</param>
+        /// <param name="error">A description of what went wrong if the scripts could not be found.</param>
+        /// <returns>True if the scripts were found, false otherwise.</returns>
+        public static bool TryFindScripts(string pattern, out List<string> paths, out string error)
+        {
+            paths = null;
+            error = null;
+
+            try
+            {
+                if (Directory.Exists(pattern))
+                {
+                    paths = Directory.EnumerateFiles(pattern, "*" + ScriptExtension, SearchOption.AllDirectories).ToList();
+                }
+                else if (pattern.IndexOfAny(new[] { '*', '?' }) >= 0)
+                {
+                    var directory = Path.GetDirectoryName(pattern);
+                    if (directory.IndexOfAny(new[] { '*', '?' }) >= 0)
+                    {
+                        error = $"Only the file name of '{pattern}' can have wildcards.";
+                        return false;
+                    }
+                    paths = Directory.EnumerateFiles(directory == "" ? "." : directory, Path.GetFileName(pattern)).ToList();
+                }
+                else if (File.Exists(pattern))
+                {
+                    var manifestDirectory = Path.GetDirectoryName(Path.GetFullPath(pattern));
+                    paths = File.ReadLines(pattern)
+                        .Select(line => line.Trim())
+                        .Where(line => line.Length > 0 && !line.StartsWith('#'))
+                        .Select(line => Path.Combine(manifestDirectory, line))
+                        .ToList();
+
+                    // A manifest is run in the order it's written.
+                    return true;
+                }
+                else
+                {
+                    error = $"'{pattern}' is not a directory, glob or manifest.";
+                    return false;
+                }
+            }
+            catch (Exception e) when (e is IOException || e is UnauthorizedAccessException)
+            {
+                error = $"Unable to find the scripts in '{pattern}': {e.Message}";
+                return false;
+            }
+
+            paths.Sort(StringComparer.Ordinal);
+            return true;
+        }
+
+        /// <summary>
+        /// Runs every script, writes their output and errors in order, then writes a summary to <see cref="Console.Error"/>.
+        /// </summary>
+        /// <returns>The category of the first script that failed, or <see cref="GiosueExceptionCategory.AllOK"/> if none did.</returns>
+        public GiosueExceptionCategory Run()
+        {
+            var workerCount = Math.Max(1, Math.Min(Options.Jobs, Paths.Length));
+            var startTimestamp = Stopwatch.GetTimestamp();
+
+            var workers = new Thread[workerCount];
+            for (int i = 0; i < workers.Length; i++)
+            {
+                workers[i] = new Thread(Work, WorkerStackSize) { Name = $"Giosue batch worker {i}" };
+                workers[i].Start();
+            }
+            foreach (var worker in workers)
+            {
+                worker.Join();
+            }
+
+            var elapsedTicks = Stopwatch.GetTimestamp() - startTimestamp;
+            Output.Flush();
+            WriteSummary(workerCount, elapsedTicks);
+            return FirstFailure;
+        }
+
+        /// <summary>
+        /// Runs scripts until there are none left.
+        /// </summary>
+        private void Work()
+        {
+            int index;
+            while ((index = Interlocked.Increment(ref NextScript) - 1) < Paths.Length)
+            {
+                Volatile.Write(ref Results[index], RunScript(Paths[index]));
+                WriteFinishedResults();
+            }
+        }
+
+        /// <summary>
+        /// Runs one script in a new <see cref="Session"/>.
+        /// </summary>
+        /// <param name="path">The path of the script.</param>
+        /// <returns>The result of running the script.</returns>
+        private ScriptResult RunScript(string path)
+        {
+            var output = new StringWriter();
+            var errors = new StringWriter();
+            var session = new Session(Builtins);
+            session.Interpreter.Output = output;
+            session.Interpreter.Tiering = Options.TieredThreshold is int threshold ? new Tiering.TieredCompilation(threshold) : null;
+
+            var allocatedBefore = GC.GetAllocatedBytesForCurrentThread();
+            var startTimestamp = Stopwatch.GetTimestamp();
+            var category = RunScript(session, path, errors);
+
+            return new ScriptResult()
+            {
+                Category = category,
+                Output = output.ToString(),
+                Errors = errors.ToString(),
+                ElapsedTicks = Stopwatch.GetTimestamp() - startTimestamp,
+                AllocatedBytes = GC.GetAllocatedBytesForCurrentThread() - allocatedBefore,
+            };
+        }
+
+        /// <summary>
+        /// Runs one script with the engine chosen in the <see cref="Options"/>.
+        /// </summary>
+        /// <param name="session">The session to run the script in.</param>
+        /// <param name="path">The path of the script.</param>
+        /// <param name="errors">The writer for errors and warnings.</param>
+        /// <returns>The result of running the script.</returns>
+        private GiosueExceptionCategory RunScript(Session session, string path, TextWriter errors)
+        {
+            try
+            {
+                using var source = MemorySource.FromFile(path);
+
+                if (Options.Engine == ExecutionEngine.TreeWalker)
+                {
+                    session.Run(source);
+                    return GiosueExceptionCategory.AllOK;
+                }
+
+                // The arena needs the whole script, which the parser emits straight into it.
+                if (Options.Engine == ExecutionEngine.Arena)
+                {
+                    var builder = new ArenaBuilder();
+                    var parsedIntoArena = new Parser<int, int>(new Scanner(source).EnumerateTokens(), builder).ParseStatements().ToList();
+                    session.Run(builder.AddStatements(parsedIntoArena));
+                    return GiosueExceptionCategory.AllOK;
+                }
+
+                // The compiler needs the whole script, and the optimizer can fold the casts because it sees all of it.
+                var parsed = new Parser(new Scanner(source).EnumerateTokens()).ParseStatements().ToList();
+                var statements = new Optimizer(session.Globals).Optimize(parsed);
+                new Resolver().Resolve(statements);
+
+                BytecodeFunction script = null;
+                try
+                {
+                    script = new Compiler().Compile(statements);
+                }
+                catch (CompilerException e)
+                {
+                    errors.WriteLine($"compiler exception on line {e.Line}, falling back to the tree-walking interpreter: {e.Message}");
+                }
+
+                if (script == null)
+                {
+                    session.Run(statements);
+                }
+                else
+                {
+                    session.Run(script);
+                }
+                return GiosueExceptionCategory.AllOK;
+            }
+            catch (ScannerException e)
+            {
+                errors.WriteLine($"scanner exception on line {e.Line}: {e.ExceptionType} ({(int)e.ExceptionType}): {e.Message}");
+                return e.Category;
+            }
+            catch (ParserException e)
+            {
+                errors.WriteLine($"parser exception at {e.ErroneousToken}: {e.ExceptionType} ({(int)e.ExceptionType}): {e.Message}");
+                return e.Category;
+            }
+            catch (InterpreterException e)
+            {
+                errors.WriteLine($"interpreter exception: {e.ExceptionType} ({(int)e.ExceptionType}): {e.Message}");
+                return e.Category;
+            }
+            catch (EnvironmentException e)
+            {
+                errors.WriteLine($"environment exception: {e.ExceptionType} ({(int)e.ExceptionType}): {e.Message}");
+                return e.Category;
+            }
+            catch (MismatchedTypeException e)
+            {
+                var expected = string.Join(" or ", e.ExpectedTypes?.Select(t => t.Name) ?? Enumerable.Empty<string>());
+                errors.WriteLine($"mismatched types: expected {expected}, got {e.ActualType?.Name ?? "niente"}");
+                return GiosueExceptionCategory.Interpreter;
+            }
+            catch (Exception e) when (e is IOException || e is UnauthorizedAccessException)
+            {
+                errors.WriteLine($"unable to read the file: {e.Message}");
+                return GiosueExceptionCategory.Unknown;
+            }
+            catch (Exception e)
+            {
+                // One broken script shouldn't stop the rest of the batch.
+                errors.WriteLine($"unexpected exception: {e}");
+                return GiosueExceptionCategory.Unknown;
+            }
+        }
+
+        /// <summary>
+        /// Writes the results of the finished scripts that every earlier script has been written before.
+        /// </summary>
+        private void WriteFinishedResults()
+        {
+            lock (WriteLock)
+            {
+                while (NextResult < Results.Length && Volatile.Read(ref Results[NextResult]) is ScriptResult result)
+                {
+                    WriteResult(Paths[NextResult], result);
+                    CountResult(result);
+
+                    // The output has been written, so don't keep it around until the whole batch is done.
+                    Results[NextResult] = null;
+                    NextResult++;
+                }
+            }
+        }
+
+        /// <summary>
+        /// Writes what a script printed to <see cref="Output"/> and its errors to <see cref="Console.Error"/>.
+        /// </summary>
+        /// <param name="path">The path of the script.</param>
+        /// <param name="result">The result of running the script.</param>
+        private void WriteResult(string path, ScriptResult result)
+        {
+            if (result.Output.Length > 0)
+            {
+                Output.WriteLine($"==> {path} <==");
+                Output.Write(result.Output);
+                if (!result.Output.EndsWith('\n'))
+                {
+                    Output.WriteLine();
+                }
+            }
+
+            if (result.Errors.Length > 0)
+            {
+                // The errors of a script come out after what it printed.
+                Output.Flush();
+                foreach (var line in result.Errors.Split(System.Environment.NewLine, StringSplitOptions.RemoveEmptyEntries))
+                {
+                    Console.Error.WriteLine($"{path}: {line}");
+                }
+            }
+        }
+
+        /// <summary>
+        /// Adds the result of a script to the totals.
+        /// </summary>
+        /// <param name="result">The result of running the script.</param>
+        private void CountResult(ScriptResult result)
+        {
+            CategoryCounts[result.Category] = CategoryCounts.GetValueOrDefault(result.Category) + 1;
+            if (FirstFailure == GiosueExceptionCategory.AllOK)
+            {
+                FirstFailure = result.Category;
+            }
+
+            TotalScriptTicks += result.ElapsedTicks;
+            TotalAllocatedBytes += result.AllocatedBytes;
+        }
+
+        /// <summary>
+        /// Writes the number of scripts of each category and how fast they ran to <see cref="Console.Error"/>.
+        /// </summary>
+        /// <param name="workerCount">The number of workers that ran the scripts.</param>
+        /// <param name="elapsedTicks">The number of <see cref="Stopwatch"/> ticks the whole batch took.</param>
+        private void WriteSummary(int workerCount, long elapsedTicks)
+        {
+            var elapsedMilliseconds = elapsedTicks * 1000.0 / Stopwatch.Frequency;
+            var scriptMilliseconds = TotalScriptTicks * 1000.0 / Stopwatch.Frequency;
+            var scriptsPerSecond = elapsedTicks == 0 ? 0 : Paths.Length * (double)Stopwatch.Frequency / elapsedTicks;
+
+            Console.Error.WriteLine($"Ran {Paths.Length} scripts in {elapsedMilliseconds:F1} ms on {workerCount} workers ({scriptsPerSecond:F1} scripts/s)");
+            Console.Error.WriteLine($"Time in scripts: {scriptMilliseconds:F1} ms ({(Paths.Length == 0 ? 0 : scriptMilliseconds / Paths.Length):F2} ms per script)");
+            foreach (var (category, count) in CategoryCounts.OrderBy(pair => pair.Key))
+            {
+                Console.Error.WriteLine($"  {category,-12} {count}");
+            }
+
+            if (Options.ReportAllocations)
+            {
+                Console.Error.WriteLine($"Allocated: {TotalAllocatedBytes} bytes");
+            }
+        }
+    }
+}
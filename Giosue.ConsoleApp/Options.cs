@@ -0,0 +1,321 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue.IO;
+
+namespace Giosue.ConsoleApp
+{
+    /// <summary>
+    /// The engine that runs the code.
+    /// </summary>
+    enum ExecutionEngine
+    {
+        /// <summary>
+        /// The tree-walking <see cref="Interpreter"/>.
+        /// </summary>
+        TreeWalker,
+
+        /// <summary>
+        /// The bytecode <see cref="Bytecode.VirtualMachine"/>.
+        /// </summary>
+        VirtualMachine,
+
+        /// <summary>
+        /// The tree-walking <see cref="Interpreter"/>, running the code from a <see cref="Arena.SyntaxArena"/>.
+        /// </summary>
+        Arena,
+    }
+
+    /// <summary>
+    /// Where the output of <c>Scrive</c> and <c>ScriveLina</c> goes.
+    /// </summary>
+    enum OutputSink
+    {
+        /// <summary>
+        /// The standard output stream.
+        /// </summary>
+        Console,
+
+        /// <summary>
+        /// The file at <see cref="Options.OutputPath"/>.
+        /// </summary>
+        File,
+
+        /// <summary>
+        /// Nowhere; the output is thrown away.
+        /// </summary>
+        Null,
+    }
+
+    /// <summary>
+    /// The command line options for the console app.
+    /// </summary>
+    class Options
+    {
+        public const string Usage =
+            "Usage: giosue.exe [options] [path-to-file]\n" +
+            "       giosue.exe --batch [--jobs=n] [--engine=tree|vm|arena] [--tiered[=n]] [--allocations] directory|glob|manifest\n" +
+            "Options:\n" +
+            "  --engine=tree|vm|arena\n" +
+            "                      The engine that runs the code: the tree-walking interpreter, the bytecode\n" +
+            "                      virtual machine, or the tree-walking interpreter over the whole script\n" +
+            "                      stored in a syntax arena (default: tree).\n" +
+            "  --tiered[=n]        Compile a function to .NET code once it has been called n times (default: 100).\n" +
+            "                      Only the tree-walking interpreter compiles functions, and not while profiling.\n" +
+            "  --disassemble       Print the bytecode before running it (implies --engine=vm).\n" +
+            "  --print-optimized   Print the tree of the code after it's optimized.\n" +
+            "  --profile[=file]    Print a profile of the functions and loops and write their folded stacks\n" +
+            "                      to file (default: the script's path plus .folded; implies --engine=tree).\n" +
+            "  --allocations       Print the number of bytes allocated while running the code.\n" +
+            "  --cache[=dir]       Cache the parsed file in dir (default: the user's local application data).\n" +
+            "  --batch             Run every .gsu file in a directory, every file matching a glob such as\n" +
+            "                      scripts/*.gsu, or every file listed in a manifest (one path per line).\n" +
+            "  --jobs=n            The number of scripts to run at once in batch mode (default: the number of cores).\n" +
+            "  --output=console|null|file\n" +
+            "                      Where the scripts' output goes (default: console).\n" +
+            "  --output-buffer=n   The number of characters of output to buffer; 0 writes it immediately (default: 65536).\n" +
+            "  --flush=line|full|exit\n" +
+            "                      Flush the output after every line, when the buffer is full, or only when the\n" +
+            "                      program ends (default: line for a terminal, otherwise full).";
+
+        /// <summary>
+        /// The path of the file to run, or null to run the REPL.
+        /// </summary>
+        public string Path { get; private set; } = null;
+
+        /// <summary>
+        /// The engine that runs the code.
+        /// </summary>
+        public ExecutionEngine Engine { get; private set; } = ExecutionEngine.TreeWalker;
+
+        /// <summary>
+        /// The number of calls after which a function is compiled, or null to interpret every function.
+        /// </summary>
+        public int? TieredThreshold { get; private set; } = null;
+
+        /// <summary>
+        /// Indicates if the bytecode should be printed before it's run.
+        /// </summary>
+        public bool Disassemble { get; private set; } = false;
+
+        /// <summary>
+        /// Indicates if the tree of the code should be printed after it's optimized.
+        /// </summary>
+        public bool PrintOptimized { get; private set; } = false;
+
+        /// <summary>
+        /// Indicates if the number of bytes allocated while running the code should be printed.
+        /// </summary>
+        public bool ReportAllocations { get; private set; } = false;
+
+        /// <summary>
+        /// Indicates if the functions and loops should be profiled.
+        /// </summary>
+        public bool Profile { get; private set; } = false;
+
+        /// <summary>
+        /// The path of the file to write the folded stacks to, or null to use the default.
+        /// </summary>
+        public string FoldedStacksPath { get; private set; } = null;
+
+        /// <summary>
+        /// The directory for the <see cref="Serialization.ScriptCache"/>, or null to not use the cache.
+        /// </summary>
+        public string CacheDirectory { get; private set; } = null;
+
+        /// <summary>
+        /// Indicates if <see cref="Path"/> names a batch of scripts to run instead of one file.
+        /// </summary>
+        public bool Batch { get; private set; } = false;
+
+        /// <summary>
+        /// The number of scripts to run at once in batch mode.
+        /// </summary>
+        public int Jobs { get; private set; } = System.Environment.ProcessorCount;
+
+        /// <summary>
+        /// Where the output of <c>Scrive</c> and <c>ScriveLina</c> goes.
+        /// </summary>
+        public OutputSink OutputSink { get; private set; } = OutputSink.Console;
+
+        /// <summary>
+        /// The path of the file to write the output to if <see cref="OutputSink"/> is <see cref="OutputSink.File"/>.
+        /// </summary>
+        public string OutputPath { get; private set; } = null;
+
+        /// <summary>
+        /// The number of characters of output to buffer.
+        /// </summary>
+        public int OutputBufferSize { get; private set; } = BufferedOutput.DefaultBufferSize;
+
+        /// <summary>
+        /// When the output is flushed, or null to choose based on where the output goes.
+        /// </summary>
+        public OutputFlushPolicy? FlushPolicy { get; private set; } = null;
+
+        /// <summary>
+        /// Parses the command line arguments.
+        /// </summary>
+        /// <param name="args">The command line arguments.</param>
+        /// <param name="options">The parsed options.</param>
+        /// <param name="error">A description of what went wrong if the arguments could not be parsed.</param>
+        /// <returns>True if the arguments were parsed, false otherwise.</returns>
+        public static bool TryParse(string[] args, out Options options, out string error)
+        {
+            options = new Options();
+            error = null;
+
+            foreach (var arg in args)
+            {
+                if (!arg.StartsWith("--"))
+                {
+                    if (options.Path != null)
+                    {
+                        error = "Only one file can be run at a time.";
+                        return false;
+                    }
+                    options.Path = arg;
+                    continue;
+                }
+
+                var separatorIndex = arg.IndexOf('=');
+                var name = separatorIndex < 0 ? arg : arg[..separatorIndex];
+                var value = separatorIndex < 0 ? null : arg[(separatorIndex + 1)..];
+
+                switch (name)
+                {
+                    case "--engine":
+                        switch (value)
+                        {
+                            case "tree": options.Engine = ExecutionEngine.TreeWalker; break;
+                            case "vm": options.Engine = ExecutionEngine.VirtualMachine; break;
+                            case "arena": options.Engine = ExecutionEngine.Arena; break;
+                            default:
+                                error = $"Unknown engine '{value}'.";
+                                return false;
+                        }
+                        break;
+                    case "--tiered":
+                        if (string.IsNullOrEmpty(value))
+                        {
+                            options.TieredThreshold = Tiering.TieredCompilation.DefaultThreshold;
+                        }
+                        else if (int.TryParse(value, out var threshold) && threshold >= 1)
+                        {
+                            options.TieredThreshold = threshold;
+                        }
+                        else
+                        {
+                            error = $"The number of calls before a function is compiled must be a positive integer, not '{value}'.";
+                            return false;
+                        }
+                        break;
+                    case "--disassemble":
+                        options.Disassemble = true;
+                        options.Engine = ExecutionEngine.VirtualMachine;
+                        break;
+                    case "--print-optimized":
+                        options.PrintOptimized = true;
+                        break;
+                    case "--profile":
+                        options.Profile = true;
+                        options.FoldedStacksPath = string.IsNullOrEmpty(value) ? null : value;
+                        options.Engine = ExecutionEngine.TreeWalker;
+                        break;
+                    case "--allocations":
+                        options.ReportAllocations = true;
+                        break;
+                    case "--cache":
+                        options.CacheDirectory = string.IsNullOrEmpty(value) ? Serialization.ScriptCache.DefaultDirectory : value;
+                        break;
+                    case "--batch":
+                        options.Batch = true;
+                        break;
+                    case "--jobs":
+                        if (!int.TryParse(value, out var jobs) || jobs < 1)
+                        {
+                            error = $"The number of jobs must be a positive integer, not '{value}'.";
+                            return false;
+                        }
+                        options.Jobs = jobs;
+                        break;
+                    case "--output":
+                        switch (value)
+                        {
+                            case "console": options.OutputSink = OutputSink.Console; break;
+                            case "null": options.OutputSink = OutputSink.Null; break;
+                            case null:
+                            case "":
+                                error = "--output needs 'console', 'null' or the path of a file.";
+                                return false;
+                            default:
+                                options.OutputSink = OutputSink.File;
+                                options.OutputPath = value;
+                                break;
+                        }
+                        break;
+                    case "--output-buffer":
+                        if (!int.TryParse(value, out var bufferSize) || bufferSize < 0)
+                        {
+                            error = $"The size of the output buffer must be a non-negative integer, not '{value}'.";
+                            return false;
+                        }
+                        options.OutputBufferSize = bufferSize;
+                        break;
+                    case "--flush":
+                        switch (value)
+                        {
+                            case "line": options.FlushPolicy = OutputFlushPolicy.OnNewLine; break;
+                            case "full": options.FlushPolicy = OutputFlushPolicy.WhenFull; break;
+                            case "exit": options.FlushPolicy = OutputFlushPolicy.OnExit; break;
+                            default:
+                                error = $"Unknown flush policy '{value}'.";
+                                return false;
+                        }
+                        break;
+                    default:
+                        error = $"Unknown option '{arg}'.";
+                        return false;
+                }
+            }
+
+            if (options.Batch)
+            {
+                if (options.Path == null)
+                {
+                    error = "Batch mode needs a directory, glob or manifest.";
+                    return false;
+                }
+
+                // These options write to one shared file or to the console while the code runs,
+                // which doesn't work when many scripts run at once.
+                if (options.Profile || options.CacheDirectory != null || options.Disassemble || options.PrintOptimized)
+                {
+                    error = "--profile, --cache, --disassemble and --print-optimized can't be used in batch mode.";
+                    return false;
+                }
+            }
+
+            return true;
+        }
+    }
+}
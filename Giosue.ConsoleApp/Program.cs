@@ -21,9 +21,15 @@ using System.Collections.Generic;
 using System.IO;
 using System.Linq;
 using System.Reflection;
+using Giosue.Arena;
 using Giosue.AST;
+using Giosue.Bytecode;
 using Giosue.Exceptions;
+using Giosue.IO;
+using Giosue.Profiling;
 using Giosue.ReturnCodes;
+using Giosue.Serialization;
+using Giosue.Tiering;
 using SourceManager;
 using SourceManager.Exceptions;
 
@@ -32,8 +38,32 @@ namespace Giosue.ConsoleApp
     class Program
     {
         const int MaxStringifiedTokenLength = 50;
+
+        /// <summary>
+        /// The size in bytes of the largest file that is read through a <see cref="FileSource"/>.
+        /// </summary>
+        /// <remarks>
+        /// A file never decodes to more characters than it has bytes, so a file of this size always fits in the
+        /// <see cref="FileSource.BufferLength"/> characters of the buffer.
+        /// </remarks>
+        private const long MaxFileSourceBytes = FileSource.BufferLength;
         
-        private static Environment OldEnvironment;
+        /// <summary>
+        /// The session that runs every input, so the REPL keeps one set of globals.
+        /// </summary>
+        private static readonly Session Session = new();
+
+        private static Options Options = new();
+
+        /// <summary>
+        /// The profiler shared by every interpreter, or null if profiling is off.
+        /// </summary>
+        private static Profiler Profiler = null;
+
+        /// <summary>
+        /// Where the output of <c>Scrive</c> and <c>ScriveLina</c> goes, or null until the options are parsed.
+        /// </summary>
+        private static TextWriter Output = null;
 
         // TODO: Clean up return codes
 
@@ -43,18 +73,33 @@ namespace Giosue.ConsoleApp
             
             try
             {
-                if (args.Length == 0)
+                if (!Options.TryParse(args, out Options, out var error))
+                {
+                    ErrorWriteLine(error);
+                    ErrorWriteLine(Options.Usage);
+                    returnCode = GiosueExceptionCategory.Unknown;
+                }
+                else if (!TryOpenOutput(out Output))
                 {
-                    returnCode = RunREPL();
+                    returnCode = GiosueExceptionCategory.Unknown;
                 }
-                else if (args.Length == 1)
+                else if (Options.Batch)
                 {
-                    returnCode = RunFile(args[0]);
+                    returnCode = RunBatch(Options.Path);
                 }
                 else
                 {
-                    ErrorWriteLine("Usage: giosue.exe [path-to-file]");
-                    returnCode = GiosueExceptionCategory.Unknown;
+                    Profiler = Options.Profile ? new Profiler() : null;
+                    Session.Interpreter.Profiler = Profiler;
+                    Session.Interpreter.Tiering = Options.TieredThreshold is int threshold ? new TieredCompilation(threshold) : null;
+                    Session.Interpreter.Output = Output;
+
+                    returnCode = Options.Path == null ? RunREPL() : RunFile(Options.Path);
+
+                    if (Profiler != null)
+                    {
+                        WriteProfile(Options.FoldedStacksPath ?? (Options.Path ?? "giosue") + ".folded");
+                    }
                 }
             }
             catch (Exception e)
@@ -63,6 +108,10 @@ namespace Giosue.ConsoleApp
                 ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: Exception occurred somewhere. Good luck finding it!");
                 ErrorWriteLine(e);
             }
+            finally
+            {
+                Output?.Dispose();
+            }
 
 #if DEBUG
             Console.WriteLine("\nPress any key to continue...");
@@ -95,12 +144,64 @@ namespace Giosue.ConsoleApp
                 }
 
                 RunString(input);
+
+                // The output has to come out before the next prompt.
+                Output.Flush();
             }
 
         omega:
             return GiosueExceptionCategory.AllOK;
         }
 
+        /// <summary>
+        /// Runs the scripts named by a directory, a glob or a manifest at the same time.
+        /// </summary>
+        /// <param name="pattern">The directory, glob or manifest.</param>
+        /// <returns>The category of the first script that failed, or <see cref="GiosueExceptionCategory.AllOK"/> if none did.</returns>
+        private static GiosueExceptionCategory RunBatch(string pattern)
+        {
+            if (!BatchRunner.TryFindScripts(pattern, out var paths, out var error))
+            {
+                ErrorWriteLine($"Error: {error}");
+                return GiosueExceptionCategory.Unknown;
+            }
+
+            return new BatchRunner(Options, paths, Output).Run();
+        }
+
+        /// <summary>
+        /// Opens the writer for the output of <c>Scrive</c> and <c>ScriveLina</c> chosen in the <see cref="Options"/>.
+        /// </summary>
+        /// <param name="output">The writer.</param>
+        /// <returns>True if the writer was opened, false otherwise.</returns>
+        private static bool TryOpenOutput(out TextWriter output)
+        {
+            output = null;
+            try
+            {
+                switch (Options.OutputSink)
+                {
+                    case OutputSink.Null:
+                        output = TextWriter.Null;
+                        break;
+                    case OutputSink.File:
+                        output = BufferedOutput.OpenFile(Options.OutputPath, Options.OutputBufferSize, Options.FlushPolicy ?? OutputFlushPolicy.WhenFull);
+                        break;
+                    default:
+                        // Like C's standard output, a terminal sees every line as soon as it's printed.
+                        var flushPolicy = Options.FlushPolicy ?? (Console.IsOutputRedirected ? OutputFlushPolicy.WhenFull : OutputFlushPolicy.OnNewLine);
+                        output = BufferedOutput.OpenConsole(Options.OutputBufferSize, flushPolicy);
+                        break;
+                }
+                return true;
+            }
+            catch (Exception e) when (e is IOException || e is UnauthorizedAccessException)
+            {
+                ErrorWriteLine($"Error: unable to open {Options.OutputPath} for the output: {e.Message}");
+                return false;
+            }
+        }
+
         private static GiosueExceptionCategory RunFile(string path)
         {
             if (!File.Exists(path))
@@ -112,12 +213,61 @@ namespace Giosue.ConsoleApp
                 throw new FileNotFoundException();
             }
 
-            using var reader = new StreamReader(path);
-            using var source = new FileSource(reader);
+            if (Options.CacheDirectory != null)
+            {
+                return RunFileWithCache(path);
+            }
+
+            using var source = OpenFile(path);
             return RunCodeFromSource(source);
         }
 
-        private static GiosueExceptionCategory RunString(string s, Environment environment = null)
+        /// <summary>
+        /// Runs a file, using the <see cref="ScriptCache"/> to skip scanning, parsing and resolving if the file hasn't changed.
+        /// </summary>
+        /// <param name="path">The path of the file.</param>
+        /// <returns>The result of running the file.</returns>
+        private static GiosueExceptionCategory RunFileWithCache(string path)
+        {
+            var cache = new ScriptCache(Options.CacheDirectory);
+            var key = ScriptCache.ComputeKey(File.ReadAllBytes(path));
+
+            if (!cache.TryLoad(key, out var statements))
+            {
+                using var source = OpenFile(path);
+                var result = ScanParseAndResolveCode(source, out statements);
+                if (result != GiosueExceptionCategory.AllOK)
+                {
+                    return result;
+                }
+
+                if (!cache.TrySave(key, statements))
+                {
+                    ErrorWriteLine($"Warning: unable to write to the cache in {cache.Directory}");
+                }
+            }
+
+            return RunStatements(statements);
+        }
+
+        /// <summary>
+        /// Opens a file as a <see cref="Source"/>.
+        /// </summary>
+        /// <param name="path">The path of the file.</param>
+        /// <returns>The source.</returns>
+        private static Source OpenFile(string path)
+        {
+            // A file that doesn't fit in the buffer of a FileSource is read into memory
+            // all at once so that the buffer never has to be refilled.
+            if (new FileInfo(path).Length > MaxFileSourceBytes)
+            {
+                return MemorySource.FromFile(path);
+            }
+
+            return new FileSource(new StreamReader(path));
+        }
+
+        private static GiosueExceptionCategory RunString(string s)
         {
             if (string.IsNullOrEmpty(s))
             {
@@ -130,23 +280,172 @@ namespace Giosue.ConsoleApp
 
         private static GiosueExceptionCategory RunCodeFromSource(Source s)
         {
+            // The tree-walking interpreter can run each statement as soon as it's parsed.
+            // The compiler and the arena need the whole script.
+            if (Options.Engine == ExecutionEngine.TreeWalker)
+            {
+                return RunCodeFromSourceIncrementally(s);
+            }
+
+            if (Options.Engine == ExecutionEngine.Arena)
+            {
+                var arenaResult = ScanParseAndResolveCodeIntoArena(s, out var arenaStatements);
+                if (arenaResult != GiosueExceptionCategory.AllOK)
+                {
+                    return arenaResult;
+                }
+
+                return RunStatements(null, arenaStatements);
+            }
+
+            var result = ScanParseAndResolveCode(s, out var statements);
+            if (result != GiosueExceptionCategory.AllOK)
+            {
+                return result;
+            }
+
+            return RunStatements(statements);
+        }
+
+        /// <summary>
+        /// Scans, parses and resolves all of the code in a source.
+        /// </summary>
+        /// <param name="s">The source code.</param>
+        /// <param name="statements">The resolved statements.</param>
+        /// <returns>The result of scanning, parsing and resolving the code.</returns>
+        private static GiosueExceptionCategory ScanParseAndResolveCode(Source s, out List<Statements.Statement> statements)
+        {
+            statements = null;
+
             var scanResult = ScanCode(s, out var scannedTokens);
             if (scanResult != null)
             {
                 return scanResult.Category;
             }
 
-            var successfullyParsed = ParseCode(scannedTokens, out var statements, out var parserException);
+            var successfullyParsed = ParseCode(scannedTokens, out statements, out var parserException);
             if (!successfullyParsed)
             {
                 return parserException.Category;
             }
 
-            var interpreter = new Interpreter(OldEnvironment);
+            // The optimizer can fold the casts because it sees the whole script.
+            statements = new Optimizer(Session.Globals).Optimize(statements);
+            if (Options.PrintOptimized)
+            {
+                ErrorWriteLine(new ASTPrinter().StringifyStatements(statements));
+            }
+
+            var resolveResult = ResolveCode(statements);
+            if (resolveResult != null)
+            {
+                return resolveResult.Category;
+            }
+
+            return GiosueExceptionCategory.AllOK;
+        }
+
+        /// <summary>
+        /// Scans and parses all of the code in a source straight into a <see cref="SyntaxArena"/>, resolving it as it's parsed.
+        /// </summary>
+        /// <remarks>
+        /// The tokens are scanned as the parser needs them, and the code is never held as trees.
+        /// </remarks>
+        /// <param name="s">The source code.</param>
+        /// <param name="statements">The resolved statements in the arena.</param>
+        /// <returns>The result of scanning, parsing and resolving the code.</returns>
+        private static GiosueExceptionCategory ScanParseAndResolveCodeIntoArena(Source s, out NodeList statements)
+        {
+            statements = default;
+
+            var builder = new ArenaBuilder();
+            var parser = new Parser<int, int>(new Scanner(s).EnumerateTokens(), builder);
+            var thisMethod = MethodBase.GetCurrentMethod();
+            try
+            {
+                // Scanning and resolving happen while the code is parsed, so their errors come out of the parser too.
+                if (!ParseCode(parser, out var parsed, out var parserException))
+                {
+                    return parserException.Category;
+                }
+
+                statements = builder.AddStatements(parsed);
+            }
+            catch (ScannerException e)
+            {
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: scanner exception");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}", $"Line: {e.Line}");
+                ErrorWriteLine($"Message: {e.Message}");
+                return e.Category;
+            }
+            catch (EnvironmentException e)
+            {
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: environment exception");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}");
+                ErrorWriteLine($"Message: {e.Message}");
+                return e.Category;
+            }
+
+            if (Options.PrintOptimized)
+            {
+                ErrorWriteLine(new ASTPrinter().StringifyStatements(statements));
+            }
+
+            return GiosueExceptionCategory.AllOK;
+        }
+
+        /// <summary>
+        /// Runs resolved statements with the engine chosen in the <see cref="Options"/>.
+        /// </summary>
+        /// <param name="statements">The resolved statements.</param>
+        /// <returns>The result of running the statements.</returns>
+        private static GiosueExceptionCategory RunStatements(List<Statements.Statement> statements)
+        {
+            // A script read from the cache is trees, so it's added to an arena here.
+            var arenaStatements = Options.Engine == ExecutionEngine.Arena ? new SyntaxArena().AddStatements(statements) : default;
+            return RunStatements(statements, arenaStatements);
+        }
 
+        /// <summary>
+        /// Runs resolved statements with the engine chosen in the <see cref="Options"/>.
+        /// </summary>
+        /// <param name="statements">The resolved statements, or null if the engine is the arena.</param>
+        /// <param name="arenaStatements">The resolved statements in an arena, if the engine is the arena.</param>
+        /// <returns>The result of running the statements.</returns>
+        private static GiosueExceptionCategory RunStatements(List<Statements.Statement> statements, NodeList arenaStatements)
+        {
             try
             {
-                interpreter.Interpret(statements);
+                var script = Options.Engine == ExecutionEngine.VirtualMachine ? CompileCode(statements) : null;
+                var allocatedBefore = GC.GetAllocatedBytesForCurrentThread();
+                if (script == null)
+                {
+                    Profiler?.Enter(Profiler.ScriptSiteName, 0);
+                    try
+                    {
+                        if (Options.Engine == ExecutionEngine.Arena)
+                        {
+                            Session.Run(arenaStatements);
+                        }
+                        else
+                        {
+                            Session.Run(statements);
+                        }
+                    }
+                    finally
+                    {
+                        Profiler?.Exit();
+                    }
+                }
+                else
+                {
+                    Session.Run(script);
+                }
+
+                if (Options.ReportAllocations)
+                {
+                    ErrorWriteLine($"Allocated: {GC.GetAllocatedBytesForCurrentThread() - allocatedBefore} bytes");
+                }
 
                 return GiosueExceptionCategory.AllOK;
             }
@@ -166,9 +465,104 @@ namespace Giosue.ConsoleApp
                 ErrorWriteLine($"Message: {e.Message}");
                 return e.Category;
             }
+        }
+
+        /// <summary>
+        /// Scans, parses, resolves and runs one top-level statement at a time.
+        /// </summary>
+        /// <remarks>
+        /// Only the tokens of the statement being parsed are kept in memory, and every statement
+        /// runs before the next one is scanned.
+        /// </remarks>
+        /// <param name="s">The source code.</param>
+        /// <returns>The result of running the code.</returns>
+        private static GiosueExceptionCategory RunCodeFromSourceIncrementally(Source s)
+        {
+            var parser = new Parser(new Scanner(s).EnumerateTokens());
+            var printer = Options.PrintOptimized ? new ASTPrinter() : null;
+            var thisMethod = MethodBase.GetCurrentMethod();
+            var allocatedBefore = GC.GetAllocatedBytesForCurrentThread();
+
+            // Time spent parsing the next statement counts as time spent in the script.
+            Profiler?.Enter(Profiler.ScriptSiteName, 0);
+            try
+            {
+                foreach (var parsedStatement in parser.ParseStatements())
+                {
+                    // A statement that can never do anything is optimized away.
+                    var statement = Session.Prepare(parsedStatement);
+                    if (statement == null)
+                    {
+                        continue;
+                    }
+
+                    if (printer != null)
+                    {
+                        ErrorWriteLine(printer.StringifyStatement(statement));
+                    }
+
+                    Session.Interpreter.Interpret(statement);
+                }
+
+                if (Options.ReportAllocations)
+                {
+                    ErrorWriteLine($"Allocated: {GC.GetAllocatedBytesForCurrentThread() - allocatedBefore} bytes");
+                }
+
+                return GiosueExceptionCategory.AllOK;
+            }
+            catch (ScannerException e)
+            {
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: scanner exception");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}", $"Line: {e.Line}");
+                ErrorWriteLine($"Message: {e.Message}");
+                return e.Category;
+            }
+            catch (ParserException e)
+            {
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: parser exception");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}");
+                ErrorWriteLine($"Message: {e.Message}");
+                ErrorWriteLine($"Erroneous token: {e.ErroneousToken}");
+                return e.Category;
+            }
+            catch (InterpreterException e)
+            {
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: interperter exception");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}");
+                ErrorWriteLine($"Message: {e.Message}");
+                return e.Category;
+            }
+            catch (EnvironmentException e)
+            {
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: environment exception");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}");
+                ErrorWriteLine($"Message: {e.Message}");
+                return e.Category;
+            }
             finally
             {
-                OldEnvironment = interpreter.Environment;
+                Profiler?.Exit();
+            }
+        }
+
+        /// <summary>
+        /// Prints the profile and writes its folded stacks to a file.
+        /// </summary>
+        /// <param name="foldedStacksPath">The path of the file to write the folded stacks to.</param>
+        private static void WriteProfile(string foldedStacksPath)
+        {
+            Profiler.WriteFlatReport(Console.Error);
+
+            try
+            {
+                using var writer = new StreamWriter(foldedStacksPath);
+                Profiler.WriteFoldedStacks(writer);
+                ErrorWriteLine($"Folded stacks written to {foldedStacksPath}");
+            }
+            catch (Exception e) when (e is IOException || e is UnauthorizedAccessException)
+            {
+                ErrorWriteLine($"Warning: unable to write the folded stacks to {foldedStacksPath}");
             }
         }
 
@@ -196,11 +590,15 @@ namespace Giosue.ConsoleApp
         }
 
         private static bool ParseCode(List<Token> code, out List<Statements.Statement> statements, out ParserException exception)
+        {
+            return ParseCode(new Parser(code), out statements, out exception);
+        }
+
+        private static bool ParseCode<TExpression, TStatement>(Parser<TExpression, TStatement> parser, out List<TStatement> statements, out ParserException exception)
         {
             statements = default;
             exception = default;
 
-            var parser = new Parser(code);
             try
             {
                 return parser.TryParse(out statements, out exception);
@@ -217,21 +615,76 @@ namespace Giosue.ConsoleApp
             }
         }
 
+        private static EnvironmentException ResolveCode(List<Statements.Statement> statements)
+        {
+            var resolver = new Resolver();
+
+            try
+            {
+                resolver.Resolve(statements);
+
+                // Success; no exceptions occurred.
+                return null;
+            }
+            catch (EnvironmentException e)
+            {
+                var thisMethod = MethodBase.GetCurrentMethod();
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: environment exception");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}");
+                ErrorWriteLine($"Message: {e.Message}");
+                return e;
+            }
+        }
+
+        /// <summary>
+        /// Compiles the statements to bytecode for the <see cref="VirtualMachine"/>.
+        /// </summary>
+        /// <param name="statements">The statements to compile.</param>
+        /// <returns>The compiled script, or null if the code must run on the tree-walking interpreter instead.</returns>
+        private static BytecodeFunction CompileCode(List<Statements.Statement> statements)
+        {
+            try
+            {
+                var script = new Compiler().Compile(statements);
+                if (Options.Disassemble)
+                {
+                    Console.Error.Write(new Disassembler().Disassemble(script));
+                }
+                return script;
+            }
+            catch (CompilerException e)
+            {
+                var thisMethod = MethodBase.GetCurrentMethod();
+                ErrorWriteLine($"{thisMethod.DeclaringType.FullName}.{thisMethod.Name} :: compiler exception, falling back to the tree-walking interpreter");
+                ErrorWriteLine($"Type: {e.ExceptionType}", $"Type code: {(int)e.ExceptionType}", $"Line: {e.Line}");
+                ErrorWriteLine($"Message: {e.Message}");
+                return null;
+            }
+        }
+
         /// <summary>
         /// Writes a <see cref="string"/> to <see cref="Console.Error"/> with a newline.
         /// </summary>
+        /// <remarks>
+        /// The <see cref="Output"/> is flushed first, so everything printed before the error comes out before it.
+        /// </remarks>
         /// <param name="s">The <see cref="string"/> to write.</param>
         private static void ErrorWriteLine(string s = "")
         {
+            Output?.Flush();
             Console.Error.WriteLine(s);
         }
 
         /// <summary>
         /// Writes an <see cref="object"/> to <see cref="Console.Error"/> with a newline.
         /// </summary>
+        /// <remarks>
+        /// The <see cref="Output"/> is flushed first, so everything printed before the error comes out before it.
+        /// </remarks>
         /// <param name="obj">The <see cref="object"/> to print</param>
         private static void ErrorWriteLine(object obj)
         {
+            Output?.Flush();
             Console.Error.WriteLine(obj);
         }
 
@@ -0,0 +1,75 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.DifferentialTests
+{
+    // Design comments:
+    // The corpus is the scripts in TestCode, the benchmark inputs in BenchmarkInputs if they
+    // have been generated, and the scripts in any directories passed on the command line.
+    // The directories next to Giosue.sln are found the same way the benchmarks find their
+    // inputs, by walking up from the directory of the test program.
+    /// <summary>
+    /// Loads the scripts that every test runs in addition to its generated inputs.
+    /// </summary>
+    static class Corpus
+    {
+        private const string SolutionFileName = "Giosue.sln";
+
+        private static readonly string[] DirectoryNames = { "TestCode", "BenchmarkInputs" };
+
+        /// <summary>
+        /// Loads the scripts in the corpus.
+        /// </summary>
+        /// <param name="extraDirectories">More directories of scripts to load.</param>
+        /// <returns>The source code of every script.</returns>
+        public static IReadOnlyList<string> Load(IEnumerable<string> extraDirectories)
+        {
+            var directories = new List<string>(extraDirectories);
+            var solutionDirectory = FindSolutionDirectory();
+            if (solutionDirectory != null)
+            {
+                directories.AddRange(DirectoryNames.Select(name => Path.Combine(solutionDirectory, name)));
+            }
+
+            return directories
+                .Where(Directory.Exists)
+                .SelectMany(directory => Directory.EnumerateFiles(directory, "*.gsu", SearchOption.AllDirectories))
+                .OrderBy(path => path, StringComparer.Ordinal)
+                .Select(File.ReadAllText)
+                .ToList();
+        }
+
+        private static string FindSolutionDirectory()
+        {
+            for (var current = new DirectoryInfo(AppContext.BaseDirectory); current != null; current = current.Parent)
+            {
+                if (File.Exists(Path.Combine(current.FullName, SolutionFileName)))
+                {
+                    return current.FullName;
+                }
+            }
+            return null;
+        }
+    }
+}
@@ -0,0 +1,64 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.DifferentialTests
+{
+    // Design comments:
+    // Each test runs the same inputs through two implementations that must agree, such as
+    // the span-based scanner and the character-at-a-time scanner, and reports every input
+    // on which they don't. The inputs are generated from a fixed seed, so a failure can be
+    // reproduced, plus the scripts in the corpus (see `Corpus`). The `scopes` test instead
+    // checks every engine against outputs known in advance.
+    // The first argument, if it's the name of a test, runs only that test. The other
+    // arguments are directories of more scripts to add to the corpus.
+    // The exit code is 0 if every test passed and 1 otherwise, so the tests can gate a build.
+    class Program
+    {
+        private static readonly Dictionary<string, Func<IReadOnlyList<string>, bool>> Tests = new()
+        {
+            { ScannerDifferentialTest.Name, ScannerDifferentialTest.Run },
+            { TieringDifferentialTest.Name, TieringDifferentialTest.Run },
+            { ScopeTest.Name, ScopeTest.Run },
+        };
+
+        static int Main(string[] args)
+        {
+            var testNames = Tests.Keys.ToList();
+            if (args.Length > 0 && Tests.ContainsKey(args[0]))
+            {
+                testNames = new List<string>() { args[0] };
+                args = args[1..];
+            }
+
+            var corpus = Corpus.Load(args);
+            var passed = true;
+            foreach (var name in testNames)
+            {
+                Console.WriteLine($"== {name} ==");
+                passed &= Tests[name](corpus);
+            }
+
+            return passed ? 0 : 1;
+        }
+    }
+}
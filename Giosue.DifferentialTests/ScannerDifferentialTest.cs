@@ -0,0 +1,179 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Text.Encodings.Web;
+using System.Text.Json;
+using Giosue.Exceptions;
+using SourceManager;
+
+namespace Giosue.DifferentialTests
+{
+    // Design comments:
+    // `SpanScanner` must produce exactly the tokens that `Scanner` produces one character at
+    // a time: the same type, lexeme, literal, line and symbol for every token, and the same
+    // error, raised after the same tokens. The generated inputs are built from pieces chosen
+    // to hit the edges of the fast path: runs of whitespace longer than a vector, comments and
+    // strings that end the input, numbers such as "1." and "1.2.3", keywords next to
+    // identifiers, and characters that can't start a token. Some inputs use only valid pieces,
+    // so that long inputs get past the first error, and some are random characters.
+    /// <summary>
+    /// Compares the tokens of the span-based scanner with those of the character-at-a-time scanner.
+    /// </summary>
+    static class ScannerDifferentialTest
+    {
+        public const string Name = "scanner";
+
+        private const int Seed = 12345;
+        private const int MixedInputCount = 50_000;
+        private const int ValidInputCount = 20_000;
+        private const int RandomInputCount = 5_000;
+
+        /// <summary>
+        /// The number of mismatches that are printed before the rest are only counted.
+        /// </summary>
+        private const int ReportedMismatches = 5;
+
+        private static readonly string[] ValidPieces =
+        {
+            " ", "  ", "\t", "\r\n", "\n", "\r", new string(' ', 40), " \t \t \t \t \t \t \t \t \t \t \t \t \t \t \t \t ",
+            "-- commento è\n", "--x", "-", "--",
+            "(", ")", "{", "}", ",", ".", ";", "+", "*", "/", "@", "!", "!=", "=", "==", "<", "<=", ">", ">=",
+            "&", "&&", "|", "||", "^", "^^", "\"stringa\"", "\"è unicode\"", "\"\"",
+            "0", "42", "1.5", "1.", "3.x", "007", "1.2.3", "12abc",
+            "var", "fun", "mentre", "se", "oppure", "ritorna", "vero", "falso", "niente", "intero",
+            "x", "_y1", "Abc_9", "varx", "se_",
+        };
+
+        private static readonly string[] InvalidPieces =
+        {
+            "è", "#", "$", "\0", "~", "`", "'", "\"", "\"su più\nfile\"", "99999999999",
+        };
+
+        private static readonly string[] AllPieces = ValidPieces.Concat(InvalidPieces).ToArray();
+
+        /// <summary>
+        /// Prints an input as a string literal that escapes only the characters that have to be escaped.
+        /// </summary>
+        private static readonly JsonSerializerOptions ReportOptions = new() { Encoder = JavaScriptEncoder.UnsafeRelaxedJsonEscaping };
+
+        /// <summary>
+        /// Runs the test.
+        /// </summary>
+        /// <param name="corpus">The scripts to scan in addition to the generated inputs.</param>
+        /// <returns>True if the scanners agreed on every input, false otherwise.</returns>
+        public static bool Run(IReadOnlyList<string> corpus)
+        {
+            var inputs = GenerateInputs().Concat(corpus);
+            int inputCount = 0, errorCount = 0, mismatchCount = 0;
+            long tokenCount = 0;
+            foreach (var input in inputs)
+            {
+                inputCount++;
+                var expected = Scan(new Scanner(new StringSource(input)).EnumerateTokensFromSource());
+                var actual = Scan(new SpanScanner(input.AsMemory()).EnumerateTokens());
+                tokenCount += expected.Count;
+                if (expected[^1].StartsWith('!'))
+                {
+                    errorCount++;
+                }
+
+                if (!expected.SequenceEqual(actual) && mismatchCount++ < ReportedMismatches)
+                {
+                    ReportMismatch(input, expected, actual);
+                }
+            }
+
+            Console.WriteLine($"{inputCount} inputs ({errorCount} ending in an error), {tokenCount} tokens, {mismatchCount} mismatches");
+            return mismatchCount == 0;
+        }
+
+        private static IEnumerable<string> GenerateInputs()
+        {
+            var random = new Random(Seed);
+            for (int i = 0; i < MixedInputCount; i++)
+            {
+                yield return Concatenate(random, AllPieces, random.Next(1, 40));
+            }
+            for (int i = 0; i < ValidInputCount; i++)
+            {
+                yield return Concatenate(random, ValidPieces, random.Next(1, 400));
+            }
+            for (int i = 0; i < RandomInputCount; i++)
+            {
+                yield return new string(Enumerable.Range(0, random.Next(0, 60)).Select(_ => (char)random.Next(0, 140)).ToArray());
+            }
+        }
+
+        private static string Concatenate(Random random, string[] pieces, int count)
+        {
+            var sb = new StringBuilder();
+            for (int i = 0; i < count; i++)
+            {
+                sb.Append(pieces[random.Next(pieces.Length)]);
+                if (random.Next(3) == 0)
+                {
+                    sb.Append(' ');
+                }
+            }
+            return sb.ToString();
+        }
+
+        /// <summary>
+        /// Scans an input, describing each token, and the error that stopped the scan if there was one, as a string.
+        /// </summary>
+        /// <param name="tokens">The tokens of the input.</param>
+        /// <returns>The descriptions of the tokens, followed by the description of the error, which starts with '!'.</returns>
+        private static List<string> Scan(IEnumerable<Token> tokens)
+        {
+            var scanned = new List<string>();
+            try
+            {
+                foreach (var token in tokens)
+                {
+                    scanned.Add($"{token.Type}|{token.Lexeme}|{token.Literal?.GetType().Name}:{token.Literal}|{token.Line}|{token.Symbol}");
+                }
+            }
+            catch (Exception e)
+            {
+                var line = e is ScannerException scannerException ? scannerException.Line : -1;
+                scanned.Add($"!{e.GetType().Name}|{e.Message}|{line}");
+            }
+            return scanned;
+        }
+
+        private static void ReportMismatch(string input, List<string> expected, List<string> actual)
+        {
+            Console.WriteLine($"Mismatch for {JsonSerializer.Serialize(input, ReportOptions)}");
+            for (int i = 0; i < Math.Max(expected.Count, actual.Count); i++)
+            {
+                var expectedToken = i < expected.Count ? expected[i] : "(none)";
+                var actualToken = i < actual.Count ? actual[i] : "(none)";
+                if (expectedToken != actualToken)
+                {
+                    Console.WriteLine($"  Scanner:     {expectedToken}");
+                    Console.WriteLine($"  SpanScanner: {actualToken}");
+                    break;
+                }
+            }
+        }
+    }
+}
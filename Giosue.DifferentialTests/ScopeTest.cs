@@ -0,0 +1,191 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using Giosue.Arena;
+using Giosue.Bytecode;
+using Giosue.Exceptions;
+using Giosue.Tiering;
+using SourceManager;
+
+namespace Giosue.DifferentialTests
+{
+    // Design comments:
+    // The resolver works out where every local lives before the code runs, and each engine
+    // then trusts it, so a name it gets wrong breaks every engine the same way and the other
+    // tests can't see it. This test runs scripts about scopes on every engine and compares
+    // what they print with what the language has always printed for them: the tree-walking
+    // interpreter, the arena built while parsing, the virtual machine (falling back to the
+    // tree-walking interpreter for what it can't compile, like the console app) and tiered
+    // compilation. The cases are mostly names that a function uses before its block
+    // declares them, such as local functions that call each other.
+    /// <summary>
+    /// Checks that every engine resolves the scopes of some scripts like the language always has.
+    /// </summary>
+    static class ScopeTest
+    {
+        public const string Name = "scopes";
+
+        private static readonly (string Script, string Expected)[] Cases =
+        {
+            // A function that uses a local declared after it
+            ("{ fun f() { ScriveLina(y); } var y = 1; f(); }", "1\n"),
+
+            // Local functions that call each other
+            (@"fun fuori() {
+                fun ping(n) { se (n > 0) { ScriveLina(""ping""); pong(n - 1); } }
+                fun pong(n) { se (n > 0) { ScriveLina(""pong""); ping(n - 1); } }
+                ping(3);
+            }
+            fuori();", "ping\npong\nping\n"),
+
+            // Reading and assigning a local declared after the functions
+            (@"fun fuori() {
+                fun leggi() { ritorna conta; }
+                fun incr() { conta = conta + 1; }
+                var conta = 10;
+                incr();
+                incr();
+                ritorna leggi();
+            }
+            ScriveLina(fuori());", "12\n"),
+
+            // A local declared two scopes out, after a function that escapes
+            (@"{
+                fun crea() { fun g() { ritorna z; } ritorna g; }
+                var z = 5;
+                var g = crea();
+                ScriveLina(g());
+            }", "5\n"),
+
+            // A later local shadows a global for the functions before it
+            (@"var w = 1;
+            { fun k() { { ritorna w; } } var w = 2; ScriveLina(k()); }
+            ScriveLina(w);", "2\n1\n"),
+
+            // A function's own later local doesn't hide the global before it's declared
+            (@"fun prima() { ScriveLina(y); var y = 3; ScriveLina(y); }
+            var y = ""globale"";
+            prima();", "globale\n3\n"),
+
+            // Code outside of a function still sees the global before the local is declared
+            (@"var v = ""globale"";
+            { ScriveLina(v); var v = ""locale""; ScriveLina(v); }", "globale\nlocale\n"),
+        };
+
+        /// <summary>
+        /// Runs the test.
+        /// </summary>
+        /// <param name="corpus">Not used; the cases have known outputs.</param>
+        /// <returns>True if every engine printed the expected output for every case, false otherwise.</returns>
+        public static bool Run(IReadOnlyList<string> corpus)
+        {
+            var engines = new (string Name, Action<Interpreter, string> Run)[]
+            {
+                ("tree", RunTree),
+                ("arena", RunArena),
+                ("vm", RunVirtualMachine),
+                ("tiering", RunTiered),
+            };
+
+            var failureCount = 0;
+            foreach (var (script, expected) in Cases)
+            {
+                foreach (var (name, run) in engines)
+                {
+                    var output = new StringWriter();
+                    var interpreter = new Interpreter() { Output = output };
+                    try
+                    {
+                        run(interpreter, script);
+                    }
+                    catch (Exception e)
+                    {
+                        output.Write($"{e.GetType().Name}: {e.Message}\n");
+                    }
+
+                    var actual = output.ToString().Replace("\r\n", "\n");
+                    if (actual != expected)
+                    {
+                        failureCount++;
+                        Console.WriteLine($"{name} printed the wrong output for:");
+                        Console.WriteLine(script);
+                        Console.WriteLine($"  Expected: {expected.Replace("\n", "|")}");
+                        Console.WriteLine($"  Actual:   {actual.Replace("\n", "|")}");
+                    }
+                }
+            }
+
+            Console.WriteLine($"{Cases.Length} cases on {engines.Length} engines, {failureCount} failures");
+            return failureCount == 0;
+        }
+
+        /// <summary>
+        /// Parses, optimizes and resolves a script into trees.
+        /// </summary>
+        private static List<Statements.Statement> Prepare(Interpreter interpreter, string script)
+        {
+            var statements = new Parser(new Scanner(new StringSource(script)).ScanTokens()).ParseStatements().ToList();
+            statements = new Optimizer(interpreter.Globals).Optimize(statements);
+            new Resolver().Resolve(statements);
+            return statements;
+        }
+
+        private static void RunTree(Interpreter interpreter, string script)
+        {
+            interpreter.Interpret(Prepare(interpreter, script));
+        }
+
+        private static void RunArena(Interpreter interpreter, string script)
+        {
+            var builder = new ArenaBuilder();
+            var parser = new Parser<int, int>(new Scanner(new StringSource(script)).EnumerateTokens(), builder);
+            if (!parser.TryParse(out var statements, out var exception))
+            {
+                throw exception;
+            }
+            interpreter.Interpret(builder.AddStatements(statements));
+        }
+
+        private static void RunVirtualMachine(Interpreter interpreter, string script)
+        {
+            var statements = Prepare(interpreter, script);
+            BytecodeFunction compiled;
+            try
+            {
+                compiled = new Compiler().Compile(statements);
+            }
+            catch (CompilerException)
+            {
+                interpreter.Interpret(statements);
+                return;
+            }
+            new VirtualMachine(interpreter).Run(compiled);
+        }
+
+        private static void RunTiered(Interpreter interpreter, string script)
+        {
+            interpreter.Tiering = new TieredCompilation(1);
+            interpreter.Interpret(Prepare(interpreter, script));
+        }
+    }
+}
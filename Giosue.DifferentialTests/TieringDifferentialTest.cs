@@ -0,0 +1,318 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+using System.Text.Encodings.Web;
+using System.Text.Json;
+using Giosue.Tiering;
+using SourceManager;
+
+namespace Giosue.DifferentialTests
+{
+    // Design comments:
+    // A function compiled to .NET code by `TieredCompilation` must behave exactly like the
+    // same function run by the tree-walking `Interpreter`: the same output, and the same
+    // error with the same message. Each input runs twice, once on a plain interpreter and
+    // once on an interpreter that compiles every function the first time it's called, and the
+    // output and error of every step are compared.
+    // Only functions are compiled, so the generated inputs apply each operator inside a
+    // function: as the returned value, as the condition of a `se` and of a `mentre`, and with
+    // a literal right operand, which the compiler can treat differently from a parameter. A
+    // function is declared once and then called with every pair of `Operands`, each call as
+    // its own step, so that an error only stops that call and the function is compiled only
+    // once. The operands include the ints at the edges of their range and the doubles that
+    // compare unlike other numbers: NaN, both infinities and negative zero.
+    // The edge cases are whole scripts for what the compiler has to get right besides the
+    // operators: closures, shadowing, globals, arity and type errors.
+    /// <summary>
+    /// Compares functions compiled by tiered compilation with the same functions run by the tree-walking interpreter.
+    /// </summary>
+    static class TieringDifferentialTest
+    {
+        public const string Name = "tiering";
+
+        /// <summary>
+        /// The number of mismatches that are printed before the rest are only counted.
+        /// </summary>
+        private const int ReportedMismatches = 5;
+
+        private static readonly string[] Operands =
+        {
+            "0", "1", "-1", "7", "2147483647", "(0 - 2147483647 - 1)",
+            "0.0", "-0.0", "2.5", "(0.0 / 0.0)", "(1.0 / 0.0)", "(-1.0 / 0.0)",
+            "\"a\"", "\"\"", "vero", "falso", "niente",
+        };
+
+        private static readonly string[] BinaryOperators =
+        {
+            "+", "-", "*", "/", "@", "&", "|", "^", "<", "<=", ">", ">=", "==", "!=", "&&", "||", "^^",
+        };
+
+        private static readonly string[] UnaryOperators = { "-", "!" };
+
+        /// <summary>
+        /// The ways that an expression is used in a function, with <c>{0}</c> standing for the expression.
+        /// </summary>
+        private static readonly string[] Uses =
+        {
+            "ritorna {0};",
+            "se ({0}) {{ ritorna \"si\"; }} oppure {{ ritorna \"no\"; }}",
+            "var n = 0; mentre ({0}) {{ n = n + 1; se (n > 2) {{ ritorna n; }} }} ritorna n;",
+        };
+
+        private static readonly string[] EdgeCases =
+        {
+            // Closures
+            @"fun fuori() {
+                var conta = 0;
+                fun dentro(n) { conta = conta + n; ritorna conta; }
+                ScriveLina(dentro(1));
+                ScriveLina(dentro(2));
+                ritorna dentro;
+            }
+            var d = fuori();
+            ScriveLina(d(5));
+            ScriveLina(d(5));
+            { var locale = 7; fun usa(k) { ritorna locale + k; } ScriveLina(usa(1)); }",
+
+            // Shadowing, blocks and loops
+            @"var g = 10;
+            fun f(a, b) {
+                var x = a;
+                { var x = b; x = x + 1; ScriveLina(x); }
+                var y = 0;
+                mentre (y < 3) {
+                    var z = y * 2;
+                    y = y + 1;
+                    se (z == 2) { ScriveLina(""due""); } oppure { ScriveLina(z); }
+                }
+                g = g + x;
+                ritorna x;
+            }
+            ScriveLina(f(1, 2));
+            ScriveLina(f(3, 4));
+            ScriveLina(g);",
+
+            // Recursion, redeclaration and globals
+            @"fun rec(n) { se (n == 0) { ritorna 0; } ritorna n + rec(n - 1); }
+            ScriveLina(rec(100));
+            fun ciclo() { var i = 0; mentre (vero) { i = i + 1; se (i > 5) { ritorna i; } } }
+            ScriveLina(ciclo());
+            fun globale() { g2 = 5; ritorna g2; }
+            var g2 = 1;
+            ScriveLina(globale());
+            ScriveLina(g2);
+            fun ridichiara() { var a = 1; var a = ""s""; ritorna a; }
+            ScriveLina(ridichiara());
+            fun ombra(x) { var x = x + 1; ritorna x; }
+            ScriveLina(ombra(1));",
+
+            // Values
+            @"fun niente_ritorno() { var q = 1; }
+            ScriveLina(niente_ritorno());
+            fun tipo(a) { ritorna TipoDiDato(a); }
+            ScriveLina(tipo(1));
+            ScriveLina(tipo(""x""));
+            ScriveLina(tipo(tipo));
+            fun valore() { ritorna valore; }
+            ScriveLina(valore());
+            fun bit(a, b) { ritorna a & b | 4; }
+            ScriveLina(bit(6, 3));",
+
+            // Errors
+            @"fun uno(a) { ritorna a; }
+            fun chiama() { ritorna uno(1, ScriveLina(""valutato"")); }
+            ScriveLina(chiama());",
+            @"fun chiama() { ritorna ScriveLina(1, ScriveLina(""valutato"")); }
+            chiama();",
+            @"fun chiama() { var x = 3; ritorna x(ScriveLina(""arg"")); }
+            chiama();",
+            @"fun leggi() { ritorna nonEsiste; }
+            ScriveLina(leggi());",
+            @"fun scrivi() { nonEsiste = 1; }
+            scrivi();",
+            @"fun cambia(a) { var x = 1; x = a; ritorna x; }
+            ScriveLina(cambia(2));
+            ScriveLina(cambia(""stringa""));",
+            @"fun somma(a, b) { ritorna a + b; }
+            ScriveLina(somma(1, 2));
+            ScriveLina(somma(1, 2.0));",
+        };
+
+        /// <summary>
+        /// Prints an input as a string literal that escapes only the characters that have to be escaped.
+        /// </summary>
+        private static readonly JsonSerializerOptions ReportOptions = new() { Encoder = JavaScriptEncoder.UnsafeRelaxedJsonEscaping };
+
+        /// <summary>
+        /// Runs the test.
+        /// </summary>
+        /// <param name="corpus">The scripts to run in addition to the generated inputs.</param>
+        /// <returns>True if the compiled functions behaved like the interpreted ones on every input, false otherwise.</returns>
+        public static bool Run(IReadOnlyList<string> corpus)
+        {
+            var interpreted = new Runner(isTiered: false);
+            var compiled = new Runner(isTiered: true);
+            int inputCount = 0, stepCount = 0, errorCount = 0, mismatchCount = 0;
+
+            foreach (var steps in GenerateInputs().Concat(EdgeCases.Concat(corpus).Select(script => new[] { script })))
+            {
+                inputCount++;
+                interpreted.Reset();
+                compiled.Reset();
+                foreach (var step in steps)
+                {
+                    stepCount++;
+                    var expected = interpreted.Run(step);
+                    var actual = compiled.Run(step);
+                    if (expected.Error != null)
+                    {
+                        errorCount++;
+                    }
+
+                    if (expected != actual && mismatchCount++ < ReportedMismatches)
+                    {
+                        Console.WriteLine($"Mismatch for {JsonSerializer.Serialize(steps[0], ReportOptions)}");
+                        Console.WriteLine($"  at step {JsonSerializer.Serialize(step, ReportOptions)}");
+                        Console.WriteLine($"  Interpreted: {JsonSerializer.Serialize(expected.Output, ReportOptions)} {expected.Error}");
+                        Console.WriteLine($"  Compiled:    {JsonSerializer.Serialize(actual.Output, ReportOptions)} {actual.Error}");
+                    }
+                }
+            }
+
+            Console.WriteLine($"{inputCount} inputs, {stepCount} steps ({errorCount} ending in an error), {compiled.CompiledCount} functions compiled, {compiled.InterpretedCount} left to the interpreter, {mismatchCount} mismatches");
+
+            // A test that never compiles anything would pass without testing anything.
+            if (compiled.CompiledCount == 0)
+            {
+                Console.WriteLine("No function was compiled.");
+                return false;
+            }
+            return mismatchCount == 0;
+        }
+
+        /// <summary>
+        /// Generates the inputs for the operators. The first step of each input declares a function, and the other steps call it.
+        /// </summary>
+        /// <returns>The steps of each input.</returns>
+        private static IEnumerable<string[]> GenerateInputs()
+        {
+            foreach (var use in Uses)
+            {
+                foreach (var @operator in BinaryOperators)
+                {
+                    var declaration = $"fun f(a, b) {{ {string.Format(use, $"a {@operator} b")} }}";
+                    yield return Calls(declaration, Operands.SelectMany(left => Operands.Select(right => $"f({left}, {right})")));
+
+                    foreach (var right in Operands)
+                    {
+                        declaration = $"fun f(a) {{ {string.Format(use, $"a {@operator} {right}")} }}";
+                        yield return Calls(declaration, Operands.Select(left => $"f({left})"));
+                    }
+                }
+
+                foreach (var @operator in UnaryOperators)
+                {
+                    var declaration = $"fun f(a) {{ {string.Format(use, $"{@operator}a")} }}";
+                    yield return Calls(declaration, Operands.Select(operand => $"f({operand})"));
+                }
+            }
+        }
+
+        private static string[] Calls(string declaration, IEnumerable<string> calls)
+        {
+            return calls.Select(call => $"ScriveLina({call});").Prepend(declaration).ToArray();
+        }
+
+        /// <summary>
+        /// Runs code on one interpreter, keeping the globals from one step to the next like the REPL.
+        /// </summary>
+        private sealed class Runner
+        {
+            private readonly bool IsTiered;
+            private readonly StringWriter Output = new();
+            private Interpreter Interpreter;
+
+            /// <summary>
+            /// The number of functions compiled by every interpreter this runner has made.
+            /// </summary>
+            public int CompiledCount { get; private set; } = 0;
+
+            /// <summary>
+            /// The number of hot functions that couldn't be compiled, in every interpreter this runner has made.
+            /// </summary>
+            public int InterpretedCount { get; private set; } = 0;
+
+            /// <summary>
+            /// Creates a new <see cref="Runner"/>.
+            /// </summary>
+            /// <param name="isTiered">True to compile every function the first time it's called, false to only interpret.</param>
+            public Runner(bool isTiered)
+            {
+                IsTiered = isTiered;
+            }
+
+            /// <summary>
+            /// Starts again with new globals.
+            /// </summary>
+            public void Reset()
+            {
+                if (Interpreter?.Tiering != null)
+                {
+                    CompiledCount += Interpreter.Tiering.CompiledCount;
+                    InterpretedCount += Interpreter.Tiering.InterpretedCount;
+                }
+
+                Interpreter = new Interpreter()
+                {
+                    Output = Output,
+                    Tiering = IsTiered ? new TieredCompilation(1) : null,
+                };
+            }
+
+            /// <summary>
+            /// Runs one step.
+            /// </summary>
+            /// <param name="code">The code of the step.</param>
+            /// <returns>What the code printed, and the type and message of the error that stopped it, or null if there wasn't one.</returns>
+            public (string Output, string Error) Run(string code)
+            {
+                Output.GetStringBuilder().Clear();
+                try
+                {
+                    var parser = new Parser(new Scanner(new StringSource(code)).ScanTokens());
+                    if (parser.TryParse(out var statements, out _))
+                    {
+                        statements = new Optimizer(Interpreter.Globals).Optimize(statements);
+                        new Resolver().Resolve(statements);
+                        Interpreter.Interpret(statements);
+                    }
+                    return (Output.ToString(), null);
+                }
+                catch (Exception e)
+                {
+                    return (Output.ToString(), $"{e.GetType().Name}: {e.Message}");
+                }
+            }
+        }
+    }
+}
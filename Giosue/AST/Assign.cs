@@ -31,8 +31,10 @@ namespace Giosue.AST
     {
         public Token Name { get; }
         public Expression Value { get; }
+        public int Depth { get; set; } = -1;
+        public int Slot { get; set; } = -1;
     
-        public Assign(Token name, Expression @value)
+        public Assign(Token name, Expression @value) : base(NodeKind.AssignExpression)
         {
             this.Name = name;
             this.Value = @value;
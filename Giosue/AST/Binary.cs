@@ -33,7 +33,7 @@ namespace Giosue.AST
         public Token Operator { get; }
         public Expression Right { get; }
     
-        public Binary(Expression left, Token @operator, Expression right)
+        public Binary(Expression left, Token @operator, Expression right) : base(NodeKind.BinaryExpression)
         {
             this.Left = left;
             this.Operator = @operator;
@@ -33,7 +33,7 @@ namespace Giosue.AST
         public Token Paren { get; }
         public List<Expression> Arguments { get; }
     
-        public Call(Expression callee, Token paren, List<Expression> arguments)
+        public Call(Expression callee, Token paren, List<Expression> arguments) : base(NodeKind.CallExpression)
         {
             this.Callee = callee;
             this.Paren = paren;
@@ -29,6 +29,13 @@ namespace Giosue.AST
 {
     public abstract class Expression
     {
+        public NodeKind Kind { get; }
+        
+        protected Expression(NodeKind kind)
+        {
+            Kind = kind;
+        }
+        
         public abstract T Accept<T>(IVisitor<T> visitor);
     }
 }
\ No newline at end of file
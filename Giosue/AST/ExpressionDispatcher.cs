@@ -0,0 +1,115 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.AST;
+using System.Runtime.CompilerServices;
+
+namespace Giosue.AST
+{
+    public static class ExpressionDispatcher
+    {
+        public static T Accept<T, TVisitor>(Expression expression, ref TVisitor visitor)
+            where TVisitor : struct, IVisitor<T>
+        {
+            switch (expression.Kind)
+            {
+                case NodeKind.AssignExpression:
+                    return visitor.VisitAssignExpression(Unsafe.As<Assign>(expression));
+                case NodeKind.BinaryExpression:
+                    return visitor.VisitBinaryExpression(Unsafe.As<Binary>(expression));
+                case NodeKind.CallExpression:
+                    return visitor.VisitCallExpression(Unsafe.As<Call>(expression));
+                case NodeKind.GetExpression:
+                    return visitor.VisitGetExpression(Unsafe.As<Get>(expression));
+                case NodeKind.GroupingExpression:
+                    return visitor.VisitGroupingExpression(Unsafe.As<Grouping>(expression));
+                case NodeKind.LiteralExpression:
+                    return visitor.VisitLiteralExpression(Unsafe.As<Literal>(expression));
+                case NodeKind.LogicalExpression:
+                    return visitor.VisitLogicalExpression(Unsafe.As<Logical>(expression));
+                case NodeKind.SetExpression:
+                    return visitor.VisitSetExpression(Unsafe.As<Set>(expression));
+                case NodeKind.SuperExpression:
+                    return visitor.VisitSuperExpression(Unsafe.As<Super>(expression));
+                case NodeKind.ThisExpression:
+                    return visitor.VisitThisExpression(Unsafe.As<This>(expression));
+                case NodeKind.UnaryExpression:
+                    return visitor.VisitUnaryExpression(Unsafe.As<Unary>(expression));
+                case NodeKind.VariableExpression:
+                    return visitor.VisitVariableExpression(Unsafe.As<Variable>(expression));
+                default:
+                    // Unknown node kind.
+                    throw new NotSupportedException($"Tipo di nodo sconosciuto: {expression.Kind}.");
+            }
+        }
+        
+        public static void Accept<TVisitor>(Expression expression, ref TVisitor visitor)
+            where TVisitor : struct, IVoidVisitor
+        {
+            switch (expression.Kind)
+            {
+                case NodeKind.AssignExpression:
+                    visitor.VisitAssignExpression(Unsafe.As<Assign>(expression));
+                    return;
+                case NodeKind.BinaryExpression:
+                    visitor.VisitBinaryExpression(Unsafe.As<Binary>(expression));
+                    return;
+                case NodeKind.CallExpression:
+                    visitor.VisitCallExpression(Unsafe.As<Call>(expression));
+                    return;
+                case NodeKind.GetExpression:
+                    visitor.VisitGetExpression(Unsafe.As<Get>(expression));
+                    return;
+                case NodeKind.GroupingExpression:
+                    visitor.VisitGroupingExpression(Unsafe.As<Grouping>(expression));
+                    return;
+                case NodeKind.LiteralExpression:
+                    visitor.VisitLiteralExpression(Unsafe.As<Literal>(expression));
+                    return;
+                case NodeKind.LogicalExpression:
+                    visitor.VisitLogicalExpression(Unsafe.As<Logical>(expression));
+                    return;
+                case NodeKind.SetExpression:
+                    visitor.VisitSetExpression(Unsafe.As<Set>(expression));
+                    return;
+                case NodeKind.SuperExpression:
+                    visitor.VisitSuperExpression(Unsafe.As<Super>(expression));
+                    return;
+                case NodeKind.ThisExpression:
+                    visitor.VisitThisExpression(Unsafe.As<This>(expression));
+                    return;
+                case NodeKind.UnaryExpression:
+                    visitor.VisitUnaryExpression(Unsafe.As<Unary>(expression));
+                    return;
+                case NodeKind.VariableExpression:
+                    visitor.VisitVariableExpression(Unsafe.As<Variable>(expression));
+                    return;
+                default:
+                    // Unknown node kind.
+                    throw new NotSupportedException($"Tipo di nodo sconosciuto: {expression.Kind}.");
+            }
+        }
+    }
+}
\ No newline at end of file
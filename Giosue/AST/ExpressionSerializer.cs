@@ -0,0 +1,206 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.AST;
+using System.IO;
+using Giosue.Serialization;
+
+namespace Giosue.AST
+{
+    public static class ExpressionSerializer
+    {
+        public static void Write(TreeWriter writer, Expression node)
+        {
+            switch (node)
+            {
+                case null:
+                    writer.WriteTag(0);
+                    break;
+                case Assign assignNode:
+                    writer.WriteTag(1);
+                    writer.WriteToken(assignNode.Name);
+                    writer.WriteExpression(assignNode.Value);
+                    writer.WriteInt32(assignNode.Depth);
+                    writer.WriteInt32(assignNode.Slot);
+                    break;
+                case Binary binaryNode:
+                    writer.WriteTag(2);
+                    writer.WriteExpression(binaryNode.Left);
+                    writer.WriteToken(binaryNode.Operator);
+                    writer.WriteExpression(binaryNode.Right);
+                    break;
+                case Call callNode:
+                    writer.WriteTag(3);
+                    writer.WriteExpression(callNode.Callee);
+                    writer.WriteToken(callNode.Paren);
+                    writer.WriteExpressionList(callNode.Arguments);
+                    break;
+                case Get getNode:
+                    writer.WriteTag(4);
+                    writer.WriteExpression(getNode.Object);
+                    writer.WriteToken(getNode.Name);
+                    break;
+                case Grouping groupingNode:
+                    writer.WriteTag(5);
+                    writer.WriteExpression(groupingNode.Expression);
+                    break;
+                case Literal literalNode:
+                    writer.WriteTag(6);
+                    writer.WriteLiteral(literalNode.Value);
+                    break;
+                case Logical logicalNode:
+                    writer.WriteTag(7);
+                    writer.WriteExpression(logicalNode.Left);
+                    writer.WriteToken(logicalNode.Operator);
+                    writer.WriteExpression(logicalNode.Right);
+                    break;
+                case Set setNode:
+                    writer.WriteTag(8);
+                    writer.WriteExpression(setNode.Object);
+                    writer.WriteToken(setNode.Name);
+                    writer.WriteExpression(setNode.Value);
+                    break;
+                case Super superNode:
+                    writer.WriteTag(9);
+                    writer.WriteToken(superNode.Keyword);
+                    writer.WriteToken(superNode.Method);
+                    break;
+                case This thisNode:
+                    writer.WriteTag(10);
+                    writer.WriteToken(thisNode.Keyword);
+                    break;
+                case Unary unaryNode:
+                    writer.WriteTag(11);
+                    writer.WriteToken(unaryNode.Operator);
+                    writer.WriteExpression(unaryNode.Right);
+                    break;
+                case Variable variableNode:
+                    writer.WriteTag(12);
+                    writer.WriteToken(variableNode.Name);
+                    writer.WriteInt32(variableNode.Depth);
+                    writer.WriteInt32(variableNode.Slot);
+                    break;
+                default:
+                    throw new NotSupportedException($"Unknown expression {node.GetType()}.");
+            }
+        }
+        
+        public static Expression Read(TreeReader reader)
+        {
+            var tag = reader.ReadTag();
+            switch (tag)
+            {
+                case 0:
+                    return null;
+                case 1:
+                    {
+                        var name = reader.ReadToken();
+                        var @value = reader.ReadExpression();
+                        var depth = reader.ReadInt32();
+                        var slot = reader.ReadInt32();
+                        return new Assign(name, @value)
+                        {
+                            Depth = depth,
+                            Slot = slot,
+                        };
+                    }
+                case 2:
+                    {
+                        var left = reader.ReadExpression();
+                        var @operator = reader.ReadToken();
+                        var right = reader.ReadExpression();
+                        return new Binary(left, @operator, right);
+                    }
+                case 3:
+                    {
+                        var callee = reader.ReadExpression();
+                        var paren = reader.ReadToken();
+                        var arguments = reader.ReadExpressionList();
+                        return new Call(callee, paren, arguments);
+                    }
+                case 4:
+                    {
+                        var @object = reader.ReadExpression();
+                        var name = reader.ReadToken();
+                        return new Get(@object, name);
+                    }
+                case 5:
+                    {
+                        var expression = reader.ReadExpression();
+                        return new Grouping(expression);
+                    }
+                case 6:
+                    {
+                        var @value = reader.ReadLiteral();
+                        return new Literal(@value);
+                    }
+                case 7:
+                    {
+                        var left = reader.ReadExpression();
+                        var @operator = reader.ReadToken();
+                        var right = reader.ReadExpression();
+                        return new Logical(left, @operator, right);
+                    }
+                case 8:
+                    {
+                        var @object = reader.ReadExpression();
+                        var name = reader.ReadToken();
+                        var @value = reader.ReadExpression();
+                        return new Set(@object, name, @value);
+                    }
+                case 9:
+                    {
+                        var keyword = reader.ReadToken();
+                        var method = reader.ReadToken();
+                        return new Super(keyword, method);
+                    }
+                case 10:
+                    {
+                        var keyword = reader.ReadToken();
+                        return new This(keyword);
+                    }
+                case 11:
+                    {
+                        var @operator = reader.ReadToken();
+                        var right = reader.ReadExpression();
+                        return new Unary(@operator, right);
+                    }
+                case 12:
+                    {
+                        var name = reader.ReadToken();
+                        var depth = reader.ReadInt32();
+                        var slot = reader.ReadInt32();
+                        return new Variable(name)
+                        {
+                            Depth = depth,
+                            Slot = slot,
+                        };
+                    }
+                default:
+                    throw new InvalidDataException($"Unknown expression tag {tag}.");
+            }
+        }
+    }
+}
\ No newline at end of file
@@ -32,7 +32,7 @@ namespace Giosue.AST
         public Expression Object { get; }
         public Token Name { get; }
     
-        public Get(Expression @object, Token name)
+        public Get(Expression @object, Token name) : base(NodeKind.GetExpression)
         {
             this.Object = @object;
             this.Name = name;
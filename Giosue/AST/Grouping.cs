@@ -31,7 +31,7 @@ namespace Giosue.AST
     {
         public Expression Expression { get; }
     
-        public Grouping(Expression expression)
+        public Grouping(Expression expression) : base(NodeKind.GroupingExpression)
         {
             this.Expression = expression;
         }
@@ -0,0 +1,45 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.AST;
+
+namespace Giosue.AST
+{
+    public interface IVoidVisitor
+    {
+        public void VisitAssignExpression(Assign expression);
+        public void VisitBinaryExpression(Binary expression);
+        public void VisitCallExpression(Call expression);
+        public void VisitGetExpression(Get expression);
+        public void VisitGroupingExpression(Grouping expression);
+        public void VisitLiteralExpression(Literal expression);
+        public void VisitLogicalExpression(Logical expression);
+        public void VisitSetExpression(Set expression);
+        public void VisitSuperExpression(Super expression);
+        public void VisitThisExpression(This expression);
+        public void VisitUnaryExpression(Unary expression);
+        public void VisitVariableExpression(Variable expression);
+    }
+}
\ No newline at end of file
@@ -31,7 +31,7 @@ namespace Giosue.AST
     {
         public object Value { get; }
     
-        public Literal(object @value)
+        public Literal(object @value) : base(NodeKind.LiteralExpression)
         {
             this.Value = @value;
         }
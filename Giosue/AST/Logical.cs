@@ -33,7 +33,7 @@ namespace Giosue.AST
         public Token Operator { get; }
         public Expression Right { get; }
     
-        public Logical(Expression left, Token @operator, Expression right)
+        public Logical(Expression left, Token @operator, Expression right) : base(NodeKind.LogicalExpression)
         {
             this.Left = left;
             this.Operator = @operator;
@@ -33,7 +33,7 @@ namespace Giosue.AST
         public Token Name { get; }
         public Expression Value { get; }
     
-        public Set(Expression @object, Token name, Expression @value)
+        public Set(Expression @object, Token name, Expression @value) : base(NodeKind.SetExpression)
         {
             this.Object = @object;
             this.Name = name;
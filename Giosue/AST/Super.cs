@@ -32,7 +32,7 @@ namespace Giosue.AST
         public Token Keyword { get; }
         public Token Method { get; }
     
-        public Super(Token keyword, Token method)
+        public Super(Token keyword, Token method) : base(NodeKind.SuperExpression)
         {
             this.Keyword = keyword;
             this.Method = method;
@@ -31,7 +31,7 @@ namespace Giosue.AST
     {
         public Token Keyword { get; }
     
-        public This(Token keyword)
+        public This(Token keyword) : base(NodeKind.ThisExpression)
         {
             this.Keyword = keyword;
         }
@@ -32,7 +32,7 @@ namespace Giosue.AST
         public Token Operator { get; }
         public Expression Right { get; }
     
-        public Unary(Token @operator, Expression right)
+        public Unary(Token @operator, Expression right) : base(NodeKind.UnaryExpression)
         {
             this.Operator = @operator;
             this.Right = right;
@@ -30,8 +30,10 @@ namespace Giosue.AST
     public class Variable : Expression
     {
         public Token Name { get; }
+        public int Depth { get; set; } = -1;
+        public int Slot { get; set; } = -1;
     
-        public Variable(Token name)
+        public Variable(Token name) : base(NodeKind.VariableExpression)
         {
             this.Name = name;
         }
@@ -26,7 +26,7 @@ using Giosue.AST;
 
 namespace Giosue
 {
-    public class ASTPrinter : IVisitor<string>
+    public class ASTPrinter : IVisitor<string>, Statements.IVisitor<string>, Arena.IVisitor<string>
     {
         public string StringifyExpression(Expression expression)
         {
@@ -41,6 +41,26 @@ namespace Giosue
             return expression?.Accept(this) ?? null;
         }
 
+        public string StringifyStatement(Statements.Statement statement)
+        {
+            return statement?.Accept(this) ?? null;
+        }
+
+        public string StringifyStatements(List<Statements.Statement> statements)
+        {
+            return string.Join(System.Environment.NewLine, statements.Select(StringifyStatement));
+        }
+
+        public string StringifyStatements(Arena.NodeList statements)
+        {
+            var lines = new List<string>(statements.Count);
+            foreach (var statement in statements)
+            {
+                lines.Add(statement.Accept(this));
+            }
+            return string.Join(System.Environment.NewLine, lines);
+        }
+
         private string Parenthesize(string name, params Expression[] expressions)
         {
             var sb = new StringBuilder("(").Append(name);
@@ -55,9 +75,53 @@ namespace Giosue
             return sb.ToString();
         }
 
+        private string Parenthesize(string name, IEnumerable<Statements.Statement> statements)
+        {
+            var sb = new StringBuilder("(").Append(name);
+
+            foreach (var statement in statements)
+            {
+                sb.Append(' ').Append(statement.Accept(this));
+            }
+
+            sb.Append(')');
+
+            return sb.ToString();
+        }
+
+        private string Parenthesize(string name, params Arena.NodeRef[] nodes)
+        {
+            var sb = new StringBuilder("(").Append(name);
+
+            foreach (var node in nodes)
+            {
+                sb.Append(' ').Append(node.Accept(this));
+            }
+
+            sb.Append(')');
+
+            return sb.ToString();
+        }
+
+        private string Parenthesize(string name, Arena.NodeList nodes)
+        {
+            var sb = new StringBuilder("(").Append(name);
+
+            foreach (var node in nodes)
+            {
+                sb.Append(' ').Append(node.Accept(this));
+            }
+
+            sb.Append(')');
+
+            return sb.ToString();
+        }
+
+        #region AST visitors
+
         public string VisitAssignExpression(Assign expression)
         {
-            throw new NotImplementedException();
+            return Parenthesize($"= {expression.Name.Lexeme}", expression.Value);
         }
 
         public string VisitBinaryExpression(Binary expression)
@@ -67,7 +131,7 @@ namespace Giosue
 
         public string VisitCallExpression(Call expression)
         {
-            throw new NotImplementedException();
+            return Parenthesize("call", expression.Arguments.Prepend(expression.Callee).ToArray());
         }
 
         public string VisitGetExpression(Get expression)
@@ -87,7 +151,7 @@ namespace Giosue
 
         public string VisitLogicalExpression(Logical expression)
         {
-            throw new NotImplementedException();
+            return Parenthesize(expression.Operator.Lexeme, expression.Left, expression.Right);
         }
 
         public string VisitSetExpression(Set expression)
@@ -111,8 +175,184 @@ namespace Giosue
         }
 
         public string VisitVariableExpression(Variable expression)
+        {
+            return expression.Name.Lexeme;
+        }
+
+        #endregion AST visitors
+
+        #region Statement visitors
+
+        public string VisitExpressionStatement(Statements.Expression statement)
+        {
+            return Parenthesize(";", statement.Expr);
+        }
+
+        public string VisitVarStatement(Statements.Var statement)
+        {
+            return statement.Initializer == null
+                ? $"(var {statement.Name.Lexeme})"
+                : Parenthesize($"var {statement.Name.Lexeme}", statement.Initializer);
+        }
+
+        public string VisitBlockStatement(Statements.Block statement)
+        {
+            return Parenthesize("block", statement.Statements);
+        }
+
+        public string VisitIfStatement(Statements.If statement)
+        {
+            var sb = new StringBuilder("(se ")
+                .Append(statement.Condition.Accept(this))
+                .Append(' ')
+                .Append(statement.ThenBranch.Accept(this));
+
+            if (statement.ElseBranch != null)
+            {
+                sb.Append(' ').Append(statement.ElseBranch.Accept(this));
+            }
+
+            return sb.Append(')').ToString();
+        }
+
+        public string VisitWhileStatement(Statements.While statement)
+        {
+            return $"(mentre {statement.Condition.Accept(this)} {statement.Body.Accept(this)})";
+        }
+
+        public string VisitReturnStatement(Statements.Return statement)
+        {
+            return statement.Value == null ? "(ritorna)" : Parenthesize("ritorna", statement.Value);
+        }
+
+        public string VisitFunctionStatement(Statements.Function statement)
+        {
+            var parameters = string.Join(" ", statement.Parameters.Select(p => p.Lexeme));
+            return Parenthesize($"fun {statement.Name.Lexeme} ({parameters})", statement.Body);
+        }
+
+        #endregion Statement visitors
+
+        #region Arena visitors
+
+        public string VisitAssignExpression(Arena.AssignExpressionView expression)
+        {
+            return Parenthesize($"= {expression.Name.Lexeme}", expression.Value);
+        }
+
+        public string VisitBinaryExpression(Arena.BinaryExpressionView expression)
+        {
+            return Parenthesize(expression.Operator.Lexeme, expression.Left, expression.Right);
+        }
+
+        public string VisitCallExpression(Arena.CallExpressionView expression)
+        {
+            var nodes = new Arena.NodeRef[expression.Arguments.Count + 1];
+            nodes[0] = expression.Callee;
+            for (int i = 0; i < expression.Arguments.Count; i++)
+            {
+                nodes[i + 1] = expression.Arguments[i];
+            }
+            return Parenthesize("call", nodes);
+        }
+
+        public string VisitGetExpression(Arena.GetExpressionView expression)
+        {
+            throw new NotImplementedException();
+        }
+
+        public string VisitGroupingExpression(Arena.GroupingExpressionView expression)
+        {
+            return Parenthesize("group", expression.Expression);
+        }
+
+        public string VisitLiteralExpression(Arena.LiteralExpressionView expression)
+        {
+            return expression.Value?.ToString() ?? "niente";
+        }
+
+        public string VisitLogicalExpression(Arena.LogicalExpressionView expression)
+        {
+            return Parenthesize(expression.Operator.Lexeme, expression.Left, expression.Right);
+        }
+
+        public string VisitSetExpression(Arena.SetExpressionView expression)
+        {
+            throw new NotImplementedException();
+        }
+
+        public string VisitSuperExpression(Arena.SuperExpressionView expression)
+        {
+            throw new NotImplementedException();
+        }
+
+        public string VisitThisExpression(Arena.ThisExpressionView expression)
         {
             throw new NotImplementedException();
         }
+
+        public string VisitUnaryExpression(Arena.UnaryExpressionView expression)
+        {
+            return Parenthesize(expression.Operator.Lexeme, expression.Right);
+        }
+
+        public string VisitVariableExpression(Arena.VariableExpressionView expression)
+        {
+            return expression.Name.Lexeme;
+        }
+
+        public string VisitExpressionStatement(Arena.ExpressionStatementView statement)
+        {
+            return Parenthesize(";", statement.Expr);
+        }
+
+        public string VisitVarStatement(Arena.VarStatementView statement)
+        {
+            return statement.Initializer.IsNone
+                ? $"(var {statement.Name.Lexeme})"
+                : Parenthesize($"var {statement.Name.Lexeme}", statement.Initializer);
+        }
+
+        public string VisitBlockStatement(Arena.BlockStatementView statement)
+        {
+            return Parenthesize("block", statement.Statements);
+        }
+
+        public string VisitIfStatement(Arena.IfStatementView statement)
+        {
+            var sb = new StringBuilder("(se ")
+                .Append(statement.Condition.Accept(this))
+                .Append(' ')
+                .Append(statement.ThenBranch.Accept(this));
+
+            if (!statement.ElseBranch.IsNone)
+            {
+                sb.Append(' ').Append(statement.ElseBranch.Accept(this));
+            }
+
+            return sb.Append(')').ToString();
+        }
+
+        public string VisitWhileStatement(Arena.WhileStatementView statement)
+        {
+            return $"(mentre {statement.Condition.Accept(this)} {statement.Body.Accept(this)})";
+        }
+
+        public string VisitReturnStatement(Arena.ReturnStatementView statement)
+        {
+            return statement.Value.IsNone ? "(ritorna)" : Parenthesize("ritorna", statement.Value);
+        }
+
+        public string VisitFunctionStatement(Arena.FunctionStatementView statement)
+        {
+            var parameters = new List<string>(statement.Parameters.Count);
+            foreach (var parameter in statement.Parameters)
+            {
+                parameters.Add(parameter.Lexeme);
+            }
+            return Parenthesize($"fun {statement.Name.Lexeme} ({string.Join(" ", parameters)})", statement.Body);
+        }
+
+        #endregion Arena visitors
     }
 }
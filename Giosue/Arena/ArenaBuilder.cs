@@ -0,0 +1,254 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Runtime.InteropServices;
+using System.Text;
+
+namespace Giosue.Arena
+{
+    // Design comments:
+    // Building an arena from trees (`SyntaxArena.AddStatements`) means the whole script is
+    // held twice at its peak: once as trees and once as the arena. The `ArenaBuilder` is the
+    // `ISyntaxBuilder` that has the parser call the generated `Add*` methods instead, so the
+    // trees are never made.
+    // The trees are optimized and resolved before they are added to an arena, so the builder
+    // does the same work as each node arrives. Variables are resolved with the same
+    // `ScopeStack` as the `Resolver`; the parser tells the builder when blocks and function
+    // bodies begin, and the nodes arrive in the order the resolver would visit them. A name
+    // that a function uses before its block declares it is bound in the arena when the
+    // block ends.
+    // Operators whose operands are literals are folded and groupings are stripped, like the
+    // `Optimizer` does, and a `se` or `mentre` whose condition is a literal only keeps the code
+    // that can run. Calls to casts aren't folded: a later statement could redefine the cast,
+    // and the builder hasn't seen the later statements yet. The nodes that folding replaces
+    // stay in the arena, unused, since nodes are never removed.
+    /// <summary>
+    /// Emits the nodes that a <see cref="Parser{TExpression, TStatement}"/> parses into a <see cref="SyntaxArena"/>, resolving and folding them as they arrive.
+    /// </summary>
+    public sealed class ArenaBuilder : ISyntaxBuilder<int, int>
+    {
+        /// <summary>
+        /// The arena that the nodes are added to.
+        /// </summary>
+        public SyntaxArena Arena { get; }
+
+        /// <summary>
+        /// The scopes enclosing the node being parsed.
+        /// </summary>
+        private readonly ScopeStack<int> Scopes;
+
+        /// <summary>
+        /// The slots of the functions whose bodies are being parsed, innermost last.
+        /// </summary>
+        private readonly Stack<int> FunctionSlots = new();
+
+        public int NoExpression => SyntaxArena.NoNode;
+
+        public int NoStatement => SyntaxArena.NoNode;
+
+        /// <summary>
+        /// Creates a new <see cref="ArenaBuilder"/>.
+        /// </summary>
+        /// <param name="arena">The arena to add the nodes to, or null for a new one.</param>
+        public ArenaBuilder(SyntaxArena arena = null)
+        {
+            Arena = arena ?? new SyntaxArena();
+            Scopes = new(Arena.SetResolution);
+        }
+
+        /// <summary>
+        /// Adds the top-level statements returned by the parser as a list.
+        /// </summary>
+        /// <param name="statements">The ids of the statements.</param>
+        /// <returns>The statements in the arena.</returns>
+        public NodeList AddStatements(List<int> statements)
+        {
+            // Statements that were optimized away are missing.
+            statements.RemoveAll(statement => statement == SyntaxArena.NoNode);
+            return Arena.AddNodeList(CollectionsMarshal.AsSpan(statements));
+        }
+
+        #region Folding
+
+        /// <summary>
+        /// Adds a literal for a value computed at compile time.
+        /// </summary>
+        /// <param name="fold">Computes the value.</param>
+        /// <param name="folded">The id of the literal.</param>
+        /// <returns>True if the value was computed, false if computing it throws.</returns>
+        private bool TryFold(Func<GiosueValue> fold, out int folded)
+        {
+            folded = Optimizer.TryFoldValue(fold, out var value) ? Arena.AddLiteralExpression(value) : SyntaxArena.NoNode;
+            return folded != SyntaxArena.NoNode;
+        }
+
+        /// <summary>
+        /// Gets a statement that must exist, such as the body of a <c>mentre</c>.
+        /// </summary>
+        /// <param name="statement">The id of the statement.</param>
+        /// <returns>The id of the statement, or of an empty block if the statement was optimized away.</returns>
+        private int Required(int statement)
+        {
+            return statement == SyntaxArena.NoNode ? Arena.AddBlockStatement(Arena.AddNodeList(ReadOnlySpan<int>.Empty)) : statement;
+        }
+
+        #endregion Folding
+
+        #region Expressions
+
+        public int Literal(object value)
+        {
+            return Arena.AddLiteralExpression(value);
+        }
+
+        public int Grouping(int expression)
+        {
+            // Groupings only matter to the parser.
+            return expression;
+        }
+
+        public int Variable(Token name)
+        {
+            var id = Arena.AddVariableExpression(name);
+            var (depth, slot) = Scopes.Resolve(name, id);
+            Arena.SetResolution(id, depth, slot);
+            return id;
+        }
+
+        public bool TryGetVariableName(int expression, out Token name)
+        {
+            return Arena.TryGetVariableName(expression, out name);
+        }
+
+        public int Assign(Token name, int value)
+        {
+            var id = Arena.AddAssignExpression(name, value);
+            var (depth, slot) = Scopes.Resolve(name, id);
+            Arena.SetResolution(id, depth, slot);
+            return id;
+        }
+
+        public int Binary(int left, Token @operator, int right)
+        {
+            if (Arena.TryGetLiteralValue(left, out var l) && Arena.TryGetLiteralValue(right, out var r)
+                && TryFold(() => Operators.Binary(@operator.Type, GiosueValue.FromObject(l), GiosueValue.FromObject(r)), out var folded))
+            {
+                return folded;
+            }
+            return Arena.AddBinaryExpression(left, @operator, right);
+        }
+
+        public int Logical(int left, Token @operator, int right)
+        {
+            if (Arena.TryGetLiteralValue(left, out var l) && Arena.TryGetLiteralValue(right, out var r)
+                && TryFold(() => Operators.Logical(@operator.Type, GiosueValue.FromObject(l), GiosueValue.FromObject(r)), out var folded))
+            {
+                return folded;
+            }
+            return Arena.AddLogicalExpression(left, @operator, right);
+        }
+
+        public int Unary(Token @operator, int right)
+        {
+            if (Arena.TryGetLiteralValue(right, out var r)
+                && TryFold(() => Operators.Unary(@operator.Type, GiosueValue.FromObject(r)), out var folded))
+            {
+                return folded;
+            }
+            return Arena.AddUnaryExpression(@operator, right);
+        }
+
+        public int Call(int callee, Token paren, List<int> arguments)
+        {
+            return Arena.AddCallExpression(callee, paren, Arena.AddNodeList(CollectionsMarshal.AsSpan(arguments)));
+        }
+
+        #endregion Expressions
+
+        #region Statements
+
+        public int Expression(int expression)
+        {
+            return Arena.AddExpressionStatement(expression);
+        }
+
+        public int Var(Token name, int initializer)
+        {
+            // The initializer has already been resolved, so it still sees any variable
+            // with the same name from an outer scope.
+            return Arena.AddVarStatement(name, initializer, Scopes.Declare(name));
+        }
+
+        public void BeginBlock()
+        {
+            Scopes.BeginScope();
+        }
+
+        public int Block(List<int> statements)
+        {
+            Scopes.EndScope();
+            return Arena.AddBlockStatement(AddStatements(statements));
+        }
+
+        public int If(int condition, int thenBranch, int elseBranch)
+        {
+            if (Arena.TryGetLiteralValue(condition, out var value))
+            {
+                // Only the branch that is taken is kept.
+                return Operators.IsTruthy(GiosueValue.FromObject(value)) ? thenBranch : elseBranch;
+            }
+            return Arena.AddIfStatement(condition, Required(thenBranch), elseBranch);
+        }
+
+        public int While(Token keyword, int condition, int body)
+        {
+            if (Arena.TryGetLiteralValue(condition, out var value) && !Operators.IsTruthy(GiosueValue.FromObject(value)))
+            {
+                // The body can never run.
+                return SyntaxArena.NoNode;
+            }
+            return Arena.AddWhileStatement(keyword, condition, Required(body));
+        }
+
+        public int Return(Token keyword, int value)
+        {
+            return Arena.AddReturnStatement(keyword, value);
+        }
+
+        public void BeginFunction(Token name, List<Token> parameters)
+        {
+            // Declare the function before its body so it can call itself.
+            FunctionSlots.Push(Scopes.Declare(name));
+
+            // The parameters and the body share one environment, so the parameters always take the first slots.
+            Scopes.BeginFunctionScope();
+            parameters.ForEach(parameter => Scopes.Declare(parameter));
+        }
+
+        public int Function(Token name, List<Token> parameters, List<int> body)
+        {
+            Scopes.EndScope();
+            return Arena.AddFunctionStatement(name, Arena.AddTokens(parameters), AddStatements(body), FunctionSlots.Pop());
+        }
+
+        #endregion Statements
+    }
+}
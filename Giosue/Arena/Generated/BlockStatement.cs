@@ -0,0 +1,52 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Arena;
+
+namespace Giosue.Arena
+{
+    internal struct BlockStatementNode
+    {
+        public int StatementsStart;
+        public int StatementsCount;
+    }
+    
+    public readonly struct BlockStatementView
+    {
+        private readonly SyntaxArena Arena;
+        private readonly int Index;
+        
+        public int Id { get; }
+        
+        public NodeList Statements => new(Arena, Arena.BlockStatementNodes[Index].StatementsStart, Arena.BlockStatementNodes[Index].StatementsCount);
+        
+        internal BlockStatementView(SyntaxArena arena, int id, int index)
+        {
+            Arena = arena;
+            Id = id;
+            Index = index;
+        }
+    }
+}
\ No newline at end of file
@@ -0,0 +1,56 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Arena;
+
+namespace Giosue.Arena
+{
+    internal struct CallExpressionNode
+    {
+        public int Callee;
+        public int Paren;
+        public int ArgumentsStart;
+        public int ArgumentsCount;
+    }
+    
+    public readonly struct CallExpressionView
+    {
+        private readonly SyntaxArena Arena;
+        private readonly int Index;
+        
+        public int Id { get; }
+        
+        public NodeRef Callee => new(Arena, Arena.CallExpressionNodes[Index].Callee);
+        public Token Paren => Arena.Tokens[Arena.CallExpressionNodes[Index].Paren];
+        public NodeList Arguments => new(Arena, Arena.CallExpressionNodes[Index].ArgumentsStart, Arena.CallExpressionNodes[Index].ArgumentsCount);
+        
+        internal CallExpressionView(SyntaxArena arena, int id, int index)
+        {
+            Arena = arena;
+            Id = id;
+            Index = index;
+        }
+    }
+}
\ No newline at end of file
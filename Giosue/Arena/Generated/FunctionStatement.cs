@@ -0,0 +1,63 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Arena;
+
+namespace Giosue.Arena
+{
+    internal struct FunctionStatementNode
+    {
+        public int Name;
+        public int ParametersStart;
+        public int ParametersCount;
+        public int BodyStart;
+        public int BodyCount;
+        public int Slot;
+    }
+    
+    public readonly struct FunctionStatementView
+    {
+        private readonly SyntaxArena Arena;
+        private readonly int Index;
+        
+        public int Id { get; }
+        
+        public Token Name => Arena.Tokens[Arena.FunctionStatementNodes[Index].Name];
+        public TokenList Parameters => new(Arena, Arena.FunctionStatementNodes[Index].ParametersStart, Arena.FunctionStatementNodes[Index].ParametersCount);
+        public NodeList Body => new(Arena, Arena.FunctionStatementNodes[Index].BodyStart, Arena.FunctionStatementNodes[Index].BodyCount);
+        public int Slot
+        {
+            get => Arena.FunctionStatementNodes[Index].Slot;
+            set => Arena.FunctionStatementNodes[Index].Slot = value;
+        }
+        
+        internal FunctionStatementView(SyntaxArena arena, int id, int index)
+        {
+            Arena = arena;
+            Id = id;
+            Index = index;
+        }
+    }
+}
\ No newline at end of file
@@ -0,0 +1,52 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Arena;
+
+namespace Giosue.Arena
+{
+    public interface IVisitor<T>
+    {
+        public T VisitAssignExpression(AssignExpressionView expression);
+        public T VisitBinaryExpression(BinaryExpressionView expression);
+        public T VisitCallExpression(CallExpressionView expression);
+        public T VisitGetExpression(GetExpressionView expression);
+        public T VisitGroupingExpression(GroupingExpressionView expression);
+        public T VisitLiteralExpression(LiteralExpressionView expression);
+        public T VisitLogicalExpression(LogicalExpressionView expression);
+        public T VisitSetExpression(SetExpressionView expression);
+        public T VisitSuperExpression(SuperExpressionView expression);
+        public T VisitThisExpression(ThisExpressionView expression);
+        public T VisitUnaryExpression(UnaryExpressionView expression);
+        public T VisitVariableExpression(VariableExpressionView expression);
+        public T VisitExpressionStatement(ExpressionStatementView statement);
+        public T VisitVarStatement(VarStatementView statement);
+        public T VisitBlockStatement(BlockStatementView statement);
+        public T VisitIfStatement(IfStatementView statement);
+        public T VisitWhileStatement(WhileStatementView statement);
+        public T VisitReturnStatement(ReturnStatementView statement);
+        public T VisitFunctionStatement(FunctionStatementView statement);
+    }
+}
\ No newline at end of file
@@ -0,0 +1,493 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Arena;
+
+namespace Giosue.Arena
+{
+    public sealed partial class SyntaxArena
+    {
+        internal AssignExpressionNode[] AssignExpressionNodes = new AssignExpressionNode[InitialCapacity];
+        private int AssignExpressionCount = 0;
+        internal BinaryExpressionNode[] BinaryExpressionNodes = new BinaryExpressionNode[InitialCapacity];
+        private int BinaryExpressionCount = 0;
+        internal CallExpressionNode[] CallExpressionNodes = new CallExpressionNode[InitialCapacity];
+        private int CallExpressionCount = 0;
+        internal GetExpressionNode[] GetExpressionNodes = new GetExpressionNode[InitialCapacity];
+        private int GetExpressionCount = 0;
+        internal GroupingExpressionNode[] GroupingExpressionNodes = new GroupingExpressionNode[InitialCapacity];
+        private int GroupingExpressionCount = 0;
+        internal LiteralExpressionNode[] LiteralExpressionNodes = new LiteralExpressionNode[InitialCapacity];
+        private int LiteralExpressionCount = 0;
+        internal LogicalExpressionNode[] LogicalExpressionNodes = new LogicalExpressionNode[InitialCapacity];
+        private int LogicalExpressionCount = 0;
+        internal SetExpressionNode[] SetExpressionNodes = new SetExpressionNode[InitialCapacity];
+        private int SetExpressionCount = 0;
+        internal SuperExpressionNode[] SuperExpressionNodes = new SuperExpressionNode[InitialCapacity];
+        private int SuperExpressionCount = 0;
+        internal ThisExpressionNode[] ThisExpressionNodes = new ThisExpressionNode[InitialCapacity];
+        private int ThisExpressionCount = 0;
+        internal UnaryExpressionNode[] UnaryExpressionNodes = new UnaryExpressionNode[InitialCapacity];
+        private int UnaryExpressionCount = 0;
+        internal VariableExpressionNode[] VariableExpressionNodes = new VariableExpressionNode[InitialCapacity];
+        private int VariableExpressionCount = 0;
+        internal ExpressionStatementNode[] ExpressionStatementNodes = new ExpressionStatementNode[InitialCapacity];
+        private int ExpressionStatementCount = 0;
+        internal VarStatementNode[] VarStatementNodes = new VarStatementNode[InitialCapacity];
+        private int VarStatementCount = 0;
+        internal BlockStatementNode[] BlockStatementNodes = new BlockStatementNode[InitialCapacity];
+        private int BlockStatementCount = 0;
+        internal IfStatementNode[] IfStatementNodes = new IfStatementNode[InitialCapacity];
+        private int IfStatementCount = 0;
+        internal WhileStatementNode[] WhileStatementNodes = new WhileStatementNode[InitialCapacity];
+        private int WhileStatementCount = 0;
+        internal ReturnStatementNode[] ReturnStatementNodes = new ReturnStatementNode[InitialCapacity];
+        private int ReturnStatementCount = 0;
+        internal FunctionStatementNode[] FunctionStatementNodes = new FunctionStatementNode[InitialCapacity];
+        private int FunctionStatementCount = 0;
+        
+        public T Accept<T>(int id, IVisitor<T> visitor)
+        {
+            switch (Kinds[id])
+            {
+                case AST.NodeKind.AssignExpression:
+                    return visitor.VisitAssignExpression(new AssignExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.BinaryExpression:
+                    return visitor.VisitBinaryExpression(new BinaryExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.CallExpression:
+                    return visitor.VisitCallExpression(new CallExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.GetExpression:
+                    return visitor.VisitGetExpression(new GetExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.GroupingExpression:
+                    return visitor.VisitGroupingExpression(new GroupingExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.LiteralExpression:
+                    return visitor.VisitLiteralExpression(new LiteralExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.LogicalExpression:
+                    return visitor.VisitLogicalExpression(new LogicalExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.SetExpression:
+                    return visitor.VisitSetExpression(new SetExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.SuperExpression:
+                    return visitor.VisitSuperExpression(new SuperExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.ThisExpression:
+                    return visitor.VisitThisExpression(new ThisExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.UnaryExpression:
+                    return visitor.VisitUnaryExpression(new UnaryExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.VariableExpression:
+                    return visitor.VisitVariableExpression(new VariableExpressionView(this, id, Indices[id]));
+                case AST.NodeKind.ExpressionStatement:
+                    return visitor.VisitExpressionStatement(new ExpressionStatementView(this, id, Indices[id]));
+                case AST.NodeKind.VarStatement:
+                    return visitor.VisitVarStatement(new VarStatementView(this, id, Indices[id]));
+                case AST.NodeKind.BlockStatement:
+                    return visitor.VisitBlockStatement(new BlockStatementView(this, id, Indices[id]));
+                case AST.NodeKind.IfStatement:
+                    return visitor.VisitIfStatement(new IfStatementView(this, id, Indices[id]));
+                case AST.NodeKind.WhileStatement:
+                    return visitor.VisitWhileStatement(new WhileStatementView(this, id, Indices[id]));
+                case AST.NodeKind.ReturnStatement:
+                    return visitor.VisitReturnStatement(new ReturnStatementView(this, id, Indices[id]));
+                case AST.NodeKind.FunctionStatement:
+                    return visitor.VisitFunctionStatement(new FunctionStatementView(this, id, Indices[id]));
+                default:
+                    throw new InvalidOperationException($"Unknown node kind {Kinds[id]}.");
+            }
+        }
+        
+        public int AddExpression(Giosue.AST.Expression expression)
+        {
+            switch (expression)
+            {
+                case null:
+                    return NoNode;
+                case Giosue.AST.Assign assignNode:
+                    return AddAssignExpression(assignNode.Name, AddExpression(assignNode.Value), assignNode.Depth, assignNode.Slot);
+                case Giosue.AST.Binary binaryNode:
+                    return AddBinaryExpression(AddExpression(binaryNode.Left), binaryNode.Operator, AddExpression(binaryNode.Right));
+                case Giosue.AST.Call callNode:
+                    return AddCallExpression(AddExpression(callNode.Callee), callNode.Paren, AddExpressions(callNode.Arguments));
+                case Giosue.AST.Get getNode:
+                    return AddGetExpression(AddExpression(getNode.Object), getNode.Name);
+                case Giosue.AST.Grouping groupingNode:
+                    return AddGroupingExpression(AddExpression(groupingNode.Expression));
+                case Giosue.AST.Literal literalNode:
+                    return AddLiteralExpression(literalNode.Value);
+                case Giosue.AST.Logical logicalNode:
+                    return AddLogicalExpression(AddExpression(logicalNode.Left), logicalNode.Operator, AddExpression(logicalNode.Right));
+                case Giosue.AST.Set setNode:
+                    return AddSetExpression(AddExpression(setNode.Object), setNode.Name, AddExpression(setNode.Value));
+                case Giosue.AST.Super superNode:
+                    return AddSuperExpression(superNode.Keyword, superNode.Method);
+                case Giosue.AST.This thisNode:
+                    return AddThisExpression(thisNode.Keyword);
+                case Giosue.AST.Unary unaryNode:
+                    return AddUnaryExpression(unaryNode.Operator, AddExpression(unaryNode.Right));
+                case Giosue.AST.Variable variableNode:
+                    return AddVariableExpression(variableNode.Name, variableNode.Depth, variableNode.Slot);
+                default:
+                    throw new NotSupportedException($"Unknown expression {expression.GetType()}.");
+            }
+        }
+        
+        public int AddStatement(Giosue.Statements.Statement statement)
+        {
+            switch (statement)
+            {
+                case null:
+                    return NoNode;
+                case Giosue.Statements.Expression expressionNode:
+                    return AddExpressionStatement(AddExpression(expressionNode.Expr));
+                case Giosue.Statements.Var varNode:
+                    return AddVarStatement(varNode.Name, AddExpression(varNode.Initializer), varNode.Slot);
+                case Giosue.Statements.Block blockNode:
+                    return AddBlockStatement(AddStatements(blockNode.Statements));
+                case Giosue.Statements.If ifNode:
+                    return AddIfStatement(AddExpression(ifNode.Condition), AddStatement(ifNode.ThenBranch), AddStatement(ifNode.ElseBranch));
+                case Giosue.Statements.While whileNode:
+                    return AddWhileStatement(whileNode.Keyword, AddExpression(whileNode.Condition), AddStatement(whileNode.Body));
+                case Giosue.Statements.Return returnNode:
+                    return AddReturnStatement(returnNode.Keyword, AddExpression(returnNode.Value));
+                case Giosue.Statements.Function functionNode:
+                    return AddFunctionStatement(functionNode.Name, AddTokens(functionNode.Parameters), AddStatements(functionNode.Body), functionNode.Slot);
+                default:
+                    throw new NotSupportedException($"Unknown statement {statement.GetType()}.");
+            }
+        }
+        
+        public int AddAssignExpression(Token name, int @value, int depth = -1, int slot = -1)
+        {
+            if (AssignExpressionCount == AssignExpressionNodes.Length)
+            {
+                Array.Resize(ref AssignExpressionNodes, AssignExpressionCount * 2);
+            }
+            
+            var index = AssignExpressionCount++;
+            AssignExpressionNodes[index] = new AssignExpressionNode()
+            {
+                Name = AddToken(name),
+                Value = @value,
+                Depth = depth,
+                Slot = slot,
+            };
+            return AddNode(AST.NodeKind.AssignExpression, index);
+        }
+        
+        public int AddBinaryExpression(int left, Token @operator, int right)
+        {
+            if (BinaryExpressionCount == BinaryExpressionNodes.Length)
+            {
+                Array.Resize(ref BinaryExpressionNodes, BinaryExpressionCount * 2);
+            }
+            
+            var index = BinaryExpressionCount++;
+            BinaryExpressionNodes[index] = new BinaryExpressionNode()
+            {
+                Left = left,
+                Operator = AddToken(@operator),
+                Right = right,
+            };
+            return AddNode(AST.NodeKind.BinaryExpression, index);
+        }
+        
+        public int AddCallExpression(int callee, Token paren, NodeList arguments)
+        {
+            if (CallExpressionCount == CallExpressionNodes.Length)
+            {
+                Array.Resize(ref CallExpressionNodes, CallExpressionCount * 2);
+            }
+            
+            var index = CallExpressionCount++;
+            CallExpressionNodes[index] = new CallExpressionNode()
+            {
+                Callee = callee,
+                Paren = AddToken(paren),
+                ArgumentsStart = arguments.Start,
+                ArgumentsCount = arguments.Count,
+            };
+            return AddNode(AST.NodeKind.CallExpression, index);
+        }
+        
+        public int AddGetExpression(int @object, Token name)
+        {
+            if (GetExpressionCount == GetExpressionNodes.Length)
+            {
+                Array.Resize(ref GetExpressionNodes, GetExpressionCount * 2);
+            }
+            
+            var index = GetExpressionCount++;
+            GetExpressionNodes[index] = new GetExpressionNode()
+            {
+                Object = @object,
+                Name = AddToken(name),
+            };
+            return AddNode(AST.NodeKind.GetExpression, index);
+        }
+        
+        public int AddGroupingExpression(int expression)
+        {
+            if (GroupingExpressionCount == GroupingExpressionNodes.Length)
+            {
+                Array.Resize(ref GroupingExpressionNodes, GroupingExpressionCount * 2);
+            }
+            
+            var index = GroupingExpressionCount++;
+            GroupingExpressionNodes[index] = new GroupingExpressionNode()
+            {
+                Expression = expression,
+            };
+            return AddNode(AST.NodeKind.GroupingExpression, index);
+        }
+        
+        public int AddLiteralExpression(object @value)
+        {
+            if (LiteralExpressionCount == LiteralExpressionNodes.Length)
+            {
+                Array.Resize(ref LiteralExpressionNodes, LiteralExpressionCount * 2);
+            }
+            
+            var index = LiteralExpressionCount++;
+            LiteralExpressionNodes[index] = new LiteralExpressionNode()
+            {
+                Value = AddConstant(@value),
+            };
+            return AddNode(AST.NodeKind.LiteralExpression, index);
+        }
+        
+        public int AddLogicalExpression(int left, Token @operator, int right)
+        {
+            if (LogicalExpressionCount == LogicalExpressionNodes.Length)
+            {
+                Array.Resize(ref LogicalExpressionNodes, LogicalExpressionCount * 2);
+            }
+            
+            var index = LogicalExpressionCount++;
+            LogicalExpressionNodes[index] = new LogicalExpressionNode()
+            {
+                Left = left,
+                Operator = AddToken(@operator),
+                Right = right,
+            };
+            return AddNode(AST.NodeKind.LogicalExpression, index);
+        }
+        
+        public int AddSetExpression(int @object, Token name, int @value)
+        {
+            if (SetExpressionCount == SetExpressionNodes.Length)
+            {
+                Array.Resize(ref SetExpressionNodes, SetExpressionCount * 2);
+            }
+            
+            var index = SetExpressionCount++;
+            SetExpressionNodes[index] = new SetExpressionNode()
+            {
+                Object = @object,
+                Name = AddToken(name),
+                Value = @value,
+            };
+            return AddNode(AST.NodeKind.SetExpression, index);
+        }
+        
+        public int AddSuperExpression(Token keyword, Token method)
+        {
+            if (SuperExpressionCount == SuperExpressionNodes.Length)
+            {
+                Array.Resize(ref SuperExpressionNodes, SuperExpressionCount * 2);
+            }
+            
+            var index = SuperExpressionCount++;
+            SuperExpressionNodes[index] = new SuperExpressionNode()
+            {
+                Keyword = AddToken(keyword),
+                Method = AddToken(method),
+            };
+            return AddNode(AST.NodeKind.SuperExpression, index);
+        }
+        
+        public int AddThisExpression(Token keyword)
+        {
+            if (ThisExpressionCount == ThisExpressionNodes.Length)
+            {
+                Array.Resize(ref ThisExpressionNodes, ThisExpressionCount * 2);
+            }
+            
+            var index = ThisExpressionCount++;
+            ThisExpressionNodes[index] = new ThisExpressionNode()
+            {
+                Keyword = AddToken(keyword),
+            };
+            return AddNode(AST.NodeKind.ThisExpression, index);
+        }
+        
+        public int AddUnaryExpression(Token @operator, int right)
+        {
+            if (UnaryExpressionCount == UnaryExpressionNodes.Length)
+            {
+                Array.Resize(ref UnaryExpressionNodes, UnaryExpressionCount * 2);
+            }
+            
+            var index = UnaryExpressionCount++;
+            UnaryExpressionNodes[index] = new UnaryExpressionNode()
+            {
+                Operator = AddToken(@operator),
+                Right = right,
+            };
+            return AddNode(AST.NodeKind.UnaryExpression, index);
+        }
+        
+        public int AddVariableExpression(Token name, int depth = -1, int slot = -1)
+        {
+            if (VariableExpressionCount == VariableExpressionNodes.Length)
+            {
+                Array.Resize(ref VariableExpressionNodes, VariableExpressionCount * 2);
+            }
+            
+            var index = VariableExpressionCount++;
+            VariableExpressionNodes[index] = new VariableExpressionNode()
+            {
+                Name = AddToken(name),
+                Depth = depth,
+                Slot = slot,
+            };
+            return AddNode(AST.NodeKind.VariableExpression, index);
+        }
+        
+        public int AddExpressionStatement(int expression)
+        {
+            if (ExpressionStatementCount == ExpressionStatementNodes.Length)
+            {
+                Array.Resize(ref ExpressionStatementNodes, ExpressionStatementCount * 2);
+            }
+            
+            var index = ExpressionStatementCount++;
+            ExpressionStatementNodes[index] = new ExpressionStatementNode()
+            {
+                Expr = expression,
+            };
+            return AddNode(AST.NodeKind.ExpressionStatement, index);
+        }
+        
+        public int AddVarStatement(Token name, int initializer, int slot = -1)
+        {
+            if (VarStatementCount == VarStatementNodes.Length)
+            {
+                Array.Resize(ref VarStatementNodes, VarStatementCount * 2);
+            }
+            
+            var index = VarStatementCount++;
+            VarStatementNodes[index] = new VarStatementNode()
+            {
+                Name = AddToken(name),
+                Initializer = initializer,
+                Slot = slot,
+            };
+            return AddNode(AST.NodeKind.VarStatement, index);
+        }
+        
+        public int AddBlockStatement(NodeList statements)
+        {
+            if (BlockStatementCount == BlockStatementNodes.Length)
+            {
+                Array.Resize(ref BlockStatementNodes, BlockStatementCount * 2);
+            }
+            
+            var index = BlockStatementCount++;
+            BlockStatementNodes[index] = new BlockStatementNode()
+            {
+                StatementsStart = statements.Start,
+                StatementsCount = statements.Count,
+            };
+            return AddNode(AST.NodeKind.BlockStatement, index);
+        }
+        
+        public int AddIfStatement(int condition, int thenBranch, int ElseBranch)
+        {
+            if (IfStatementCount == IfStatementNodes.Length)
+            {
+                Array.Resize(ref IfStatementNodes, IfStatementCount * 2);
+            }
+            
+            var index = IfStatementCount++;
+            IfStatementNodes[index] = new IfStatementNode()
+            {
+                Condition = condition,
+                ThenBranch = thenBranch,
+                ElseBranch = ElseBranch,
+            };
+            return AddNode(AST.NodeKind.IfStatement, index);
+        }
+        
+        public int AddWhileStatement(Token keyword, int condition, int body)
+        {
+            if (WhileStatementCount == WhileStatementNodes.Length)
+            {
+                Array.Resize(ref WhileStatementNodes, WhileStatementCount * 2);
+            }
+            
+            var index = WhileStatementCount++;
+            WhileStatementNodes[index] = new WhileStatementNode()
+            {
+                Keyword = AddToken(keyword),
+                Condition = condition,
+                Body = body,
+            };
+            return AddNode(AST.NodeKind.WhileStatement, index);
+        }
+        
+        public int AddReturnStatement(Token keyword, int value)
+        {
+            if (ReturnStatementCount == ReturnStatementNodes.Length)
+            {
+                Array.Resize(ref ReturnStatementNodes, ReturnStatementCount * 2);
+            }
+            
+            var index = ReturnStatementCount++;
+            ReturnStatementNodes[index] = new ReturnStatementNode()
+            {
+                Keyword = AddToken(keyword),
+                Value = value,
+            };
+            return AddNode(AST.NodeKind.ReturnStatement, index);
+        }
+        
+        public int AddFunctionStatement(Token name, TokenList parameters, NodeList body, int slot = -1)
+        {
+            if (FunctionStatementCount == FunctionStatementNodes.Length)
+            {
+                Array.Resize(ref FunctionStatementNodes, FunctionStatementCount * 2);
+            }
+            
+            var index = FunctionStatementCount++;
+            FunctionStatementNodes[index] = new FunctionStatementNode()
+            {
+                Name = AddToken(name),
+                ParametersStart = parameters.Start,
+                ParametersCount = parameters.Count,
+                BodyStart = body.Start,
+                BodyCount = body.Count,
+                Slot = slot,
+            };
+            return AddNode(AST.NodeKind.FunctionStatement, index);
+        }
+    }
+}
\ No newline at end of file
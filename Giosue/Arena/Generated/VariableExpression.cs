@@ -0,0 +1,63 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Arena;
+
+namespace Giosue.Arena
+{
+    internal struct VariableExpressionNode
+    {
+        public int Name;
+        public int Depth;
+        public int Slot;
+    }
+    
+    public readonly struct VariableExpressionView
+    {
+        private readonly SyntaxArena Arena;
+        private readonly int Index;
+        
+        public int Id { get; }
+        
+        public Token Name => Arena.Tokens[Arena.VariableExpressionNodes[Index].Name];
+        public int Depth
+        {
+            get => Arena.VariableExpressionNodes[Index].Depth;
+            set => Arena.VariableExpressionNodes[Index].Depth = value;
+        }
+        public int Slot
+        {
+            get => Arena.VariableExpressionNodes[Index].Slot;
+            set => Arena.VariableExpressionNodes[Index].Slot = value;
+        }
+        
+        internal VariableExpressionView(SyntaxArena arena, int id, int index)
+        {
+            Arena = arena;
+            Id = id;
+            Index = index;
+        }
+    }
+}
\ No newline at end of file
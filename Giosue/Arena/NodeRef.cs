@@ -0,0 +1,65 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Arena
+{
+    /// <summary>
+    /// A node in a <see cref="SyntaxArena"/>, or no node.
+    /// </summary>
+    public readonly struct NodeRef
+    {
+        private readonly SyntaxArena Arena;
+
+        /// <summary>
+        /// The id of the node, or <see cref="SyntaxArena.NoNode"/>.
+        /// </summary>
+        public int Id { get; }
+
+        /// <summary>
+        /// Indicates if there is no node, like a null tree.
+        /// </summary>
+        public bool IsNone => Id == SyntaxArena.NoNode;
+
+        /// <summary>
+        /// The kind of the node.
+        /// </summary>
+        public AST.NodeKind Kind => Arena.KindOf(Id);
+
+        public NodeRef(SyntaxArena arena, int id)
+        {
+            Arena = arena;
+            Id = id;
+        }
+
+        /// <summary>
+        /// Visits the node.
+        /// </summary>
+        /// <typeparam name="T">The type of value returned by the visitor.</typeparam>
+        /// <param name="visitor">The visitor.</param>
+        /// <returns>The value returned by the visitor.</returns>
+        public T Accept<T>(IVisitor<T> visitor)
+        {
+            return Arena.Accept(Id, visitor);
+        }
+    }
+}
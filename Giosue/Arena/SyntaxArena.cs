@@ -0,0 +1,268 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Arena
+{
+    // Design comments:
+    // A `SyntaxArena` holds a whole program as a handful of arrays instead of one object per
+    // node. Every kind of node has its own array of small structs (see `Generated/`, which the
+    // ASTGenerator writes from the same definitions as the tree classes), and a node refers to
+    // its children by their int ids. An id indexes `Kinds` and `Indices`, which say which
+    // array the node is in and where. Tokens and literal values are kept in their own tables
+    // and nodes store their indices; lists of children are ranges of `ListItems`.
+    // A million-node program is then a few dozen large arrays that the GC barely has to look
+    // at, and the nodes that are run together sit next to each other in memory.
+    // The views (`BinaryExpressionView` and so on) and `NodeRef` give the nodes the same
+    // properties as the tree classes, so the code that walks an arena reads like the code
+    // that walks the trees.
+    // An arena is built from trees that have been optimized and resolved (`AddStatements`),
+    // or node by node with the generated `Add*` methods, which is how `ArenaBuilder` has the
+    // parser emit a script straight into an arena. Nodes are never removed; the arena is
+    // dropped as a whole.
+    /// <summary>
+    /// Stores syntax trees in arrays, with nodes referring to each other by id.
+    /// </summary>
+    public sealed partial class SyntaxArena
+    {
+        /// <summary>
+        /// The id of a missing node, such as the else branch of an if statement without one.
+        /// </summary>
+        public const int NoNode = -1;
+
+        private const int InitialCapacity = 16;
+
+        /// <summary>
+        /// The kind of each node, by id.
+        /// </summary>
+        private AST.NodeKind[] Kinds = new AST.NodeKind[InitialCapacity];
+
+        /// <summary>
+        /// The index of each node in the array of its kind, by id.
+        /// </summary>
+        private int[] Indices = new int[InitialCapacity];
+
+        internal Token[] Tokens = new Token[InitialCapacity];
+        private int TokenCount = 0;
+
+        /// <summary>
+        /// The values of literals.
+        /// </summary>
+        internal object[] Constants = new object[InitialCapacity];
+        private int ConstantCount = 0;
+
+        /// <summary>
+        /// The items of every list of nodes (node ids) and every list of tokens (token indices).
+        /// </summary>
+        internal int[] ListItems = new int[InitialCapacity];
+        private int ListItemCount = 0;
+
+        /// <summary>
+        /// The number of nodes in the arena.
+        /// </summary>
+        public int NodeCount { get; private set; } = 0;
+
+        /// <summary>
+        /// Gets the kind of a node.
+        /// </summary>
+        /// <param name="id">The id of the node.</param>
+        /// <returns>The kind of the node, or <see cref="AST.NodeKind.None"/> if the id is <see cref="NoNode"/>.</returns>
+        public AST.NodeKind KindOf(int id)
+        {
+            return id == NoNode ? AST.NodeKind.None : Kinds[id];
+        }
+
+        /// <summary>
+        /// Gets the value of a literal.
+        /// </summary>
+        /// <param name="id">The id of the node.</param>
+        /// <param name="value">The value of the literal.</param>
+        /// <returns>True if the node is a literal, false otherwise.</returns>
+        internal bool TryGetLiteralValue(int id, out object value)
+        {
+            if (KindOf(id) != AST.NodeKind.LiteralExpression)
+            {
+                value = null;
+                return false;
+            }
+
+            value = Constants[LiteralExpressionNodes[Indices[id]].Value];
+            return true;
+        }
+
+        /// <summary>
+        /// Gets the name of a variable.
+        /// </summary>
+        /// <param name="id">The id of the node.</param>
+        /// <param name="name">The name of the variable.</param>
+        /// <returns>True if the node is a variable, false otherwise.</returns>
+        internal bool TryGetVariableName(int id, out Token name)
+        {
+            if (KindOf(id) != AST.NodeKind.VariableExpression)
+            {
+                name = null;
+                return false;
+            }
+
+            name = Tokens[VariableExpressionNodes[Indices[id]].Name];
+            return true;
+        }
+
+        /// <summary>
+        /// Sets the depth and slot of a variable or an assignment.
+        /// </summary>
+        /// <param name="id">The id of the node.</param>
+        /// <param name="depth">The depth of the variable, or -1 for a global.</param>
+        /// <param name="slot">The slot of the variable, or -1 for a global.</param>
+        internal void SetResolution(int id, int depth, int slot)
+        {
+            switch (KindOf(id))
+            {
+                case AST.NodeKind.VariableExpression:
+                    VariableExpressionNodes[Indices[id]].Depth = depth;
+                    VariableExpressionNodes[Indices[id]].Slot = slot;
+                    break;
+                case AST.NodeKind.AssignExpression:
+                    AssignExpressionNodes[Indices[id]].Depth = depth;
+                    AssignExpressionNodes[Indices[id]].Slot = slot;
+                    break;
+            }
+        }
+
+        /// <summary>
+        /// Adds every statement in a list, and everything in them, to the arena.
+        /// </summary>
+        /// <param name="statements">The statements.</param>
+        /// <returns>The statements in the arena.</returns>
+        public NodeList AddStatements(List<Statements.Statement> statements)
+        {
+            // The statements are added before the list, so that the items of the list are contiguous
+            // even though the statements add lists of their own.
+            var ids = new int[statements.Count];
+            for (int i = 0; i < ids.Length; i++)
+            {
+                ids[i] = AddStatement(statements[i]);
+            }
+            return new NodeList(this, AddListItems(ids), ids.Length);
+        }
+
+        /// <summary>
+        /// Adds every expression in a list, and everything in them, to the arena.
+        /// </summary>
+        /// <param name="expressions">The expressions.</param>
+        /// <returns>The expressions in the arena.</returns>
+        public NodeList AddExpressions(List<AST.Expression> expressions)
+        {
+            var ids = new int[expressions.Count];
+            for (int i = 0; i < ids.Length; i++)
+            {
+                ids[i] = AddExpression(expressions[i]);
+            }
+            return new NodeList(this, AddListItems(ids), ids.Length);
+        }
+
+        /// <summary>
+        /// Adds a list of nodes that are already in the arena.
+        /// </summary>
+        /// <param name="ids">The ids of the nodes.</param>
+        /// <returns>The list.</returns>
+        public NodeList AddNodeList(ReadOnlySpan<int> ids)
+        {
+            return new NodeList(this, AddListItems(ids), ids.Length);
+        }
+
+        /// <summary>
+        /// Adds a list of tokens to the arena.
+        /// </summary>
+        /// <param name="tokens">The tokens.</param>
+        /// <returns>The tokens in the arena.</returns>
+        public TokenList AddTokens(List<Token> tokens)
+        {
+            var start = ListItemCount;
+            EnsureCapacity(ref ListItems, ListItemCount + tokens.Count);
+            foreach (var token in tokens)
+            {
+                ListItems[ListItemCount++] = AddToken(token);
+            }
+            return new TokenList(this, start, tokens.Count);
+        }
+
+        /// <summary>
+        /// Records a node that has been put in the array of its kind.
+        /// </summary>
+        /// <param name="kind">The kind of the node.</param>
+        /// <param name="index">The index of the node in the array of its kind.</param>
+        /// <returns>The id of the node.</returns>
+        private int AddNode(AST.NodeKind kind, int index)
+        {
+            EnsureCapacity(ref Kinds, NodeCount + 1);
+            EnsureCapacity(ref Indices, NodeCount + 1);
+
+            var id = NodeCount++;
+            Kinds[id] = kind;
+            Indices[id] = index;
+            return id;
+        }
+
+        private int AddToken(Token token)
+        {
+            EnsureCapacity(ref Tokens, TokenCount + 1);
+            Tokens[TokenCount] = token;
+            return TokenCount++;
+        }
+
+        private int AddConstant(object constant)
+        {
+            EnsureCapacity(ref Constants, ConstantCount + 1);
+            Constants[ConstantCount] = constant;
+            return ConstantCount++;
+        }
+
+        /// <summary>
+        /// Appends items to <see cref="ListItems"/>.
+        /// </summary>
+        /// <param name="items">The items.</param>
+        /// <returns>The index of the first item.</returns>
+        private int AddListItems(ReadOnlySpan<int> items)
+        {
+            var start = ListItemCount;
+            EnsureCapacity(ref ListItems, ListItemCount + items.Length);
+            items.CopyTo(ListItems.AsSpan(start));
+            ListItemCount += items.Length;
+            return start;
+        }
+
+        /// <summary>
+        /// Doubles the size of an array until it can hold a number of items.
+        /// </summary>
+        /// <typeparam name="T">The type of the items.</typeparam>
+        /// <param name="array">The array.</param>
+        /// <param name="capacity">The number of items the array must hold.</param>
+        private static void EnsureCapacity<T>(ref T[] array, int capacity)
+        {
+            if (capacity > array.Length)
+            {
+                Array.Resize(ref array, Math.Max(capacity, array.Length * 2));
+            }
+        }
+    }
+}
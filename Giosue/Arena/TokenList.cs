@@ -0,0 +1,79 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Arena
+{
+    /// <summary>
+    /// A list of tokens in a <see cref="SyntaxArena"/>.
+    /// </summary>
+    public readonly struct TokenList
+    {
+        private readonly SyntaxArena Arena;
+
+        /// <summary>
+        /// The index of the first token's index in <see cref="SyntaxArena.ListItems"/>.
+        /// </summary>
+        public int Start { get; }
+
+        /// <summary>
+        /// The number of tokens in the list.
+        /// </summary>
+        public int Count { get; }
+
+        public Token this[int index] => Arena.Tokens[Arena.ListItems[Start + index]];
+
+        public TokenList(SyntaxArena arena, int start, int count)
+        {
+            Arena = arena;
+            Start = start;
+            Count = count;
+        }
+
+        public Enumerator GetEnumerator()
+        {
+            return new Enumerator(this);
+        }
+
+        /// <summary>
+        /// Enumerates the tokens of a <see cref="TokenList"/> without allocating.
+        /// </summary>
+        public struct Enumerator
+        {
+            private readonly TokenList List;
+            private int Index;
+
+            public Token Current => List[Index];
+
+            internal Enumerator(TokenList list)
+            {
+                List = list;
+                Index = -1;
+            }
+
+            public bool MoveNext()
+            {
+                return ++Index < List.Count;
+            }
+        }
+    }
+}
@@ -0,0 +1,66 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue.Builtins.Arrays
+{
+    class ArrayAdd : IGiosueCallable
+    {
+        public const string Name = "ArrayAggiungi";
+
+        public int Arity => 2;
+
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
+        {
+            var left = GiosueArray.FromArgument(arguments[0]);
+            var right = GiosueArray.FromArgument(arguments[1]);
+            if (left.ElementType != right.ElementType || left.Length != right.Length)
+            {
+                // Both arrays must have the same type and length.
+                throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Non è possibile sommare un array di {left.Length} elementi {left.ElementType} e uno di {right.Length} elementi {right.ElementType}.");
+            }
+
+            switch (left.ElementType)
+            {
+                case GiosueArrayType.Int:
+                    var ints = new int[left.Length];
+                    VectorOperations.Add(left.IntSpan, right.IntSpan, ints);
+                    return GiosueValue.FromObject(new GiosueArray(ints));
+                case GiosueArrayType.Double:
+                    var doubles = new double[left.Length];
+                    VectorOperations.Add(left.DoubleSpan, right.DoubleSpan, doubles);
+                    return GiosueValue.FromObject(new GiosueArray(doubles));
+                default:
+                    var values = new GiosueValue[left.Length];
+                    var leftValues = left.ValueSpan;
+                    var rightValues = right.ValueSpan;
+                    for (int i = 0; i < values.Length; i++)
+                    {
+                        values[i] = Operators.Binary(TokenType.Plus, leftValues[i], rightValues[i]);
+                    }
+                    return GiosueValue.FromObject(new GiosueArray(values));
+            }
+        }
+    }
+}
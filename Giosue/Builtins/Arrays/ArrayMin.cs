@@ -0,0 +1,63 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue.Builtins.Arrays
+{
+    class ArrayMin : IGiosueCallable
+    {
+        public const string Name = "ArrayMin";
+
+        public int Arity => 1;
+
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
+        {
+            var array = GiosueArray.FromArgument(arguments[0]);
+            if (array.Length == 0)
+            {
+                // An empty array has no minimo.
+                throw new InterpreterException(InterpreterExceptionType.IndexOutOfRange, "Un array vuoto non ha un minimo.");
+            }
+
+            switch (array.ElementType)
+            {
+                case GiosueArrayType.Int:
+                    return VectorOperations.Min(array.IntSpan);
+                case GiosueArrayType.Double:
+                    return VectorOperations.Min(array.DoubleSpan);
+                default:
+                    var values = array.ValueSpan;
+                    var result = values[0];
+                    foreach (var element in values[1..])
+                    {
+                        if (Operators.CompareNumbers(element, result) < 0)
+                        {
+                            result = element;
+                        }
+                    }
+                    return result;
+            }
+        }
+    }
+}
@@ -0,0 +1,62 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue.Builtins.Arrays
+{
+    class ArrayScale : IGiosueCallable
+    {
+        public const string Name = "ArrayScala";
+
+        public int Arity => 2;
+
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
+        {
+            var array = GiosueArray.FromArgument(arguments[0]);
+            var factor = arguments[1];
+            switch (array.ElementType)
+            {
+                case GiosueArrayType.Int when factor.IsInt:
+                    var ints = new int[array.Length];
+                    VectorOperations.Scale(array.IntSpan, factor.AsInt, ints);
+                    return GiosueValue.FromObject(new GiosueArray(ints));
+                case GiosueArrayType.Double when factor.IsDouble:
+                    var doubles = new double[array.Length];
+                    VectorOperations.Scale(array.DoubleSpan, factor.AsDouble, doubles);
+                    return GiosueValue.FromObject(new GiosueArray(doubles));
+                case GiosueArrayType.Value:
+                    var values = new GiosueValue[array.Length];
+                    var elements = array.ValueSpan;
+                    for (int i = 0; i < values.Length; i++)
+                    {
+                        values[i] = Operators.Binary(TokenType.Star, elements[i], factor);
+                    }
+                    return GiosueValue.FromObject(new GiosueArray(values));
+                default:
+                    // The factor must have the same type as the elements.
+                    throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Non è possibile scalare quell'array per un valore di tipo {factor.ClrType?.Name ?? "niente"}.");
+            }
+        }
+    }
+}
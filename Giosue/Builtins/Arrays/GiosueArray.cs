@@ -0,0 +1,256 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue.Builtins.Arrays
+{
+    /// <summary>
+    /// The type of the elements of a <see cref="GiosueArray"/>.
+    /// </summary>
+    public enum GiosueArrayType : byte
+    {
+        /// <summary>
+        /// Every element is an <see cref="int"/>.
+        /// </summary>
+        Int,
+
+        /// <summary>
+        /// Every element is a <see cref="double"/>.
+        /// </summary>
+        Double,
+
+        /// <summary>
+        /// The elements can be any value.
+        /// </summary>
+        Value,
+    }
+
+    // Design comments:
+    // An array of ints or doubles keeps its elements in an `int[]` or `double[]`, so the bulk
+    // builtins can run over them with `Vector<T>` (see `VectorOperations`). Any other array
+    // keeps `GiosueValue`s rather than objects, so putting a number in it doesn't box it.
+    // A slice is a view of the same storage, like a `Span<T>`: writing to a slice writes to
+    // the array it came from. The bulk builtins that make an array (ArrayScala, ArrayAggiungi)
+    // always make a new one.
+    // Every array is an object to Giosue, so two arrays are only equal if they're the same one.
+    /// <summary>
+    /// A fixed-length array of Giosue values.
+    /// </summary>
+    public sealed class GiosueArray
+    {
+        private readonly int[] Ints;
+        private readonly double[] Doubles;
+        private readonly GiosueValue[] Values;
+
+        /// <summary>
+        /// The index in the storage of the first element.
+        /// </summary>
+        private readonly int Start;
+
+        /// <summary>
+        /// The type of the elements.
+        /// </summary>
+        public GiosueArrayType ElementType { get; }
+
+        /// <summary>
+        /// The number of elements.
+        /// </summary>
+        public int Length { get; }
+
+        private GiosueArray(GiosueArrayType elementType, int[] ints, double[] doubles, GiosueValue[] values, int start, int length)
+        {
+            ElementType = elementType;
+            Ints = ints;
+            Doubles = doubles;
+            Values = values;
+            Start = start;
+            Length = length;
+        }
+
+        public GiosueArray(int[] elements) : this(GiosueArrayType.Int, elements, null, null, 0, elements.Length)
+        {
+
+        }
+
+        public GiosueArray(double[] elements) : this(GiosueArrayType.Double, null, elements, null, 0, elements.Length)
+        {
+
+        }
+
+        public GiosueArray(GiosueValue[] elements) : this(GiosueArrayType.Value, null, null, elements, 0, elements.Length)
+        {
+
+        }
+
+        /// <summary>
+        /// The elements of an array of ints.
+        /// </summary>
+        internal Span<int> IntSpan => Ints.AsSpan(Start, Length);
+
+        /// <summary>
+        /// The elements of an array of doubles.
+        /// </summary>
+        internal Span<double> DoubleSpan => Doubles.AsSpan(Start, Length);
+
+        /// <summary>
+        /// The elements of an array of values.
+        /// </summary>
+        internal Span<GiosueValue> ValueSpan => Values.AsSpan(Start, Length);
+
+        /// <summary>
+        /// Gets or sets an element.
+        /// </summary>
+        /// <param name="index">The index of the element.</param>
+        /// <returns>The element.</returns>
+        /// <exception cref="InterpreterException">Thrown if <paramref name="index"/> is out of range or the value doesn't fit in the array.</exception>
+        public GiosueValue this[int index]
+        {
+            get
+            {
+                CheckIndex(index);
+                return ElementType switch
+                {
+                    GiosueArrayType.Int => new GiosueValue(Ints[Start + index]),
+                    GiosueArrayType.Double => new GiosueValue(Doubles[Start + index]),
+                    _ => Values[Start + index],
+                };
+            }
+            set
+            {
+                CheckIndex(index);
+                switch (ElementType)
+                {
+                    case GiosueArrayType.Int when value.IsInt:
+                        Ints[Start + index] = value.AsInt;
+                        break;
+                    case GiosueArrayType.Double when value.IsDouble:
+                        Doubles[Start + index] = value.AsDouble;
+                        break;
+                    case GiosueArrayType.Value:
+                        Values[Start + index] = value;
+                        break;
+                    default:
+                        // That value can't be put in this array.
+                        throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Non è possibile mettere un valore di tipo {value.ClrType?.Name ?? "niente"} in quell'array.");
+                }
+            }
+        }
+
+        /// <summary>
+        /// Gets a view of part of the array.
+        /// </summary>
+        /// <param name="start">The index of the first element of the slice.</param>
+        /// <param name="end">The index after the last element of the slice.</param>
+        /// <returns>The slice, which shares its elements with this array.</returns>
+        /// <exception cref="InterpreterException">Thrown if the range is not in the array.</exception>
+        public GiosueArray Slice(int start, int end)
+        {
+            if (start < 0 || end > Length || start > end)
+            {
+                // The slice is outside the array.
+                throw new InterpreterException(InterpreterExceptionType.IndexOutOfRange, $"La fetta da {start} a {end} è fuori dall'array di lunghezza {Length}.");
+            }
+
+            return new GiosueArray(ElementType, Ints, Doubles, Values, Start + start, end - start);
+        }
+
+        private void CheckIndex(int index)
+        {
+            if ((uint)index >= (uint)Length)
+            {
+                // The index is outside the array.
+                throw new InterpreterException(InterpreterExceptionType.IndexOutOfRange, $"L'indice {index} è fuori dall'array di lunghezza {Length}.");
+            }
+        }
+
+        public override string ToString()
+        {
+            var sb = new StringBuilder("[");
+            for (int i = 0; i < Length; i++)
+            {
+                if (i > 0)
+                {
+                    sb.Append(", ");
+                }
+                sb.Append(this[i].ToString());
+            }
+            return sb.Append(']').ToString();
+        }
+
+        #region Arguments
+
+        /// <summary>
+        /// Gets the array passed to a builtin.
+        /// </summary>
+        /// <param name="argument">The argument.</param>
+        /// <returns>The array.</returns>
+        /// <exception cref="InterpreterException">Thrown if <paramref name="argument"/> is not an array.</exception>
+        internal static GiosueArray FromArgument(GiosueValue argument)
+        {
+            if (argument.TryGetObject<GiosueArray>(out var array))
+            {
+                return array;
+            }
+
+            // An array is expected.
+            throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Un array è atteso, non un valore di tipo {argument.ClrType?.Name ?? "niente"}.");
+        }
+
+        /// <summary>
+        /// Gets an index or length passed to a builtin.
+        /// </summary>
+        /// <param name="argument">The argument.</param>
+        /// <returns>The index or length.</returns>
+        /// <exception cref="InterpreterException">Thrown if <paramref name="argument"/> is not an int.</exception>
+        internal static int IndexFromArgument(GiosueValue argument)
+        {
+            if (argument.IsInt)
+            {
+                return argument.AsInt;
+            }
+
+            // An index must be an integer.
+            throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Un indice deve essere un intero, non un valore di tipo {argument.ClrType?.Name ?? "niente"}.");
+        }
+
+        /// <summary>
+        /// Gets the length of a new array passed to a builtin.
+        /// </summary>
+        /// <param name="argument">The argument.</param>
+        /// <returns>The length.</returns>
+        /// <exception cref="InterpreterException">Thrown if <paramref name="argument"/> is not a non-negative int.</exception>
+        internal static int LengthFromArgument(GiosueValue argument)
+        {
+            var length = IndexFromArgument(argument);
+            if (length < 0)
+            {
+                // The length of an array cannot be negative.
+                throw new InterpreterException(InterpreterExceptionType.IndexOutOfRange, $"La lunghezza di un array non può essere negativa ({length}).");
+            }
+            return length;
+        }
+
+        #endregion Arguments
+    }
+}
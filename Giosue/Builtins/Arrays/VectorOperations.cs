@@ -0,0 +1,274 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Numerics;
+using System.Runtime.InteropServices;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace Giosue.Builtins.Arrays
+{
+    // Design comments:
+    // Each operation runs over whole `Vector<T>`s first and then over the elements that are
+    // left. `Vector<T>.Count` depends on the machine, so a sum of doubles can round
+    // differently on different machines; ints wrap around on overflow, like `+` does.
+    // A minimum or maximum of doubles is NaN if any element is NaN, like `Math.Min` and
+    // `Math.Max`.
+    /// <summary>
+    /// The bulk operations on the storage of a <see cref="GiosueArray"/>, using SIMD instructions where the machine has them.
+    /// </summary>
+    internal static class VectorOperations
+    {
+        #region Reductions
+
+        public static int Sum(ReadOnlySpan<int> values)
+        {
+            var vectors = MemoryMarshal.Cast<int, Vector<int>>(values);
+            var total = Vector<int>.Zero;
+            foreach (var vector in vectors)
+            {
+                total += vector;
+            }
+
+            var sum = 0;
+            for (int i = 0; i < Vector<int>.Count; i++)
+            {
+                sum += total[i];
+            }
+            for (int i = vectors.Length * Vector<int>.Count; i < values.Length; i++)
+            {
+                sum += values[i];
+            }
+            return sum;
+        }
+
+        public static double Sum(ReadOnlySpan<double> values)
+        {
+            var vectors = MemoryMarshal.Cast<double, Vector<double>>(values);
+            var total = Vector<double>.Zero;
+            foreach (var vector in vectors)
+            {
+                total += vector;
+            }
+
+            var sum = 0.0;
+            for (int i = 0; i < Vector<double>.Count; i++)
+            {
+                sum += total[i];
+            }
+            for (int i = vectors.Length * Vector<double>.Count; i < values.Length; i++)
+            {
+                sum += values[i];
+            }
+            return sum;
+        }
+
+        /// <summary>
+        /// Finds the smallest element.
+        /// </summary>
+        /// <param name="values">The elements; there must be at least one.</param>
+        /// <returns>The smallest element.</returns>
+        public static int Min(ReadOnlySpan<int> values)
+        {
+            var vectors = MemoryMarshal.Cast<int, Vector<int>>(values);
+            var min = values[0];
+            if (vectors.Length > 0)
+            {
+                var minimums = vectors[0];
+                foreach (var vector in vectors[1..])
+                {
+                    minimums = Vector.Min(minimums, vector);
+                }
+                for (int i = 0; i < Vector<int>.Count; i++)
+                {
+                    min = Math.Min(min, minimums[i]);
+                }
+            }
+            for (int i = vectors.Length * Vector<int>.Count; i < values.Length; i++)
+            {
+                min = Math.Min(min, values[i]);
+            }
+            return min;
+        }
+
+        /// <summary>
+        /// Finds the largest element.
+        /// </summary>
+        /// <param name="values">The elements; there must be at least one.</param>
+        /// <returns>The largest element.</returns>
+        public static int Max(ReadOnlySpan<int> values)
+        {
+            var vectors = MemoryMarshal.Cast<int, Vector<int>>(values);
+            var max = values[0];
+            if (vectors.Length > 0)
+            {
+                var maximums = vectors[0];
+                foreach (var vector in vectors[1..])
+                {
+                    maximums = Vector.Max(maximums, vector);
+                }
+                for (int i = 0; i < Vector<int>.Count; i++)
+                {
+                    max = Math.Max(max, maximums[i]);
+                }
+            }
+            for (int i = vectors.Length * Vector<int>.Count; i < values.Length; i++)
+            {
+                max = Math.Max(max, values[i]);
+            }
+            return max;
+        }
+
+        /// <summary>
+        /// Finds the smallest element.
+        /// </summary>
+        /// <param name="values">The elements; there must be at least one.</param>
+        /// <returns>The smallest element, or NaN if any element is NaN.</returns>
+        public static double Min(ReadOnlySpan<double> values)
+        {
+            var vectors = MemoryMarshal.Cast<double, Vector<double>>(values);
+            var min = values[0];
+            if (vectors.Length > 0)
+            {
+                var minimums = vectors[0];
+
+                // An element is NaN if it isn't equal to itself.
+                var nans = Vector<long>.Zero;
+                foreach (var vector in vectors)
+                {
+                    minimums = Vector.Min(minimums, vector);
+                    nans |= Vector.OnesComplement(Vector.Equals(vector, vector));
+                }
+                if (nans != Vector<long>.Zero)
+                {
+                    return double.NaN;
+                }
+                for (int i = 0; i < Vector<double>.Count; i++)
+                {
+                    min = Math.Min(min, minimums[i]);
+                }
+            }
+            for (int i = vectors.Length * Vector<double>.Count; i < values.Length; i++)
+            {
+                min = Math.Min(min, values[i]);
+            }
+            return min;
+        }
+
+        /// <summary>
+        /// Finds the largest element.
+        /// </summary>
+        /// <param name="values">The elements; there must be at least one.</param>
+        /// <returns>The largest element, or NaN if any element is NaN.</returns>
+        public static double Max(ReadOnlySpan<double> values)
+        {
+            var vectors = MemoryMarshal.Cast<double, Vector<double>>(values);
+            var max = values[0];
+            if (vectors.Length > 0)
+            {
+                var maximums = vectors[0];
+                var nans = Vector<long>.Zero;
+                foreach (var vector in vectors)
+                {
+                    maximums = Vector.Max(maximums, vector);
+                    nans |= Vector.OnesComplement(Vector.Equals(vector, vector));
+                }
+                if (nans != Vector<long>.Zero)
+                {
+                    return double.NaN;
+                }
+                for (int i = 0; i < Vector<double>.Count; i++)
+                {
+                    max = Math.Max(max, maximums[i]);
+                }
+            }
+            for (int i = vectors.Length * Vector<double>.Count; i < values.Length; i++)
+            {
+                max = Math.Max(max, values[i]);
+            }
+            return max;
+        }
+
+        #endregion Reductions
+
+        #region Element-wise operations
+
+        public static void Scale(ReadOnlySpan<int> values, int factor, Span<int> result)
+        {
+            var vectors = MemoryMarshal.Cast<int, Vector<int>>(values);
+            var resultVectors = MemoryMarshal.Cast<int, Vector<int>>(result);
+            for (int i = 0; i < vectors.Length; i++)
+            {
+                resultVectors[i] = vectors[i] * factor;
+            }
+            for (int i = vectors.Length * Vector<int>.Count; i < values.Length; i++)
+            {
+                result[i] = values[i] * factor;
+            }
+        }
+
+        public static void Scale(ReadOnlySpan<double> values, double factor, Span<double> result)
+        {
+            var vectors = MemoryMarshal.Cast<double, Vector<double>>(values);
+            var resultVectors = MemoryMarshal.Cast<double, Vector<double>>(result);
+            for (int i = 0; i < vectors.Length; i++)
+            {
+                resultVectors[i] = vectors[i] * factor;
+            }
+            for (int i = vectors.Length * Vector<double>.Count; i < values.Length; i++)
+            {
+                result[i] = values[i] * factor;
+            }
+        }
+
+        public static void Add(ReadOnlySpan<int> left, ReadOnlySpan<int> right, Span<int> result)
+        {
+            var leftVectors = MemoryMarshal.Cast<int, Vector<int>>(left);
+            var rightVectors = MemoryMarshal.Cast<int, Vector<int>>(right);
+            var resultVectors = MemoryMarshal.Cast<int, Vector<int>>(result);
+            for (int i = 0; i < leftVectors.Length; i++)
+            {
+                resultVectors[i] = leftVectors[i] + rightVectors[i];
+            }
+            for (int i = leftVectors.Length * Vector<int>.Count; i < left.Length; i++)
+            {
+                result[i] = left[i] + right[i];
+            }
+        }
+
+        public static void Add(ReadOnlySpan<double> left, ReadOnlySpan<double> right, Span<double> result)
+        {
+            var leftVectors = MemoryMarshal.Cast<double, Vector<double>>(left);
+            var rightVectors = MemoryMarshal.Cast<double, Vector<double>>(right);
+            var resultVectors = MemoryMarshal.Cast<double, Vector<double>>(result);
+            for (int i = 0; i < leftVectors.Length; i++)
+            {
+                resultVectors[i] = leftVectors[i] + rightVectors[i];
+            }
+            for (int i = leftVectors.Length * Vector<double>.Count; i < left.Length; i++)
+            {
+                result[i] = left[i] + right[i];
+            }
+        }
+
+        #endregion Element-wise operations
+    }
+}
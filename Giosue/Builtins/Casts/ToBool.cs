@@ -30,9 +30,9 @@ namespace Giosue.Builtins.Casts
 
         public int Arity => 1;
 
-        public object Call(Interpreter interpreter, List<object> arguments)
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
         {
-            return (bool)arguments[0];
+            return arguments[0].AsBool;
         }
     }
 }
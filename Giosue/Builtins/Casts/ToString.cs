@@ -30,7 +30,7 @@ namespace Giosue.Builtins.Casts
 
         public int Arity => 1;
 
-        public object Call(Interpreter interpreter, List<object> arguments)
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
         {
             return arguments[0].ToString();
         }
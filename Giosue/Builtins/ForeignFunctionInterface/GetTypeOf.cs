@@ -30,9 +30,9 @@ namespace Giosue.Builtins.ForeignFunctionInterface
 
         public int Arity => 1;
 
-        public object Call(Interpreter interpreter, List<object> arguments)
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
         {
-            return arguments[0]?.GetType() ?? null;
+            return GiosueValue.FromObject(arguments[0].ClrType);
         }
     }
 }
@@ -18,6 +18,7 @@
 
 using System;
 using System.Collections.Generic;
+using System.IO;
 using System.Linq;
 using System.Text;
 using System.Threading.Tasks;
@@ -35,11 +36,38 @@ namespace Giosue.Builtins.ForeignFunctionInterface
 
         }
 
-        public object Call(Interpreter interpreter, List<object> arguments)
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
         {
             // TODO: Throw exception if invalid arguments
-            Console.Write(arguments[0]);
-            return null;
+            WriteValue(interpreter.Output, arguments[0]);
+            return GiosueValue.Nil;
+        }
+
+        /// <summary>
+        /// Writes a value the way <c>Scrive</c> prints it.
+        /// </summary>
+        /// <remarks>
+        /// Numbers and booleans are written without boxing them, so a <see cref="IO.BufferedOutput"/> can format them without allocating.
+        /// </remarks>
+        /// <param name="output">The writer to write to.</param>
+        /// <param name="value">The value to write.</param>
+        internal static void WriteValue(TextWriter output, GiosueValue value)
+        {
+            switch (value.Type)
+            {
+                case GiosueValueType.Int:
+                    output.Write(value.AsInt);
+                    break;
+                case GiosueValueType.Double:
+                    output.Write(value.AsDouble);
+                    break;
+                case GiosueValueType.Bool:
+                    output.Write(value.AsBool);
+                    break;
+                default:
+                    output.Write(value.ToObject());
+                    break;
+            }
         }
     }
 }
@@ -35,10 +35,11 @@ namespace Giosue.Builtins.ForeignFunctionInterface
 
         }
 
-        public object Call(Interpreter interpreter, List<object> arguments)
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
         {
-            Console.WriteLine(arguments[0]);
-            return null;
+            Print.WriteValue(interpreter.Output, arguments[0]);
+            interpreter.Output.WriteLine();
+            return GiosueValue.Nil;
         }
     }
 }
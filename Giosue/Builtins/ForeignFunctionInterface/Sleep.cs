@@ -0,0 +1,60 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue.Builtins.ForeignFunctionInterface
+{
+    class Sleep : IGiosueCallable
+    {
+        public const string Name = "Dormi";
+
+        /// <summary>
+        /// The longest sleep, which is the most that <see cref="System.Threading.Thread.Sleep(TimeSpan)"/> and <see cref="Task.Delay(TimeSpan)"/> take.
+        /// </summary>
+        private const int MaximumMilliseconds = int.MaxValue;
+
+        public int Arity => 1;
+
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
+        {
+            var milliseconds = arguments[0];
+            if (!milliseconds.IsInt && !milliseconds.IsDouble)
+            {
+                // The number of milliseconds must be a number.
+                throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Il numero di millisecondi deve essere un numero, non un valore di tipo {milliseconds.ClrType?.Name ?? "niente"}.");
+            }
+
+            var value = milliseconds.IsInt ? milliseconds.AsInt : milliseconds.AsDouble;
+            if (double.IsNaN(value) || value > MaximumMilliseconds)
+            {
+                // The number of milliseconds must be a number no greater than {MaximumMilliseconds}.
+                throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Il numero di millisecondi deve essere un numero non più grande di {MaximumMilliseconds}, non {value}.");
+            }
+
+            // A negative sleep doesn't pause at all. On a scheduler this suspends the script instead of blocking the thread.
+            interpreter.Suspend(value > 0 ? TimeSpan.FromMilliseconds(value) : TimeSpan.Zero);
+            return GiosueValue.Nil;
+        }
+    }
+}
@@ -37,11 +37,11 @@ namespace Giosue.Builtins.ForeignFunctionInterface
 
         }
 
-        public object Call(Interpreter interpreter, List<object> arguments)
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
         {
             unchecked
             {
-                return (double)(DateTime.Now - UnixEpoch).TotalMilliseconds;
+                return (double)(DateTime.UtcNow - UnixEpoch).TotalMilliseconds;
             }
         }
     }
@@ -0,0 +1,78 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Text;
+
+namespace Giosue.Bytecode
+{
+    /// <summary>
+    /// Represents a Giosue function that has been compiled to bytecode.
+    /// </summary>
+    public class BytecodeFunction : IGiosueCallable
+    {
+        /// <summary>
+        /// The name given to the top level of a script.
+        /// </summary>
+        public const string ScriptName = "<script>";
+
+        /// <summary>
+        /// The name of the function.
+        /// </summary>
+        public string Name { get; }
+
+        /// <inheritdoc/>
+        public int Arity { get; }
+
+        /// <summary>
+        /// The compiled body of the function.
+        /// </summary>
+        public Chunk Chunk { get; } = new();
+
+        /// <summary>
+        /// Creates a new <see cref="BytecodeFunction"/>.
+        /// </summary>
+        /// <param name="name">The name of the function.</param>
+        /// <param name="arity">The number of parameters of the function.</param>
+        public BytecodeFunction(string name, int arity)
+        {
+            Name = name;
+            Arity = arity;
+        }
+
+        /// <summary>
+        /// Calls the function from outside of a <see cref="VirtualMachine"/>, such as from a builtin.
+        /// </summary>
+        /// <param name="interpreter">The interpreter whose globals the function uses.</param>
+        /// <param name="arguments">The arguments to the function.</param>
+        /// <returns>The return value of the function.</returns>
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
+        {
+            return new VirtualMachine(interpreter).Invoke(this, arguments);
+        }
+
+        /// <remarks>
+        /// Compiled functions print like the functions of the tree-walking interpreter, so scripts can't tell which engine runs them.
+        /// </remarks>
+        public override string ToString()
+        {
+            return typeof(GiosueFunction).ToString();
+        }
+    }
+}
@@ -0,0 +1,182 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Text;
+
+namespace Giosue.Bytecode
+{
+    // Design comments:
+    // A chunk is a flat array of bytes. Each instruction is one `OpCode` byte
+    // followed by its operands. Constants (numbers, strings, names of globals and
+    // functions) live in a separate pool and are referred to by index.
+    // The source line of every byte is kept in a parallel array for the disassembler
+    // and for error messages. So are the names of the local variables that instructions
+    // assign, since those only refer to their variables by slot.
+    /// <summary>
+    /// Represents a sequence of bytecode instructions and the constants they use.
+    /// </summary>
+    public class Chunk
+    {
+        private const int InitialCapacity = 16;
+
+        /// <summary>
+        /// The instructions and their operands.
+        /// </summary>
+        /// <remarks>
+        /// Only the first <see cref="Count"/> bytes are used.
+        /// </remarks>
+        public byte[] Code { get; private set; } = new byte[InitialCapacity];
+
+        /// <summary>
+        /// The source line of every byte in <see cref="Code"/>.
+        /// </summary>
+        public int[] Lines { get; private set; } = new int[InitialCapacity];
+
+        /// <summary>
+        /// The number of bytes used in <see cref="Code"/>.
+        /// </summary>
+        public int Count { get; private set; } = 0;
+
+        /// <summary>
+        /// The constant pool.
+        /// </summary>
+        public List<GiosueValue> Constants { get; } = new();
+
+        /// <summary>
+        /// The index of every constant in <see cref="Constants"/>, used to avoid duplicate constants.
+        /// </summary>
+        private Dictionary<GiosueValue, int> ConstantIndices { get; } = new();
+
+        /// <summary>
+        /// The symbols of the local variables assigned by instructions, by the offset of the instruction.
+        /// </summary>
+        /// <remarks>
+        /// Locals are only referred to by slot, so this is only used to name a variable in an error message.
+        /// </remarks>
+        private Dictionary<int, int> AssignedLocals { get; } = new();
+
+        /// <summary>
+        /// Appends a byte to the chunk.
+        /// </summary>
+        /// <param name="b">The byte to append.</param>
+        /// <param name="line">The source line the byte came from.</param>
+        public void Write(byte b, int line)
+        {
+            if (Count == Code.Length)
+            {
+                var newCapacity = Code.Length * 2;
+                var code = Code;
+                var lines = Lines;
+                Array.Resize(ref code, newCapacity);
+                Array.Resize(ref lines, newCapacity);
+                Code = code;
+                Lines = lines;
+            }
+
+            Code[Count] = b;
+            Lines[Count] = line;
+            Count++;
+        }
+
+        /// <summary>
+        /// Appends an opcode to the chunk.
+        /// </summary>
+        /// <param name="opCode">The opcode to append.</param>
+        /// <param name="line">The source line the opcode came from.</param>
+        public void Write(OpCode opCode, int line)
+        {
+            Write((byte)opCode, line);
+        }
+
+        /// <summary>
+        /// Appends a 16-bit operand to the chunk.
+        /// </summary>
+        /// <param name="operand">The operand to append.</param>
+        /// <param name="line">The source line the operand came from.</param>
+        public void WriteShort(ushort operand, int line)
+        {
+            Write((byte)(operand >> 8), line);
+            Write((byte)(operand & 0xff), line);
+        }
+
+        /// <summary>
+        /// Reads a 16-bit operand.
+        /// </summary>
+        /// <param name="offset">The offset of the operand.</param>
+        /// <returns>The operand.</returns>
+        public ushort ReadShort(int offset)
+        {
+            return (ushort)((Code[offset] << 8) | Code[offset + 1]);
+        }
+
+        /// <summary>
+        /// Overwrites a 16-bit operand that was already written.
+        /// </summary>
+        /// <param name="offset">The offset of the operand.</param>
+        /// <param name="operand">The new value of the operand.</param>
+        public void PatchShort(int offset, ushort operand)
+        {
+            Code[offset] = (byte)(operand >> 8);
+            Code[offset + 1] = (byte)(operand & 0xff);
+        }
+
+        /// <summary>
+        /// Records the name of the local variable assigned by the next instruction.
+        /// </summary>
+        /// <param name="symbol">The symbol of the name of the variable.</param>
+        public void NameNextLocal(int symbol)
+        {
+            AssignedLocals[Count] = symbol;
+        }
+
+        /// <summary>
+        /// Gets the name of the local variable assigned by an instruction.
+        /// </summary>
+        /// <param name="offset">The offset of the instruction.</param>
+        /// <returns>The name of the variable, or null if the instruction doesn't assign a local variable.</returns>
+        public string LocalNameAt(int offset)
+        {
+            return AssignedLocals.TryGetValue(offset, out var symbol) ? SymbolTable.NameOf(symbol) : null;
+        }
+
+        /// <summary>
+        /// Adds a constant to the constant pool.
+        /// </summary>
+        /// <remarks>
+        /// Constants that are equal to a constant already in the pool reuse its index.
+        /// </remarks>
+        /// <param name="value">The constant to add.</param>
+        /// <returns>The index of the constant.</returns>
+        public int AddConstant(GiosueValue value)
+        {
+            // Equals on the values also compares their types,
+            // so 1 and 1.0 are kept as separate constants.
+            if (ConstantIndices.TryGetValue(value, out var index))
+            {
+                return index;
+            }
+
+            Constants.Add(value);
+            index = Constants.Count - 1;
+            ConstantIndices[value] = index;
+            return index;
+        }
+    }
+}
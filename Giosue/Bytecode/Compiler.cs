@@ -0,0 +1,579 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue.Bytecode
+{
+    // Design comments:
+    // The compiler lowers the statement and expression trees to bytecode for the
+    // `VirtualMachine`. It follows the same scoping rules as the `Resolver`: anything
+    // declared outside of all blocks and functions is a global and is looked up by name,
+    // everything else is a local that lives in a slot on the virtual machine's stack.
+    // Functions cannot use the locals of the function (or top-level block) they were
+    // declared in; the compiler throws a `CompilerException` for that, and the caller
+    // can fall back to the tree-walking `Interpreter`. That includes a local declared after
+    // the function, which the compiler hasn't seen yet but the `Resolver` has bound.
+    /// <summary>
+    /// Compiles statements to bytecode.
+    /// </summary>
+    public class Compiler : AST.IVisitor<object>, Statements.IVisitor<object>
+    {
+        /// <summary>
+        /// A local variable known at compile time.
+        /// </summary>
+        private class Local
+        {
+            public int Symbol { get; }
+            public int ScopeDepth { get; }
+
+            public Local(int symbol, int scopeDepth)
+            {
+                Symbol = symbol;
+                ScopeDepth = scopeDepth;
+            }
+        }
+
+        /// <summary>
+        /// The state of the function that is currently being compiled.
+        /// </summary>
+        private class FunctionState
+        {
+            public FunctionState Enclosing { get; }
+            public BytecodeFunction Function { get; }
+            public List<Local> Locals { get; } = new();
+            public int ScopeDepth { get; set; } = 0;
+
+            public FunctionState(FunctionState enclosing, BytecodeFunction function)
+            {
+                Enclosing = enclosing;
+                Function = function;
+            }
+        }
+
+        private const int MaxArguments = byte.MaxValue;
+        private const int MaxShortOperand = ushort.MaxValue;
+
+        private FunctionState Current = null;
+
+        /// <summary>
+        /// The line of the most recently seen token, used to tag the emitted bytes.
+        /// </summary>
+        private int Line = 0;
+
+        private Chunk CurrentChunk => Current.Function.Chunk;
+
+        /// <summary>
+        /// Compiles a list of statements to a function that runs them.
+        /// </summary>
+        /// <param name="statements">The statements to compile.</param>
+        /// <returns>The compiled script.</returns>
+        /// <exception cref="CompilerException">Thrown if the statements cannot be compiled to bytecode.</exception>
+        public BytecodeFunction Compile(List<Statements.Statement> statements)
+        {
+            Current = new FunctionState(null, new BytecodeFunction(BytecodeFunction.ScriptName, 0));
+            Line = 0;
+
+            statements.ForEach(CompileStatement);
+            Emit(OpCode.Nil);
+            Emit(OpCode.Return);
+
+            var script = Current.Function;
+            Current = null;
+            return script;
+        }
+
+        private void CompileStatement(Statements.Statement statement)
+        {
+            if (statement == null)
+            {
+                throw new InterpreterException(InterpreterExceptionType.Unknown, "The given statement is null.");
+            }
+            statement.Accept(this);
+        }
+
+        private void CompileExpression(AST.Expression expression)
+        {
+            if (expression == null)
+            {
+                throw new InterpreterException(InterpreterExceptionType.Unknown, "The given expression is null.");
+            }
+            expression.Accept(this);
+        }
+
+        #region Emitting bytecode
+
+        private void Emit(OpCode opCode)
+        {
+            CurrentChunk.Write(opCode, Line);
+        }
+
+        private void Emit(OpCode opCode, int operand)
+        {
+            if (operand > MaxShortOperand)
+            {
+                throw new CompilerException(CompilerExceptionType.Unknown, Line, $"Operand {operand} for {opCode} does not fit in 16 bits.");
+            }
+
+            CurrentChunk.Write(opCode, Line);
+            CurrentChunk.WriteShort((ushort)operand, Line);
+        }
+
+        private void EmitConstant(GiosueValue value)
+        {
+            Emit(OpCode.Constant, MakeConstant(value));
+        }
+
+        private int MakeConstant(GiosueValue value)
+        {
+            var index = CurrentChunk.AddConstant(value);
+            if (index > MaxShortOperand)
+            {
+                // Too many constants in one function.
+                throw new CompilerException(CompilerExceptionType.TooManyConstants, Line, "Troppe costanti in una funzione.");
+            }
+            return index;
+        }
+
+        /// <summary>
+        /// Emits a forward jump whose offset is filled in later by <see cref="PatchJump(int)"/>.
+        /// </summary>
+        /// <param name="opCode">The jump instruction.</param>
+        /// <returns>The offset of the jump's operand.</returns>
+        private int EmitJump(OpCode opCode)
+        {
+            Emit(opCode, MaxShortOperand);
+            return CurrentChunk.Count - 2;
+        }
+
+        private void PatchJump(int operandOffset)
+        {
+            // -2 to account for the operand itself.
+            var jump = CurrentChunk.Count - operandOffset - 2;
+            if (jump > MaxShortOperand)
+            {
+                // Too much code to jump over.
+                throw new CompilerException(CompilerExceptionType.JumpTooLarge, Line, "Troppo codice da saltare.");
+            }
+            CurrentChunk.PatchShort(operandOffset, (ushort)jump);
+        }
+
+        private void EmitLoop(int loopStart)
+        {
+            // +3 to account for the Loop instruction and its operand.
+            var offset = CurrentChunk.Count - loopStart + 3;
+            if (offset > MaxShortOperand)
+            {
+                // The body of the loop is too large.
+                throw new CompilerException(CompilerExceptionType.JumpTooLarge, Line, "Il corpo del ciclo è troppo grande.");
+            }
+            Emit(OpCode.Loop, offset);
+        }
+
+        #endregion Emitting bytecode
+
+        #region Scopes and variables
+
+        private void BeginScope()
+        {
+            Current.ScopeDepth++;
+        }
+
+        private void EndScope()
+        {
+            Current.ScopeDepth--;
+
+            var locals = Current.Locals;
+            while (locals.Count > 0 && locals[^1].ScopeDepth > Current.ScopeDepth)
+            {
+                Emit(OpCode.Pop);
+                locals.RemoveAt(locals.Count - 1);
+            }
+        }
+
+        /// <summary>
+        /// Finds the slot of a local variable in the function that is being compiled.
+        /// </summary>
+        /// <param name="state">The function to search.</param>
+        /// <param name="symbol">The symbol of the name of the variable.</param>
+        /// <returns>The slot of the variable, or -1 if there is no such local.</returns>
+        private static int ResolveLocal(FunctionState state, int symbol)
+        {
+            for (int i = state.Locals.Count - 1; i >= 0; i--)
+            {
+                if (state.Locals[i].Symbol == symbol)
+                {
+                    return i;
+                }
+            }
+            return -1;
+        }
+
+        /// <summary>
+        /// Finds the slot of a variable, or -1 if the variable is a global.
+        /// </summary>
+        /// <param name="name">The name of the variable.</param>
+        /// <param name="depth">The depth that the <see cref="Resolver"/> gave the variable, or -1 if it wasn't resolved.</param>
+        /// <returns>The slot of the variable, or -1 if the variable is a global.</returns>
+        private int ResolveVariable(Token name, int depth)
+        {
+            var slot = ResolveLocal(Current, name.Symbol);
+            if (slot >= 0)
+            {
+                return slot;
+            }
+
+            for (var enclosing = Current.Enclosing; enclosing != null; enclosing = enclosing.Enclosing)
+            {
+                if (ResolveLocal(enclosing, name.Symbol) >= 0)
+                {
+                    // The variable '{name}' belongs to an enclosing function and cannot be captured.
+                    throw new CompilerException(CompilerExceptionType.CapturedLocalVariable, name.Line, $"La variabile '{name.Lexeme}' appartiene a una funzione esterna e non può essere catturata.");
+                }
+            }
+
+            if (depth >= 0)
+            {
+                // The resolver found a local that an enclosing function declares later.
+                // The variable '{name}' belongs to an enclosing function and cannot be captured.
+                throw new CompilerException(CompilerExceptionType.CapturedLocalVariable, name.Line, $"La variabile '{name.Lexeme}' appartiene a una funzione esterna e non può essere catturata.");
+            }
+            return -1;
+        }
+
+        /// <summary>
+        /// Defines a variable whose value is on top of the stack.
+        /// </summary>
+        /// <param name="name">The name of the variable.</param>
+        private void DefineVariable(Token name)
+        {
+            if (Current.ScopeDepth == 0)
+            {
+                Emit(OpCode.DefineGlobal, MakeConstant(name.Symbol));
+                return;
+            }
+
+            if (Environment.IsReservedWord(name.Symbol))
+            {
+                // The name of the variable is reserved.
+                throw new EnvironmentException(EnvironmentExceptionType.VariableNameIsReservedKeyword, $"Il nome della variable '{name.Lexeme}' è reservato.");
+            }
+
+            // Declaring a variable twice in the same scope overwrites it.
+            var locals = Current.Locals;
+            for (int i = locals.Count - 1; i >= 0 && locals[i].ScopeDepth == Current.ScopeDepth; i--)
+            {
+                if (locals[i].Symbol == name.Symbol)
+                {
+                    Emit(OpCode.StoreLocal, i);
+                    return;
+                }
+            }
+
+            if (locals.Count > MaxShortOperand)
+            {
+                // Too many local variables in one function.
+                throw new CompilerException(CompilerExceptionType.TooManyLocalVariables, name.Line, "Troppe variabili locali in una funzione.");
+            }
+
+            // The value stays where it is on the stack; that is the variable's slot.
+            locals.Add(new Local(name.Symbol, Current.ScopeDepth));
+        }
+
+        #endregion Scopes and variables
+
+        #region AST visitors
+
+        object AST.IVisitor<object>.VisitAssignExpression(AST.Assign expression)
+        {
+            CompileExpression(expression.Value);
+            Line = expression.Name.Line;
+
+            var slot = ResolveVariable(expression.Name, expression.Depth);
+            if (slot >= 0)
+            {
+                CurrentChunk.NameNextLocal(expression.Name.Symbol);
+                Emit(OpCode.SetLocal, slot);
+            }
+            else
+            {
+                Emit(OpCode.SetGlobal, MakeConstant(expression.Name.Symbol));
+            }
+
+            // An assignment evaluates to niente.
+            Emit(OpCode.Nil);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitBinaryExpression(AST.Binary expression)
+        {
+            CompileExpression(expression.Left);
+            CompileExpression(expression.Right);
+            Line = expression.Operator.Line;
+
+            switch (expression.Operator.Type)
+            {
+                case TokenType.Plus: Emit(OpCode.Add); break;
+                case TokenType.Minus: Emit(OpCode.Subtract); break;
+                case TokenType.Star: Emit(OpCode.Multiply); break;
+                case TokenType.Slash: Emit(OpCode.Divide); break;
+                case TokenType.And: Emit(OpCode.BitwiseAnd); break;
+                case TokenType.Pipe: Emit(OpCode.BitwiseOr); break;
+                case TokenType.Caret: Emit(OpCode.BitwiseXor); break;
+                case TokenType.At: Emit(OpCode.Concatenate); break;
+                case TokenType.EqualEqual: Emit(OpCode.Equal); break;
+                case TokenType.BangEqual: Emit(OpCode.NotEqual); break;
+                case TokenType.Greater: Emit(OpCode.Greater); break;
+                case TokenType.GreaterEqual: Emit(OpCode.GreaterEqual); break;
+                case TokenType.Less: Emit(OpCode.Less); break;
+                case TokenType.LessEqual: Emit(OpCode.LessEqual); break;
+                default:
+                    throw new CompilerException(CompilerExceptionType.UnsupportedExpression, Line, $"Operator {expression.Operator.Type} is not supported.");
+            }
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitCallExpression(AST.Call expression)
+        {
+            CompileExpression(expression.Callee);
+            expression.Arguments.ForEach(CompileExpression);
+            Line = expression.Paren.Line;
+
+            if (expression.Arguments.Count > MaxArguments)
+            {
+                // Too many arguments.
+                throw new CompilerException(CompilerExceptionType.TooManyArguments, Line, "Troppi argomenti.");
+            }
+
+            Emit(OpCode.Call);
+            CurrentChunk.Write((byte)expression.Arguments.Count, Line);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitGetExpression(AST.Get expression)
+        {
+            throw new CompilerException(CompilerExceptionType.UnsupportedExpression, expression.Name.Line, $"{nameof(AST.Get)} is not supported.");
+        }
+
+        object AST.IVisitor<object>.VisitGroupingExpression(AST.Grouping expression)
+        {
+            CompileExpression(expression.Expression);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitLiteralExpression(AST.Literal expression)
+        {
+            switch (expression.Value)
+            {
+                case null: Emit(OpCode.Nil); break;
+                case true: Emit(OpCode.True); break;
+                case false: Emit(OpCode.False); break;
+                default: EmitConstant(GiosueValue.FromObject(expression.Value)); break;
+            }
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitLogicalExpression(AST.Logical expression)
+        {
+            // Logical operators don't short-circuit, so both sides are always evaluated.
+            CompileExpression(expression.Left);
+            CompileExpression(expression.Right);
+            Line = expression.Operator.Line;
+
+            switch (expression.Operator.Type)
+            {
+                case TokenType.AndAnd: Emit(OpCode.LogicalAnd); break;
+                case TokenType.PipePipe: Emit(OpCode.LogicalOr); break;
+                case TokenType.CaretCaret: Emit(OpCode.LogicalXor); break;
+                default:
+                    throw new CompilerException(CompilerExceptionType.UnsupportedExpression, Line, $"Operator {expression.Operator.Type} is not supported.");
+            }
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitSetExpression(AST.Set expression)
+        {
+            throw new CompilerException(CompilerExceptionType.UnsupportedExpression, expression.Name.Line, $"{nameof(AST.Set)} is not supported.");
+        }
+
+        object AST.IVisitor<object>.VisitSuperExpression(AST.Super expression)
+        {
+            throw new CompilerException(CompilerExceptionType.UnsupportedExpression, expression.Keyword.Line, $"{nameof(AST.Super)} is not supported.");
+        }
+
+        object AST.IVisitor<object>.VisitThisExpression(AST.This expression)
+        {
+            throw new CompilerException(CompilerExceptionType.UnsupportedExpression, expression.Keyword.Line, $"{nameof(AST.This)} is not supported.");
+        }
+
+        object AST.IVisitor<object>.VisitUnaryExpression(AST.Unary expression)
+        {
+            CompileExpression(expression.Right);
+            Line = expression.Operator.Line;
+
+            switch (expression.Operator.Type)
+            {
+                case TokenType.Minus: Emit(OpCode.Negate); break;
+                case TokenType.Bang: Emit(OpCode.Not); break;
+                default:
+                    // Any other unary operator evaluates to niente.
+                    Emit(OpCode.Pop);
+                    Emit(OpCode.Nil);
+                    break;
+            }
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitVariableExpression(AST.Variable expression)
+        {
+            Line = expression.Name.Line;
+
+            var slot = ResolveVariable(expression.Name, expression.Depth);
+            if (slot >= 0)
+            {
+                Emit(OpCode.GetLocal, slot);
+            }
+            else
+            {
+                Emit(OpCode.GetGlobal, MakeConstant(expression.Name.Symbol));
+            }
+            return null;
+        }
+
+        #endregion AST visitors
+
+        #region Statement visitors
+
+        object Statements.IVisitor<object>.VisitExpressionStatement(Statements.Expression statement)
+        {
+            CompileExpression(statement.Expr);
+            Emit(OpCode.Pop);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitVarStatement(Statements.Var statement)
+        {
+            Line = statement.Name.Line;
+            if (statement.Initializer == null)
+            {
+                Emit(OpCode.Nil);
+            }
+            else
+            {
+                CompileExpression(statement.Initializer);
+            }
+
+            Line = statement.Name.Line;
+            DefineVariable(statement.Name);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitBlockStatement(Statements.Block statement)
+        {
+            BeginScope();
+            statement.Statements.ForEach(CompileStatement);
+            EndScope();
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitIfStatement(Statements.If statement)
+        {
+            CompileExpression(statement.Condition);
+
+            var thenJump = EmitJump(OpCode.JumpIfFalse);
+            CompileStatement(statement.ThenBranch);
+
+            if (statement.ElseBranch == null)
+            {
+                PatchJump(thenJump);
+                return null;
+            }
+
+            var elseJump = EmitJump(OpCode.Jump);
+            PatchJump(thenJump);
+            CompileStatement(statement.ElseBranch);
+            PatchJump(elseJump);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitWhileStatement(Statements.While statement)
+        {
+            if (statement.Condition == null)
+            {
+                // A boolean expression is expected after mentre.
+                throw new InterpreterException(InterpreterExceptionType.MentreWithoutCondition, "Un espressione booleana in atteso dopo mentre.");
+            }
+
+            var loopStart = CurrentChunk.Count;
+            CompileExpression(statement.Condition);
+
+            var exitJump = EmitJump(OpCode.JumpIfFalse);
+            CompileStatement(statement.Body);
+            EmitLoop(loopStart);
+
+            PatchJump(exitJump);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitReturnStatement(Statements.Return statement)
+        {
+            Line = statement.Keyword.Line;
+            if (statement.Value == null)
+            {
+                Emit(OpCode.Nil);
+            }
+            else
+            {
+                CompileExpression(statement.Value);
+            }
+            Emit(OpCode.Return);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitFunctionStatement(Statements.Function statement)
+        {
+            Line = statement.Name.Line;
+            var function = new BytecodeFunction(statement.Name.Lexeme, statement.Parameters.Count);
+
+            // Compile the body with its own state. The parameters and the body
+            // share one scope, like they do in the interpreter.
+            Current = new FunctionState(Current, function);
+            BeginScope();
+            foreach (var parameter in statement.Parameters)
+            {
+                Current.Locals.Add(new Local(parameter.Symbol, Current.ScopeDepth));
+            }
+            statement.Body.ForEach(CompileStatement);
+            Emit(OpCode.Nil);
+            Emit(OpCode.Return);
+            Current = Current.Enclosing;
+
+            Line = statement.Name.Line;
+            EmitConstant(GiosueValue.FromObject(function));
+            DefineVariable(statement.Name);
+            return null;
+        }
+
+        #endregion Statement visitors
+    }
+}
@@ -0,0 +1,233 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Text;
+
+namespace Giosue.Bytecode
+{
+    /// <summary>
+    /// Represents an instruction for the <see cref="VirtualMachine"/>.
+    /// </summary>
+    /// <remarks>
+    /// Operands follow the opcode in the code of a <see cref="Chunk"/>.
+    /// Unless noted otherwise, an operand is a 16-bit unsigned integer.
+    /// </remarks>
+    public enum OpCode : byte
+    {
+        #region Constants
+
+        /// <summary>
+        /// Pushes the constant at the index given by the operand.
+        /// </summary>
+        Constant,
+
+        /// <summary>
+        /// Pushes <c>niente</c>.
+        /// </summary>
+        Nil,
+
+        /// <summary>
+        /// Pushes <c>vero</c>.
+        /// </summary>
+        True,
+
+        /// <summary>
+        /// Pushes <c>falso</c>.
+        /// </summary>
+        False,
+
+        /// <summary>
+        /// Discards the value on top of the stack.
+        /// </summary>
+        Pop,
+
+        #endregion Constants
+
+        #region Variables
+
+        /// <summary>
+        /// Pushes the local variable in the slot given by the operand.
+        /// </summary>
+        GetLocal,
+
+        /// <summary>
+        /// Pops a value and assigns it to the existing local variable in the slot given by the operand.
+        /// </summary>
+        SetLocal,
+
+        /// <summary>
+        /// Pops a value and stores it in the slot given by the operand, overwriting the variable that was there.
+        /// </summary>
+        StoreLocal,
+
+        /// <summary>
+        /// Pushes the global variable whose name is the <see cref="SymbolTable"/> symbol in the constant given by the operand.
+        /// </summary>
+        GetGlobal,
+
+        /// <summary>
+        /// Pops a value and assigns it to the existing global variable whose name is the <see cref="SymbolTable"/> symbol in the constant given by the operand.
+        /// </summary>
+        SetGlobal,
+
+        /// <summary>
+        /// Pops a value and defines a global variable whose name is the <see cref="SymbolTable"/> symbol in the constant given by the operand.
+        /// </summary>
+        DefineGlobal,
+
+        #endregion Variables
+
+        #region Binary operators
+
+        /// <summary>
+        /// The operator <c>+</c>.
+        /// </summary>
+        Add,
+
+        /// <summary>
+        /// The operator <c>-</c>.
+        /// </summary>
+        Subtract,
+
+        /// <summary>
+        /// The operator <c>*</c>.
+        /// </summary>
+        Multiply,
+
+        /// <summary>
+        /// The operator <c>/</c>.
+        /// </summary>
+        Divide,
+
+        /// <summary>
+        /// The operator <c>&amp;</c>.
+        /// </summary>
+        BitwiseAnd,
+
+        /// <summary>
+        /// The operator <c>|</c>.
+        /// </summary>
+        BitwiseOr,
+
+        /// <summary>
+        /// The operator <c>^</c>.
+        /// </summary>
+        BitwiseXor,
+
+        /// <summary>
+        /// The operator <c>@</c>.
+        /// </summary>
+        Concatenate,
+
+        /// <summary>
+        /// The operator <c>==</c>.
+        /// </summary>
+        Equal,
+
+        /// <summary>
+        /// The operator <c>!=</c>.
+        /// </summary>
+        NotEqual,
+
+        /// <summary>
+        /// The operator <c>&gt;</c>.
+        /// </summary>
+        Greater,
+
+        /// <summary>
+        /// The operator <c>&gt;=</c>.
+        /// </summary>
+        GreaterEqual,
+
+        /// <summary>
+        /// The operator <c>&lt;</c>.
+        /// </summary>
+        Less,
+
+        /// <summary>
+        /// The operator <c>&lt;=</c>.
+        /// </summary>
+        LessEqual,
+
+        #endregion Binary operators
+
+        #region Logical operators
+
+        /// <summary>
+        /// The operator <c>&amp;&amp;</c>.
+        /// </summary>
+        LogicalAnd,
+
+        /// <summary>
+        /// The operator <c>||</c>.
+        /// </summary>
+        LogicalOr,
+
+        /// <summary>
+        /// The operator <c>^^</c>.
+        /// </summary>
+        LogicalXor,
+
+        #endregion Logical operators
+
+        #region Unary operators
+
+        /// <summary>
+        /// The operator <c>!</c>.
+        /// </summary>
+        Not,
+
+        /// <summary>
+        /// The unary operator <c>-</c>.
+        /// </summary>
+        Negate,
+
+        #endregion Unary operators
+
+        #region Control flow
+
+        /// <summary>
+        /// Jumps forward by the number of bytes given by the operand.
+        /// </summary>
+        Jump,
+
+        /// <summary>
+        /// Pops a value and jumps forward by the number of bytes given by the operand if the value is not truthy.
+        /// </summary>
+        JumpIfFalse,
+
+        /// <summary>
+        /// Jumps backward by the number of bytes given by the operand.
+        /// </summary>
+        Loop,
+
+        /// <summary>
+        /// Calls the value below the arguments on the stack. The operand is the number of arguments (8 bits).
+        /// </summary>
+        Call,
+
+        /// <summary>
+        /// Returns from the current function with the value on top of the stack.
+        /// </summary>
+        Return,
+
+        #endregion Control flow
+    }
+}
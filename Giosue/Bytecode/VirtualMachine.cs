@@ -0,0 +1,537 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+using Giosue.Profiling;
+
+namespace Giosue.Bytecode
+{
+    // Design comments:
+    // The virtual machine is a stack machine. Every call to a `BytecodeFunction` pushes a
+    // `CallFrame` onto an explicit frame stack instead of recursing on the .NET stack.
+    // The arguments of a call become the first local variables of the callee:
+    //
+    //     ... | callee | argument 0 | argument 1 | other locals | temporaries
+    //                  ^ StackBase
+    //
+    // Globals are shared with the host `Interpreter` (its `Globals`), so builtins,
+    // the REPL and the tree-walking interpreter all see the same global variables.
+    // Because the frames are explicit, a script can also be run a slice at a time (see
+    // `Start` and `RunSlice`): `Execute` counts a step at every backward jump and every
+    // call, and when the steps run out, or a builtin asks to suspend the script, it saves
+    // the instruction pointer in the frame and returns. The next slice carries on from the
+    // frames. Code between two steps never loops, so a slice can't run much longer than its
+    // steps. Builtins and tree-walking functions called by the script still run to the end
+    // before the slice can stop; the steps that the interpreter counts in a tree-walking
+    // function (see `Interpreter.CountStep`) are taken off the slice when it returns.
+    /// <summary>
+    /// Runs bytecode produced by the <see cref="Compiler"/>.
+    /// </summary>
+    public class VirtualMachine
+    {
+        /// <summary>
+        /// The state of a function that is running.
+        /// </summary>
+        private struct CallFrame
+        {
+            public BytecodeFunction Function;
+            public int InstructionPointer;
+            public int StackBase;
+        }
+
+        private const int InitialStackSize = 256;
+        private const int InitialFrameCount = 64;
+
+        /// <summary>
+        /// The interpreter that provides the globals and is passed to builtins.
+        /// </summary>
+        private Interpreter Host { get; }
+
+        private GiosueValue[] Stack = new GiosueValue[InitialStackSize];
+        private int StackTop = 0;
+
+        private CallFrame[] Frames = new CallFrame[InitialFrameCount];
+        private int FrameCount = 0;
+
+        /// <summary>
+        /// The number of steps (backward jumps and calls) left before <see cref="Execute(int)"/> stops.
+        /// </summary>
+        private int Steps = int.MaxValue;
+
+        /// <summary>
+        /// Indicates if <see cref="RunSlice(int)"/> is running, so the builtins the script calls can suspend it.
+        /// </summary>
+        private bool IsRunningSlice = false;
+
+        /// <summary>
+        /// Indicates if a script started by <see cref="Start(BytecodeFunction)"/> hasn't finished yet.
+        /// </summary>
+        public bool IsRunning => FrameCount > 0;
+
+        /// <summary>
+        /// Creates a new <see cref="VirtualMachine"/>.
+        /// </summary>
+        /// <param name="host">The interpreter that provides the globals and is passed to builtins.</param>
+        public VirtualMachine(Interpreter host)
+        {
+            // The host for a {nameof(VirtualMachine)} cannot be null.
+            Host = host ?? throw new ArgumentNullException(nameof(host), $"L'interprete per una {nameof(VirtualMachine)} non può essere nullo.");
+        }
+
+        /// <summary>
+        /// Runs a compiled script.
+        /// </summary>
+        /// <param name="script">The script to run.</param>
+        public void Run(BytecodeFunction script)
+        {
+            var allocatedBefore = Host.BeginMetrics();
+            try
+            {
+                Invoke(script, new List<GiosueValue>());
+            }
+            catch (Exception e)
+            {
+                Interpreter.CountError(e);
+
+                // Whatever was printed before the error should come out before the error is reported.
+                Host.Output.Flush();
+                throw;
+            }
+            finally
+            {
+                Host.EndMetrics(allocatedBefore);
+            }
+        }
+
+        /// <summary>
+        /// Calls a compiled function and runs it to completion.
+        /// </summary>
+        /// <param name="function">The function to call.</param>
+        /// <param name="arguments">The arguments to the function.</param>
+        /// <returns>The return value of the function.</returns>
+        public GiosueValue Invoke(BytecodeFunction function, List<GiosueValue> arguments)
+        {
+            var baseFrameCount = FrameCount;
+            var baseStackTop = StackTop;
+
+            try
+            {
+                Push(GiosueValue.FromObject(function));
+                foreach (var argument in arguments)
+                {
+                    Push(argument);
+                }
+                CallFunction(function, arguments.Count);
+                while (!Execute(baseFrameCount))
+                {
+                    Steps = int.MaxValue;
+                }
+                return Pop();
+            }
+            catch
+            {
+                // Throw away whatever the failed call left behind.
+                FrameCount = baseFrameCount;
+                Array.Clear(Stack, baseStackTop, StackTop - baseStackTop);
+                StackTop = baseStackTop;
+                throw;
+            }
+        }
+
+        #region Slices
+
+        /// <summary>
+        /// Starts running a compiled script a slice at a time.
+        /// </summary>
+        /// <remarks>
+        /// Nothing runs until <see cref="RunSlice(int)"/> is called.
+        /// </remarks>
+        /// <param name="script">The script to run.</param>
+        /// <exception cref="InvalidOperationException">Thrown if the virtual machine is already running code.</exception>
+        public void Start(BytecodeFunction script)
+        {
+            if (FrameCount > 0)
+            {
+                // The virtual machine is already running a script.
+                throw new InvalidOperationException("La macchina virtuale sta già eseguendo uno script.");
+            }
+
+            Push(GiosueValue.FromObject(script));
+            CallFunction(script, 0);
+        }
+
+        /// <summary>
+        /// Runs the script given to <see cref="Start(BytecodeFunction)"/> for a number of steps.
+        /// </summary>
+        /// <remarks>
+        /// A step is one backward jump (one iteration of a loop) or one call. The slice ends early if a builtin
+        /// asks to suspend the script (see <see cref="Interpreter.Suspend(TimeSpan)"/>).
+        /// If the script throws an exception, it is stopped and can't be resumed.
+        /// </remarks>
+        /// <param name="steps">The most steps to run.</param>
+        /// <returns>True if the script finished, false if it can be resumed with another slice.</returns>
+        /// <exception cref="InvalidOperationException">Thrown if no script is running.</exception>
+        public bool RunSlice(int steps)
+        {
+            if (FrameCount == 0)
+            {
+                // The virtual machine isn't running a script.
+                throw new InvalidOperationException("La macchina virtuale non sta eseguendo uno script.");
+            }
+
+            Steps = steps;
+            IsRunningSlice = true;
+            var allocatedBefore = Host.BeginMetrics();
+            try
+            {
+                if (Execute(0))
+                {
+                    // Throw away the script's return value.
+                    Pop();
+                    return true;
+                }
+                return false;
+            }
+            catch (Exception e)
+            {
+                Interpreter.CountError(e);
+                FrameCount = 0;
+                Array.Clear(Stack, 0, StackTop);
+                StackTop = 0;
+
+                // Whatever was printed before the error should come out before the error is reported.
+                Host.Output.Flush();
+                throw;
+            }
+            finally
+            {
+                Steps = int.MaxValue;
+                IsRunningSlice = false;
+                Host.CanSuspend = false;
+                Host.EndMetrics(allocatedBefore);
+            }
+        }
+
+        #endregion Slices
+
+        #region Stack
+
+        private void Push(GiosueValue value)
+        {
+            if (StackTop == Stack.Length)
+            {
+                Array.Resize(ref Stack, Stack.Length * 2);
+            }
+            Stack[StackTop++] = value;
+        }
+
+        private GiosueValue Pop()
+        {
+            var value = Stack[--StackTop];
+            Stack[StackTop] = default;
+            return value;
+        }
+
+        #endregion Stack
+
+        #region Calls
+
+        /// <summary>
+        /// Calls the value <paramref name="argumentCount"/> slots below the top of the stack.
+        /// </summary>
+        /// <param name="callee">The value to call.</param>
+        /// <param name="argumentCount">The number of arguments on the stack.</param>
+        private void CallValue(GiosueValue callee, int argumentCount)
+        {
+            if (!callee.TryGetObject<IGiosueCallable>(out var callable))
+            {
+                // It's impossible to use that object as a function.
+                throw new InterpreterException(InterpreterExceptionType.AttemptToCallNonCallableObject, "Non è possible usare quello oggeto come una funzione.");
+            }
+
+            if (callable.Arity != argumentCount)
+            {
+                // It's impossible to that number of parameters with that function.
+                throw new InterpreterException(InterpreterExceptionType.WrongNumberOfArgumentsPassedToFunction, $"È vietato usare quello numero di parametri con quello funzione.");
+            }
+
+            if (callable is BytecodeFunction function)
+            {
+                CallFunction(function, argumentCount);
+                return;
+            }
+
+            // Builtins and tree-walking functions are called directly.
+            var arguments = new List<GiosueValue>(argumentCount);
+            for (int i = StackTop - argumentCount; i < StackTop; i++)
+            {
+                arguments.Add(Stack[i]);
+            }
+
+            // Only a builtin that the script calls itself can suspend it. A tree-walking function has to run to the end, so
+            // anything it calls blocks instead.
+            Host.CanSuspend = IsRunningSlice && callable is not GiosueFunction;
+            var result = callable.Call(Host, arguments);
+            Host.CanSuspend = false;
+            if (IsRunningSlice)
+            {
+                Steps -= Host.TakeSteps();
+            }
+
+            // Pop the arguments and the callee, then push the result.
+            for (int i = 0; i <= argumentCount; i++)
+            {
+                Pop();
+            }
+            Push(result);
+        }
+
+        private void CallFunction(BytecodeFunction function, int argumentCount)
+        {
+            if (GiosueEventSource.IsCounting)
+            {
+                Host.CountCall();
+            }
+
+            if (FrameCount == Frames.Length)
+            {
+                Array.Resize(ref Frames, Frames.Length * 2);
+            }
+
+            ref var frame = ref Frames[FrameCount++];
+            frame.Function = function;
+            frame.InstructionPointer = 0;
+            frame.StackBase = StackTop - argumentCount;
+        }
+
+        #endregion Calls
+
+        /// <summary>
+        /// Runs instructions until the frame count drops back to <paramref name="baseFrameCount"/>, or until the steps run out.
+        /// </summary>
+        /// <param name="baseFrameCount">The number of frames that were running before the call.</param>
+        /// <returns>True if the frame count dropped back to <paramref name="baseFrameCount"/>, false if execution stopped early and the frames can be resumed.</returns>
+        private bool Execute(int baseFrameCount)
+        {
+            var frame = Frames[FrameCount - 1];
+            var code = frame.Function.Chunk.Code;
+            var constants = frame.Function.Chunk.Constants;
+            var ip = frame.InstructionPointer;
+            var stackBase = frame.StackBase;
+
+            while (true)
+            {
+                var instruction = (OpCode)code[ip++];
+                switch (instruction)
+                {
+                    #region Constants
+
+                    case OpCode.Constant:
+                        Push(constants[(code[ip] << 8) | code[ip + 1]]);
+                        ip += 2;
+                        break;
+                    case OpCode.Nil: Push(GiosueValue.Nil); break;
+                    case OpCode.True: Push(true); break;
+                    case OpCode.False: Push(false); break;
+                    case OpCode.Pop: Pop(); break;
+
+                    #endregion Constants
+
+                    #region Variables
+
+                    case OpCode.GetLocal:
+                        Push(Stack[stackBase + ((code[ip] << 8) | code[ip + 1])]);
+                        ip += 2;
+                        break;
+                    case OpCode.SetLocal:
+                        {
+                            var slot = stackBase + ((code[ip] << 8) | code[ip + 1]);
+                            ip += 2;
+                            var value = Pop();
+
+                            // Like the interpreter, a variable keeps its type once it's defined.
+                            if (!value.HasSameTypeAs(Stack[slot]))
+                            {
+                                // The variable '{name}' is undefined
+                                throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{frame.Function.Chunk.LocalNameAt(ip - 3)}' è imprecisato.");
+                            }
+                            Stack[slot] = value;
+                            break;
+                        }
+                    case OpCode.StoreLocal:
+                        Stack[stackBase + ((code[ip] << 8) | code[ip + 1])] = Pop();
+                        ip += 2;
+                        break;
+                    case OpCode.GetGlobal:
+                        Push(Host.Globals.GetValue(constants[(code[ip] << 8) | code[ip + 1]].AsInt));
+                        ip += 2;
+                        break;
+                    case OpCode.SetGlobal:
+                        Host.Globals.AssignIfExists(constants[(code[ip] << 8) | code[ip + 1]].AsInt, Pop());
+                        ip += 2;
+                        break;
+                    case OpCode.DefineGlobal:
+                        Host.Globals.DefineOrOverwrite(constants[(code[ip] << 8) | code[ip + 1]].AsInt, Pop());
+                        ip += 2;
+                        break;
+
+                    #endregion Variables
+
+                    #region Binary operators
+
+                    case OpCode.Add:
+                        {
+                            var right = Pop();
+                            var left = Pop();
+                            Push(left.IsInt && right.IsInt ? left.AsInt + right.AsInt : Operators.Binary(TokenType.Plus, left, right));
+                            break;
+                        }
+                    case OpCode.Subtract:
+                        {
+                            var right = Pop();
+                            var left = Pop();
+                            Push(left.IsInt && right.IsInt ? left.AsInt - right.AsInt : Operators.Binary(TokenType.Minus, left, right));
+                            break;
+                        }
+                    case OpCode.Multiply: BinaryOperator(TokenType.Star); break;
+                    case OpCode.Divide: BinaryOperator(TokenType.Slash); break;
+                    case OpCode.BitwiseAnd: BinaryOperator(TokenType.And); break;
+                    case OpCode.BitwiseOr: BinaryOperator(TokenType.Pipe); break;
+                    case OpCode.BitwiseXor: BinaryOperator(TokenType.Caret); break;
+                    case OpCode.Concatenate: BinaryOperator(TokenType.At); break;
+                    case OpCode.Equal: BinaryOperator(TokenType.EqualEqual); break;
+                    case OpCode.NotEqual: BinaryOperator(TokenType.BangEqual); break;
+                    case OpCode.Greater: BinaryOperator(TokenType.Greater); break;
+                    case OpCode.GreaterEqual: BinaryOperator(TokenType.GreaterEqual); break;
+                    case OpCode.Less:
+                        {
+                            var right = Pop();
+                            var left = Pop();
+                            Push(left.IsInt && right.IsInt ? left.AsInt < right.AsInt : Operators.Binary(TokenType.Less, left, right));
+                            break;
+                        }
+                    case OpCode.LessEqual: BinaryOperator(TokenType.LessEqual); break;
+
+                    #endregion Binary operators
+
+                    #region Logical and unary operators
+
+                    case OpCode.LogicalAnd: LogicalOperator(TokenType.AndAnd); break;
+                    case OpCode.LogicalOr: LogicalOperator(TokenType.PipePipe); break;
+                    case OpCode.LogicalXor: LogicalOperator(TokenType.CaretCaret); break;
+                    case OpCode.Not: Push(Operators.Unary(TokenType.Bang, Pop())); break;
+                    case OpCode.Negate: Push(Operators.Unary(TokenType.Minus, Pop())); break;
+
+                    #endregion Logical and unary operators
+
+                    #region Control flow
+
+                    case OpCode.Jump:
+                        ip += 2 + ((code[ip] << 8) | code[ip + 1]);
+                        break;
+                    case OpCode.JumpIfFalse:
+                        if (Operators.IsTruthy(Pop()))
+                        {
+                            ip += 2;
+                        }
+                        else
+                        {
+                            ip += 2 + ((code[ip] << 8) | code[ip + 1]);
+                        }
+                        break;
+                    case OpCode.Loop:
+                        ip += 2 - ((code[ip] << 8) | code[ip + 1]);
+                        if (--Steps <= 0)
+                        {
+                            Frames[FrameCount - 1].InstructionPointer = ip;
+                            return false;
+                        }
+                        break;
+                    case OpCode.Call:
+                        {
+                            var argumentCount = code[ip++];
+
+                            // Save where this frame was before the callee takes over.
+                            Frames[FrameCount - 1].InstructionPointer = ip;
+                            CallValue(Stack[StackTop - argumentCount - 1], argumentCount);
+
+                            // The top frame is where to carry on from, whether it's the callee's or this one.
+                            if (--Steps <= 0 || Host.IsSuspensionRequested)
+                            {
+                                return false;
+                            }
+
+                            frame = Frames[FrameCount - 1];
+                            code = frame.Function.Chunk.Code;
+                            constants = frame.Function.Chunk.Constants;
+                            ip = frame.InstructionPointer;
+                            stackBase = frame.StackBase;
+                            break;
+                        }
+                    case OpCode.Return:
+                        {
+                            var result = Pop();
+
+                            // Discard the callee and everything the function put on the stack.
+                            var calleeSlot = stackBase - 1;
+                            Array.Clear(Stack, calleeSlot, StackTop - calleeSlot);
+                            StackTop = calleeSlot;
+                            Push(result);
+
+                            FrameCount--;
+                            if (FrameCount == baseFrameCount)
+                            {
+                                return true;
+                            }
+
+                            frame = Frames[FrameCount - 1];
+                            code = frame.Function.Chunk.Code;
+                            constants = frame.Function.Chunk.Constants;
+                            ip = frame.InstructionPointer;
+                            stackBase = frame.StackBase;
+                            break;
+                        }
+
+                    #endregion Control flow
+
+                    default:
+                        throw new InterpreterException(InterpreterExceptionType.Unknown, $"Unknown instruction {instruction}.");
+                }
+            }
+        }
+
+        private void BinaryOperator(TokenType @operator)
+        {
+            var right = Pop();
+            var left = Pop();
+            Push(Operators.Binary(@operator, left, right));
+        }
+
+        private void LogicalOperator(TokenType @operator)
+        {
+            var right = Pop();
+            var left = Pop();
+            Push(Operators.Logical(@operator, left, right));
+        }
+    }
+}
@@ -0,0 +1,124 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Bytecode;
+
+namespace Giosue
+{
+    /// <summary>
+    /// Turns bytecode into a human-readable listing.
+    /// </summary>
+    public class Disassembler
+    {
+        /// <summary>
+        /// Disassembles a function and every function declared inside of it.
+        /// </summary>
+        /// <param name="function">The function to disassemble.</param>
+        /// <returns>The listing.</returns>
+        public string Disassemble(BytecodeFunction function)
+        {
+            var sb = new StringBuilder();
+            DisassembleFunction(function, sb);
+            return sb.ToString();
+        }
+
+        private void DisassembleFunction(BytecodeFunction function, StringBuilder sb)
+        {
+            sb.Append("== ").Append(function.Name).Append(" ==").AppendLine();
+
+            var chunk = function.Chunk;
+            var offset = 0;
+            while (offset < chunk.Count)
+            {
+                offset = DisassembleInstruction(chunk, offset, sb);
+            }
+
+            // Nested functions are listed after the function that declares them.
+            foreach (var nested in chunk.Constants.Select(c => c.AsObject).OfType<BytecodeFunction>())
+            {
+                sb.AppendLine();
+                DisassembleFunction(nested, sb);
+            }
+        }
+
+        /// <summary>
+        /// Disassembles one instruction.
+        /// </summary>
+        /// <param name="chunk">The chunk that contains the instruction.</param>
+        /// <param name="offset">The offset of the instruction.</param>
+        /// <param name="sb">The listing to append to.</param>
+        /// <returns>The offset of the next instruction.</returns>
+        private static int DisassembleInstruction(Chunk chunk, int offset, StringBuilder sb)
+        {
+            sb.Append($"{offset:0000} ");
+
+            // Only show the line when it changes.
+            if (offset > 0 && chunk.Lines[offset] == chunk.Lines[offset - 1])
+            {
+                sb.Append("   | ");
+            }
+            else
+            {
+                sb.Append($"{chunk.Lines[offset],4} ");
+            }
+
+            var instruction = (OpCode)chunk.Code[offset];
+            switch (instruction)
+            {
+                case OpCode.Constant:
+                    {
+                        var index = chunk.ReadShort(offset + 1);
+                        var constant = chunk.Constants[index].TryGetObject<BytecodeFunction>(out var function) ? $"<fun {function.Name}>" : chunk.Constants[index].ToString();
+                        sb.AppendLine($"{instruction,-16} {index,4} '{constant}'");
+                        return offset + 3;
+                    }
+                case OpCode.GetGlobal:
+                case OpCode.SetGlobal:
+                case OpCode.DefineGlobal:
+                    {
+                        var index = chunk.ReadShort(offset + 1);
+                        sb.AppendLine($"{instruction,-16} {index,4} '{SymbolTable.NameOf(chunk.Constants[index].AsInt)}'");
+                        return offset + 3;
+                    }
+                case OpCode.GetLocal:
+                case OpCode.SetLocal:
+                case OpCode.StoreLocal:
+                    sb.AppendLine($"{instruction,-16} {chunk.ReadShort(offset + 1),4}");
+                    return offset + 3;
+                case OpCode.Jump:
+                case OpCode.JumpIfFalse:
+                    sb.AppendLine($"{instruction,-16} {offset,4} -> {offset + 3 + chunk.ReadShort(offset + 1)}");
+                    return offset + 3;
+                case OpCode.Loop:
+                    sb.AppendLine($"{instruction,-16} {offset,4} -> {offset + 3 - chunk.ReadShort(offset + 1)}");
+                    return offset + 3;
+                case OpCode.Call:
+                    sb.AppendLine($"{instruction,-16} {chunk.Code[offset + 1],4}");
+                    return offset + 2;
+                default:
+                    sb.AppendLine($"{instruction}");
+                    return offset + 1;
+            }
+        }
+    }
+}
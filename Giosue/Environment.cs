@@ -25,27 +25,44 @@ using Giosue.Exceptions;
 
 namespace Giosue
 {
+    // Design comments:
+    // Blocks and function calls get their environments from a pool in the `Interpreter`
+    // (see `Interpreter.RentEnvironment`), so an environment can be reset and reused with
+    // a new parent. An environment that a function closes over has to outlive the block or
+    // call that created it, so creating a `GiosueFunction` marks its closure and every
+    // ancestor as captured, and a captured environment is never put back in the pool.
+    // The globals of an interpreter forked from a `GlobalsSnapshot` read through to the
+    // snapshot, and copy a binding into `Variables` the first time they define or assign it,
+    // or read a function from it.
     public class Environment
     {
-        private static readonly HashSet<string> ReservedWords = new()
-        {
-            "intero",
-            "virgola",
-            "mentre",
-            "vero",
-            "falso",
-            "se",
-            "oppure",
-            "bool",
-            "niente"
-        };
+        private static readonly GiosueValue[] NoSlots = new GiosueValue[0];
 
-        private readonly Environment ParentEnvironment = null;
+        private Environment ParentEnvironment = null;
 
         /// <summary>
-        /// The collection of variables.
+        /// Indicates if a function closes over this environment, so it must not be reused.
         /// </summary>
-        private readonly Dictionary<string, object> Variables = new();
+        internal bool IsCaptured { get; private set; } = false;
+
+        /// <summary>
+        /// The collection of variables that are looked up by name, keyed by the <see cref="SymbolTable"/> symbol of the name.
+        /// </summary>
+        /// <remarks>
+        /// Only global variables (the ones the <see cref="Resolver"/> can't resolve) live here,
+        /// so the dictionary isn't created until it's needed.
+        /// </remarks>
+        private Dictionary<int, GiosueValue> Variables = null;
+
+        /// <summary>
+        /// The collection of local variables, indexed by the slot the <see cref="Resolver"/> gave them.
+        /// </summary>
+        private GiosueValue[] Slots = NoSlots;
+
+        /// <summary>
+        /// The snapshot that this environment was forked from, or null if it wasn't forked.
+        /// </summary>
+        private readonly GlobalsSnapshot Snapshot = null;
 
         /// <summary>
         /// Creates a new <see cref="Environment"/>.
@@ -64,6 +81,15 @@ namespace Giosue
             ParentEnvironment = parentEnvironment;
         }
 
+        /// <summary>
+        /// Creates the globals of an interpreter forked from a snapshot.
+        /// </summary>
+        /// <param name="snapshot">The snapshot of the globals.</param>
+        internal Environment(GlobalsSnapshot snapshot)
+        {
+            Snapshot = snapshot;
+        }
+
         /// <summary>
         /// Defines a variable with a name and a value.
         /// </summary>
@@ -73,13 +99,27 @@ namespace Giosue
         /// <param name="name">The name of the variable to define.</param>
         /// <param name="value">The value of the variable to define.</param>
         /// <exception cref="EnvironmentException">Thrown if <see cref="name"/> is a reserved keyword.</exception>
-        /// <seealso cref="TryDefineOrOverwrite(string, object)"/>
-        public void DefineOrOverwrite(string name, object value)
+        /// <seealso cref="TryDefineOrOverwrite(string, GiosueValue)"/>
+        public void DefineOrOverwrite(string name, GiosueValue value)
+        {
+            DefineOrOverwrite(SymbolTable.Intern(name), value);
+        }
+
+        /// <summary>
+        /// Defines a variable with a name and a value.
+        /// </summary>
+        /// <remarks>
+        /// If the variable is already defined, the current value is overwritten.
+        /// </remarks>
+        /// <param name="symbol">The symbol of the name of the variable to define.</param>
+        /// <param name="value">The value of the variable to define.</param>
+        /// <exception cref="EnvironmentException">Thrown if <see cref="symbol"/> is a reserved keyword.</exception>
+        public void DefineOrOverwrite(int symbol, GiosueValue value)
         {
-            if (!TryDefineOrOverwrite(name, value))
+            if (!TryDefineOrOverwrite(symbol, value))
             {
                 // The name of the variable is reserved.
-                throw new EnvironmentException(EnvironmentExceptionType.VariableNameIsReservedKeyword, $"Il nome della variable '{name}' è reservato.");
+                throw new EnvironmentException(EnvironmentExceptionType.VariableNameIsReservedKeyword, $"Il nome della variable '{SymbolTable.NameOf(symbol)}' è reservato.");
             }
         }
 
@@ -92,34 +132,68 @@ namespace Giosue
         /// <param name="name">The name of the variable to define.</param>
         /// <param name="value">The value of the variable to define.</param>
         /// <returns>True if the variable was successfully defined or overwritten, false otherwise.</returns>
-        public bool TryDefineOrOverwrite(string name, object value)
+        public bool TryDefineOrOverwrite(string name, GiosueValue value)
+        {
+            return TryDefineOrOverwrite(SymbolTable.Intern(name), value);
+        }
+
+        /// <summary>
+        /// Tries to define a variable with a name and a value.
+        /// </summary>
+        /// <remarks>
+        /// If the variable is already defined, it is overwritten.
+        /// </remarks>
+        /// <param name="symbol">The symbol of the name of the variable to define.</param>
+        /// <param name="value">The value of the variable to define.</param>
+        /// <returns>True if the variable was successfully defined or overwritten, false otherwise.</returns>
+        public bool TryDefineOrOverwrite(int symbol, GiosueValue value)
         {
-            if (ReservedWords.Contains(name))
+            if (IsReservedWord(symbol))
             {
                 return false;
             }
 
-            
-
-            Variables[name] = value;
+            Variables ??= new();
+            Variables[symbol] = value;
             return true;
         }
 
+        /// <summary>
+        /// Tests if a name is reserved and cannot be used for a variable.
+        /// </summary>
+        /// <param name="symbol">The symbol of the name to test.</param>
+        /// <returns>True if <paramref name="symbol"/> is reserved, false otherwise.</returns>
+        internal static bool IsReservedWord(int symbol)
+        {
+            return SymbolTable.IsReserved(symbol);
+        }
+
         /// <summary>
         /// Gets a variable's value.
         /// </summary>
         /// <param name="name">The name of the variable.</param>
         /// <returns>The variable's value.</returns>
         /// <exception cref="EnvironmentException">Thrown if the variable cannot be found.</exception>
-        public object GetValue(string name)
+        public GiosueValue GetValue(string name)
+        {
+            return GetValue(SymbolTable.Intern(name));
+        }
+
+        /// <summary>
+        /// Gets a variable's value.
+        /// </summary>
+        /// <param name="symbol">The symbol of the name of the variable.</param>
+        /// <returns>The variable's value.</returns>
+        /// <exception cref="EnvironmentException">Thrown if the variable cannot be found.</exception>
+        public GiosueValue GetValue(int symbol)
         {
-            if (TryGetValue(name, out var value))
+            if (TryGetValue(symbol, out var value))
             {
                 return value;
             }
 
             // The variable '{name}' is undefined.
-            throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{name}' è imprecisato.");
+            throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{SymbolTable.NameOf(symbol)}' è imprecisato.");
         }
 
         /// <summary>
@@ -128,20 +202,32 @@ namespace Giosue
         /// <param name="name">The name of the variable.</param>
         /// <param name="value">The value of the variable.</param>
         /// <returns>True if the variable's value was found, false otherwise.</returns>
-        public bool TryGetValue(string name, out object value)
+        public bool TryGetValue(string name, out GiosueValue value)
         {
-            value = default;
+            return TryGetValue(SymbolTable.Intern(name), out value);
+        }
 
-            // Search the current environment first.
-            if (Variables.TryGetValue(name, out value))
-            {
-                return true;
-            }
+        /// <summary>
+        /// Gets a variable's value.
+        /// </summary>
+        /// <param name="symbol">The symbol of the name of the variable.</param>
+        /// <param name="value">The value of the variable.</param>
+        /// <returns>True if the variable's value was found, false otherwise.</returns>
+        public bool TryGetValue(int symbol, out GiosueValue value)
+        {
+            value = default;
 
-            // Search parent environments after.
-            if (ParentEnvironment != null)
+            // Search the current environment first, then the parent environments.
+            for (var environment = this; environment != null; environment = environment.ParentEnvironment)
             {
-                return ParentEnvironment.TryGetValue(name, out value);
+                if (environment.Variables != null && environment.Variables.TryGetValue(symbol, out value))
+                {
+                    return true;
+                }
+                if (environment.Snapshot != null && environment.TryGetSnapshotValue(symbol, out value))
+                {
+                    return true;
+                }
             }
 
             // The variable doesn't exist anywhere.
@@ -154,12 +240,23 @@ namespace Giosue
         /// <param name="name">The name of the variable.</param>
         /// <param name="value">The value to assign to the variable.</param>
         /// <exception cref="EnvironmentException">Thrown if the variable is not defined or assignment fails.</exception>
-        public void AssignIfExists(string name, object value)
+        public void AssignIfExists(string name, GiosueValue value)
+        {
+            AssignIfExists(SymbolTable.Intern(name), value);
+        }
+
+        /// <summary>
+        /// Assigns a variable a value if it exists.
+        /// </summary>
+        /// <param name="symbol">The symbol of the name of the variable.</param>
+        /// <param name="value">The value to assign to the variable.</param>
+        /// <exception cref="EnvironmentException">Thrown if the variable is not defined or assignment fails.</exception>
+        public void AssignIfExists(int symbol, GiosueValue value)
         {
-            if (!TryAssignIfExists(name, value))
+            if (!TryAssignIfExists(symbol, value))
             {
                 // The variable '{name}' is undefined
-                throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{name}' è imprecisato.");
+                throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{SymbolTable.NameOf(symbol)}' è imprecisato.");
             }
         }
 
@@ -172,30 +269,243 @@ namespace Giosue
         /// <param name="name">The name of the variable to update.</param>
         /// <param name="value">The variable's new value.</param>
         /// <returns>True if the variable's value was successfully updated, false otherwise.</returns>
-        public bool TryAssignIfExists(string name, object value)
+        public bool TryAssignIfExists(string name, GiosueValue value)
         {
-            // Try to update the variable in the current environment first
-            if (Variables.TryGetValue(name, out var v))
+            return TryAssignIfExists(SymbolTable.Intern(name), value);
+        }
+
+        /// <summary>
+        /// Assigns a variable a certain value.
+        /// </summary>
+        /// <remarks>
+        /// The variable's value will only be updated if it exists and the type of the new value is equal to the type of the old value.
+        /// </remarks>
+        /// <param name="symbol">The symbol of the name of the variable to update.</param>
+        /// <param name="value">The variable's new value.</param>
+        /// <returns>True if the variable's value was successfully updated, false otherwise.</returns>
+        public bool TryAssignIfExists(int symbol, GiosueValue value)
+        {
+            for (var environment = this; environment != null; environment = environment.ParentEnvironment)
             {
-                // Redefine the variable only if the types match
-                if (value.GetType() == v.GetType())
+                if (environment.Variables != null && environment.Variables.TryGetValue(symbol, out var v))
                 {
-                    DefineOrOverwrite(name, value);
-                    return true;
+                    // Redefine the variable only if the types match
+                    if (value.HasSameTypeAs(v))
+                    {
+                        environment.Variables[symbol] = value;
+                        return true;
+                    }
+                }
+                else if (environment.Snapshot != null && environment.Snapshot.Variables.TryGetValue(symbol, out v))
+                {
+                    // Copy the variable into this environment instead of changing the snapshot.
+                    if (value.HasSameTypeAs(v))
+                    {
+                        environment.Variables ??= new();
+                        environment.Variables[symbol] = value;
+                        return true;
+                    }
                 }
-            }
 
-            // If no such variable exists in the current environment,
-            // assign it in the parent environment
-            if (ParentEnvironment != null)
-            {
-                return ParentEnvironment.TryAssignIfExists(name, value);
+                // If no such variable exists in this environment,
+                // assign it in the parent environment
             }
 
             // Types didn't match or variable doesn't exist anywhere.
             return false;
         }
 
+        #region Snapshots
+
+        /// <summary>
+        /// Gets a variable's value from the snapshot this environment was forked from.
+        /// </summary>
+        /// <remarks>
+        /// A function is only copied once, and the copy is kept in <see cref="Variables"/>.
+        /// </remarks>
+        /// <param name="symbol">The symbol of the name of the variable.</param>
+        /// <param name="value">The value of the variable.</param>
+        /// <returns>True if the variable is in the snapshot, false otherwise.</returns>
+        private bool TryGetSnapshotValue(int symbol, out GiosueValue value)
+        {
+            if (!Snapshot.TryGetValue(symbol, out value, out var isCopied))
+            {
+                return false;
+            }
+
+            if (isCopied)
+            {
+                Variables ??= new();
+                Variables[symbol] = value;
+            }
+            return true;
+        }
+
+        /// <summary>
+        /// Copies the variables that are looked up by name, including the ones still shared with a snapshot.
+        /// </summary>
+        /// <returns>The copy of the variables.</returns>
+        internal Dictionary<int, GiosueValue> CopyVariables()
+        {
+            var variables = Snapshot == null ? new Dictionary<int, GiosueValue>() : new Dictionary<int, GiosueValue>(Snapshot.Variables.Count);
+            if (Snapshot != null)
+            {
+                foreach (var symbol in Snapshot.Variables.Keys)
+                {
+                    if ((Variables == null || !Variables.ContainsKey(symbol)) && TryGetSnapshotValue(symbol, out var value))
+                    {
+                        variables[symbol] = value;
+                    }
+                }
+            }
+            if (Variables != null)
+            {
+                foreach (var pair in Variables)
+                {
+                    variables[pair.Key] = pair.Value;
+                }
+            }
+            return variables;
+        }
+
+        #endregion Snapshots
+
+        #region Resolved variables
+
+        /// <summary>
+        /// Defines a local variable in a slot.
+        /// </summary>
+        /// <remarks>
+        /// If the slot is already in use, the current value is overwritten.
+        /// The name of the variable was already checked by the <see cref="Resolver"/>.
+        /// </remarks>
+        /// <param name="slot">The slot of the variable to define.</param>
+        /// <param name="value">The value of the variable to define.</param>
+        public void DefineAt(int slot, GiosueValue value)
+        {
+            if (slot >= Slots.Length)
+            {
+                Array.Resize(ref Slots, Math.Max(slot + 1, Slots.Length * 2));
+            }
+
+            Slots[slot] = value;
+        }
+
+        /// <summary>
+        /// Gets a local variable's value.
+        /// </summary>
+        /// <param name="depth">The number of environments between this environment and the variable's environment.</param>
+        /// <param name="slot">The slot of the variable.</param>
+        /// <param name="name">The name of the variable, used for error messages.</param>
+        /// <returns>The variable's value.</returns>
+        /// <exception cref="EnvironmentException">Thrown if the variable has not been defined yet.</exception>
+        public GiosueValue GetAt(int depth, int slot, string name)
+        {
+            var slots = Ancestor(depth).Slots;
+            if (slot < slots.Length)
+            {
+                return slots[slot];
+            }
+
+            // The variable '{name}' is undefined.
+            throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{name}' è imprecisato.");
+        }
+
+        /// <summary>
+        /// Assigns a local variable a value.
+        /// </summary>
+        /// <remarks>
+        /// Like <see cref="TryAssignIfExists(string, GiosueValue)"/>, the value is only updated if the type of the new value
+        /// is equal to the type of the old value.
+        /// </remarks>
+        /// <param name="depth">The number of environments between this environment and the variable's environment.</param>
+        /// <param name="slot">The slot of the variable.</param>
+        /// <param name="name">The name of the variable, used for error messages.</param>
+        /// <param name="value">The variable's new value.</param>
+        /// <exception cref="EnvironmentException">Thrown if the variable is not defined or assignment fails.</exception>
+        public void AssignAt(int depth, int slot, string name, GiosueValue value)
+        {
+            var slots = Ancestor(depth).Slots;
+            if (slot < slots.Length && value.HasSameTypeAs(slots[slot]))
+            {
+                slots[slot] = value;
+                return;
+            }
+
+            // The variable '{name}' is undefined
+            throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{name}' è imprecisato.");
+        }
+
+        /// <summary>
+        /// Counts the environments in the chain from this one up to the globals.
+        /// </summary>
+        /// <returns>The number of environments, including this one.</returns>
+        internal int CountDepth()
+        {
+            var depth = 0;
+            for (var environment = this; environment != null; environment = environment.ParentEnvironment)
+            {
+                depth++;
+            }
+            return depth;
+        }
+
+        /// <summary>
+        /// Gets the environment <paramref name="depth"/> levels above this one.
+        /// </summary>
+        /// <param name="depth">The number of parents to walk.</param>
+        /// <returns>The ancestor environment.</returns>
+        private Environment Ancestor(int depth)
+        {
+            var environment = this;
+            for (int i = 0; i < depth; i++)
+            {
+                environment = environment.ParentEnvironment;
+            }
+            return environment;
+        }
+
+        #endregion Resolved variables
+
+        #region Pooling
+
+        /// <summary>
+        /// Marks this environment and its ancestors as captured by a closure.
+        /// </summary>
+        internal void Capture()
+        {
+            for (var environment = this; environment != null && !environment.IsCaptured; environment = environment.ParentEnvironment)
+            {
+                environment.IsCaptured = true;
+            }
+        }
+
+        /// <summary>
+        /// Prepares an unused environment to be used again.
+        /// </summary>
+        /// <param name="parentEnvironment">The new parent <see cref="Environment"/>.</param>
+        /// <param name="slotCount">The number of slots that are known to be needed, such as the number of parameters of a function.</param>
+        internal void Reset(Environment parentEnvironment, int slotCount)
+        {
+            ParentEnvironment = parentEnvironment;
+            if (Slots.Length < slotCount)
+            {
+                Slots = new GiosueValue[slotCount];
+            }
+        }
+
+        /// <summary>
+        /// Clears the variables of an environment that is no longer used so it doesn't keep their values alive.
+        /// </summary>
+        internal void Clear()
+        {
+            ParentEnvironment = null;
+            Variables = null;
+            Array.Clear(Slots, 0, Slots.Length);
+        }
+
+        #endregion Pooling
+
         private void PrintEnvironment(Environment environment)
         {
             if (environment == null)
@@ -204,11 +514,16 @@ namespace Giosue
             }
 
             Console.WriteLine("Environment:");
-            foreach (var pair in Variables) 
+            foreach (var pair in environment.Variables ?? new()) 
             {
-                Console.WriteLine($"  Name: {pair.Key}");
+                Console.WriteLine($"  Name: {SymbolTable.NameOf(pair.Key)}");
                 Console.WriteLine($"  Value: {pair.Value}");
             }
+            for (int i = 0; i < environment.Slots.Length; i++)
+            {
+                Console.WriteLine($"  Slot: {i}");
+                Console.WriteLine($"  Value: {environment.Slots[i]}");
+            }
 
             PrintEnvironment(environment.ParentEnvironment);
         }
@@ -0,0 +1,52 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace Giosue.Exceptions
+{
+    public enum CompilerExceptionType : int
+    {
+        AllOK = 0,
+        Unknown = 1,
+        UnsupportedExpression = 2,
+        CapturedLocalVariable = 3,
+        TooManyLocalVariables = 4,
+        TooManyConstants = 5,
+        TooManyArguments = 6,
+        JumpTooLarge = 7,
+    }
+
+    public class CompilerException : GiosueException<CompilerExceptionType>
+    {
+        public override CompilerExceptionType ExceptionType { get; }
+
+        public int Line { get; }
+
+        public CompilerException(CompilerExceptionType exceptionType, int line, string message) : base(message)
+        {
+            Category = GiosueExceptionCategory.Compiler;
+            ExceptionType = exceptionType;
+            Line = line;
+        }
+    }
+}
@@ -37,8 +37,11 @@ namespace Giosue.Exceptions
     {
         public override EnvironmentExceptionType ExceptionType { get; }
 
-        public EnvironmentException() : base(default) { }
-        public EnvironmentException(string message) : base(message) { }
+        public EnvironmentException() : this(default(string)) { }
+        public EnvironmentException(string message) : base(message)
+        {
+            Category = GiosueExceptionCategory.Environment;
+        }
         public EnvironmentException(EnvironmentExceptionType environmentExceptionType, string message = default) : this(message)
         {
             ExceptionType = environmentExceptionType;
@@ -31,6 +31,8 @@ namespace Giosue.Exceptions
         Scanner = 10,
         Parser = 20,
         Interpreter = 30,
+        Compiler = 40,
+        Environment = 50,
     }
 
     public abstract class GiosueException<T> : Exception where T : Enum
@@ -32,6 +32,7 @@ namespace Giosue.Exceptions
         MentreWithoutCondition = 3,
         AttemptToCallNonCallableObject = 4,
         WrongNumberOfArgumentsPassedToFunction = 5,
+        IndexOutOfRange = 6,
     }
 
     public class InterpreterException : GiosueException<InterpreterExceptionType>
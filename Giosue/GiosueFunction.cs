@@ -21,32 +21,276 @@ using System.Collections.Generic;
 using System.Linq;
 using System.Text;
 using System.Threading.Tasks;
+using Giosue.Profiling;
+using Giosue.Tiering;
 
 namespace Giosue
 {
+    // Design comments:
+    // A call gets its environment from the interpreter's pool, sized for the parameters,
+    // and gives it back when the call ends. When the interpreter calls a function it passes
+    // the argument expressions, which are evaluated straight into the environment's slots,
+    // so no list of arguments is built. Other callers, such as the virtual machine, use the
+    // `IGiosueCallable` overload with a list.
+    // A function declared by code in a `SyntaxArena` keeps a view of its declaration instead
+    // of the tree; everything else works the same way.
+    // If the interpreter has a `TieredCompilation`, every call is counted, and once the
+    // declaration is compiled the call runs the compiled code instead (see `TryGetCompiled`).
+    // A function in a `GlobalsSnapshot` is copied for each fork that reads it, so the forks
+    // count their calls to it apart; the copy keeps the closure and the compiled body.
     class GiosueFunction : IGiosueCallable
     {
         private readonly Statements.Function Declaration;
+
+        /// <summary>
+        /// The declaration of a function declared in a <see cref="Arena.SyntaxArena"/>, used when <see cref="Declaration"/> is null.
+        /// </summary>
+        private readonly Arena.FunctionStatementView ArenaDeclaration;
+
+        private readonly Token Name;
         private readonly Environment Closure;
 
-        public int Arity => Declaration.Parameters.Count;
+        /// <summary>
+        /// The tier of <see cref="Declaration"/>, or null until the function is called by an interpreter that compiles hot functions.
+        /// </summary>
+        private FunctionTier Tier = null;
+
+        /// <summary>
+        /// The compiled body of the function, or null if it hasn't been compiled.
+        /// </summary>
+        private CompiledFunction Compiled = null;
+
+        public int Arity { get; }
 
         public GiosueFunction(Statements.Function declaration, Environment closure)
         {
             Declaration = declaration;
+            Name = declaration.Name;
+            Arity = declaration.Parameters.Count;
             Closure = closure;
+
+            // The closure outlives the block or call that created it.
+            Closure.Capture();
         }
 
-        public object Call(Interpreter interpreter, List<object> arguments)
+        public GiosueFunction(Arena.FunctionStatementView declaration, Environment closure)
         {
-            var environment = new Environment(Closure);
+            ArenaDeclaration = declaration;
+            Name = declaration.Name;
+            Arity = declaration.Parameters.Count;
+            Closure = closure;
+            Closure.Capture();
+        }
+
+        private GiosueFunction(GiosueFunction function)
+        {
+            Declaration = function.Declaration;
+            ArenaDeclaration = function.ArenaDeclaration;
+            Name = function.Name;
+            Arity = function.Arity;
+            Compiled = function.Compiled;
+            Closure = function.Closure;
+        }
+
+        /// <summary>
+        /// Copies the function without its call count.
+        /// </summary>
+        /// <returns>The copy, which shares its declaration, closure and compiled body with this function.</returns>
+        internal GiosueFunction Copy()
+        {
+            return new GiosueFunction(this);
+        }
+
+        public GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments)
+        {
+            if (GiosueEventSource.IsCounting)
+            {
+                interpreter.CountCall();
+            }
+
+            if (TryGetCompiled(interpreter, out var compiled))
+            {
+                return compiled(interpreter, Closure, arguments.ToArray());
+            }
+
+            // The resolver gives the parameters the first slots in the function's environment.
+            var environment = interpreter.RentEnvironment(Closure, Arity);
             for (int i = 0; i < arguments.Count; i++)
             {
-                environment.DefineOrOverwrite(Declaration.Parameters[i].Lexeme, arguments[i]);
+                environment.DefineAt(i, arguments[i]);
+            }
+
+            return Run(interpreter, environment);
+        }
+
+        /// <summary>
+        /// Calls the function, evaluating the arguments straight into its environment.
+        /// </summary>
+        /// <param name="interpreter">The interpreter that evaluates the arguments and runs the function.</param>
+        /// <param name="arguments">The expressions of the arguments. There must be one for each parameter.</param>
+        /// <returns>The value returned by the function.</returns>
+        public GiosueValue Call(Interpreter interpreter, List<AST.Expression> arguments)
+        {
+            if (GiosueEventSource.IsCounting)
+            {
+                interpreter.CountCall();
+            }
+
+            if (TryGetCompiled(interpreter, out var compiled))
+            {
+                var values = new GiosueValue[arguments.Count];
+                for (int i = 0; i < arguments.Count; i++)
+                {
+                    values[i] = interpreter.EvaluateExpression(arguments[i]);
+                }
+                return compiled(interpreter, Closure, values);
+            }
+
+            var environment = interpreter.RentEnvironment(Closure, Arity);
+            try
+            {
+                for (int i = 0; i < arguments.Count; i++)
+                {
+                    environment.DefineAt(i, interpreter.EvaluateExpression(arguments[i]));
+                }
+            }
+            catch
+            {
+                interpreter.ReturnEnvironment(environment);
+                throw;
+            }
+
+            return Run(interpreter, environment);
+        }
+
+        /// <summary>
+        /// Calls the function, evaluating the arguments straight into its environment.
+        /// </summary>
+        /// <param name="interpreter">The interpreter that evaluates the arguments and runs the function.</param>
+        /// <param name="arguments">The expressions of the arguments in a <see cref="Arena.SyntaxArena"/>. There must be one for each parameter.</param>
+        /// <returns>The value returned by the function.</returns>
+        public GiosueValue Call(Interpreter interpreter, Arena.NodeList arguments)
+        {
+            if (GiosueEventSource.IsCounting)
+            {
+                interpreter.CountCall();
             }
 
-            interpreter.ExecuteBlock(Declaration.Body, environment);
-            return null;
+            var environment = interpreter.RentEnvironment(Closure, Arity);
+            try
+            {
+                for (int i = 0; i < arguments.Count; i++)
+                {
+                    environment.DefineAt(i, interpreter.EvaluateExpression(arguments[i]));
+                }
+            }
+            catch
+            {
+                interpreter.ReturnEnvironment(environment);
+                throw;
+            }
+
+            return Run(interpreter, environment);
+        }
+
+        /// <summary>
+        /// Calls the function from compiled code.
+        /// </summary>
+        /// <param name="interpreter">The interpreter that runs the function.</param>
+        /// <param name="arguments">The values of the arguments. There must be one for each parameter.</param>
+        /// <returns>The value returned by the function.</returns>
+        internal GiosueValue Call(Interpreter interpreter, GiosueValue[] arguments)
+        {
+            if (GiosueEventSource.IsCounting)
+            {
+                interpreter.CountCall();
+            }
+
+            if (TryGetCompiled(interpreter, out var compiled))
+            {
+                return compiled(interpreter, Closure, arguments);
+            }
+
+            var environment = interpreter.RentEnvironment(Closure, Arity);
+            for (int i = 0; i < arguments.Length; i++)
+            {
+                environment.DefineAt(i, arguments[i]);
+            }
+
+            return Run(interpreter, environment);
+        }
+
+        /// <summary>
+        /// Counts a call to the function and gets its compiled body if it has one.
+        /// </summary>
+        /// <param name="interpreter">The interpreter that is calling the function.</param>
+        /// <param name="compiled">The compiled body, or null if the call should be interpreted.</param>
+        /// <returns>True if the call should run <paramref name="compiled"/>, false otherwise.</returns>
+        private bool TryGetCompiled(Interpreter interpreter, out CompiledFunction compiled)
+        {
+            compiled = null;
+
+            // Compiled code can't be profiled or count steps for a scheduled script, and functions in an arena aren't compiled.
+            if (interpreter.Tiering == null || interpreter.Profiler != null || interpreter.ScheduledTask != null || Declaration == null)
+            {
+                return false;
+            }
+
+            if (Compiled == null)
+            {
+                Tier ??= interpreter.Tiering.GetTier(Declaration);
+                Compiled = Tier.RecordCall();
+            }
+
+            compiled = Compiled;
+            return compiled != null;
+        }
+
+        /// <summary>
+        /// Runs the body of the function in an environment that holds the arguments.
+        /// </summary>
+        /// <param name="interpreter">The interpreter that runs the function.</param>
+        /// <param name="environment">The environment of the call, which is returned to the pool afterward.</param>
+        /// <returns>The value returned by the function.</returns>
+        private GiosueValue Run(Interpreter interpreter, Environment environment)
+        {
+            try
+            {
+                interpreter.CountStep();
+                if (interpreter.Profiler != null)
+                {
+                    interpreter.Profiler.Enter(Name.Lexeme, Name.Line);
+                    try
+                    {
+                        ExecuteBody(interpreter, environment);
+                    }
+                    finally
+                    {
+                        interpreter.Profiler.Exit();
+                    }
+                }
+                else
+                {
+                    ExecuteBody(interpreter, environment);
+                }
+                return interpreter.TakeReturnValue();
+            }
+            finally
+            {
+                interpreter.ReturnEnvironment(environment);
+            }
+        }
+
+        private void ExecuteBody(Interpreter interpreter, Environment environment)
+        {
+            if (Declaration != null)
+            {
+                interpreter.ExecuteBlock(Declaration.Body, environment);
+            }
+            else
+            {
+                interpreter.ExecuteBlock(ArenaDeclaration.Body, environment);
+            }
         }
     }
 }
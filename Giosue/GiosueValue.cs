@@ -0,0 +1,291 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace Giosue
+{
+    /// <summary>
+    /// Represents the type of a <see cref="GiosueValue"/>.
+    /// </summary>
+    public enum GiosueValueType : byte
+    {
+        /// <summary>
+        /// The value <c>niente</c>.
+        /// </summary>
+        Nil,
+
+        /// <summary>
+        /// A <see cref="bool"/>.
+        /// </summary>
+        Bool,
+
+        /// <summary>
+        /// An <see cref="int"/>.
+        /// </summary>
+        Int,
+
+        /// <summary>
+        /// A <see cref="double"/>.
+        /// </summary>
+        Double,
+
+        /// <summary>
+        /// Any other object, such as a <see cref="string"/> or a function.
+        /// </summary>
+        Object,
+    }
+
+    // Design comments:
+    // Every value in a running Giosue program is a `GiosueValue`. Numbers and booleans are
+    // stored inline in `Bits` so arithmetic never boxes; everything else (strings, functions)
+    // is stored in `Reference`. Boxed objects only appear at the edges: literals from the
+    // parser, and values handed to or from .NET code through `FromObject` and `ToObject`.
+    /// <summary>
+    /// Represents a Giosue value without boxing numbers and booleans.
+    /// </summary>
+    public readonly struct GiosueValue : IEquatable<GiosueValue>
+    {
+        /// <summary>
+        /// The value <c>niente</c>.
+        /// </summary>
+        public static readonly GiosueValue Nil = default;
+
+        /// <summary>
+        /// The type of the value.
+        /// </summary>
+        public GiosueValueType Type { get; }
+
+        /// <summary>
+        /// The payload of a <see cref="bool"/>, <see cref="int"/> or <see cref="double"/>.
+        /// </summary>
+        private readonly long Bits;
+
+        /// <summary>
+        /// The payload of an <see cref="GiosueValueType.Object"/>.
+        /// </summary>
+        private readonly object Reference;
+
+        #region Constructors and conversions
+
+        public GiosueValue(bool value)
+        {
+            Type = GiosueValueType.Bool;
+            Bits = value ? 1 : 0;
+            Reference = null;
+        }
+
+        public GiosueValue(int value)
+        {
+            Type = GiosueValueType.Int;
+            Bits = value;
+            Reference = null;
+        }
+
+        public GiosueValue(double value)
+        {
+            Type = GiosueValueType.Double;
+            Bits = BitConverter.DoubleToInt64Bits(value);
+            Reference = null;
+        }
+
+        /// <summary>
+        /// Creates a <see cref="GiosueValue"/> that holds a reference.
+        /// </summary>
+        /// <remarks>
+        /// Use <see cref="FromObject(object)"/> if <paramref name="reference"/> could be a boxed number or boolean.
+        /// </remarks>
+        /// <param name="reference">The object to hold, or null for <c>niente</c>.</param>
+        private GiosueValue(object reference)
+        {
+            Type = reference == null ? GiosueValueType.Nil : GiosueValueType.Object;
+            Bits = 0;
+            Reference = reference;
+        }
+
+        public static implicit operator GiosueValue(bool value) => new(value);
+        public static implicit operator GiosueValue(int value) => new(value);
+        public static implicit operator GiosueValue(double value) => new(value);
+        public static implicit operator GiosueValue(string value) => new((object)value);
+
+        /// <summary>
+        /// Creates a <see cref="GiosueValue"/> from an object, unboxing numbers and booleans.
+        /// </summary>
+        /// <param name="obj">The object.</param>
+        /// <returns>The <see cref="GiosueValue"/> that represents <paramref name="obj"/>.</returns>
+        public static GiosueValue FromObject(object obj)
+        {
+            return obj switch
+            {
+                null => Nil,
+                bool b => new GiosueValue(b),
+                int i => new GiosueValue(i),
+                double d => new GiosueValue(d),
+                GiosueValue v => v,
+                _ => new GiosueValue(obj),
+            };
+        }
+
+        /// <summary>
+        /// Converts the value to an object, boxing numbers and booleans.
+        /// </summary>
+        /// <returns>The value as an object.</returns>
+        public object ToObject()
+        {
+            return Type switch
+            {
+                GiosueValueType.Bool => AsBool,
+                GiosueValueType.Int => AsInt,
+                GiosueValueType.Double => AsDouble,
+                _ => Reference,
+            };
+        }
+
+        #endregion Constructors and conversions
+
+        #region Accessors
+
+        public bool IsNil => Type == GiosueValueType.Nil;
+        public bool IsBool => Type == GiosueValueType.Bool;
+        public bool IsInt => Type == GiosueValueType.Int;
+        public bool IsDouble => Type == GiosueValueType.Double;
+        public bool IsObject => Type == GiosueValueType.Object;
+
+        /// <summary>
+        /// The value as a <see cref="bool"/>.
+        /// </summary>
+        /// <exception cref="InvalidCastException">Thrown if the value is not a <see cref="bool"/>.</exception>
+        public bool AsBool => Type == GiosueValueType.Bool ? Bits != 0 : throw InvalidCast(typeof(bool));
+
+        /// <summary>
+        /// The value as an <see cref="int"/>.
+        /// </summary>
+        /// <exception cref="InvalidCastException">Thrown if the value is not an <see cref="int"/>.</exception>
+        public int AsInt => Type == GiosueValueType.Int ? (int)Bits : throw InvalidCast(typeof(int));
+
+        /// <summary>
+        /// The value as a <see cref="double"/>.
+        /// </summary>
+        /// <exception cref="InvalidCastException">Thrown if the value is not a <see cref="double"/>.</exception>
+        public double AsDouble => Type == GiosueValueType.Double ? BitConverter.Int64BitsToDouble(Bits) : throw InvalidCast(typeof(double));
+
+        /// <summary>
+        /// The value as an object, or null if the value is a number, a boolean or <c>niente</c>.
+        /// </summary>
+        public object AsObject => Reference;
+
+        /// <summary>
+        /// The .NET type of the value, or null for <c>niente</c>.
+        /// </summary>
+        /// <remarks>
+        /// A function compiled to bytecode reports the type of the functions of the tree-walking interpreter,
+        /// so scripts can't tell which engine runs them.
+        /// </remarks>
+        public Type ClrType => Type switch
+        {
+            GiosueValueType.Bool => typeof(bool),
+            GiosueValueType.Int => typeof(int),
+            GiosueValueType.Double => typeof(double),
+            GiosueValueType.Object when Reference is Bytecode.BytecodeFunction => typeof(GiosueFunction),
+            GiosueValueType.Object => Reference.GetType(),
+            _ => null,
+        };
+
+        /// <summary>
+        /// Tests if the value holds an object of type <typeparamref name="T"/>.
+        /// </summary>
+        /// <typeparam name="T">The type to test for.</typeparam>
+        /// <param name="value">The object.</param>
+        /// <returns>True if the value holds an object of type <typeparamref name="T"/>, false otherwise.</returns>
+        public bool TryGetObject<T>(out T value) where T : class
+        {
+            value = Reference as T;
+            return value != null;
+        }
+
+        private InvalidCastException InvalidCast(Type expected)
+        {
+            return new InvalidCastException($"Unable to cast {ClrType?.Name ?? "niente"} to {expected.Name}.");
+        }
+
+        #endregion Accessors
+
+        #region Equality
+
+        /// <summary>
+        /// Tests if two values have the same type.
+        /// </summary>
+        /// <param name="other">The other value.</param>
+        /// <returns>True if both values have the same type, false otherwise.</returns>
+        public bool HasSameTypeAs(GiosueValue other)
+        {
+            if (Type != other.Type)
+            {
+                return false;
+            }
+            return Type != GiosueValueType.Object || Reference.GetType() == other.Reference.GetType();
+        }
+
+        public bool Equals(GiosueValue other)
+        {
+            if (Type != other.Type)
+            {
+                return false;
+            }
+
+            return Type switch
+            {
+                GiosueValueType.Nil => true,
+                GiosueValueType.Double => AsDouble.Equals(other.AsDouble),
+                GiosueValueType.Object => Reference.GetType() == other.Reference.GetType() && Reference.Equals(other.Reference),
+                _ => Bits == other.Bits,
+            };
+        }
+
+        public override bool Equals(object obj)
+        {
+            return obj is GiosueValue other && Equals(other);
+        }
+
+        public override int GetHashCode()
+        {
+            return Type == GiosueValueType.Object ? Reference.GetHashCode() : HashCode.Combine(Type, Bits);
+        }
+
+        public static bool operator ==(GiosueValue left, GiosueValue right) => left.Equals(right);
+        public static bool operator !=(GiosueValue left, GiosueValue right) => !left.Equals(right);
+
+        #endregion Equality
+
+        public override string ToString()
+        {
+            return Type switch
+            {
+                GiosueValueType.Bool => AsBool.ToString(),
+                GiosueValueType.Int => AsInt.ToString(),
+                GiosueValueType.Double => AsDouble.ToString(),
+                GiosueValueType.Object => Reference.ToString(),
+                _ => "niente",
+            };
+        }
+    }
+}
@@ -0,0 +1,107 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace Giosue
+{
+    // Design comments:
+    // A host that runs the same prelude before every snippet can run it once, take a
+    // snapshot, and fork an interpreter from the snapshot for each snippet instead of
+    // registering the builtins and running the prelude again.
+    // Taking a snapshot copies the global bindings once, so the interpreter it came from
+    // can keep running without changing it. A fork doesn't copy anything: its globals read
+    // through to the snapshot, and a binding is only copied into the fork when the fork
+    // defines or assigns it.
+    // Functions don't look globals up through their closure: the interpreter that calls a
+    // function resolves its globals in its own `Globals`. So a function from the prelude,
+    // or a closure that one of them made, reads and writes the globals of the fork that
+    // calls it, never the ones of the interpreter the snapshot came from. Each fork gets its
+    // own copy of a function the first time it reads it, so the forks count calls apart for
+    // tiering; the copy shares the declaration and any compiled code with the original.
+    // Copy-on-write is per binding: the objects that bindings refer to are still shared by
+    // every fork. An array, or a local variable that a closure in the prelude captured, is
+    // the same object in every fork, so the forks see each other's writes to it, and forks
+    // that write shared state like that must not run on different threads at the same time.
+    // Forks of a snapshot that holds only immutable values, such as the builtins and
+    // functions that don't capture locals, share nothing that changes.
+    /// <summary>
+    /// The global variables of an <see cref="Interpreter"/> at one moment, which new interpreters can be forked from.
+    /// </summary>
+    public sealed class GlobalsSnapshot
+    {
+        /// <summary>
+        /// The global variables, keyed by the <see cref="SymbolTable"/> symbol of the name.
+        /// </summary>
+        internal readonly Dictionary<int, GiosueValue> Variables;
+
+        /// <summary>
+        /// Takes a snapshot of global variables.
+        /// </summary>
+        /// <param name="globals">The global variables.</param>
+        internal GlobalsSnapshot(Environment globals)
+        {
+            Variables = globals.CopyVariables();
+        }
+
+        /// <summary>
+        /// The number of global variables in the snapshot.
+        /// </summary>
+        public int Count => Variables.Count;
+
+        /// <summary>
+        /// Creates a new <see cref="Interpreter"/> whose globals start as the ones in the snapshot.
+        /// </summary>
+        /// <remarks>
+        /// The new interpreter has no <see cref="Interpreter.Profiler"/> or <see cref="Interpreter.Tiering"/>,
+        /// and writes to <see cref="Console.Out"/>.
+        /// </remarks>
+        /// <returns>The new interpreter.</returns>
+        public Interpreter Fork()
+        {
+            return new Interpreter(this);
+        }
+
+        /// <summary>
+        /// Gets the value a fork sees for a variable in the snapshot.
+        /// </summary>
+        /// <param name="symbol">The symbol of the name of the variable.</param>
+        /// <param name="value">The value of the variable.</param>
+        /// <param name="isCopied">True if <paramref name="value"/> is a copy of a function that the fork should keep, false otherwise.</param>
+        /// <returns>True if the variable is in the snapshot, false otherwise.</returns>
+        internal bool TryGetValue(int symbol, out GiosueValue value, out bool isCopied)
+        {
+            isCopied = false;
+            if (!Variables.TryGetValue(symbol, out value))
+            {
+                return false;
+            }
+
+            if (value.TryGetObject<GiosueFunction>(out var function))
+            {
+                value = GiosueValue.FromObject(function.Copy());
+                isCopied = true;
+            }
+            return true;
+        }
+    }
+}
@@ -34,6 +34,6 @@ namespace Giosue
         /// </summary>
         int Arity { get; }
 
-        object Call(Interpreter interpreter, List<object> arguments);
+        GiosueValue Call(Interpreter interpreter, List<GiosueValue> arguments);
     }
 }
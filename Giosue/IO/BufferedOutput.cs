@@ -0,0 +1,309 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.IO
+{
+    /// <summary>
+    /// When a <see cref="BufferedOutput"/> writes its buffer to its destination.
+    /// </summary>
+    public enum OutputFlushPolicy
+    {
+        /// <summary>
+        /// When a newline is written, when the buffer is full, and when the output is flushed or disposed.
+        /// </summary>
+        OnNewLine,
+
+        /// <summary>
+        /// When the buffer is full, and when the output is flushed or disposed.
+        /// </summary>
+        WhenFull,
+
+        /// <summary>
+        /// Only when the output is flushed or disposed; the buffer grows to hold everything written until then.
+        /// </summary>
+        OnExit,
+    }
+
+    // Design comments:
+    // `Console.Out` flushes after every write and takes a lock to do it, so a script that
+    // prints a line at a time makes a system call per line. A `BufferedOutput` collects the
+    // characters in its own buffer and hands them to the destination in large pieces; when
+    // that happens is decided by the `OutputFlushPolicy`.
+    // The destination is any `TextWriter`: the console (`OpenConsole` writes to the standard
+    // output stream directly, bypassing `Console.Out`), a file (`OpenFile`), memory (a
+    // `StringWriter`), or nothing (`TextWriter.Null`, which needs no buffer at all).
+    // Numbers are formatted straight into the buffer, so printing them doesn't allocate.
+    // A `BufferedOutput` is not thread safe; each interpreter should have its own.
+    /// <summary>
+    /// Buffers text before writing it to another <see cref="TextWriter"/>.
+    /// </summary>
+    public class BufferedOutput : TextWriter
+    {
+        /// <summary>
+        /// The number of characters buffered if no size is given.
+        /// </summary>
+        public const int DefaultBufferSize = 64 * 1024;
+
+        /// <summary>
+        /// The most characters a formatted number can take up.
+        /// </summary>
+        private const int MaximumNumberLength = 64;
+
+        /// <summary>
+        /// The writer that the buffer is flushed to.
+        /// </summary>
+        public TextWriter Destination { get; }
+
+        /// <summary>
+        /// When the buffer is written to <see cref="Destination"/>.
+        /// </summary>
+        public OutputFlushPolicy FlushPolicy { get; }
+
+        /// <summary>
+        /// Indicates if <see cref="Destination"/> is disposed with this <see cref="BufferedOutput"/>.
+        /// </summary>
+        private readonly bool OwnsDestination;
+
+        /// <summary>
+        /// Indicates if every write is passed on to <see cref="Destination"/> immediately.
+        /// </summary>
+        private readonly bool IsWriteThrough;
+
+        private char[] Buffer;
+
+        /// <summary>
+        /// The number of characters in <see cref="Buffer"/>.
+        /// </summary>
+        private int Length = 0;
+
+        private bool IsDisposed = false;
+
+        /// <inheritdoc/>
+        public override Encoding Encoding => Destination.Encoding;
+
+        /// <summary>
+        /// Creates a new <see cref="BufferedOutput"/>.
+        /// </summary>
+        /// <param name="destination">The writer to write the buffered text to.</param>
+        /// <param name="bufferSize">The number of characters to buffer; zero writes everything through immediately.</param>
+        /// <param name="flushPolicy">When the buffer is written to <paramref name="destination"/>.</param>
+        /// <param name="ownsDestination">True if <paramref name="destination"/> should be disposed with this <see cref="BufferedOutput"/>.</param>
+        public BufferedOutput(TextWriter destination, int bufferSize = DefaultBufferSize, OutputFlushPolicy flushPolicy = OutputFlushPolicy.WhenFull, bool ownsDestination = false)
+            : base(destination?.FormatProvider)
+        {
+            // The destination of a {nameof(BufferedOutput)} cannot be null.
+            Destination = destination ?? throw new ArgumentNullException(nameof(destination), $"La destinazione di un {nameof(BufferedOutput)} non può essere nulla.");
+
+            if (bufferSize < 0)
+            {
+                // The buffer size cannot be negative.
+                throw new ArgumentOutOfRangeException(nameof(bufferSize), bufferSize, "La dimensione del buffer non può essere negativa.");
+            }
+
+            Buffer = new char[Math.Max(bufferSize, MaximumNumberLength)];
+            FlushPolicy = bufferSize == 0 ? OutputFlushPolicy.OnNewLine : flushPolicy;
+            OwnsDestination = ownsDestination;
+            NewLine = destination.NewLine;
+            IsWriteThrough = bufferSize == 0;
+        }
+
+        /// <summary>
+        /// Creates a <see cref="BufferedOutput"/> that writes to the standard output stream.
+        /// </summary>
+        /// <param name="bufferSize">The number of characters to buffer.</param>
+        /// <param name="flushPolicy">When the buffer is written to the standard output stream.</param>
+        /// <returns>The <see cref="BufferedOutput"/>.</returns>
+        public static BufferedOutput OpenConsole(int bufferSize = DefaultBufferSize, OutputFlushPolicy flushPolicy = OutputFlushPolicy.WhenFull)
+        {
+            // Console.OutputEncoding has a byte order mark if it's UTF-8, which shouldn't be written to the console.
+            var encoding = Console.OutputEncoding.CodePage == Encoding.UTF8.CodePage ? new UTF8Encoding(false) : Console.OutputEncoding;
+            var writer = new StreamWriter(Console.OpenStandardOutput(), encoding, Math.Max(bufferSize, 1024)) { AutoFlush = false };
+            return new BufferedOutput(writer, bufferSize, flushPolicy, ownsDestination: true);
+        }
+
+        /// <summary>
+        /// Creates a <see cref="BufferedOutput"/> that writes to a file, replacing the file if it exists.
+        /// </summary>
+        /// <param name="path">The path of the file.</param>
+        /// <param name="bufferSize">The number of characters to buffer.</param>
+        /// <param name="flushPolicy">When the buffer is written to the file.</param>
+        /// <returns>The <see cref="BufferedOutput"/>.</returns>
+        public static BufferedOutput OpenFile(string path, int bufferSize = DefaultBufferSize, OutputFlushPolicy flushPolicy = OutputFlushPolicy.WhenFull)
+        {
+            var writer = new StreamWriter(path, false, new UTF8Encoding(false), Math.Max(bufferSize, 1024));
+            return new BufferedOutput(writer, bufferSize, flushPolicy, ownsDestination: true);
+        }
+
+        #region Writing
+
+        /// <inheritdoc/>
+        public override void Write(char value)
+        {
+            if (Length == Buffer.Length)
+            {
+                MakeRoom(1);
+            }
+
+            Buffer[Length++] = value;
+            if ((value == '\n' && FlushPolicy == OutputFlushPolicy.OnNewLine) || IsWriteThrough)
+            {
+                Flush();
+            }
+        }
+
+        /// <inheritdoc/>
+        public override void Write(string value)
+        {
+            if (value != null)
+            {
+                Write(value.AsSpan());
+            }
+        }
+
+        /// <inheritdoc/>
+        public override void Write(char[] buffer, int index, int count)
+        {
+            Write(buffer.AsSpan(index, count));
+        }
+
+        /// <inheritdoc/>
+        public override void Write(ReadOnlySpan<char> buffer)
+        {
+            while (buffer.Length > 0)
+            {
+                if (Length == Buffer.Length)
+                {
+                    MakeRoom(buffer.Length);
+                }
+
+                var count = Math.Min(buffer.Length, Buffer.Length - Length);
+                buffer[..count].CopyTo(Buffer.AsSpan(Length));
+                Length += count;
+
+                // The newline check only looks at what was just copied.
+                if (FlushPolicy == OutputFlushPolicy.OnNewLine && buffer[..count].Contains('\n'))
+                {
+                    Flush();
+                }
+
+                buffer = buffer[count..];
+            }
+
+            if (IsWriteThrough)
+            {
+                Flush();
+            }
+        }
+
+        /// <inheritdoc/>
+        public override void WriteLine()
+        {
+            Write(CoreNewLine.AsSpan());
+        }
+
+        /// <inheritdoc/>
+        public override void WriteLine(string value)
+        {
+            Write(value);
+            Write(CoreNewLine.AsSpan());
+        }
+
+        /// <inheritdoc/>
+        public override void Write(int value)
+        {
+            if (Buffer.Length - Length < MaximumNumberLength)
+            {
+                MakeRoom(MaximumNumberLength);
+            }
+
+            value.TryFormat(Buffer.AsSpan(Length), out var charactersWritten, provider: FormatProvider);
+            Length += charactersWritten;
+            if (IsWriteThrough)
+            {
+                Flush();
+            }
+        }
+
+        /// <inheritdoc/>
+        public override void Write(double value)
+        {
+            if (Buffer.Length - Length < MaximumNumberLength)
+            {
+                MakeRoom(MaximumNumberLength);
+            }
+
+            value.TryFormat(Buffer.AsSpan(Length), out var charactersWritten, provider: FormatProvider);
+            Length += charactersWritten;
+            if (IsWriteThrough)
+            {
+                Flush();
+            }
+        }
+
+        /// <summary>
+        /// Makes room in the buffer by flushing it or, if the policy is <see cref="OutputFlushPolicy.OnExit"/>, by growing it.
+        /// </summary>
+        /// <param name="needed">The number of characters that are about to be written.</param>
+        private void MakeRoom(int needed)
+        {
+            if (FlushPolicy != OutputFlushPolicy.OnExit)
+            {
+                Flush();
+                return;
+            }
+
+            Array.Resize(ref Buffer, Math.Max(Buffer.Length * 2, Length + needed));
+        }
+
+        #endregion Writing
+
+        /// <summary>
+        /// Writes the buffered characters to <see cref="Destination"/> and flushes it.
+        /// </summary>
+        public override void Flush()
+        {
+            if (Length > 0)
+            {
+                Destination.Write(Buffer, 0, Length);
+                Length = 0;
+            }
+            Destination.Flush();
+        }
+
+        /// <inheritdoc/>
+        protected override void Dispose(bool disposing)
+        {
+            if (disposing && !IsDisposed)
+            {
+                IsDisposed = true;
+                Flush();
+                if (OwnsDestination)
+                {
+                    Destination.Dispose();
+                }
+            }
+            base.Dispose(disposing);
+        }
+    }
+}
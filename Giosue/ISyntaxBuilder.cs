@@ -0,0 +1,103 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace Giosue
+{
+    // Design comments:
+    // The parser doesn't make nodes itself. It hands every piece of syntax to an
+    // `ISyntaxBuilder` as soon as it has been parsed, children first, and gets back whatever
+    // the builder uses to stand for it. `TreeBuilder` makes the tree classes, which the
+    // optimizer and the resolver then rewrite; `Arena.ArenaBuilder` writes the nodes straight
+    // into a `SyntaxArena`, so a script run from an arena never exists as trees at all.
+    // The builder is also told when a block or a function body begins, before any of the
+    // statements in it are parsed. Together with the order in which the nodes arrive, that is
+    // the order in which the `Resolver` visits the trees, so a builder can resolve variables
+    // as they are parsed.
+    /// <summary>
+    /// Makes the nodes for the syntax that a <see cref="Parser{TExpression, TStatement}"/> parses.
+    /// </summary>
+    /// <typeparam name="TExpression">The type that stands for an expression.</typeparam>
+    /// <typeparam name="TStatement">The type that stands for a statement.</typeparam>
+    public interface ISyntaxBuilder<TExpression, TStatement>
+    {
+        /// <summary>
+        /// Stands for a missing expression, such as the value of a <c>ritorna</c> without one.
+        /// </summary>
+        TExpression NoExpression { get; }
+
+        /// <summary>
+        /// Stands for a missing statement, such as the else branch of an if statement without one.
+        /// </summary>
+        TStatement NoStatement { get; }
+
+        TExpression Literal(object value);
+
+        TExpression Grouping(TExpression expression);
+
+        TExpression Variable(Token name);
+
+        /// <summary>
+        /// Tests if an expression can be assigned to.
+        /// </summary>
+        /// <param name="expression">The expression on the left of the <c>=</c>.</param>
+        /// <param name="name">The name of the variable that the expression reads.</param>
+        /// <returns>True if the expression is a variable, false otherwise.</returns>
+        bool TryGetVariableName(TExpression expression, out Token name);
+
+        TExpression Assign(Token name, TExpression value);
+
+        TExpression Binary(TExpression left, Token @operator, TExpression right);
+
+        TExpression Logical(TExpression left, Token @operator, TExpression right);
+
+        TExpression Unary(Token @operator, TExpression right);
+
+        TExpression Call(TExpression callee, Token paren, List<TExpression> arguments);
+
+        TStatement Expression(TExpression expression);
+
+        TStatement Var(Token name, TExpression initializer);
+
+        /// <summary>
+        /// Called after the <c>{</c> of a block statement, before its statements are parsed.
+        /// </summary>
+        void BeginBlock();
+
+        TStatement Block(List<TStatement> statements);
+
+        TStatement If(TExpression condition, TStatement thenBranch, TStatement elseBranch);
+
+        TStatement While(Token keyword, TExpression condition, TStatement body);
+
+        TStatement Return(Token keyword, TExpression value);
+
+        /// <summary>
+        /// Called after the parameters of a function, before its body is parsed.
+        /// </summary>
+        /// <param name="name">The name of the function.</param>
+        /// <param name="parameters">The parameters of the function.</param>
+        void BeginFunction(Token name, List<Token> parameters);
+
+        TStatement Function(Token name, List<Token> parameters, List<TStatement> body);
+    }
+}
@@ -18,58 +18,259 @@
 
 using System;
 using System.Collections.Generic;
+using System.IO;
 using System.Linq;
 using System.Text;
+using System.Threading;
 using System.Threading.Tasks;
 using Giosue.Exceptions;
 using Giosue.Builtins;
+using Giosue.Builtins.Arrays;
 using Giosue.Builtins.Casts;
 using Giosue.Builtins.ForeignFunctionInterface;
+using Giosue.Profiling;
+using Giosue.Tiering;
 
 using CastToString = Giosue.Builtins.Casts.ToString;
 
 namespace Giosue
 {
-    public class Interpreter : AST.IVisitor<object>, Statements.IVisitor<object>
+    // Design comments:
+    // `ritorna` doesn't throw. It stores the value in `ReturnValue` and sets `IsReturning`,
+    // and every statement list and loop stops as soon as the flag is set, so the value is
+    // handed back to `GiosueFunction.Call` without unwinding the .NET stack.
+    // Block and call environments are rented from `EnvironmentPool` and returned when the
+    // block or call ends, unless a closure captured them (see `Environment`).
+    // The trees are visited through the generated dispatchers rather than `Accept`: they switch
+    // on the tree's `Kind` and call a struct visitor, so each visit is a direct call instead of
+    // two virtual calls, and statements don't return a value that is thrown away.
+    // The interpreter also runs code stored in a `SyntaxArena`; those visitors mirror the ones
+    // for the trees.
+    // A global is always looked up in the interpreter's own `Globals`, not through the
+    // environment of the running code, so a function that came from a `GlobalsSnapshot`
+    // reads and writes the globals of the fork that calls it.
+    // While a listener has the `GiosueEventSource` counters on, the interpreter counts nodes,
+    // calls and environments in batches of its own, and adds what's left of them, and the
+    // bytes the run allocated, when each call to `Interpret` ends.
+    public class Interpreter : Arena.IVisitor<GiosueValue>
     {
-        internal readonly Environment Globals = new();
+        /// <summary>
+        /// The most environments that are kept in <see cref="EnvironmentPool"/>.
+        /// </summary>
+        private const int MaximumPooledEnvironments = 256;
+
+        internal readonly Environment Globals;
         public Environment Environment;
 
-        public Interpreter(Environment oldEnvironment = null)
+        /// <summary>
+        /// Environments that are no longer used and can be reset for another block or call.
+        /// </summary>
+        private readonly Stack<Environment> EnvironmentPool = new();
+
+        /// <summary>
+        /// Indicates if a <c>ritorna</c> statement has run and the current function is returning.
+        /// </summary>
+        private bool IsReturning = false;
+
+        /// <summary>
+        /// The value of the last <c>ritorna</c> statement.
+        /// </summary>
+        private GiosueValue ReturnValue = GiosueValue.Nil;
+
+        /// <summary>
+        /// The profiler that measures functions and loops, or null to not profile.
+        /// </summary>
+        public Profiler Profiler { get; set; } = null;
+
+        /// <summary>
+        /// Compiles the functions that are called often, or null to interpret every function.
+        /// </summary>
+        /// <remarks>
+        /// Functions are not compiled while <see cref="Profiler"/> is set.
+        /// </remarks>
+        public TieredCompilation Tiering { get; set; } = null;
+
+        /// <summary>
+        /// The writer that <c>Scrive</c> and <c>ScriveLina</c> write to.
+        /// </summary>
+        /// <remarks>
+        /// Interpreters that run at the same time should each have their own writer, or share one that is synchronized.
+        /// The writer is flushed if a run is stopped by an exception; otherwise the host flushes it when it's done.
+        /// Use an <see cref="IO.BufferedOutput"/> for scripts that print a lot.
+        /// </remarks>
+        public TextWriter Output { get; set; } = Console.Out;
+
+        private CounterBatch EvaluatedNodes = new(GiosueCounter.NodesEvaluated);
+        private CounterBatch FunctionCalls = new(GiosueCounter.FunctionCalls);
+        private CounterBatch CreatedEnvironments = new(GiosueCounter.EnvironmentsCreated);
+
+        /// <summary>
+        /// Creates a new <see cref="Interpreter"/> whose globals are the builtins.
+        /// </summary>
+        /// <remarks>
+        /// To keep variables between runs, keep the interpreter, or use a <see cref="Session"/>.
+        /// </remarks>
+        public Interpreter()
         {
-            // If no old environment is given, add globals.
-            if (oldEnvironment == null)
-            {
-                Environment = Globals;
-                Globals.DefineOrOverwrite(TimeMillis.Name, new TimeMillis());
-                Globals.DefineOrOverwrite(Print.Name, new Print());
-                Globals.DefineOrOverwrite(PrintLine.Name, new PrintLine());
-                Globals.DefineOrOverwrite(GetTypeOf.Name, new GetTypeOf());
+            Globals = new();
+            Environment = Globals;
+            Globals.DefineOrOverwrite(TimeMillis.Name, GiosueValue.FromObject(new TimeMillis()));
+            Globals.DefineOrOverwrite(Sleep.Name, GiosueValue.FromObject(new Sleep()));
+            Globals.DefineOrOverwrite(Print.Name, GiosueValue.FromObject(new Print()));
+            Globals.DefineOrOverwrite(PrintLine.Name, GiosueValue.FromObject(new PrintLine()));
+            Globals.DefineOrOverwrite(GetTypeOf.Name, GiosueValue.FromObject(new GetTypeOf()));
+
+            Globals.DefineOrOverwrite(CastToString.Name, GiosueValue.FromObject(new CastToString()));
+            Globals.DefineOrOverwrite(ToBool.Name, GiosueValue.FromObject(new ToBool()));
+            Globals.DefineOrOverwrite(ToInt.Name, GiosueValue.FromObject(new ToInt())); 
+            Globals.DefineOrOverwrite(ToDouble.Name, GiosueValue.FromObject(new ToDouble()));
+
+            Globals.DefineOrOverwrite(NewIntArray.Name, GiosueValue.FromObject(new NewIntArray()));
+            Globals.DefineOrOverwrite(NewDoubleArray.Name, GiosueValue.FromObject(new NewDoubleArray()));
+            Globals.DefineOrOverwrite(NewArray.Name, GiosueValue.FromObject(new NewArray()));
+            Globals.DefineOrOverwrite(ArrayGet.Name, GiosueValue.FromObject(new ArrayGet()));
+            Globals.DefineOrOverwrite(ArraySet.Name, GiosueValue.FromObject(new ArraySet()));
+            Globals.DefineOrOverwrite(ArrayLength.Name, GiosueValue.FromObject(new ArrayLength()));
+            Globals.DefineOrOverwrite(ArraySlice.Name, GiosueValue.FromObject(new ArraySlice()));
+            Globals.DefineOrOverwrite(ArraySum.Name, GiosueValue.FromObject(new ArraySum()));
+            Globals.DefineOrOverwrite(ArrayMin.Name, GiosueValue.FromObject(new ArrayMin()));
+            Globals.DefineOrOverwrite(ArrayMax.Name, GiosueValue.FromObject(new ArrayMax()));
+            Globals.DefineOrOverwrite(ArrayScale.Name, GiosueValue.FromObject(new ArrayScale()));
+            Globals.DefineOrOverwrite(ArrayAdd.Name, GiosueValue.FromObject(new ArrayAdd()));
+        }
 
-                Globals.DefineOrOverwrite(CastToString.Name, new CastToString());
-                Globals.DefineOrOverwrite(ToBool.Name, new ToBool());
-                Globals.DefineOrOverwrite(ToInt.Name, new ToInt()); 
-                Globals.DefineOrOverwrite(ToDouble.Name, new ToDouble());
-            }
-            else
-            {
-                Environment = new Environment(oldEnvironment);
-            }
+        /// <summary>
+        /// Creates a new <see cref="Interpreter"/> whose globals start as the ones in a snapshot.
+        /// </summary>
+        /// <param name="snapshot">The snapshot of the globals.</param>
+        /// <seealso cref="GlobalsSnapshot.Fork"/>
+        internal Interpreter(GlobalsSnapshot snapshot)
+        {
+            // The builtins are already in the snapshot.
+            Globals = new Environment(snapshot);
+            Environment = Globals;
+        }
+
+        /// <summary>
+        /// Takes a snapshot of the global variables, which new interpreters can be forked from.
+        /// </summary>
+        /// <remarks>
+        /// Take the snapshot between runs, not while code is running.
+        /// </remarks>
+        /// <returns>The snapshot.</returns>
+        public GlobalsSnapshot Snapshot()
+        {
+            return new GlobalsSnapshot(Globals);
         }
 
         #region Interpreting and evaluating
 
-        public object Interpret(AST.Expression expression)
+        public GiosueValue Interpret(AST.Expression expression)
         {
-            return EvaluateExpression(expression);
+            var allocatedBefore = BeginMetrics();
+            try
+            {
+                return EvaluateExpression(expression);
+            }
+            catch (Exception e)
+            {
+                CountError(e);
+                throw;
+            }
+            finally
+            {
+                EndMetrics(allocatedBefore);
+            }
         }
 
+        /// <summary>
+        /// Executes a list of statements.
+        /// </summary>
+        /// <remarks>
+        /// The statements must have been run through a <see cref="Resolver"/> first.
+        /// </remarks>
+        /// <param name="statements">The statements to execute.</param>
         public void Interpret(List<Statements.Statement> statements)
         {
-            foreach (var statement in statements)
+            var allocatedBefore = BeginMetrics();
+            try
+            {
+                foreach (var statement in statements)
+                {
+                    ExecuteStatement(statement);
+                }
+            }
+            catch (Exception e)
+            {
+                CountError(e);
+
+                // Whatever was printed before the error should come out before the error is reported.
+                Output.Flush();
+                throw;
+            }
+            finally
+            {
+                EndMetrics(allocatedBefore);
+            }
+        }
+
+        /// <summary>
+        /// Executes one top-level statement.
+        /// </summary>
+        /// <remarks>
+        /// The statement must have been run through a <see cref="Resolver"/> first.
+        /// </remarks>
+        /// <param name="statement">The statement to execute.</param>
+        public void Interpret(Statements.Statement statement)
+        {
+            var allocatedBefore = BeginMetrics();
+            try
             {
                 ExecuteStatement(statement);
             }
+            catch (Exception e)
+            {
+                CountError(e);
+
+                // Whatever was printed before the error should come out before the error is reported.
+                Output.Flush();
+                throw;
+            }
+            finally
+            {
+                EndMetrics(allocatedBefore);
+            }
+        }
+
+        /// <summary>
+        /// Executes a list of statements in a <see cref="Arena.SyntaxArena"/>.
+        /// </summary>
+        /// <remarks>
+        /// The statements must have been run through a <see cref="Resolver"/> before they were added to the arena.
+        /// </remarks>
+        /// <param name="statements">The statements to execute.</param>
+        public void Interpret(Arena.NodeList statements)
+        {
+            var allocatedBefore = BeginMetrics();
+            try
+            {
+                foreach (var statement in statements)
+                {
+                    ExecuteStatement(statement);
+                }
+            }
+            catch (Exception e)
+            {
+                CountError(e);
+
+                // Whatever was printed before the error should come out before the error is reported.
+                Output.Flush();
+                throw;
+            }
+            finally
+            {
+                EndMetrics(allocatedBefore);
+            }
         }
 
         private void ExecuteStatement(Statements.Statement statement)
@@ -78,15 +279,51 @@ namespace Giosue
             {
                 throw new InterpreterException(InterpreterExceptionType.Unknown, "The given statement is null.");
             }
-            statement.Accept(this);
+            if (GiosueEventSource.IsCounting)
+            {
+                EvaluatedNodes.Increment();
+            }
+            var executor = new StatementExecutor(this);
+            Statements.StatementDispatcher.Accept(statement, ref executor);
         }
 
-        private object EvaluateExpression(AST.Expression expression)
+        internal GiosueValue EvaluateExpression(AST.Expression expression)
         {
             if (expression == null)
             {
                 throw new InterpreterException(InterpreterExceptionType.Unknown, "The given expression is null.");
             }
+            if (GiosueEventSource.IsCounting)
+            {
+                EvaluatedNodes.Increment();
+            }
+            var evaluator = new ExpressionEvaluator(this);
+            return AST.ExpressionDispatcher.Accept<GiosueValue, ExpressionEvaluator>(expression, ref evaluator);
+        }
+
+        private void ExecuteStatement(Arena.NodeRef statement)
+        {
+            if (statement.IsNone)
+            {
+                throw new InterpreterException(InterpreterExceptionType.Unknown, "The given statement is null.");
+            }
+            if (GiosueEventSource.IsCounting)
+            {
+                EvaluatedNodes.Increment();
+            }
+            statement.Accept(this);
+        }
+
+        internal GiosueValue EvaluateExpression(Arena.NodeRef expression)
+        {
+            if (expression.IsNone)
+            {
+                throw new InterpreterException(InterpreterExceptionType.Unknown, "The given expression is null.");
+            }
+            if (GiosueEventSource.IsCounting)
+            {
+                EvaluatedNodes.Increment();
+            }
             return expression.Accept(this);
         }
 
@@ -97,7 +334,14 @@ namespace Giosue
             try
             {
                 Environment = environment;
-                statements.ForEach(ExecuteStatement);
+                foreach (var statement in statements)
+                {
+                    ExecuteStatement(statement);
+                    if (IsReturning)
+                    {
+                        break;
+                    }
+                }
             }
             finally
             {
@@ -105,237 +349,598 @@ namespace Giosue
             }
         }
 
-        #endregion Interpreting and evaluating
-
-        private static string Stringify(object obj)
+        public void ExecuteBlock(Arena.NodeList statements, Environment environment)
         {
-            return obj?.ToString() ?? "niente";
+            var previousEnvironment = Environment;
+
+            try
+            {
+                Environment = environment;
+                foreach (var statement in statements)
+                {
+                    ExecuteStatement(statement);
+                    if (IsReturning)
+                    {
+                        break;
+                    }
+                }
+            }
+            finally
+            {
+                Environment = previousEnvironment;
+            }
         }
 
-        #region Comparisons and equality
+        /// <summary>
+        /// Gets the value returned by the function that just finished and stops returning.
+        /// </summary>
+        /// <returns>The value of the <c>ritorna</c> statement, or <c>niente</c> if the function ended without one.</returns>
+        internal GiosueValue TakeReturnValue()
+        {
+            var value = IsReturning ? ReturnValue : GiosueValue.Nil;
+            IsReturning = false;
+            ReturnValue = GiosueValue.Nil;
+            return value;
+        }
 
-        private static bool IsTruthy(object expression)
+        /// <summary>
+        /// Gets an environment for a block or call, reusing one from the pool if possible.
+        /// </summary>
+        /// <param name="parentEnvironment">The parent of the environment.</param>
+        /// <param name="slotCount">The number of slots that are known to be needed.</param>
+        /// <returns>The environment.</returns>
+        internal Environment RentEnvironment(Environment parentEnvironment, int slotCount)
         {
-            if (expression is bool b)
+            if (GiosueEventSource.IsCounting)
             {
-                return b;
+                CountEnvironment(parentEnvironment, EnvironmentPool.Count == 0);
             }
 
-            // TODO: Everything else except true and false should not be a bool.
-            return true;
+            if (EnvironmentPool.TryPop(out var environment))
+            {
+                environment.Reset(parentEnvironment, slotCount);
+                return environment;
+            }
+
+            environment = new Environment(parentEnvironment);
+            environment.Reset(parentEnvironment, slotCount);
+            return environment;
         }
 
-        private static bool AreEqual(object a, object b)
+        /// <summary>
+        /// Puts an environment back in the pool once its block or call has ended.
+        /// </summary>
+        /// <param name="environment">The environment.</param>
+        internal void ReturnEnvironment(Environment environment)
         {
-            if (a == null)
+            // A captured environment lives on in its closure.
+            if (environment.IsCaptured || EnvironmentPool.Count >= MaximumPooledEnvironments)
             {
-                if (b == null)
-                {
-                    return true;
-                }
-                return false;
+                return;
             }
 
-            return (a.GetType() == b.GetType()) && a.Equals(b);
+            environment.Clear();
+            EnvironmentPool.Push(environment);
         }
 
-        private static int? CompareObjects(object left, object right)
+        #endregion Interpreting and evaluating
+
+        #region Metrics
+
+        /// <summary>
+        /// Starts measuring a run for the <see cref="GiosueEventSource"/> counters.
+        /// </summary>
+        /// <returns>The number of bytes the thread had allocated, or -1 if the counters are off.</returns>
+        internal long BeginMetrics()
         {
-            // By the rules of IComparable.CompareTo, 0 means two objects are equal
-            if (left == null && right == null)
+            return GiosueEventSource.IsCounting ? GC.GetAllocatedBytesForCurrentThread() : -1;
+        }
+
+        /// <summary>
+        /// Adds what a run counted to the <see cref="GiosueEventSource"/> counters.
+        /// </summary>
+        /// <param name="allocatedBefore">The value returned by <see cref="BeginMetrics"/> when the run started.</param>
+        internal void EndMetrics(long allocatedBefore)
+        {
+            if (allocatedBefore >= 0)
             {
-                return 0;
+                GiosueEventSource.Log.Add(GiosueCounter.AllocatedBytes, GC.GetAllocatedBytesForCurrentThread() - allocatedBefore);
             }
-            if (left is IComparable l && right is IComparable r)
+
+            // The batches are empty unless the counters were on at some point.
+            EvaluatedNodes.Flush();
+            FunctionCalls.Flush();
+            CreatedEnvironments.Flush();
+        }
+
+        /// <summary>
+        /// Counts an error that stopped a run, if it's about mismatched types.
+        /// </summary>
+        /// <remarks>
+        /// Errors are counted when they stop a run rather than when they're created, because the
+        /// <see cref="Optimizer"/> creates and ignores them while it tries to fold constants.
+        /// </remarks>
+        /// <param name="error">The error.</param>
+        internal static void CountError(Exception error)
+        {
+            if (GiosueEventSource.IsCounting
+                && (error is MismatchedTypeException || error is InterpreterException { ExceptionType: InterpreterExceptionType.MismatchedTypes }))
             {
-                return l.CompareTo(r);
+                GiosueEventSource.Log.Add(GiosueCounter.MismatchedTypeErrors, 1);
             }
-            return null;
         }
 
-        private static int CompareNumbers(object left, object right)
+        /// <summary>
+        /// Counts a call to a function.
+        /// </summary>
+        internal void CountCall()
+        {
+            FunctionCalls.Increment();
+        }
+
+        /// <summary>
+        /// Counts an environment that is about to be rented, and how deep its chain is.
+        /// </summary>
+        /// <param name="parentEnvironment">The parent of the environment.</param>
+        /// <param name="isNew">True if the pool is empty and the environment will be created, false otherwise.</param>
+        private void CountEnvironment(Environment parentEnvironment, bool isNew)
         {
-            if (left is int li)
+            if (isNew)
             {
-                if (right is int ri)
-                {
-                    // This will have a value because int is IComparable
-                    return CompareObjects(li, ri).Value;
-                }
-                throw new MismatchedTypeException(typeof(int), right.GetType());
+                CreatedEnvironments.Increment();
             }
-            if (left is double ld)
+
+            GiosueEventSource.Log.ReportEnvironmentDepth(parentEnvironment == null ? 1 : parentEnvironment.CountDepth() + 1);
+        }
+
+        #endregion Metrics
+
+        #region Suspension
+
+        /// <summary>
+        /// Indicates if the builtin that is running can suspend the script instead of blocking its thread.
+        /// </summary>
+        /// <remarks>
+        /// Only true while a <see cref="Bytecode.VirtualMachine"/> running a slice calls a builtin (see <see cref="Bytecode.VirtualMachine.RunSlice(int)"/>).
+        /// </remarks>
+        internal bool CanSuspend { get; set; } = false;
+
+        /// <summary>
+        /// How long the script asked to be suspended for, or null if it didn't.
+        /// </summary>
+        private TimeSpan? SuspensionDelay = null;
+
+        /// <summary>
+        /// Indicates if a builtin has asked to suspend the script at the end of its call.
+        /// </summary>
+        internal bool IsSuspensionRequested => SuspensionDelay != null;
+
+        /// <summary>
+        /// Pauses the script that is running for a while.
+        /// </summary>
+        /// <remarks>
+        /// If the script is running a slice at a time, such as on a <see cref="Scheduling.ScriptScheduler"/>, the slice ends when
+        /// the builtin that called this method returns, and the thread is free to run other scripts in the meantime.
+        /// Otherwise, the thread is blocked for <paramref name="delay"/>, or until the timeout of the <see cref="ScheduledTask"/>.
+        /// </remarks>
+        /// <param name="delay">How long to pause the script for.</param>
+        public void Suspend(TimeSpan delay)
+        {
+            if (delay < TimeSpan.Zero)
             {
-                if (right is double rd)
-                {
-                    // This will have a value because double is IComparable
-                    return CompareObjects(ld, rd).Value;
-                }
-                throw new MismatchedTypeException(typeof(double), right.GetType());
+                delay = TimeSpan.Zero;
             }
 
-            throw new MismatchedTypeException(new List<Type>() { typeof(int), typeof(double) }, left.GetType());
+            if (CanSuspend)
+            {
+                SuspensionDelay = (SuspensionDelay ?? TimeSpan.Zero) + delay;
+            }
+            else if (ScheduledTask != null)
+            {
+                // Only the builtins that a virtual machine's slice calls itself can suspend the script; anything deeper blocks.
+                Output.Flush();
+                ScheduledTask.Block(delay);
+            }
+            else
+            {
+                // Whatever was printed before the pause should come out before it.
+                Output.Flush();
+                Thread.Sleep(delay);
+            }
         }
 
-        #endregion Comparisons and equality
+        /// <summary>
+        /// Gets how long the script asked to be suspended for, and forgets the request.
+        /// </summary>
+        /// <returns>How long to suspend the script for, or null if it didn't ask to be suspended.</returns>
+        internal TimeSpan? TakeSuspension()
+        {
+            var delay = SuspensionDelay;
+            SuspensionDelay = null;
+            return delay;
+        }
 
-        private static void ThrowIfNotNumbers(object left, object right)
+        #endregion Suspension
+
+        #region Budget
+
+        /// <summary>
+        /// The number of steps between two checks of the budget of the <see cref="ScheduledTask"/>.
+        /// </summary>
+        private const int StepsPerBudgetCheck = 1_000;
+
+        /// <summary>
+        /// The scheduled script that the interpreter is running a slice of, or null.
+        /// </summary>
+        /// <remarks>
+        /// While it's set, the tree-walking interpreter counts its steps (loop iterations and calls), checks the script's budget
+        /// every <see cref="StepsPerBudgetCheck"/> steps, and doesn't run compiled code, which can't count its steps.
+        /// </remarks>
+        internal Scheduling.ScriptTask ScheduledTask = null;
+
+        /// <summary>
+        /// The steps counted since <see cref="TakeSteps"/> was last called.
+        /// </summary>
+        private int Steps = 0;
+
+        /// <summary>
+        /// The steps left before the budget of the <see cref="ScheduledTask"/> is checked again.
+        /// </summary>
+        private int StepsUntilBudgetCheck = StepsPerBudgetCheck;
+
+        /// <summary>
+        /// Counts a loop iteration or a call for the <see cref="ScheduledTask"/>, if there is one.
+        /// </summary>
+        /// <exception cref="Scheduling.ScriptStoppedException">Thrown if the script has to stop.</exception>
+        internal void CountStep()
         {
-            switch (left, right)
+            if (ScheduledTask == null)
             {
-                case (int _, int _):
-                case (double _, double _):
-                    break;
-                case (int _, _):
-                    throw new MismatchedTypeException(typeof(int), right.GetType());
-                case (double _, _):
-                    throw new MismatchedTypeException(typeof(double), right.GetType());
-                default:
-                    throw new MismatchedTypeException(new List<Type>() { typeof(int), typeof(double) }, left.GetType());
+                return;
+            }
+
+            Steps++;
+            if (--StepsUntilBudgetCheck == 0)
+            {
+                StepsUntilBudgetCheck = StepsPerBudgetCheck;
+                ScheduledTask.CheckBudget(Steps);
             }
         }
 
-        private enum BinaryOperandType
+        /// <summary>
+        /// Gets the steps counted since the last call, and starts counting again.
+        /// </summary>
+        /// <returns>The number of steps.</returns>
+        internal int TakeSteps()
+        {
+            var steps = Steps;
+            Steps = 0;
+            return steps;
+        }
+
+        #endregion Budget
+
+        private static string Stringify(object obj)
         {
-            None,
-            Integer,
-            Double,
-            String
+            return obj?.ToString() ?? "niente";
         }
 
         #region AST visitors
 
-        object AST.IVisitor<object>.VisitAssignExpression(AST.Assign expression)
+        private GiosueValue VisitAssignExpression(AST.Assign expression)
         {
             var value = EvaluateExpression(expression.Value);
-            Environment.AssignIfExists(expression.Name.Lexeme, value);
-            return null;
+            if (expression.Depth < 0)
+            {
+                Globals.AssignIfExists(expression.Name.Symbol, value);
+            }
+            else
+            {
+                Environment.AssignAt(expression.Depth, expression.Slot, expression.Name.Lexeme, value);
+            }
+            return GiosueValue.Nil;
         }
 
-        object AST.IVisitor<object>.VisitBinaryExpression(AST.Binary expression)
+        private GiosueValue VisitBinaryExpression(AST.Binary expression)
         {
             var left = EvaluateExpression(expression.Left);
             var right = EvaluateExpression(expression.Right);
+            return Operators.Binary(expression.Operator.Type, left, right);
+        }
 
-            switch (expression.Operator.Type)
+        private GiosueValue VisitCallExpression(AST.Call expression)
+        {
+            var callee = EvaluateExpression(expression.Callee);
+
+            // Giosue functions evaluate their arguments straight into their environment.
+            if (callee.TryGetObject<GiosueFunction>(out var function))
             {
-                case TokenType.Greater: return CompareNumbers(left, right) > 0;
-                case TokenType.GreaterEqual: return CompareNumbers(left, right) >= 0;
-                case TokenType.Less: return CompareNumbers(left, right) < 0;
-                case TokenType.LessEqual: return CompareNumbers(left, right) <= 0;
-                case TokenType.BangEqual: return !AreEqual(left, right);
-                case TokenType.EqualEqual: return AreEqual(left, right);
-                default: break;
+                if (function.Arity != expression.Arguments.Count)
+                {
+                    // It's impossible to that number of parameters with that function.
+                    throw new InterpreterException(InterpreterExceptionType.WrongNumberOfArgumentsPassedToFunction, $"È vietato usare quello numero di parametri con quello funzione.");
+                }
+
+                return function.Call(this, expression.Arguments);
             }
 
-            var numericType = BinaryOperandType.None;
-            int leftInt = default;
-            int rightInt = default;
-            double leftDouble = default;
-            double rightDouble = default;
-            string leftString = null;
-            string rightString = null;
+            var arguments = expression.Arguments.Select(EvaluateExpression).ToList();
 
-            if (left is int i1)
+            if (callee.TryGetObject<IGiosueCallable>(out var callable))
             {
-                if (right is int i2)
-                {
-                    numericType = BinaryOperandType.Integer;
-                    leftInt = i1;
-                    rightInt = i2;
-                }
-                else
+                if (callable.Arity != arguments.Count)
                 {
-                    throw new MismatchedTypeException(typeof(int), right.GetType());
+                    // It's impossible to that number of parameters with that function.
+                    throw new InterpreterException(InterpreterExceptionType.WrongNumberOfArgumentsPassedToFunction, $"È vietato usare quello numero di parametri con quello funzione.");
                 }
+
+                return callable.Call(this, arguments);
             }
-            else if (left is double d1)
+            // It's impossible to use that object as a function.
+            throw new InterpreterException(InterpreterExceptionType.AttemptToCallNonCallableObject, "Non è possible usare quello oggeto come una funzione.");
+        }
+
+        private GiosueValue VisitGetExpression(AST.Get expression)
+        {
+            throw new NotImplementedException();
+        }
+
+        private GiosueValue VisitGroupingExpression(AST.Grouping expression)
+        {
+            return EvaluateExpression(expression.Expression);
+        }
+
+        private GiosueValue VisitLiteralExpression(AST.Literal expression)
+        {
+            return GiosueValue.FromObject(expression.Value);
+        }
+
+        private GiosueValue VisitLogicalExpression(AST.Logical expression)
+        {
+            var left = EvaluateExpression(expression.Left);
+            var right = EvaluateExpression(expression.Right);
+            return Operators.Logical(expression.Operator.Type, left, right);
+        }
+
+        private GiosueValue VisitSetExpression(AST.Set expression)
+        {
+            throw new NotImplementedException();
+        }
+
+        private GiosueValue VisitSuperExpression(AST.Super expression)
+        {
+            throw new NotImplementedException();
+        }
+
+        private GiosueValue VisitThisExpression(AST.This expression)
+        {
+            throw new NotImplementedException();
+        }
+
+        private GiosueValue VisitUnaryExpression(AST.Unary expression)
+        {
+            var right = EvaluateExpression(expression.Right);
+            return Operators.Unary(expression.Operator.Type, right);
+        }
+
+        private GiosueValue VisitVariableExpression(AST.Variable expression)
+        {
+            if (expression.Depth < 0)
+            {
+                return Globals.GetValue(expression.Name.Symbol);
+            }
+            return Environment.GetAt(expression.Depth, expression.Slot, expression.Name.Lexeme);
+        }
+
+        #endregion AST visitors
+
+        #region Statement visitors
+
+        private void VisitExpressionStatement(Statements.Expression statement)
+        {
+            EvaluateExpression(statement.Expr);
+        }
+
+        private void VisitVarStatement(Statements.Var statement)
+        {
+            var value = statement.Initializer == null ? GiosueValue.Nil : EvaluateExpression(statement.Initializer);
+            Define(statement.Name, statement.Slot, value);
+        }
+
+        private void VisitBlockStatement(Statements.Block statement)
+        {
+            var environment = RentEnvironment(Environment, 0);
+            try
+            {
+                ExecuteBlock(statement.Statements, environment);
+            }
+            finally
+            {
+                ReturnEnvironment(environment);
+            }
+        }
+
+        private void VisitIfStatement(Statements.If statement)
+        {
+            if (Operators.IsTruthy(EvaluateExpression(statement.Condition)))
+            {
+                ExecuteStatement(statement.ThenBranch);
+            }
+            else if (statement.ElseBranch != null)
             {
-                if (right is double d2)
+                ExecuteStatement(statement.ElseBranch);
+            }
+        }
+
+        private void VisitWhileStatement(Statements.While statement)
+        {
+            if (statement.Condition == null)
+            {
+                // A boolean expression is expected after mentre.
+                throw new InterpreterException(InterpreterExceptionType.MentreWithoutCondition, "Un espressione booleana in atteso dopo mentre.");
+            }
+
+            if (Profiler != null)
+            {
+                Profiler.Enter(statement.Keyword.Lexeme, statement.Keyword.Line);
+                try
                 {
-                    numericType = BinaryOperandType.Double;
-                    leftDouble = d1;
-                    rightDouble = d2;
+                    ExecuteWhile(statement);
                 }
-                else
+                finally
                 {
-                    throw new MismatchedTypeException(typeof(double), right.GetType());
+                    Profiler.Exit();
                 }
             }
-            else if (left is string s1)
+            else
             {
-                if (right is string s2)
-                {
-                    numericType = BinaryOperandType.String;
-                    leftString = s1;
-                    rightString = s2;
-                }
-                else
+                ExecuteWhile(statement);
+            }
+        }
+
+        private void ExecuteWhile(Statements.While statement)
+        {
+            while (Operators.IsTruthy(EvaluateExpression(statement.Condition)))
+            {
+                ExecuteStatement(statement.Body);
+                if (IsReturning)
                 {
-                    throw new MismatchedTypeException(typeof(string), right.GetType());
+                    break;
                 }
+                CountStep();
             }
+        }
+
+        private void VisitReturnStatement(Statements.Return statement)
+        {
+            ReturnValue = statement.Value == null ? GiosueValue.Nil : EvaluateExpression(statement.Value);
+            IsReturning = true;
+        }
 
+        private void VisitFunctionStatement(Statements.Function statement)
+        {
+            var function = new GiosueFunction(statement, Environment);
+            Define(statement.Name, statement.Slot, GiosueValue.FromObject(function));
+        }
+
+        /// <summary>
+        /// Defines a variable in the current environment.
+        /// </summary>
+        /// <param name="name">The name of the variable.</param>
+        /// <param name="slot">The slot given to the variable by the <see cref="Resolver"/>, or -1 for a global.</param>
+        /// <param name="value">The value of the variable.</param>
+        private void Define(Token name, int slot, GiosueValue value)
+        {
+            if (slot < 0)
+            {
+                Globals.DefineOrOverwrite(name.Symbol, value);
+            }
             else
             {
-                throw new MismatchedTypeException(new List<Type>() { typeof(int), typeof(double), typeof(string) }, left.GetType());
+                Environment.DefineAt(slot, value);
             }
+        }
 
+        #endregion Statement visitors
 
-            //! WARNING !//
-            //! DO NOT USE A SWITCH EXPRESSION HERE !//
-            // Using a switch expression instead of a switch statement causes integer
-            // addition to result in floating point numbers.
-            switch (expression.Operator.Type, numericType)
+        #region Tree dispatch
+
+        /// <summary>
+        /// Evaluates expressions for <see cref="AST.ExpressionDispatcher"/>.
+        /// </summary>
+        private readonly struct ExpressionEvaluator : AST.IVisitor<GiosueValue>
+        {
+            private readonly Interpreter Interpreter;
+
+            public ExpressionEvaluator(Interpreter interpreter)
             {
-                case (_, BinaryOperandType.None): throw new NotImplementedException();
-                case (var t, BinaryOperandType.Integer):
-                    switch (t)
-                    {
-                        case TokenType.Plus: return leftInt + rightInt;
-                        case TokenType.Minus: return leftInt - rightInt;
-                        case TokenType.Star: return leftInt * rightInt;
-                        case TokenType.Slash: return (double)((double)leftInt / (double)rightInt);
-
-                        case TokenType.And: return leftInt & rightInt;
-                        case TokenType.Pipe: return leftInt | rightInt;
-                        case TokenType.Caret: return leftInt ^ rightInt;
-                        default: throw new NotImplementedException();
-                    }
-                case (var t, BinaryOperandType.Double):
-                    switch (t)
-                    {
-                        case TokenType.Plus: return leftDouble + rightDouble;
-                        case TokenType.Minus: return leftDouble - rightDouble;
-                        case TokenType.Star: return leftDouble * rightDouble;
-                        case TokenType.Slash: return (double)((double)leftDouble / (double)rightDouble);
-
-                        case TokenType.And:
-                        case TokenType.Pipe:
-                        case TokenType.Caret:
-                            throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Solamente {nameof(Int32)} può essere usato con i operatori bitwise");
-                        default: throw new NotImplementedException();
-                    }
-                case (var t, BinaryOperandType.String):
-                    switch (t)
-                    {
-                        case TokenType.At: return leftString + rightString;
-                        default: throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Non è possibile usare quello operatore con le stringhe");
-                    }
-                default:
-                    throw new NotImplementedException();
+                Interpreter = interpreter;
             }
 
-            // return null;
+            public GiosueValue VisitAssignExpression(AST.Assign expression) => Interpreter.VisitAssignExpression(expression);
+            public GiosueValue VisitBinaryExpression(AST.Binary expression) => Interpreter.VisitBinaryExpression(expression);
+            public GiosueValue VisitCallExpression(AST.Call expression) => Interpreter.VisitCallExpression(expression);
+            public GiosueValue VisitGetExpression(AST.Get expression) => Interpreter.VisitGetExpression(expression);
+            public GiosueValue VisitGroupingExpression(AST.Grouping expression) => Interpreter.VisitGroupingExpression(expression);
+            public GiosueValue VisitLiteralExpression(AST.Literal expression) => Interpreter.VisitLiteralExpression(expression);
+            public GiosueValue VisitLogicalExpression(AST.Logical expression) => Interpreter.VisitLogicalExpression(expression);
+            public GiosueValue VisitSetExpression(AST.Set expression) => Interpreter.VisitSetExpression(expression);
+            public GiosueValue VisitSuperExpression(AST.Super expression) => Interpreter.VisitSuperExpression(expression);
+            public GiosueValue VisitThisExpression(AST.This expression) => Interpreter.VisitThisExpression(expression);
+            public GiosueValue VisitUnaryExpression(AST.Unary expression) => Interpreter.VisitUnaryExpression(expression);
+            public GiosueValue VisitVariableExpression(AST.Variable expression) => Interpreter.VisitVariableExpression(expression);
         }
 
-        object AST.IVisitor<object>.VisitCallExpression(AST.Call expression)
+        /// <summary>
+        /// Executes statements for <see cref="Statements.StatementDispatcher"/>.
+        /// </summary>
+        private readonly struct StatementExecutor : Statements.IVoidVisitor
+        {
+            private readonly Interpreter Interpreter;
+
+            public StatementExecutor(Interpreter interpreter)
+            {
+                Interpreter = interpreter;
+            }
+
+            public void VisitExpressionStatement(Statements.Expression statement) => Interpreter.VisitExpressionStatement(statement);
+            public void VisitVarStatement(Statements.Var statement) => Interpreter.VisitVarStatement(statement);
+            public void VisitBlockStatement(Statements.Block statement) => Interpreter.VisitBlockStatement(statement);
+            public void VisitIfStatement(Statements.If statement) => Interpreter.VisitIfStatement(statement);
+            public void VisitWhileStatement(Statements.While statement) => Interpreter.VisitWhileStatement(statement);
+            public void VisitReturnStatement(Statements.Return statement) => Interpreter.VisitReturnStatement(statement);
+            public void VisitFunctionStatement(Statements.Function statement) => Interpreter.VisitFunctionStatement(statement);
+        }
+
+        #endregion Tree dispatch
+
+        #region Arena visitors
+
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitAssignExpression(Arena.AssignExpressionView expression)
+        {
+            var value = EvaluateExpression(expression.Value);
+            if (expression.Depth < 0)
+            {
+                Globals.AssignIfExists(expression.Name.Symbol, value);
+            }
+            else
+            {
+                Environment.AssignAt(expression.Depth, expression.Slot, expression.Name.Lexeme, value);
+            }
+            return GiosueValue.Nil;
+        }
+
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitBinaryExpression(Arena.BinaryExpressionView expression)
+        {
+            var left = EvaluateExpression(expression.Left);
+            var right = EvaluateExpression(expression.Right);
+            return Operators.Binary(expression.Operator.Type, left, right);
+        }
+
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitCallExpression(Arena.CallExpressionView expression)
         {
             var callee = EvaluateExpression(expression.Callee);
+            var argumentExpressions = expression.Arguments;
 
-            var arguments = expression.Arguments.Select(EvaluateExpression).ToList();
+            // Giosue functions evaluate their arguments straight into their environment.
+            if (callee.TryGetObject<GiosueFunction>(out var function))
+            {
+                if (function.Arity != argumentExpressions.Count)
+                {
+                    // It's impossible to that number of parameters with that function.
+                    throw new InterpreterException(InterpreterExceptionType.WrongNumberOfArgumentsPassedToFunction, $"È vietato usare quello numero di parametri con quello funzione.");
+                }
+
+                return function.Call(this, argumentExpressions);
+            }
 
-            if (callee is IGiosueCallable callable)
+            var arguments = new List<GiosueValue>(argumentExpressions.Count);
+            foreach (var argument in argumentExpressions)
+            {
+                arguments.Add(EvaluateExpression(argument));
+            }
+
+            if (callee.TryGetObject<IGiosueCallable>(out var callable))
             {
                 if (callable.Arity != arguments.Count)
                 {
@@ -349,152 +954,155 @@ namespace Giosue
             throw new InterpreterException(InterpreterExceptionType.AttemptToCallNonCallableObject, "Non è possible usare quello oggeto come una funzione.");
         }
 
-        object AST.IVisitor<object>.VisitGetExpression(AST.Get expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitGetExpression(Arena.GetExpressionView expression)
         {
             throw new NotImplementedException();
         }
 
-        object AST.IVisitor<object>.VisitGroupingExpression(AST.Grouping expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitGroupingExpression(Arena.GroupingExpressionView expression)
         {
             return EvaluateExpression(expression.Expression);
         }
 
-        object AST.IVisitor<object>.VisitLiteralExpression(AST.Literal expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitLiteralExpression(Arena.LiteralExpressionView expression)
         {
-            return expression.Value;
+            return GiosueValue.FromObject(expression.Value);
         }
 
-        object AST.IVisitor<object>.VisitLogicalExpression(AST.Logical expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitLogicalExpression(Arena.LogicalExpressionView expression)
         {
-            object left = EvaluateExpression(expression.Left);
-            object right = EvaluateExpression(expression.Right);
-            
-            switch (expression.Operator.Type)
-            {
-                case TokenType.Greater: return CompareNumbers(left, right) > 0;
-                case TokenType.GreaterEqual: return CompareNumbers(left, right) >= 0;
-                case TokenType.Less: return CompareNumbers(left, right) < 0;
-                case TokenType.LessEqual: return CompareNumbers(left, right) <= 0;
-                case TokenType.BangEqual: return !AreEqual(left, right);
-                case TokenType.Equal: return AreEqual(left, right);
-                default: break;
-            }
-
-            if (left is bool l)
-            {
-                if (right is bool r)
-                {
-                    return expression.Operator.Type switch
-                    {
-                        TokenType.AndAnd => l && r,
-                        TokenType.PipePipe => l || r,
-
-                        // xor is the same as !=
-                        TokenType.CaretCaret => l != r,
-
-                        _ => throw new NotImplementedException()
-                    };
-                }
-                throw new MismatchedTypeException(typeof(bool), right.GetType());
-            }
-            throw new MismatchedTypeException(typeof(bool), left.GetType());
+            var left = EvaluateExpression(expression.Left);
+            var right = EvaluateExpression(expression.Right);
+            return Operators.Logical(expression.Operator.Type, left, right);
         }
 
-        object AST.IVisitor<object>.VisitSetExpression(AST.Set expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitSetExpression(Arena.SetExpressionView expression)
         {
             throw new NotImplementedException();
         }
 
-        object AST.IVisitor<object>.VisitSuperExpression(AST.Super expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitSuperExpression(Arena.SuperExpressionView expression)
         {
             throw new NotImplementedException();
         }
 
-        object AST.IVisitor<object>.VisitThisExpression(AST.This expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitThisExpression(Arena.ThisExpressionView expression)
         {
             throw new NotImplementedException();
         }
 
-        object AST.IVisitor<object>.VisitUnaryExpression(AST.Unary expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitUnaryExpression(Arena.UnaryExpressionView expression)
         {
             var right = EvaluateExpression(expression.Right);
-            return expression.Operator.Type switch
-            {
-                TokenType.Minus => right switch
-                {
-                    double d => -d,
-                    int i => -i,
-                    _ => null,
-                },
-                TokenType.Bang => !IsTruthy(right),
-                _ => null,
-            };
+            return Operators.Unary(expression.Operator.Type, right);
         }
 
-        object AST.IVisitor<object>.VisitVariableExpression(AST.Variable expression)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitVariableExpression(Arena.VariableExpressionView expression)
         {
-            return Environment.GetValue(expression.Name.Lexeme);
+            if (expression.Depth < 0)
+            {
+                return Globals.GetValue(expression.Name.Symbol);
+            }
+            return Environment.GetAt(expression.Depth, expression.Slot, expression.Name.Lexeme);
         }
 
-        #endregion AST visitors
-
-        #region Statement visitors
-
-        object Statements.IVisitor<object>.VisitExpressionStatement(Statements.Expression statement)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitExpressionStatement(Arena.ExpressionStatementView statement)
         {
             EvaluateExpression(statement.Expr);
-            return null;
+            return GiosueValue.Nil;
         }
 
-        object Statements.IVisitor<object>.VisitVarStatement(Statements.Var statement)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitVarStatement(Arena.VarStatementView statement)
         {
-            var value = statement.Initializer == null ? null : EvaluateExpression(statement.Initializer);
-            Environment.DefineOrOverwrite(statement.Name.Lexeme, value);
-            return null;
+            var value = statement.Initializer.IsNone ? GiosueValue.Nil : EvaluateExpression(statement.Initializer);
+            Define(statement.Name, statement.Slot, value);
+            return GiosueValue.Nil;
         }
 
-        object Statements.IVisitor<object>.VisitBlockStatement(Statements.Block statement)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitBlockStatement(Arena.BlockStatementView statement)
         {
-            ExecuteBlock(statement.Statements, new Environment(Environment));
-            return null;
+            var environment = RentEnvironment(Environment, 0);
+            try
+            {
+                ExecuteBlock(statement.Statements, environment);
+            }
+            finally
+            {
+                ReturnEnvironment(environment);
+            }
+            return GiosueValue.Nil;
         }
 
-        object Statements.IVisitor<object>.VisitIfStatement(Statements.If statement)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitIfStatement(Arena.IfStatementView statement)
         {
-            if (IsTruthy(EvaluateExpression(statement.Condition)))
+            if (Operators.IsTruthy(EvaluateExpression(statement.Condition)))
             {
                 ExecuteStatement(statement.ThenBranch);
             }
-            else if (statement.ElseBranch != null)
+            else if (!statement.ElseBranch.IsNone)
             {
                 ExecuteStatement(statement.ElseBranch);
             }
-            return null;
+            return GiosueValue.Nil;
         }
 
-        object Statements.IVisitor<object>.VisitWhileStatement(Statements.While statement)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitWhileStatement(Arena.WhileStatementView statement)
         {
-            if (statement.Condition == null)
+            if (statement.Condition.IsNone)
             {
                 // A boolean expression is expected after mentre.
                 throw new InterpreterException(InterpreterExceptionType.MentreWithoutCondition, "Un espressione booleana in atteso dopo mentre.");
             }
 
-            while (IsTruthy(EvaluateExpression(statement.Condition)))
+            if (Profiler != null)
             {
-                ExecuteStatement(statement.Body);
+                Profiler.Enter(statement.Keyword.Lexeme, statement.Keyword.Line);
+                try
+                {
+                    ExecuteWhile(statement);
+                }
+                finally
+                {
+                    Profiler.Exit();
+                }
+            }
+            else
+            {
+                ExecuteWhile(statement);
+            }
+
+            return GiosueValue.Nil;
+        }
+
+        private void ExecuteWhile(Arena.WhileStatementView statement)
+        {
+            var condition = statement.Condition;
+            var body = statement.Body;
+            while (Operators.IsTruthy(EvaluateExpression(condition)))
+            {
+                ExecuteStatement(body);
+                if (IsReturning)
+                {
+                    break;
+                }
+                CountStep();
             }
+        }
 
-            return null;
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitReturnStatement(Arena.ReturnStatementView statement)
+        {
+            ReturnValue = statement.Value.IsNone ? GiosueValue.Nil : EvaluateExpression(statement.Value);
+            IsReturning = true;
+            return GiosueValue.Nil;
         }
 
-        object Statements.IVisitor<object>.VisitFunctionStatement(Statements.Function statement)
+        GiosueValue Arena.IVisitor<GiosueValue>.VisitFunctionStatement(Arena.FunctionStatementView statement)
         {
             var function = new GiosueFunction(statement, Environment);
-            Environment.DefineOrOverwrite(statement.Name.Lexeme, function);
-            return null;
+            Define(statement.Name, statement.Slot, GiosueValue.FromObject(function));
+            return GiosueValue.Nil;
         }
 
-        #endregion Statement visitors
+        #endregion Arena visitors
     }
 }
@@ -0,0 +1,239 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue
+{
+    // Design comments:
+    // The semantics of the operators live here instead of in the `Interpreter` so that
+    // every engine that runs Giosue code (the tree-walking interpreter and the bytecode
+    // virtual machine) behaves exactly the same way.
+    /// <summary>
+    /// The semantics of the Giosue operators.
+    /// </summary>
+    internal static class Operators
+    {
+        #region Comparisons and equality
+
+        public static bool IsTruthy(GiosueValue expression)
+        {
+            if (expression.IsBool)
+            {
+                return expression.AsBool;
+            }
+
+            // TODO: Everything else except true and false should not be a bool.
+            return true;
+        }
+
+        public static bool AreEqual(GiosueValue a, GiosueValue b)
+        {
+            if (a.IsNil)
+            {
+                return b.IsNil;
+            }
+
+            return a.Equals(b);
+        }
+
+        public static int CompareNumbers(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt)
+            {
+                if (right.IsInt)
+                {
+                    return left.AsInt.CompareTo(right.AsInt);
+                }
+                throw new MismatchedTypeException(typeof(int), right.ClrType);
+            }
+            if (left.IsDouble)
+            {
+                if (right.IsDouble)
+                {
+                    return left.AsDouble.CompareTo(right.AsDouble);
+                }
+                throw new MismatchedTypeException(typeof(double), right.ClrType);
+            }
+
+            throw new MismatchedTypeException(new List<Type>() { typeof(int), typeof(double) }, left.ClrType);
+        }
+
+        #endregion Comparisons and equality
+
+        #region Operators
+
+        /// <summary>
+        /// Applies a binary operator to two operands.
+        /// </summary>
+        /// <param name="operator">The type of the operator.</param>
+        /// <param name="left">The left operand.</param>
+        /// <param name="right">The right operand.</param>
+        /// <returns>The result of the operation.</returns>
+        public static GiosueValue Binary(TokenType @operator, GiosueValue left, GiosueValue right)
+        {
+            switch (@operator)
+            {
+                case TokenType.Greater: return CompareNumbers(left, right) > 0;
+                case TokenType.GreaterEqual: return CompareNumbers(left, right) >= 0;
+                case TokenType.Less: return CompareNumbers(left, right) < 0;
+                case TokenType.LessEqual: return CompareNumbers(left, right) <= 0;
+                case TokenType.BangEqual: return !AreEqual(left, right);
+                case TokenType.EqualEqual: return AreEqual(left, right);
+                default: break;
+            }
+
+            if (left.IsInt)
+            {
+                if (!right.IsInt)
+                {
+                    throw new MismatchedTypeException(typeof(int), right.ClrType);
+                }
+
+                var leftInt = left.AsInt;
+                var rightInt = right.AsInt;
+
+                //! WARNING !//
+                //! DO NOT USE A SWITCH EXPRESSION HERE !//
+                // Using a switch expression instead of a switch statement causes integer
+                // addition to result in floating point numbers.
+                switch (@operator)
+                {
+                    case TokenType.Plus: return leftInt + rightInt;
+                    case TokenType.Minus: return leftInt - rightInt;
+                    case TokenType.Star: return leftInt * rightInt;
+                    case TokenType.Slash: return (double)leftInt / (double)rightInt;
+
+                    case TokenType.And: return leftInt & rightInt;
+                    case TokenType.Pipe: return leftInt | rightInt;
+                    case TokenType.Caret: return leftInt ^ rightInt;
+                    default: throw new NotImplementedException();
+                }
+            }
+
+            if (left.IsDouble)
+            {
+                if (!right.IsDouble)
+                {
+                    throw new MismatchedTypeException(typeof(double), right.ClrType);
+                }
+
+                var leftDouble = left.AsDouble;
+                var rightDouble = right.AsDouble;
+                switch (@operator)
+                {
+                    case TokenType.Plus: return leftDouble + rightDouble;
+                    case TokenType.Minus: return leftDouble - rightDouble;
+                    case TokenType.Star: return leftDouble * rightDouble;
+                    case TokenType.Slash: return leftDouble / rightDouble;
+
+                    case TokenType.And:
+                    case TokenType.Pipe:
+                    case TokenType.Caret:
+                        throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Solamente {nameof(Int32)} può essere usato con i operatori bitwise");
+                    default: throw new NotImplementedException();
+                }
+            }
+
+            if (left.TryGetObject<string>(out var leftString))
+            {
+                if (!right.TryGetObject<string>(out var rightString))
+                {
+                    throw new MismatchedTypeException(typeof(string), right.ClrType);
+                }
+
+                switch (@operator)
+                {
+                    case TokenType.At: return leftString + rightString;
+                    default: throw new InterpreterException(InterpreterExceptionType.MismatchedTypes, $"Non è possibile usare quello operatore con le stringhe");
+                }
+            }
+
+            throw new MismatchedTypeException(new List<Type>() { typeof(int), typeof(double), typeof(string) }, left.ClrType);
+        }
+
+        /// <summary>
+        /// Applies a logical operator to two operands.
+        /// </summary>
+        /// <remarks>
+        /// Both operands are always evaluated; logical operators do not short-circuit.
+        /// </remarks>
+        /// <param name="operator">The type of the operator.</param>
+        /// <param name="left">The left operand.</param>
+        /// <param name="right">The right operand.</param>
+        /// <returns>The result of the operation.</returns>
+        public static GiosueValue Logical(TokenType @operator, GiosueValue left, GiosueValue right)
+        {
+            switch (@operator)
+            {
+                case TokenType.Greater: return CompareNumbers(left, right) > 0;
+                case TokenType.GreaterEqual: return CompareNumbers(left, right) >= 0;
+                case TokenType.Less: return CompareNumbers(left, right) < 0;
+                case TokenType.LessEqual: return CompareNumbers(left, right) <= 0;
+                case TokenType.BangEqual: return !AreEqual(left, right);
+                case TokenType.Equal: return AreEqual(left, right);
+                default: break;
+            }
+
+            if (left.IsBool)
+            {
+                if (right.IsBool)
+                {
+                    var l = left.AsBool;
+                    var r = right.AsBool;
+                    return @operator switch
+                    {
+                        TokenType.AndAnd => l && r,
+                        TokenType.PipePipe => l || r,
+
+                        // xor is the same as !=
+                        TokenType.CaretCaret => l != r,
+
+                        _ => throw new NotImplementedException()
+                    };
+                }
+                throw new MismatchedTypeException(typeof(bool), right.ClrType);
+            }
+            throw new MismatchedTypeException(typeof(bool), left.ClrType);
+        }
+
+        /// <summary>
+        /// Applies a unary operator to an operand.
+        /// </summary>
+        /// <param name="operator">The type of the operator.</param>
+        /// <param name="right">The operand.</param>
+        /// <returns>The result of the operation.</returns>
+        public static GiosueValue Unary(TokenType @operator, GiosueValue right)
+        {
+            switch (@operator)
+            {
+                case TokenType.Minus when right.IsDouble: return -right.AsDouble;
+                case TokenType.Minus when right.IsInt: return -right.AsInt;
+                case TokenType.Bang: return !IsTruthy(right);
+                default: return GiosueValue.Nil;
+            }
+        }
+
+        #endregion Operators
+    }
+}
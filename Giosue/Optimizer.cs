@@ -0,0 +1,377 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Builtins.Casts;
+using Giosue.Exceptions;
+
+using CastToString = Giosue.Builtins.Casts.ToString;
+
+namespace Giosue
+{
+    // Design comments:
+    // The optimizer rewrites the trees between parsing and resolving. It folds operators and
+    // casts whose operands are all literals into a single literal, strips groupings, and
+    // removes `se` and `mentre` statements whose condition is a literal and whose body can
+    // never run. The folding uses `Operators`, the same code the engines use, so a folded
+    // expression always has the value it would have had at runtime.
+    // An expression that would throw (such as `1 + 2.0`, which throws a
+    // `MismatchedTypeException`) is left alone so it still throws at runtime, and only if
+    // it is actually run.
+    // A cast is a global variable that a script can redefine, so casts are only folded when
+    // the whole program is optimized at once. A first pass finds every name the program
+    // declares or assigns; a cast is folded in the second pass only if its name isn't one of
+    // them and the global is still bound to the builtin.
+    /// <summary>
+    /// Folds constant expressions and removes dead branches.
+    /// </summary>
+    public class Optimizer : AST.IVisitor<AST.Expression>, Statements.IVisitor<Statements.Statement>
+    {
+        /// <summary>
+        /// The globals that the code will run with, used to find the cast builtins, or null to never fold casts.
+        /// </summary>
+        private readonly Environment Globals;
+
+        /// <summary>
+        /// The names of every variable and function that the code declares or assigns.
+        /// </summary>
+        private readonly HashSet<int> AssignedSymbols = new();
+
+        /// <summary>
+        /// Indicates if calls to cast builtins can be folded in the current pass.
+        /// </summary>
+        private bool CanFoldCasts = false;
+
+        /// <summary>
+        /// Creates a new <see cref="Optimizer"/>.
+        /// </summary>
+        /// <param name="globals">The globals that the code will run with, or null to never fold calls to cast builtins.</param>
+        public Optimizer(Environment globals = null)
+        {
+            Globals = globals;
+        }
+
+        /// <summary>
+        /// Optimizes a whole program.
+        /// </summary>
+        /// <param name="statements">The statements of the program.</param>
+        /// <returns>The optimized statements.</returns>
+        public List<Statements.Statement> Optimize(List<Statements.Statement> statements)
+        {
+            CanFoldCasts = false;
+            var optimized = OptimizeStatements(statements);
+
+            if (Globals != null)
+            {
+                CanFoldCasts = true;
+                optimized = OptimizeStatements(optimized);
+                CanFoldCasts = false;
+            }
+
+            return optimized;
+        }
+
+        /// <summary>
+        /// Optimizes one top-level statement without looking at the rest of the program.
+        /// </summary>
+        /// <remarks>
+        /// Calls to casts are never folded, because a later statement could redefine them.
+        /// </remarks>
+        /// <param name="statement">The statement to optimize.</param>
+        /// <returns>The optimized statement, or null if the statement does nothing.</returns>
+        public Statements.Statement Optimize(Statements.Statement statement)
+        {
+            CanFoldCasts = false;
+            return OptimizeStatement(statement);
+        }
+
+        private Statements.Statement OptimizeStatement(Statements.Statement statement)
+        {
+            return statement?.Accept(this);
+        }
+
+        private AST.Expression OptimizeExpression(AST.Expression expression)
+        {
+            return expression?.Accept(this);
+        }
+
+        /// <summary>
+        /// Optimizes a list of statements and drops the ones that do nothing.
+        /// </summary>
+        /// <param name="statements">The statements to optimize.</param>
+        /// <returns>The optimized statements.</returns>
+        private List<Statements.Statement> OptimizeStatements(List<Statements.Statement> statements)
+        {
+            var optimized = new List<Statements.Statement>(statements.Count);
+            foreach (var statement in statements)
+            {
+                var optimizedStatement = OptimizeStatement(statement);
+                if (optimizedStatement != null)
+                {
+                    optimized.Add(optimizedStatement);
+                }
+            }
+            return optimized;
+        }
+
+        /// <summary>
+        /// Optimizes a statement that must exist, such as the body of a <c>mentre</c>.
+        /// </summary>
+        /// <param name="statement">The statement to optimize.</param>
+        /// <returns>The optimized statement, or an empty block if the statement does nothing.</returns>
+        private Statements.Statement OptimizeRequiredStatement(Statements.Statement statement)
+        {
+            return OptimizeStatement(statement) ?? new Statements.Block(new List<Statements.Statement>());
+        }
+
+        #region Folding
+
+        /// <summary>
+        /// Tries to compute the value of an expression at compile time.
+        /// </summary>
+        /// <param name="fold">Computes the value.</param>
+        /// <param name="folded">The literal that holds the value.</param>
+        /// <returns>True if the value was computed, false if computing it throws.</returns>
+        private static bool TryFold(Func<GiosueValue> fold, out AST.Literal folded)
+        {
+            folded = TryFoldValue(fold, out var value) ? new AST.Literal(value) : null;
+            return folded != null;
+        }
+
+        /// <summary>
+        /// Tries to compute the value of an expression at compile time.
+        /// </summary>
+        /// <param name="fold">Computes the value.</param>
+        /// <param name="value">The value, as the value of a literal.</param>
+        /// <returns>True if the value was computed, false if computing it throws.</returns>
+        internal static bool TryFoldValue(Func<GiosueValue> fold, out object value)
+        {
+            try
+            {
+                value = fold().ToObject();
+                return true;
+            }
+            catch (Exception e) when (e is MismatchedTypeException || e is InterpreterException || e is InvalidCastException || e is NotImplementedException)
+            {
+                // Leave the expression alone so it throws at runtime.
+                value = null;
+                return false;
+            }
+        }
+
+        /// <summary>
+        /// Tests if a call is to a cast builtin that can be folded.
+        /// </summary>
+        /// <param name="callee">The expression that is called.</param>
+        /// <param name="cast">The cast builtin.</param>
+        /// <returns>True if the call can be folded, false otherwise.</returns>
+        private bool TryGetCast(AST.Expression callee, out IGiosueCallable cast)
+        {
+            cast = null;
+
+            if (!CanFoldCasts || callee is not AST.Variable variable || AssignedSymbols.Contains(variable.Name.Symbol))
+            {
+                return false;
+            }
+
+            if (!Globals.TryGetValue(variable.Name.Symbol, out var value) || !value.TryGetObject(out cast))
+            {
+                return false;
+            }
+
+            return cast is CastToString || cast is ToBool || cast is ToInt || cast is ToDouble;
+        }
+
+        private static GiosueValue ValueOf(AST.Literal literal)
+        {
+            return GiosueValue.FromObject(literal.Value);
+        }
+
+        #endregion Folding
+
+        #region AST visitors
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitAssignExpression(AST.Assign expression)
+        {
+            AssignedSymbols.Add(expression.Name.Symbol);
+            return new AST.Assign(expression.Name, OptimizeExpression(expression.Value));
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitBinaryExpression(AST.Binary expression)
+        {
+            var left = OptimizeExpression(expression.Left);
+            var right = OptimizeExpression(expression.Right);
+
+            if (left is AST.Literal l && right is AST.Literal r
+                && TryFold(() => Operators.Binary(expression.Operator.Type, ValueOf(l), ValueOf(r)), out var folded))
+            {
+                return folded;
+            }
+            return new AST.Binary(left, expression.Operator, right);
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitCallExpression(AST.Call expression)
+        {
+            var callee = OptimizeExpression(expression.Callee);
+            var arguments = expression.Arguments.Select(OptimizeExpression).ToList();
+
+            if (arguments.All(a => a is AST.Literal) && TryGetCast(callee, out var cast) && cast.Arity == arguments.Count)
+            {
+                var values = arguments.Select(a => ValueOf((AST.Literal)a)).ToList();
+
+                // Casts don't use the interpreter.
+                if (TryFold(() => cast.Call(null, values), out var folded))
+                {
+                    return folded;
+                }
+            }
+            return new AST.Call(callee, expression.Paren, arguments);
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitGetExpression(AST.Get expression)
+        {
+            return new AST.Get(OptimizeExpression(expression.Object), expression.Name);
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitGroupingExpression(AST.Grouping expression)
+        {
+            // Groupings only matter to the parser.
+            return OptimizeExpression(expression.Expression);
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitLiteralExpression(AST.Literal expression)
+        {
+            return expression;
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitLogicalExpression(AST.Logical expression)
+        {
+            var left = OptimizeExpression(expression.Left);
+            var right = OptimizeExpression(expression.Right);
+
+            if (left is AST.Literal l && right is AST.Literal r
+                && TryFold(() => Operators.Logical(expression.Operator.Type, ValueOf(l), ValueOf(r)), out var folded))
+            {
+                return folded;
+            }
+            return new AST.Logical(left, expression.Operator, right);
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitSetExpression(AST.Set expression)
+        {
+            return new AST.Set(OptimizeExpression(expression.Object), expression.Name, OptimizeExpression(expression.Value));
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitSuperExpression(AST.Super expression)
+        {
+            return expression;
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitThisExpression(AST.This expression)
+        {
+            return expression;
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitUnaryExpression(AST.Unary expression)
+        {
+            var right = OptimizeExpression(expression.Right);
+
+            if (right is AST.Literal r && TryFold(() => Operators.Unary(expression.Operator.Type, ValueOf(r)), out var folded))
+            {
+                return folded;
+            }
+            return new AST.Unary(expression.Operator, right);
+        }
+
+        AST.Expression AST.IVisitor<AST.Expression>.VisitVariableExpression(AST.Variable expression)
+        {
+            return new AST.Variable(expression.Name);
+        }
+
+        #endregion AST visitors
+
+        #region Statement visitors
+
+        Statements.Statement Statements.IVisitor<Statements.Statement>.VisitExpressionStatement(Statements.Expression statement)
+        {
+            return new Statements.Expression(OptimizeExpression(statement.Expr));
+        }
+
+        Statements.Statement Statements.IVisitor<Statements.Statement>.VisitVarStatement(Statements.Var statement)
+        {
+            AssignedSymbols.Add(statement.Name.Symbol);
+            return new Statements.Var(statement.Name, OptimizeExpression(statement.Initializer));
+        }
+
+        Statements.Statement Statements.IVisitor<Statements.Statement>.VisitBlockStatement(Statements.Block statement)
+        {
+            return new Statements.Block(OptimizeStatements(statement.Statements));
+        }
+
+        Statements.Statement Statements.IVisitor<Statements.Statement>.VisitIfStatement(Statements.If statement)
+        {
+            var condition = OptimizeExpression(statement.Condition);
+
+            if (condition is AST.Literal literal)
+            {
+                // Only the branch that is taken is kept. A branch that
+                // isn't a block runs in the enclosing scope either way.
+                return Operators.IsTruthy(ValueOf(literal))
+                    ? OptimizeStatement(statement.ThenBranch)
+                    : OptimizeStatement(statement.ElseBranch);
+            }
+
+            return new Statements.If(condition, OptimizeRequiredStatement(statement.ThenBranch), OptimizeStatement(statement.ElseBranch));
+        }
+
+        Statements.Statement Statements.IVisitor<Statements.Statement>.VisitWhileStatement(Statements.While statement)
+        {
+            var condition = OptimizeExpression(statement.Condition);
+
+            if (condition is AST.Literal literal && !Operators.IsTruthy(ValueOf(literal)))
+            {
+                // The body can never run.
+                return null;
+            }
+
+            return new Statements.While(statement.Keyword, condition, OptimizeRequiredStatement(statement.Body));
+        }
+
+        Statements.Statement Statements.IVisitor<Statements.Statement>.VisitReturnStatement(Statements.Return statement)
+        {
+            return new Statements.Return(statement.Keyword, OptimizeExpression(statement.Value));
+        }
+
+        Statements.Statement Statements.IVisitor<Statements.Statement>.VisitFunctionStatement(Statements.Function statement)
+        {
+            AssignedSymbols.Add(statement.Name.Symbol);
+            foreach (var parameter in statement.Parameters)
+            {
+                AssignedSymbols.Add(parameter.Symbol);
+            }
+
+            return new Statements.Function(statement.Name, statement.Parameters, OptimizeStatements(statement.Body));
+        }
+
+        #endregion Statement visitors
+    }
+}
@@ -22,18 +22,45 @@ using System.Linq;
 using System.Reflection;
 using System.Text;
 using System.Threading.Tasks;
-using Giosue.AST;
 using Giosue.Exceptions;
-
-using Statement = Giosue.Statements.Statement;
+using Giosue.Profiling;
 
 namespace Giosue
 {
-    // TODO: Documentation
     /// <summary>
-    /// 
+    /// Parses tokens into the syntax trees.
     /// </summary>
-    public class Parser
+    public class Parser : Parser<AST.Expression, Statements.Statement>
+    {
+        /// <summary>
+        /// Creates a new <see cref="Parser"/>.
+        /// </summary>
+        /// <param name="tokens">The tokens to parse.</param>
+        public Parser(List<Token> tokens) : this((IEnumerable<Token>)tokens)
+        {
+
+        }
+
+        /// <summary>
+        /// Creates a new <see cref="Parser"/> that pulls its tokens one at a time, such as from <see cref="Scanner.EnumerateTokens"/>.
+        /// </summary>
+        /// <param name="tokens">The tokens to parse.</param>
+        public Parser(IEnumerable<Token> tokens) : base(tokens, new TreeBuilder())
+        {
+
+        }
+    }
+
+    // Design comments:
+    // The grammar is written once, and an `ISyntaxBuilder` decides what a parsed piece of
+    // syntax turns into: `Parser` uses `TreeBuilder` to make the tree classes, and
+    // `Arena.ArenaBuilder` emits the nodes straight into a `SyntaxArena`.
+    /// <summary>
+    /// Parses tokens, handing what it parses to an <see cref="ISyntaxBuilder{TExpression, TStatement}"/>.
+    /// </summary>
+    /// <typeparam name="TExpression">The type that stands for an expression.</typeparam>
+    /// <typeparam name="TStatement">The type that stands for a statement.</typeparam>
+    public class Parser<TExpression, TStatement>
     {
         /// <summary>
         /// Signals that a synchronization must take place.
@@ -44,68 +71,221 @@ namespace Giosue
             public SynchronizeSignal(string message) : base(message) { }
         }
 
+        // Design comments:
+        // The parser only ever looks at the current token and the most recently consumed
+        // token, so it keeps just those two in `Lookahead` instead of holding on to every
+        // token. The slot for the current token is `ConsumedCount % LookaheadLength`; the
+        // previous token is in the other slot. Tokens are pulled from `Tokens` one at a time,
+        // and only once the parser needs to look at them, so the scanner never runs ahead
+        // of the parser.
+        /// <summary>
+        /// The number of tokens kept in <see cref="Lookahead"/>: the previous token and the current token.
+        /// </summary>
+        private const int LookaheadLength = 2;
+
         /// <summary>
         /// The <see cref="Token"/>s to be parsed.
         /// </summary>
-        private List<Token> Tokens { get; }
+        private IEnumerator<Token> Tokens { get; }
+
+        /// <summary>
+        /// The previous and current tokens.
+        /// </summary>
+        private readonly Token[] Lookahead = new Token[LookaheadLength];
+
+        /// <summary>
+        /// The number of tokens that have been consumed.
+        /// </summary>
+        private int ConsumedCount = 0;
+
+        /// <summary>
+        /// Indicates if the current token has been pulled from <see cref="Tokens"/>.
+        /// </summary>
+        private bool IsCurrentTokenPulled = false;
+
+        /// <summary>
+        /// How tightly the binary and logical operators bind, from loosest to tightest.
+        /// </summary>
+        private enum Precedence : byte
+        {
+            /// <summary>
+            /// The token is not a binary or logical operator.
+            /// </summary>
+            None,
+
+            Equality,
+            ExclusiveOr,
+            Or,
+            And,
+            Comparison,
+            Term,
+            Factor,
+            Bitwise,
+        }
+
+        // Design comments:
+        // Binary and logical expressions are parsed by precedence climbing: one loop looks up
+        // the current token in `BinaryPrecedences` instead of descending through a method for
+        // every level of precedence, so an operand costs one call instead of nine. The trees
+        // are the same as the recursive descent that came before; in particular, equality
+        // binds more loosely than `^^`, `||` and `&&`.
+        /// <summary>
+        /// The precedence of each <see cref="TokenType"/> as a binary or logical operator, indexed by the token type.
+        /// </summary>
+        private static readonly Precedence[] BinaryPrecedences = new Precedence[Enum.GetValues<TokenType>().Max(t => (int)t) + 1];
+
+        /// <summary>
+        /// Indicates if a <see cref="TokenType"/> makes a logical expression instead of a binary one, indexed by the token type.
+        /// </summary>
+        private static readonly bool[] IsLogicalOperator = new bool[BinaryPrecedences.Length];
+
+        static Parser()
+        {
+            var operators = new (TokenType, Precedence, bool)[]
+            {
+                (TokenType.BangEqual, Precedence.Equality, false),
+                (TokenType.EqualEqual, Precedence.Equality, false),
+                (TokenType.CaretCaret, Precedence.ExclusiveOr, true),
+                (TokenType.PipePipe, Precedence.Or, true),
+                (TokenType.AndAnd, Precedence.And, true),
+                (TokenType.Greater, Precedence.Comparison, false),
+                (TokenType.GreaterEqual, Precedence.Comparison, false),
+                (TokenType.Less, Precedence.Comparison, false),
+                (TokenType.LessEqual, Precedence.Comparison, false),
+                (TokenType.Minus, Precedence.Term, false),
+                (TokenType.Plus, Precedence.Term, false),
+                (TokenType.At, Precedence.Term, false),
+                (TokenType.Slash, Precedence.Factor, false),
+                (TokenType.Star, Precedence.Factor, false),
+                (TokenType.And, Precedence.Bitwise, false),
+                (TokenType.Pipe, Precedence.Bitwise, false),
+                (TokenType.Caret, Precedence.Bitwise, false),
+            };
+            foreach (var (type, precedence, isLogical) in operators)
+            {
+                BinaryPrecedences[(int)type] = precedence;
+                IsLogicalOperator[(int)type] = isLogical;
+            }
+        }
+
+        /// <summary>
+        /// The number of function bodies being parsed, used to reject <c>ritorna</c> outside of a function.
+        /// </summary>
+        private int FunctionDepth = 0;
+
+        /// <summary>
+        /// The statements parsed so far that haven't been reported to <see cref="GiosueEventSource"/>.
+        /// </summary>
+        private CounterBatch ParsedStatements = new(GiosueCounter.StatementsParsed);
 
         /// <summary>
-        /// The index into <see cref="Tokens"/> of the current token.
+        /// The current token, or null if there are no more tokens.
         /// </summary>
-        private int CurrentTokenIndex = 0;
+        private Token CurrentToken
+        {
+            get
+            {
+                var index = ConsumedCount % LookaheadLength;
+                if (!IsCurrentTokenPulled)
+                {
+                    Lookahead[index] = Tokens.MoveNext() ? Tokens.Current : null;
+                    IsCurrentTokenPulled = true;
+                }
+                return Lookahead[index];
+            }
+        }
 
-        // The index check isn't in the book, but I think it's a really good idea to have it here.
+        // The null check isn't in the book, but I think it's a really good idea to have it here.
         /// <summary>
         /// Tests if there are any more tokens to parse.
         /// </summary>
-        private bool IsAtEnd => (CurrentTokenIndex >= Tokens.Count) || (Tokens[CurrentTokenIndex].Type == TokenType.EOF);
+        private bool IsAtEnd => CurrentToken == null || CurrentToken.Type == TokenType.EOF;
 
         /// <summary>
-        /// 
+        /// Makes the nodes for what is parsed.
         /// </summary>
-        /// <param name="tokens"></param>
-        public Parser(List<Token> tokens)
+        private ISyntaxBuilder<TExpression, TStatement> Builder { get; }
+
+        /// <summary>
+        /// Creates a new <see cref="Parser{TExpression, TStatement}"/> that pulls its tokens one at a time, such as from <see cref="Scanner.EnumerateTokens"/>.
+        /// </summary>
+        /// <param name="tokens">The tokens to parse.</param>
+        /// <param name="builder">Makes the nodes for what is parsed.</param>
+        public Parser(IEnumerable<Token> tokens, ISyntaxBuilder<TExpression, TStatement> builder)
         {
             // The source tokens for a {nameof(Parser)} cannot be null
-            Tokens = tokens ?? throw new ArgumentNullException(nameof(tokens), $"È vietato creare un {nameof(Parser)} da una lista dei tokens nulla");
+            Tokens = tokens?.GetEnumerator() ?? throw new ArgumentNullException(nameof(tokens), $"È vietato creare un {nameof(Parser)} da una lista dei tokens nulla");
+
+            // The builder for a {nameof(Parser)} cannot be null
+            Builder = builder ?? throw new ArgumentNullException(nameof(builder), $"È vietato creare un {nameof(Parser)} senza un costruttore dei nodi");
         }
 
         /// <summary>
         /// 
         /// </summary>
         /// <returns></returns>
-        public bool TryParse(out List<Statement> statements, out ParserException exception)
+        public bool TryParse(out List<TStatement> statements, out ParserException exception)
         {
             // TODO: Wrap this in a try block to prevent any possible errors.
 
             var success = true;
-            statements = new List<Statement>();
+            statements = new List<TStatement>();
             exception = default;
 
-            // No tokens means nothing to do.
-            if (Tokens.Count <= 0)
+            // No tokens or only an EOF token means nothing to do.
+            if (IsAtEnd)
             {
                 return success;
             }
-            // If there's only one EOF token, there's also nothing to do.
-            if (Tokens.Count == 1 && Tokens[0].Type == TokenType.EOF)
+            try
             {
-                return success;
+                while (!IsAtEnd)
+                {
+                    if (!TryDeclaration(out var parsedStatement))
+                    {
+                        return false;
+                    }
+                    statements.Add(parsedStatement);
+                }
+                return true;
             }
-            while (!IsAtEnd)
+            finally
             {
-                if (!TryDeclaration(out var parsedStatement))
+                ParsedStatements.Flush();
+            }
+        }
+
+        /// <summary>
+        /// Parses top-level statements one at a time.
+        /// </summary>
+        /// <remarks>
+        /// Each statement is returned as soon as it's parsed, so it can be run before the rest of the tokens are scanned.
+        /// Parsing stops at the first statement that can't be parsed.
+        /// </remarks>
+        /// <returns>The parsed statements.</returns>
+        /// <exception cref="ParserException">Thrown if the tokens can't be parsed.</exception>
+        public IEnumerable<TStatement> ParseStatements()
+        {
+            try
+            {
+                while (!IsAtEnd)
                 {
-                    return false;
+                    if (!TryDeclaration(out var parsedStatement))
+                    {
+                        yield break;
+                    }
+                    yield return parsedStatement;
                 }
-                statements.Add(parsedStatement);
             }
-            return true;
+            finally
+            {
+                ParsedStatements.Flush();
+            }
         }
 
-        private List<Statement> Block()
+        private List<TStatement> Block()
         {
-            var statements = new List<Statement>();
+            var statements = new List<TStatement>();
 
             while (!CurrentTokenTypeEquals(TokenType.RightBrace))
             {
@@ -117,21 +297,21 @@ namespace Giosue
             return statements;
         }
 
-        private Statement IfStatement()
+        private TStatement IfStatement()
         {
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.LeftParenthesis, "Expected '(' after 'if'.", out _);
             var condition = Expression();
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.RightParenthesis, "Expected ')' after 'if'.", out _);
             var thenBranch = Statement();
-            Statement elseBranch = default;
+            var elseBranch = Builder.NoStatement;
             if (AdvanceIfMatches(out _, TokenType.Oppure))
             {
                 elseBranch = Statement();
             }
-            return new Statements.If(condition, thenBranch, elseBranch);
+            return Builder.If(condition, thenBranch, elseBranch);
         }
 
-        private Statement MentreStatement()
+        private TStatement MentreStatement(Token keyword)
         {
             // A '(' was expected after 'mentre'.
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.LeftParenthesis, "Un '(' in atteso dopo 'mentre'.", out _);
@@ -143,12 +323,12 @@ namespace Giosue
 
             var body = Statement();
 
-            return new Statements.While(condition, body);
+            return Builder.While(keyword, condition, body);
         }
 
-        private bool TryDeclaration(out Statement statement)
+        private bool TryDeclaration(out TStatement statement)
         {
-            statement = default;
+            statement = Builder.NoStatement;
             try
             {
                 if (AdvanceIfMatches(out var consumed, TokenType.Fun))
@@ -163,6 +343,10 @@ namespace Giosue
                 {
                     statement = Statement();
                 }
+                if (GiosueEventSource.IsCounting)
+                {
+                    ParsedStatements.Increment();
+                }
                 return true;
             }
             catch (SynchronizeSignal s)
@@ -173,49 +357,73 @@ namespace Giosue
             }
         }
 
-        private Statement VariableDeclaration()
+        private TStatement VariableDeclaration()
         {
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.Identifier, "Expected variable name.", out var variableNameToken);
 
-            AST.Expression initializer = null;
+            var initializer = Builder.NoExpression;
             if (AdvanceIfMatches(out _, TokenType.Equal))
             {
                 initializer = Expression();
             }
 
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.Semicolon, "Expected ';' after variable declaration.", out _);
-            return new Statements.Var(variableNameToken, initializer);
+            return Builder.Var(variableNameToken, initializer);
         }
 
-        private Statement Statement()
+        private TStatement Statement()
         {
             if (AdvanceIfMatches(out _, TokenType.Se))
             {
                 return IfStatement();
             }
-            if (AdvanceIfMatches(out _, TokenType.Mentre))
+            if (AdvanceIfMatches(out var mentre, TokenType.Mentre))
+            {
+                return MentreStatement(mentre);
+            }
+            if (AdvanceIfMatches(out var ritorna, TokenType.Ritorna))
             {
-                return MentreStatement();
+                return RitornaStatement(ritorna);
             }
             if (AdvanceIfMatches(out _, TokenType.LeftBrace))
             {
-                return new Statements.Block(Block());
+                Builder.BeginBlock();
+                return Builder.Block(Block());
             }
             return ExpressionStatement();
         }
 
-        private Statement ExpressionStatement()
+        private TStatement RitornaStatement(Token keyword)
+        {
+            if (FunctionDepth == 0)
+            {
+                // It's impossible to use 'ritorna' outside of a function.
+                throw ParseException(keyword, "È vietato usare 'ritorna' fuori di una funzione.");
+            }
+
+            var value = Builder.NoExpression;
+            if (!CurrentTokenTypeEquals(TokenType.Semicolon))
+            {
+                value = Expression();
+            }
+
+            // A ';' was expected after 'ritorna'.
+            AdvanceIfMatchesOrCrashIfNotMatches(TokenType.Semicolon, "Un ';' in atteso dopo 'ritorna'.", out _);
+            return Builder.Return(keyword, value);
+        }
+
+        private TStatement ExpressionStatement()
         {
             var expression = Expression();
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.Semicolon, "Expected ';' after expression.", out _);
-            return new Statements.Expression(expression);
+            return Builder.Expression(expression);
         }
 
         /// <summary>
         /// Parse a function definition.
         /// </summary>
         /// <returns></returns>
-        private Statements.Function FunctionDeclaration()
+        private TStatement FunctionDeclaration()
         {
             // A name of a function was expected.
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.Identifier, "Un nome di una funzione in atteso.", out var name);
@@ -235,30 +443,41 @@ namespace Giosue
 
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.RightParenthesis, "Un ')' in atteso dopo gli argomenti per una funzione.", out _);
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.LeftBrace, "Un '{' in atteso primo di il corpo per una funzione.", out _);
-            var body = Block();
-            return new Statements.Function(name, arguments, body);
+
+            Builder.BeginFunction(name, arguments);
+
+            List<TStatement> body;
+            FunctionDepth++;
+            try
+            {
+                body = Block();
+            }
+            finally
+            {
+                FunctionDepth--;
+            }
+            return Builder.Function(name, arguments, body);
         }
 
         /// <summary>
         /// 
         /// </summary>
         /// <returns></returns>
-        private Expression Expression()
+        private TExpression Expression()
         {
             return Assignment();
         }
 
-        private Expression Assignment()
+        private TExpression Assignment()
         {
-            var expression = Equality();
+            var expression = BinaryOrLogical(Precedence.Equality);
             if (AdvanceIfMatches(out var token, TokenType.Equal))
             {
                 var value = Assignment();
 
-                if (expression is AST.Variable v)
+                if (Builder.TryGetVariableName(expression, out var name))
                 {
-                    var name = v.Name;
-                    return new AST.Assign(name, value);
+                    return Builder.Assign(name, value);
                 }
 
                 // It's impossible to assign to that expression
@@ -271,142 +490,45 @@ namespace Giosue
         #region Binary and logical expressions
 
         /// <summary>
-        /// Parses a binary expression.
+        /// Parses binary and logical expressions whose operators bind at least as tightly as <paramref name="minimumPrecedence"/>.
         /// </summary>
-        /// <param name="callback">The function handling the higher precedence operators.</param>
-        /// <param name="tokens">The tokens to be consumed.</param>
-        /// <returns>An <see cref="AST.Expression"/> representing the expression.</returns>
-        private Expression BinaryExpression(Func<Expression> callback, params TokenType[] tokens)
+        /// <remarks>
+        /// Every operator is left-associative, so the right operand only takes operators that bind more tightly.
+        /// </remarks>
+        /// <param name="minimumPrecedence">The loosest operator that can be consumed.</param>
+        /// <returns>The expression.</returns>
+        private TExpression BinaryOrLogical(Precedence minimumPrecedence)
         {
-            var expression = callback();
+            var expression = Unary();
 
-            while (AdvanceIfMatches(out _, tokens))
+            while (Peek(out var current))
             {
-                if (PreviousToken(out var @operator))
-                {
-                    expression = new Binary(expression, @operator, callback());
-                }
-                else
+                var precedence = BinaryPrecedences[(int)current.Type];
+                if (precedence == Precedence.None || precedence < minimumPrecedence)
                 {
-                    // No previous token was available.
                     break;
                 }
-            }
-
-            return expression;
-        }
 
-        /// <summary>
-        /// Parses a logical expression.
-        /// </summary>
-        /// <param name="callback">The function handling the higher precedence operators.</param>
-        /// <param name="tokens">The tokens to be consumed.</param>
-        /// <returns>An <see cref="AST.Expression"/> representing the expression.</returns>
-        private Expression LogicalExpression(Func<Expression> callback, params TokenType[] tokens)
-        {
-            var expression = callback();
-
-            while (AdvanceIfMatches(out _, tokens))
-            {
-                if (PreviousToken(out var @operator))
-                {
-                    expression = new Logical(expression, @operator, callback());
-                }
-                else
-                {
-                    // No previous token was available
-                    break;
-                }
+                Advance(out var @operator);
+                var right = BinaryOrLogical(precedence + 1);
+                expression = IsLogicalOperator[(int)@operator.Type]
+                    ? Builder.Logical(expression, @operator, right)
+                    : Builder.Binary(expression, @operator, right);
             }
 
             return expression;
         }
 
-        // TODO: Should this go under logical expression?
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression Equality()
-        {
-            return BinaryExpression(ExclusiveOr, TokenType.BangEqual, TokenType.EqualEqual);
-        }
-
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression ExclusiveOr()
-        {
-            return LogicalExpression(Or, TokenType.CaretCaret);
-        }
-
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression Or()
-        {
-            return LogicalExpression(And, TokenType.PipePipe);
-        }
-
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression And()
-        {
-            return LogicalExpression(Comparison, TokenType.AndAnd);
-        }
-
         /// <summary>
         /// 
         /// </summary>
         /// <returns></returns>
-        private Expression Comparison()
+        private TExpression Unary()
         {
-            return BinaryExpression(Term, TokenType.Greater, TokenType.GreaterEqual, TokenType.Less, TokenType.LessEqual);
-        }
-
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression Term()
-        {
-            return BinaryExpression(Factor, TokenType.Minus, TokenType.Plus, TokenType.At);
-        }
-
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression Factor()
-        {
-            return BinaryExpression(Bitwise, TokenType.Slash, TokenType.Star);
-        }
-
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression Bitwise()
-        {
-            return BinaryExpression(Unary, TokenType.And, TokenType.Pipe, TokenType.Caret);
-        }
-
-        /// <summary>
-        /// 
-        /// </summary>
-        /// <returns></returns>
-        private Expression Unary()
-        {
-            if (AdvanceIfMatches(out _, TokenType.Bang, TokenType.Minus))
+            if (Peek(out var current) && current.Type is TokenType.Bang or TokenType.Minus)
             {
-                if (PreviousToken(out var @operator))
-                {
-                    return new Unary(@operator, Unary());
-                }
+                Advance(out var @operator);
+                return Builder.Unary(@operator, Unary());
             }
 
             return Call();
@@ -417,9 +539,9 @@ namespace Giosue
         /// </summary>
         /// <param name="callee"></param>
         /// <returns></returns>
-        private Expression FinishCall(Expression callee)
+        private TExpression FinishCall(TExpression callee)
         {
-            var arguments = new List<Expression>();
+            var arguments = new List<TExpression>();
             if (!CurrentTokenTypeEquals(TokenType.RightParenthesis))
             {
                 do
@@ -429,14 +551,14 @@ namespace Giosue
             }
 
             AdvanceIfMatchesOrCrashIfNotMatches(TokenType.RightParenthesis, "Un ')' in atteso dopo gli argomenti per una funzione.", out var consumed);
-            return new AST.Call(callee, consumed, arguments);
+            return Builder.Call(callee, consumed, arguments);
         }
 
         /// <summary>
         /// 
         /// </summary>
         /// <returns></returns>
-        private Expression Call()
+        private TExpression Call()
         {
             var expression = Primary();
 
@@ -452,52 +574,48 @@ namespace Giosue
         /// 
         /// </summary>
         /// <returns></returns>
-        private Expression Primary()
+        private TExpression Primary()
         {
             if (AdvanceIfMatches(out _, TokenType.Falso))
             {
-                return new Literal(false);
+                return Builder.Literal(false);
             }
             if (AdvanceIfMatches(out _, TokenType.Vero))
             {
-                return new Literal(true);
+                return Builder.Literal(true);
             }
             if (AdvanceIfMatches(out _, TokenType.Niente))
             {
-                return new Literal(null);
+                return Builder.Literal(null);
             }
 
-            if (AdvanceIfMatches(out var consumed, TokenType.Integer, TokenType.Float, TokenType.String))
+            if (Peek(out var current) && current.Type is TokenType.Integer or TokenType.Float or TokenType.String)
             {
-                return new Literal(consumed.Literal);
+                Advance(out var consumed);
+                return Builder.Literal(consumed.Literal);
             }
 
             if (AdvanceIfMatches(out _, TokenType.LeftParenthesis))
             {
                 var expression = Expression();
                 AdvanceIfMatchesOrCrashIfNotMatches(TokenType.RightParenthesis, "Expected ')' after expression.", out _);
-                return new Grouping(expression);
+                return Builder.Grouping(expression);
             }
 
             if (AdvanceIfMatches(out _, TokenType.Identifier))
             {
                 if (PreviousToken(out var previous))
                 {
-                    return new AST.Variable(previous);
+                    return Builder.Variable(previous);
                 }
 
                 // Could not get previous token for variable declaration.
                 throw new ParserException(ParserExceptionType.Unknown, null, "Prendere il token prima per la creazione di una variabile era impossible");
             }
 
-            if (!Peek(out var current))
-            {
-                current = null;
-            }
-
             // Expected expression.
             //throw ParseException(current, "Una espressione era previsto.");
-            return null;
+            return Builder.NoExpression;
         }
 
         #endregion Binary and logical expressions
@@ -543,6 +661,7 @@ namespace Giosue
                         case TokenType.Mentre:
                         case TokenType.Var:
                         case TokenType.Fun:
+                        case TokenType.Ritorna:
                             return;
                     }
                 }
@@ -577,6 +696,26 @@ namespace Giosue
             throw ParseException(current, message);
         }
 
+        /// <summary>
+        /// Advance the <see cref="Parser"/> if the type of the current token equals <paramref name="tokenType"/>.
+        /// </summary>
+        /// <remarks>
+        /// This is separate from the overload that takes several types so that checking for one type doesn't allocate an array.
+        /// </remarks>
+        /// <param name="tokenType">The token type to check.</param>
+        /// <returns>True if the type of the current token equals <paramref name="tokenType"/> and the <see cref="Parser"/> was successfully advanced.</returns>
+        private bool AdvanceIfMatches(out Token consumed, TokenType tokenType)
+        {
+            if (CurrentTokenTypeEquals(tokenType))
+            {
+                return Advance(out consumed);
+            }
+
+            // No match, not advanced.
+            consumed = default;
+            return false;
+        }
+
         /// <summary>
         /// Advance the <see cref="Parser"/> if the type of the current token equals one of <paramref name="tokenTypes"/>.
         /// </summary>
@@ -628,7 +767,8 @@ namespace Giosue
                 return false;
             }
 
-            CurrentTokenIndex++;
+            ConsumedCount++;
+            IsCurrentTokenPulled = false;
             if (PreviousToken(out var previous))
             {
                 consumed = previous;
@@ -651,7 +791,7 @@ namespace Giosue
                 return false;
             }
 
-            current = Tokens[CurrentTokenIndex];
+            current = CurrentToken;
             return true;
         }
 
@@ -664,14 +804,13 @@ namespace Giosue
         {
             last = default;
 
-            // If the current token index is before the second token in the list,
-            // there's nothing to see.
-            if (CurrentTokenIndex < 1)
+            // If nothing has been consumed, there's nothing to see.
+            if (ConsumedCount < 1)
             {
                 return false;
             }
 
-            last = Tokens[CurrentTokenIndex - 1];
+            last = Lookahead[(ConsumedCount - 1) % LookaheadLength];
             return true;
         }
 
@@ -0,0 +1,73 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Runtime.CompilerServices;
+using System.Text;
+
+namespace Giosue.Profiling
+{
+    /// <summary>
+    /// Counts events on one thread and adds them to a <see cref="GiosueEventSource"/> counter in batches.
+    /// </summary>
+    /// <remarks>
+    /// Only increment the batch while <see cref="GiosueEventSource.IsCounting"/> is true, and flush it when the work ends.
+    /// </remarks>
+    internal struct CounterBatch
+    {
+        /// <summary>
+        /// The number of events that are counted before they are added to the counter.
+        /// </summary>
+        public const int Size = 1024;
+
+        private readonly GiosueCounter Counter;
+        private int Count;
+
+        public CounterBatch(GiosueCounter counter)
+        {
+            Counter = counter;
+            Count = 0;
+        }
+
+        /// <summary>
+        /// Counts one event, and adds the batch to the counter once it's full.
+        /// </summary>
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public void Increment()
+        {
+            if (++Count == Size)
+            {
+                Flush();
+            }
+        }
+
+        /// <summary>
+        /// Adds the events counted so far to the counter.
+        /// </summary>
+        public void Flush()
+        {
+            if (Count != 0)
+            {
+                GiosueEventSource.Log.Add(Counter, Count);
+                Count = 0;
+            }
+        }
+    }
+}
@@ -0,0 +1,163 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics.Tracing;
+using System.Linq;
+using System.Text;
+using System.Threading;
+
+namespace Giosue.Profiling
+{
+    /// <summary>
+    /// A count that <see cref="GiosueEventSource"/> publishes.
+    /// </summary>
+    internal enum GiosueCounter
+    {
+        NodesEvaluated,
+        FunctionCalls,
+        MismatchedTypeErrors,
+        EnvironmentsCreated,
+        AllocatedBytes,
+        TokensScanned,
+        StatementsParsed,
+    }
+
+    // Design comments:
+    // The counters are published as EventCounters, so `dotnet-counters monitor --counters Giosue`
+    // or any `EventListener` can read them while a host runs scripts. Nothing is counted
+    // until a listener turns the counters on: every place that counts first checks
+    // `IsCounting`, which is a plain static field, so a host that isn't being watched only
+    // pays for a branch that is never taken.
+    // The counts that go up on every node, token or call are kept in a `CounterBatch` by
+    // the interpreter, scanner or parser that is running, and only added to the shared
+    // totals every `CounterBatch.Size` events and when the run ends, so threads running
+    // scripts at the same time don't fight over the totals.
+    // The nodes that are counted are the ones the tree-walking interpreter and the arena
+    // visit; code run by the virtual machine or compiled by `TieredCompilation` only counts
+    // its calls.
+    /// <summary>
+    /// Publishes counters about the scripts that run in this process.
+    /// </summary>
+    [EventSource(Name = SourceName)]
+    public sealed class GiosueEventSource : EventSource
+    {
+        /// <summary>
+        /// The name of the event source, which tools such as <c>dotnet-counters</c> use to find the counters.
+        /// </summary>
+        public const string SourceName = "Giosue";
+
+        /// <summary>
+        /// Indicates if a listener has turned the counters on.
+        /// </summary>
+        /// <remarks>
+        /// This has no initializer because a listener can turn the counters on while <see cref="Log"/> is being created.
+        /// </remarks>
+        internal static bool IsCounting;
+
+        /// <summary>
+        /// The only <see cref="GiosueEventSource"/>.
+        /// </summary>
+        public static readonly GiosueEventSource Log = new();
+
+        /// <summary>
+        /// The running total of each <see cref="GiosueCounter"/>.
+        /// </summary>
+        private readonly long[] Totals = new long[Enum.GetValues(typeof(GiosueCounter)).Length];
+
+        /// <summary>
+        /// The deepest chain of environments created since the counters were last published.
+        /// </summary>
+        private int DeepestEnvironment = 0;
+
+        /// <summary>
+        /// The counters, which are created when a listener first turns them on.
+        /// </summary>
+        private DiagnosticCounter[] Counters = null;
+
+        private GiosueEventSource()
+        {
+
+        }
+
+        protected override void OnEventCommand(EventCommandEventArgs command)
+        {
+            if (command.Command == EventCommand.Enable)
+            {
+                Counters ??= new DiagnosticCounter[]
+                {
+                    RateCounter("nodes-evaluated", "Nodes Evaluated", GiosueCounter.NodesEvaluated),
+                    RateCounter("function-calls", "Function Calls", GiosueCounter.FunctionCalls),
+                    RateCounter("mismatched-type-errors", "Mismatched Type Errors", GiosueCounter.MismatchedTypeErrors),
+                    RateCounter("environments-created", "Environments Created", GiosueCounter.EnvironmentsCreated),
+                    RateCounter("allocated-bytes", "Bytes Allocated by Scripts", GiosueCounter.AllocatedBytes, "B"),
+                    RateCounter("tokens-scanned", "Tokens Scanned", GiosueCounter.TokensScanned),
+                    RateCounter("statements-parsed", "Statements Parsed", GiosueCounter.StatementsParsed),
+                    new PollingCounter("environment-depth", this, () => Interlocked.Exchange(ref DeepestEnvironment, 0))
+                    {
+                        DisplayName = "Deepest Environment Chain",
+                    },
+                };
+                IsCounting = true;
+            }
+            else if (command.Command == EventCommand.Disable)
+            {
+                IsCounting = IsEnabled();
+            }
+        }
+
+        private IncrementingPollingCounter RateCounter(string name, string displayName, GiosueCounter counter, string units = "")
+        {
+            return new IncrementingPollingCounter(name, this, () => Interlocked.Read(ref Totals[(int)counter]))
+            {
+                DisplayName = displayName,
+                DisplayUnits = units,
+                DisplayRateTimeScale = TimeSpan.FromSeconds(1),
+            };
+        }
+
+        /// <summary>
+        /// Adds to a counter.
+        /// </summary>
+        /// <param name="counter">The counter.</param>
+        /// <param name="count">The number to add.</param>
+        internal void Add(GiosueCounter counter, long count)
+        {
+            Interlocked.Add(ref Totals[(int)counter], count);
+        }
+
+        /// <summary>
+        /// Records the depth of a chain of environments, keeping the deepest one.
+        /// </summary>
+        /// <param name="depth">The number of environments in the chain.</param>
+        internal void ReportEnvironmentDepth(int depth)
+        {
+            var deepest = Volatile.Read(ref DeepestEnvironment);
+            while (depth > deepest)
+            {
+                var previous = Interlocked.CompareExchange(ref DeepestEnvironment, depth, deepest);
+                if (previous == deepest)
+                {
+                    return;
+                }
+                deepest = previous;
+            }
+        }
+    }
+}
@@ -0,0 +1,88 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Profiling
+{
+    /// <summary>
+    /// Holds what a <see cref="Profiler"/> measured for one function or loop.
+    /// </summary>
+    public class ProfileEntry
+    {
+        /// <summary>
+        /// The name of the function, or <c>mentre</c> for a loop.
+        /// </summary>
+        public string Name { get; }
+
+        /// <summary>
+        /// The line the function or loop is declared on.
+        /// </summary>
+        public int Line { get; }
+
+        /// <summary>
+        /// The number of times the site was entered.
+        /// </summary>
+        public long Calls { get; internal set; } = 0;
+
+        /// <summary>
+        /// The number of <see cref="Stopwatch"/> ticks spent in the site, including the sites entered from it.
+        /// </summary>
+        public long InclusiveTicks { get; internal set; } = 0;
+
+        /// <summary>
+        /// The number of <see cref="Stopwatch"/> ticks spent in the site, excluding the sites entered from it.
+        /// </summary>
+        public long ExclusiveTicks { get; internal set; } = 0;
+
+        /// <summary>
+        /// The number of bytes allocated in the site, including the sites entered from it.
+        /// </summary>
+        public long InclusiveAllocatedBytes { get; internal set; } = 0;
+
+        /// <summary>
+        /// The number of bytes allocated in the site, excluding the sites entered from it.
+        /// </summary>
+        public long ExclusiveAllocatedBytes { get; internal set; } = 0;
+
+        /// <summary>
+        /// The number of times the site is on the stack of the <see cref="Profiler"/>.
+        /// </summary>
+        internal int ActiveCount { get; set; } = 0;
+
+        public double InclusiveMilliseconds => InclusiveTicks * 1000.0 / Stopwatch.Frequency;
+
+        public double ExclusiveMilliseconds => ExclusiveTicks * 1000.0 / Stopwatch.Frequency;
+
+        public ProfileEntry(string name, int line)
+        {
+            Name = name;
+            Line = line;
+        }
+
+        public override string ToString()
+        {
+            // The script site isn't on a line.
+            return Line > 0 ? $"{Name}:{Line}" : Name;
+        }
+    }
+}
@@ -0,0 +1,207 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.IO;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Profiling
+{
+    // Design comments:
+    // The profiler is driven by the interpreter: every call to a `GiosueFunction` and every
+    // `mentre` loop enters a site when it starts and exits it when it ends, even if it ends by
+    // throwing. A site is identified by its name and the line it was declared on, so two
+    // functions with the same name in different places are kept apart.
+    // Time is measured with `Stopwatch` timestamps and allocations with the number of bytes
+    // allocated by the current thread. Inclusive figures include everything done by the sites
+    // entered from a site; exclusive figures don't. A recursive site only adds to its inclusive
+    // figures when its outermost call exits, so recursion is never counted twice.
+    // Every distinct stack of sites is interned into a path (its parent path plus a site), so
+    // entering a site never builds a string. The folded stacks are only formatted when they
+    // are written.
+    /// <summary>
+    /// Records how many times each function and loop runs, how long it takes and how much it allocates.
+    /// </summary>
+    public class Profiler
+    {
+        /// <summary>
+        /// The name of the site that measures the code outside of every function and loop.
+        /// </summary>
+        public const string ScriptSiteName = "<script>";
+
+        private class Frame
+        {
+            public ProfileEntry Entry;
+            public int Path;
+            public long StartTimestamp;
+            public long StartAllocatedBytes;
+            public long ChildTicks;
+            public long ChildAllocatedBytes;
+        }
+
+        private readonly Dictionary<(string Name, int Line), ProfileEntry> EntriesBySite = new();
+
+        /// <summary>
+        /// The site and parent path of each path. The path at index 0 is the empty stack.
+        /// </summary>
+        private readonly List<(ProfileEntry Entry, int Parent)> Paths = new() { (null, -1) };
+
+        private readonly Dictionary<(ProfileEntry Entry, int Parent), int> PathIndices = new();
+
+        /// <summary>
+        /// The number of ticks spent in each path, excluding the paths entered from it.
+        /// </summary>
+        private readonly List<long> PathTicks = new() { 0 };
+
+        private readonly Stack<Frame> Frames = new();
+
+        /// <summary>
+        /// Frames that have exited and can be reused.
+        /// </summary>
+        private readonly Stack<Frame> FreeFrames = new();
+
+        /// <summary>
+        /// Every site that has been entered.
+        /// </summary>
+        public IEnumerable<ProfileEntry> Entries => EntriesBySite.Values;
+
+        /// <summary>
+        /// Starts measuring a site.
+        /// </summary>
+        /// <remarks>
+        /// Every call must be matched by a call to <see cref="Exit"/>.
+        /// </remarks>
+        /// <param name="name">The name of the site.</param>
+        /// <param name="line">The line the site is on.</param>
+        public void Enter(string name, int line)
+        {
+            if (!EntriesBySite.TryGetValue((name, line), out var entry))
+            {
+                entry = new ProfileEntry(name, line);
+                EntriesBySite.Add((name, line), entry);
+            }
+
+            var parentPath = Frames.Count == 0 ? 0 : Frames.Peek().Path;
+            if (!PathIndices.TryGetValue((entry, parentPath), out var path))
+            {
+                path = Paths.Count;
+                Paths.Add((entry, parentPath));
+                PathTicks.Add(0);
+                PathIndices.Add((entry, parentPath), path);
+            }
+
+            var frame = FreeFrames.Count == 0 ? new Frame() : FreeFrames.Pop();
+            frame.Entry = entry;
+            frame.Path = path;
+            frame.ChildTicks = 0;
+            frame.ChildAllocatedBytes = 0;
+
+            entry.Calls++;
+            entry.ActiveCount++;
+            Frames.Push(frame);
+
+            // Read the counters last so the bookkeeping above isn't measured.
+            frame.StartAllocatedBytes = GC.GetAllocatedBytesForCurrentThread();
+            frame.StartTimestamp = Stopwatch.GetTimestamp();
+        }
+
+        /// <summary>
+        /// Stops measuring the site that was entered last.
+        /// </summary>
+        public void Exit()
+        {
+            var endTimestamp = Stopwatch.GetTimestamp();
+            var endAllocatedBytes = GC.GetAllocatedBytesForCurrentThread();
+
+            var frame = Frames.Pop();
+            var entry = frame.Entry;
+            var ticks = endTimestamp - frame.StartTimestamp;
+            var allocatedBytes = endAllocatedBytes - frame.StartAllocatedBytes;
+
+            entry.ExclusiveTicks += ticks - frame.ChildTicks;
+            entry.ExclusiveAllocatedBytes += allocatedBytes - frame.ChildAllocatedBytes;
+            PathTicks[frame.Path] += ticks - frame.ChildTicks;
+
+            if (--entry.ActiveCount == 0)
+            {
+                entry.InclusiveTicks += ticks;
+                entry.InclusiveAllocatedBytes += allocatedBytes;
+            }
+
+            if (Frames.Count > 0)
+            {
+                var parent = Frames.Peek();
+                parent.ChildTicks += ticks;
+                parent.ChildAllocatedBytes += allocatedBytes;
+            }
+
+            frame.Entry = null;
+            FreeFrames.Push(frame);
+        }
+
+        /// <summary>
+        /// Writes a table of every site, with the sites that took the most exclusive time first.
+        /// </summary>
+        /// <param name="writer">The writer to write the report to.</param>
+        public void WriteFlatReport(TextWriter writer)
+        {
+            writer.WriteLine($"{"Calls",12} {"Incl. ms",12} {"Excl. ms",12} {"Incl. bytes",14} {"Excl. bytes",14}  Site");
+
+            foreach (var entry in Entries.OrderByDescending(e => e.ExclusiveTicks))
+            {
+                writer.WriteLine(
+                    $"{entry.Calls,12} {entry.InclusiveMilliseconds,12:F3} {entry.ExclusiveMilliseconds,12:F3} " +
+                    $"{entry.InclusiveAllocatedBytes,14} {entry.ExclusiveAllocatedBytes,14}  {entry}");
+            }
+        }
+
+        /// <summary>
+        /// Writes the exclusive time of every stack of sites in the folded stacks format read by flame graph tools.
+        /// </summary>
+        /// <remarks>
+        /// Each line is a stack of sites separated by semicolons, outermost first, followed by the number of microseconds spent in it.
+        /// </remarks>
+        /// <param name="writer">The writer to write the stacks to.</param>
+        public void WriteFoldedStacks(TextWriter writer)
+        {
+            var sites = new Stack<ProfileEntry>();
+            var line = new StringBuilder();
+
+            for (int path = 1; path < Paths.Count; path++)
+            {
+                var microseconds = PathTicks[path] * 1_000_000 / Stopwatch.Frequency;
+                if (microseconds == 0)
+                {
+                    continue;
+                }
+
+                for (var p = path; p > 0; p = Paths[p].Parent)
+                {
+                    sites.Push(Paths[p].Entry);
+                }
+
+                line.Clear().AppendJoin(';', sites).Append(' ').Append(microseconds);
+                sites.Clear();
+                writer.WriteLine(line);
+            }
+        }
+    }
+}
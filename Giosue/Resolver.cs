@@ -0,0 +1,242 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Exceptions;
+
+namespace Giosue
+{
+    // Design comments:
+    // The resolver walks the trees once before they are interpreted and works out where
+    // every local variable lives. Each scope (a block or a function body) gets one
+    // `Environment` at runtime, and every variable declared in that scope gets the next
+    // free slot in it. Uses of a variable are then given a depth (how many environments
+    // up the chain the variable lives) and a slot, so the interpreter never needs to
+    // look up a local by name.
+    // Anything declared outside of all scopes is a global and is left unresolved
+    // (a depth of -1). Globals are still looked up by name so builtins and the REPL
+    // keep working.
+    // A function can use a local that its block declares after it, such as another local
+    // function it calls; the `ScopeStack` binds those names when the block ends.
+    /// <summary>
+    /// Resolves the depth and slot of every local variable before the code is interpreted.
+    /// </summary>
+    public class Resolver : AST.IVisitor<object>, Statements.IVisitor<object>
+    {
+        /// <summary>
+        /// The scopes enclosing the code being resolved.
+        /// </summary>
+        private readonly ScopeStack<AST.Expression> Scopes = new(Bind);
+
+        /// <summary>
+        /// Resolves the variables in <paramref name="statements"/>.
+        /// </summary>
+        /// <param name="statements">The statements to resolve.</param>
+        /// <exception cref="EnvironmentException">Thrown if a local variable's name is a reserved keyword.</exception>
+        public void Resolve(List<Statements.Statement> statements)
+        {
+            foreach (var statement in statements)
+            {
+                ResolveStatement(statement);
+            }
+        }
+
+        /// <summary>
+        /// Resolves the local variables in one top-level statement.
+        /// </summary>
+        /// <param name="statement">The statement to resolve.</param>
+        /// <exception cref="EnvironmentException">Thrown if a local variable's name is a reserved keyword.</exception>
+        public void Resolve(Statements.Statement statement)
+        {
+            ResolveStatement(statement);
+        }
+
+        private void ResolveStatement(Statements.Statement statement)
+        {
+            statement?.Accept(this);
+        }
+
+        private void ResolveExpression(AST.Expression expression)
+        {
+            expression?.Accept(this);
+        }
+
+        /// <summary>
+        /// Sets the depth and slot of a variable or assignment that was resolved when its scope ended.
+        /// </summary>
+        /// <param name="expression">The variable or assignment.</param>
+        /// <param name="depth">The depth of the variable.</param>
+        /// <param name="slot">The slot of the variable.</param>
+        private static void Bind(AST.Expression expression, int depth, int slot)
+        {
+            switch (expression)
+            {
+                case AST.Variable variable:
+                    (variable.Depth, variable.Slot) = (depth, slot);
+                    break;
+                case AST.Assign assign:
+                    (assign.Depth, assign.Slot) = (depth, slot);
+                    break;
+            }
+        }
+
+        #region AST visitors
+
+        object AST.IVisitor<object>.VisitAssignExpression(AST.Assign expression)
+        {
+            ResolveExpression(expression.Value);
+            (expression.Depth, expression.Slot) = Scopes.Resolve(expression.Name, expression);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitBinaryExpression(AST.Binary expression)
+        {
+            ResolveExpression(expression.Left);
+            ResolveExpression(expression.Right);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitCallExpression(AST.Call expression)
+        {
+            ResolveExpression(expression.Callee);
+            expression.Arguments.ForEach(ResolveExpression);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitGetExpression(AST.Get expression)
+        {
+            ResolveExpression(expression.Object);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitGroupingExpression(AST.Grouping expression)
+        {
+            ResolveExpression(expression.Expression);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitLiteralExpression(AST.Literal expression)
+        {
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitLogicalExpression(AST.Logical expression)
+        {
+            ResolveExpression(expression.Left);
+            ResolveExpression(expression.Right);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitSetExpression(AST.Set expression)
+        {
+            ResolveExpression(expression.Value);
+            ResolveExpression(expression.Object);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitSuperExpression(AST.Super expression)
+        {
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitThisExpression(AST.This expression)
+        {
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitUnaryExpression(AST.Unary expression)
+        {
+            ResolveExpression(expression.Right);
+            return null;
+        }
+
+        object AST.IVisitor<object>.VisitVariableExpression(AST.Variable expression)
+        {
+            (expression.Depth, expression.Slot) = Scopes.Resolve(expression.Name, expression);
+            return null;
+        }
+
+        #endregion AST visitors
+
+        #region Statement visitors
+
+        object Statements.IVisitor<object>.VisitExpressionStatement(Statements.Expression statement)
+        {
+            ResolveExpression(statement.Expr);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitVarStatement(Statements.Var statement)
+        {
+            // The initializer is resolved first so that it still sees any variable
+            // with the same name from an outer scope.
+            ResolveExpression(statement.Initializer);
+            statement.Slot = Scopes.Declare(statement.Name);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitBlockStatement(Statements.Block statement)
+        {
+            Scopes.BeginScope();
+            Resolve(statement.Statements);
+            Scopes.EndScope();
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitIfStatement(Statements.If statement)
+        {
+            ResolveExpression(statement.Condition);
+            ResolveStatement(statement.ThenBranch);
+            ResolveStatement(statement.ElseBranch);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitWhileStatement(Statements.While statement)
+        {
+            ResolveExpression(statement.Condition);
+            ResolveStatement(statement.Body);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitReturnStatement(Statements.Return statement)
+        {
+            ResolveExpression(statement.Value);
+            return null;
+        }
+
+        object Statements.IVisitor<object>.VisitFunctionStatement(Statements.Function statement)
+        {
+            // Declare the function before resolving its body so it can call itself.
+            statement.Slot = Scopes.Declare(statement.Name);
+
+            // The parameters and the body share one environment (see GiosueFunction.Call),
+            // so the parameters always take the first slots.
+            Scopes.BeginFunctionScope();
+            statement.Parameters.ForEach(parameter => Scopes.Declare(parameter));
+            Resolve(statement.Body);
+            Scopes.EndScope();
+            return null;
+        }
+
+        #endregion Statement visitors
+    }
+}
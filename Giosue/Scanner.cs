@@ -22,10 +22,15 @@ using System.Linq;
 using System.Text;
 using Giosue.Exceptions;
 using Giosue.Extensions;
+using Giosue.Profiling;
 using SourceManager;
 
 namespace Giosue
 {
+    // Design comments:
+    // If the source has all of its characters in memory, the tokens are scanned by a
+    // `SpanScanner`, which reads the characters directly and produces exactly the same
+    // tokens. Otherwise they are read one at a time through the `Source`.
     /// <summary>
     /// Represents a scanner that converts source code to a <see cref="List{T}"/> of <see cref="Tokens"/>.
     /// </summary>
@@ -33,21 +38,6 @@ namespace Giosue
     {
         private const char StringTerminator = '"';
 
-        /// <summary>
-        /// A dictionary of <see cref="string"/> to <see cref="TokenType"/>.
-        /// </summary>
-        private static readonly Dictionary<string, TokenType> Keywords = new()
-        {
-            { "var", TokenType.Var },
-            { "fun", TokenType.Fun },
-            { "oppure", TokenType.Oppure },
-            { "falso", TokenType.Falso },
-            { "se", TokenType.Se },
-            { "niente", TokenType.Niente },
-            { "vero", TokenType.Vero },
-            { "mentre", TokenType.Mentre },
-        };
-
         private static readonly Dictionary<char, TokenType> SingleCharacterTokens = new()
         {
             { '(', TokenType.LeftParenthesis },
@@ -86,6 +76,11 @@ namespace Giosue
         /// </summary>
         private List<Token> Tokens { get; } = new();
 
+        /// <summary>
+        /// The token produced by the last call to <see cref="ScanToken"/>, or null if it didn't produce one.
+        /// </summary>
+        private Token ScannedToken { get; set; } = null;
+
         /// <summary>
         /// The line that the current character is on.
         /// </summary>
@@ -107,18 +102,62 @@ namespace Giosue
         /// <returns>The list of scanned tokens.</returns>
         public List<Token> ScanTokens()
         {
+            foreach (var token in EnumerateTokens())
+            {
+                Tokens.Add(token);
+            }
+            return Tokens;
+        }
+
+        /// <summary>
+        /// Scans the tokens in the source one at a time.
+        /// </summary>
+        /// <remarks>
+        /// Each token is scanned only when it's asked for, and the tokens are not added to the list returned by <see cref="GetTokens"/>.
+        /// The last token is always <see cref="TokenType.EOF"/>.
+        /// </remarks>
+        /// <returns>The scanned tokens.</returns>
+        /// <exception cref="ScannerException">Thrown if a token can't be scanned.</exception>
+        public IEnumerable<Token> EnumerateTokens()
+        {
+            if (Source.TryGetRemainingCharacters(out var characters))
+            {
+                return new SpanScanner(characters).EnumerateTokens();
+            }
+
+            return EnumerateTokensFromSource();
+        }
+
+        /// <summary>
+        /// Scans the tokens in the source one at a time, reading one character at a time.
+        /// </summary>
+        /// <returns>The scanned tokens.</returns>
+        internal IEnumerable<Token> EnumerateTokensFromSource()
+        {
+            var scannedTokens = new CounterBatch(GiosueCounter.TokensScanned);
             while (!Source.IsAtEnd)
             {
+                ScannedToken = null;
                 ScanToken();
                 
                 // We scanned one token. Clear out the token from the source
                 // so the next token can be read.
                 // Do this here - ScanToken should handle scanning the token and that's it.
                 Source.ClearToken();
+
+                // Whitespace and comments don't produce a token.
+                if (ScannedToken != null)
+                {
+                    if (GiosueEventSource.IsCounting)
+                    {
+                        scannedTokens.Increment();
+                    }
+                    yield return ScannedToken;
+                }
             }
 
-            Tokens.Add(new Token(TokenType.EOF, "", null, Line));
-            return Tokens;
+            scannedTokens.Flush();
+            yield return new Token(TokenType.EOF, "", null, Line);
         }
 
         public IReadOnlyList<Token> GetTokens()
@@ -192,8 +231,8 @@ namespace Giosue
                     }
                 case var c when c.IsAsciiAlphanumericOrUnderscore():
                     {
-                        var tokenType = Identifier();
-                        AddToken(tokenType);
+                        var symbol = Identifier();
+                        AddSymbolToken(symbol);
                         break;
                     }
 
@@ -205,14 +244,26 @@ namespace Giosue
         }
 
         /// <summary>
-        /// Adds a token to <see cref="Tokens"/>.
+        /// Sets the token produced by <see cref="ScanToken"/>.
         /// </summary>
         /// <param name="type">The type of the token to add.</param>
         /// <param name="literal">The token's literal.</param>
         private void AddToken(TokenType type, object literal = null)
         {
             var lexeme = Source.CurrentToken;
-            Tokens.Add(new Token(type, lexeme, literal, Line));
+            ScannedToken = new Token(type, lexeme, literal, Line);
+        }
+
+        /// <summary>
+        /// Sets the token produced by <see cref="ScanToken"/> to an identifier or keyword.
+        /// </summary>
+        /// <remarks>
+        /// The lexeme is the interned name of the symbol, so no new <see cref="string"/> is allocated.
+        /// </remarks>
+        /// <param name="symbol">The symbol of the identifier or keyword.</param>
+        private void AddSymbolToken(int symbol)
+        {
+            ScannedToken = new Token(SymbolTable.TokenTypeOf(symbol), SymbolTable.NameOf(symbol), null, Line, symbol);
         }
 
         /// <summary>
@@ -332,8 +383,8 @@ namespace Giosue
         /// <summary>
         /// Scans an identifier (user-defined or keyword).
         /// </summary>
-        /// <returns>The type of the identifier.</returns>
-        private TokenType Identifier()
+        /// <returns>The symbol of the identifier.</returns>
+        private int Identifier()
         {
             if (Source.Peek(out var current))
             {
@@ -347,13 +398,7 @@ namespace Giosue
                 }
             }
 
-            var lexeme = Source.CurrentToken;
-            var tokenType = TokenType.Identifier;
-            if (Keywords.TryGetValue(lexeme, out var keywordType))
-            {
-                tokenType = keywordType;
-            }
-            return tokenType;
+            return SymbolTable.Intern(Source.CurrentTokenSpan);
         }
 
         /// <summary>
@@ -0,0 +1,308 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+using Giosue.Bytecode;
+
+namespace Giosue.Scheduling
+{
+    // Design comments:
+    // The scheduler runs many compiled scripts on a few worker threads. Each script runs on
+    // its own `VirtualMachine`, a slice of `StepsPerSlice` steps at a time (see
+    // `VirtualMachine.RunSlice`), and then goes to the back of the queue, so a script stuck
+    // in a loop only ever holds a worker for one slice. Between slices the scheduler checks
+    // the script's CPU budget and timeout.
+    // A script that calls `Dormi` isn't put back in the queue until a timer wakes it up, so
+    // sleeping scripts don't use a worker at all. A sleep is cut short at the script's
+    // timeout, and the script is then stopped when it wakes up.
+    // Only the script's own frames can be paused. A tree-walking function that the script
+    // calls runs to the end, but while it runs the interpreter counts its loop iterations
+    // and calls against the slice and checks the budget and timeout every so often (see
+    // `Interpreter.CountStep`), stopping the script in the middle if it went over. A script
+    // with neither a budget nor a timeout is stopped instead once such a function runs
+    // longer than a slice, since nothing else would ever free its worker. A `Dormi` inside
+    // such a function can't suspend the script, so it blocks the worker, at most until the
+    // timeout, and the blocked time doesn't count as CPU time.
+    // A script that the `Compiler` can't compile, such as one that captures a local in a
+    // closure, runs on the tree-walking interpreter the same way, a top-level statement at
+    // a time. Any statement could hold its worker, so such a script must have a budget or a
+    // timeout.
+    // Disposing the scheduler cancels the tree-walking code and the pauses that are holding
+    // workers, so the workers can be joined.
+    // The workers are threads of their own with a large stack, for the same reason as in
+    // the console app's batch runner: a deeply recursive builtin or tree-walking function
+    // would otherwise overflow a thread pool thread's stack.
+    /// <summary>
+    /// Runs many scripts at once on a fixed number of threads, a slice at a time.
+    /// </summary>
+    public sealed class ScriptScheduler : IDisposable
+    {
+        /// <summary>
+        /// The number of steps that a script runs each time it gets a worker, unless the scheduler is given another number.
+        /// </summary>
+        public const int DefaultStepsPerSlice = 10_000;
+
+        /// <summary>
+        /// The stack size of a worker thread, which is the same as the main thread's on most systems.
+        /// </summary>
+        private const int WorkerStackSize = 8 * 1024 * 1024;
+
+        /// <summary>
+        /// The scripts that are waiting for a worker. Only used while holding its own lock.
+        /// </summary>
+        private readonly Queue<ScriptTask> ReadyTasks = new();
+
+        /// <summary>
+        /// The scripts that are waiting for a timer to wake them up. Only used while holding the lock on <see cref="ReadyTasks"/>.
+        /// </summary>
+        private readonly HashSet<ScriptTask> SleepingTasks = new();
+
+        private readonly Thread[] Workers;
+
+        /// <summary>
+        /// The scripts that workers are running a slice of. Only used while holding the lock on <see cref="ReadyTasks"/>.
+        /// </summary>
+        private readonly HashSet<ScriptTask> RunningTasks = new();
+
+        /// <summary>
+        /// Indicates if the scheduler has been disposed. Only used while holding the lock on <see cref="ReadyTasks"/>.
+        /// </summary>
+        private bool IsDisposed = false;
+
+        /// <summary>
+        /// The number of steps (loop iterations and calls) that a script runs each time it gets a worker.
+        /// </summary>
+        public int StepsPerSlice { get; }
+
+        /// <summary>
+        /// Creates a new <see cref="ScriptScheduler"/> and starts its workers.
+        /// </summary>
+        /// <param name="workerCount">The number of threads that run scripts.</param>
+        /// <param name="stepsPerSlice">The number of steps (loop iterations and calls) that a script runs each time it gets a worker.</param>
+        /// <exception cref="ArgumentOutOfRangeException">Thrown if <paramref name="workerCount"/> or <paramref name="stepsPerSlice"/> is not positive.</exception>
+        public ScriptScheduler(int workerCount, int stepsPerSlice = DefaultStepsPerSlice)
+        {
+            if (workerCount < 1)
+            {
+                // There must be at least one worker.
+                throw new ArgumentOutOfRangeException(nameof(workerCount), "Ci deve essere almeno un thread.");
+            }
+            if (stepsPerSlice < 1)
+            {
+                // A slice must have at least one step.
+                throw new ArgumentOutOfRangeException(nameof(stepsPerSlice), "Una fetta deve avere almeno un passo.");
+            }
+
+            StepsPerSlice = stepsPerSlice;
+            Workers = new Thread[workerCount];
+            for (int i = 0; i < workerCount; i++)
+            {
+                Workers[i] = new Thread(Work, WorkerStackSize)
+                {
+                    IsBackground = true,
+                    Name = $"{nameof(ScriptScheduler)} {i}",
+                };
+                Workers[i].Start();
+            }
+        }
+
+        /// <summary>
+        /// Starts running a compiled script.
+        /// </summary>
+        /// <remarks>
+        /// The interpreter must not run any other code until the script stops. Use a new interpreter, such as one forked from a
+        /// <see cref="GlobalsSnapshot"/>, for each script.
+        /// </remarks>
+        /// <param name="interpreter">The interpreter that provides the script's globals and output.</param>
+        /// <param name="script">The compiled script.</param>
+        /// <param name="cpuBudget">The most time the script can spend running, or null for no limit.</param>
+        /// <param name="timeout">The most time the script can take to finish, including time spent waiting and sleeping, or null for no limit.</param>
+        /// <returns>The task that follows the script.</returns>
+        /// <exception cref="ObjectDisposedException">Thrown if the scheduler has been disposed.</exception>
+        public ScriptTask Submit(Interpreter interpreter, BytecodeFunction script, TimeSpan? cpuBudget = null, TimeSpan? timeout = null)
+        {
+            return Submit(new ScriptTask(interpreter, script, cpuBudget, timeout));
+        }
+
+        /// <summary>
+        /// Starts running a script on the tree-walking interpreter, such as one that the <see cref="Compiler"/> can't compile.
+        /// </summary>
+        /// <remarks>
+        /// The statements must have been run through a <see cref="Resolver"/> first. A top-level statement can't be paused, so
+        /// a slice only ends between two of them; while one runs, the script is stopped if it goes over its CPU budget or
+        /// timeout, and <c>Dormi</c> blocks the worker instead of suspending the script. So the script must have a CPU budget or a
+        /// timeout, or both.
+        /// The interpreter must not run any other code until the script stops.
+        /// </remarks>
+        /// <param name="interpreter">The interpreter that runs the script.</param>
+        /// <param name="script">The top-level statements of the script.</param>
+        /// <param name="cpuBudget">The most time the script can spend running, or null for no limit.</param>
+        /// <param name="timeout">The most time the script can take to finish, including time spent waiting and sleeping, or null for no limit.</param>
+        /// <returns>The task that follows the script.</returns>
+        /// <exception cref="ArgumentException">Thrown if both <paramref name="cpuBudget"/> and <paramref name="timeout"/> are null.</exception>
+        /// <exception cref="ObjectDisposedException">Thrown if the scheduler has been disposed.</exception>
+        public ScriptTask Submit(Interpreter interpreter, List<Statements.Statement> script, TimeSpan? cpuBudget = null, TimeSpan? timeout = null)
+        {
+            if (cpuBudget == null && timeout == null)
+            {
+                // A script run by the tree-walking interpreter needs a CPU budget or a timeout.
+                throw new ArgumentException("Uno script eseguito dall'interprete ad albero ha bisogno di un limite di CPU o di tempo.", nameof(cpuBudget));
+            }
+
+            return Submit(new ScriptTask(interpreter, script, cpuBudget, timeout));
+        }
+
+        /// <summary>
+        /// Puts a new script in the queue.
+        /// </summary>
+        /// <param name="task">The script.</param>
+        /// <returns>The script.</returns>
+        /// <exception cref="ObjectDisposedException">Thrown if the scheduler has been disposed.</exception>
+        private ScriptTask Submit(ScriptTask task)
+        {
+            lock (ReadyTasks)
+            {
+                if (IsDisposed)
+                {
+                    throw new ObjectDisposedException(nameof(ScriptScheduler));
+                }
+
+                ReadyTasks.Enqueue(task);
+                Monitor.Pulse(ReadyTasks);
+            }
+            return task;
+        }
+
+        /// <summary>
+        /// Puts a script back in the queue, or cancels it if the scheduler has been disposed.
+        /// </summary>
+        /// <param name="task">The script.</param>
+        private void Enqueue(ScriptTask task)
+        {
+            lock (ReadyTasks)
+            {
+                SleepingTasks.Remove(task);
+                if (!IsDisposed)
+                {
+                    ReadyTasks.Enqueue(task);
+                    Monitor.Pulse(ReadyTasks);
+                    return;
+                }
+            }
+
+            task.Finish(ScriptTaskStatus.Canceled);
+        }
+
+        /// <summary>
+        /// Runs slices of the scripts in the queue until the scheduler is disposed.
+        /// </summary>
+        private void Work()
+        {
+            while (true)
+            {
+                ScriptTask task;
+                lock (ReadyTasks)
+                {
+                    while (ReadyTasks.Count == 0 && !IsDisposed)
+                    {
+                        Monitor.Wait(ReadyTasks);
+                    }
+                    if (IsDisposed)
+                    {
+                        return;
+                    }
+                    task = ReadyTasks.Dequeue();
+                    RunningTasks.Add(task);
+                }
+
+                var isStopped = task.RunSlice(StepsPerSlice);
+                lock (ReadyTasks)
+                {
+                    RunningTasks.Remove(task);
+                }
+                if (isStopped)
+                {
+                    continue;
+                }
+
+                var delay = task.Interpreter.TakeSuspension();
+                if (delay is TimeSpan sleep && sleep > TimeSpan.Zero)
+                {
+                    // Wake the script up at its timeout at the latest, so it can be stopped then.
+                    if (task.TimeLeft is TimeSpan timeLeft && timeLeft < sleep)
+                    {
+                        sleep = timeLeft > TimeSpan.Zero ? timeLeft : TimeSpan.Zero;
+                    }
+
+                    lock (ReadyTasks)
+                    {
+                        task.MarkSleeping();
+                        SleepingTasks.Add(task);
+                    }
+                    Task.Delay(sleep).ContinueWith(_ => Enqueue(task), TaskScheduler.Default);
+                }
+                else
+                {
+                    Enqueue(task);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Stops the workers once they finish the slices they are running, and cancels every script that is waiting or sleeping.
+        /// Tree-walking code that a worker is running is canceled too, since its slice might never end.
+        /// </summary>
+        public void Dispose()
+        {
+            ScriptTask[] canceled;
+            lock (ReadyTasks)
+            {
+                if (IsDisposed)
+                {
+                    return;
+                }
+
+                IsDisposed = true;
+                canceled = ReadyTasks.Concat(SleepingTasks).ToArray();
+                ReadyTasks.Clear();
+                SleepingTasks.Clear();
+                Monitor.PulseAll(ReadyTasks);
+
+                // A slice of tree-walking code might never end on its own.
+                foreach (var task in RunningTasks)
+                {
+                    task.Cancel();
+                }
+            }
+
+            foreach (var worker in Workers)
+            {
+                worker.Join();
+            }
+            foreach (var task in canceled)
+            {
+                task.Finish(ScriptTaskStatus.Canceled);
+            }
+        }
+    }
+}
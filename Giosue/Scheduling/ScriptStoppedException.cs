@@ -0,0 +1,43 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+
+namespace Giosue.Scheduling
+{
+    /// <summary>
+    /// Stops a <see cref="ScriptTask"/> in the middle of a slice, from code that can't return to the scheduler on its own.
+    /// </summary>
+    internal sealed class ScriptStoppedException : Exception
+    {
+        /// <summary>
+        /// The final status of the script.
+        /// </summary>
+        public ScriptTaskStatus Status { get; }
+
+        // The script was stopped ({status}).
+        public ScriptStoppedException(ScriptTaskStatus status) : base($"Lo script è stato fermato ({status}).")
+        {
+            Status = status;
+        }
+    }
+}
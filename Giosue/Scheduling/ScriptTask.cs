@@ -0,0 +1,359 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Diagnostics;
+using System.Linq;
+using System.Text;
+using System.Threading;
+using System.Threading.Tasks;
+using Giosue.Bytecode;
+
+namespace Giosue.Scheduling
+{
+    /// <summary>
+    /// The state of a <see cref="ScriptTask"/>.
+    /// </summary>
+    public enum ScriptTaskStatus
+    {
+        /// <summary>
+        /// The script is waiting for a worker to run its next slice.
+        /// </summary>
+        Waiting,
+
+        /// <summary>
+        /// A worker is running a slice of the script.
+        /// </summary>
+        Running,
+
+        /// <summary>
+        /// The script asked to pause, such as with <c>Dormi</c>, and is waiting to be woken up.
+        /// </summary>
+        Sleeping,
+
+        /// <summary>
+        /// The script ran to the end.
+        /// </summary>
+        Completed,
+
+        /// <summary>
+        /// The script threw an exception, which is in <see cref="ScriptTask.Exception"/>.
+        /// </summary>
+        Faulted,
+
+        /// <summary>
+        /// The script was stopped because it used up its <see cref="ScriptTask.CpuBudget"/>.
+        /// </summary>
+        CpuBudgetExceeded,
+
+        /// <summary>
+        /// The script was stopped because it didn't finish before its <see cref="ScriptTask.Timeout"/>.
+        /// </summary>
+        TimedOut,
+
+        /// <summary>
+        /// The script was stopped because its <see cref="ScriptScheduler"/> was disposed.
+        /// </summary>
+        Canceled,
+
+        /// <summary>
+        /// The script was stopped because, with no <see cref="ScriptTask.CpuBudget"/> or <see cref="ScriptTask.Timeout"/> to
+        /// bound it, it spent more than a slice in a tree-walking function, which can't be paused.
+        /// </summary>
+        SliceOverrun,
+    }
+
+    /// <summary>
+    /// A script that runs a slice at a time on a <see cref="ScriptScheduler"/>.
+    /// </summary>
+    public sealed class ScriptTask
+    {
+        private readonly TaskCompletionSource<ScriptTaskStatus> CompletionSource = new(TaskCreationOptions.RunContinuationsAsynchronously);
+
+        /// <summary>
+        /// The <see cref="Stopwatch"/> timestamp after which the script is stopped, or <see cref="long.MaxValue"/> if it has no timeout.
+        /// </summary>
+        private readonly long Deadline;
+
+        /// <summary>
+        /// The number of <see cref="Stopwatch"/> ticks spent running the script's slices.
+        /// </summary>
+        private long CpuTicks = 0;
+
+        /// <summary>
+        /// The <see cref="Stopwatch"/> timestamp at which the running slice started, moved forward past the time it spent blocked in <see cref="Block(TimeSpan)"/>.
+        /// </summary>
+        private long SliceStart = 0;
+
+        /// <summary>
+        /// The number of steps in the running slice.
+        /// </summary>
+        private int SliceSteps = 0;
+
+        /// <summary>
+        /// Stops the code that can't return to the scheduler on its own when the scheduler is disposed.
+        /// </summary>
+        private readonly CancellationTokenSource Cancellation = new();
+
+        /// <summary>
+        /// The top-level statements of a script that runs on the tree-walking interpreter, or null if it runs on <see cref="Machine"/>.
+        /// </summary>
+        private readonly List<Statements.Statement> Script = null;
+
+        /// <summary>
+        /// The index in <see cref="Script"/> of the next statement to run.
+        /// </summary>
+        private int NextStatement = 0;
+
+        /// <summary>
+        /// The interpreter that provides the script's globals and output.
+        /// </summary>
+        public Interpreter Interpreter { get; }
+
+        /// <summary>
+        /// The virtual machine that holds where the script is, or null if the script runs on the tree-walking interpreter.
+        /// </summary>
+        internal VirtualMachine Machine { get; }
+
+        /// <summary>
+        /// The state of the script, which changes as it runs.
+        /// </summary>
+        public ScriptTaskStatus Status { get; private set; } = ScriptTaskStatus.Waiting;
+
+        /// <summary>
+        /// The exception that stopped the script if it's <see cref="ScriptTaskStatus.Faulted"/>, or null.
+        /// </summary>
+        public Exception Exception { get; private set; } = null;
+
+        /// <summary>
+        /// The most time the script can spend running, or null if it has no limit.
+        /// </summary>
+        public TimeSpan? CpuBudget { get; }
+
+        /// <summary>
+        /// The most time the script can take from being submitted to finishing, including the time it spends waiting and sleeping, or null if it has no limit.
+        /// </summary>
+        public TimeSpan? Timeout { get; }
+
+        /// <summary>
+        /// The time the script has spent running.
+        /// </summary>
+        public TimeSpan CpuTime => TimeSpan.FromSeconds((double)CpuTicks / Stopwatch.Frequency);
+
+        /// <summary>
+        /// The number of slices the script has run.
+        /// </summary>
+        public int Slices { get; private set; } = 0;
+
+        /// <summary>
+        /// Completes with the final status of the script once it stops.
+        /// </summary>
+        public Task<ScriptTaskStatus> Completion => CompletionSource.Task;
+
+        internal ScriptTask(Interpreter interpreter, BytecodeFunction script, TimeSpan? cpuBudget, TimeSpan? timeout)
+            : this(interpreter, cpuBudget, timeout)
+        {
+            Machine = new VirtualMachine(interpreter);
+            Machine.Start(script);
+        }
+
+        internal ScriptTask(Interpreter interpreter, List<Statements.Statement> script, TimeSpan? cpuBudget, TimeSpan? timeout)
+            : this(interpreter, cpuBudget, timeout)
+        {
+            Script = script;
+        }
+
+        private ScriptTask(Interpreter interpreter, TimeSpan? cpuBudget, TimeSpan? timeout)
+        {
+            Interpreter = interpreter;
+            CpuBudget = cpuBudget;
+            Timeout = timeout;
+            Deadline = timeout is TimeSpan t ? Stopwatch.GetTimestamp() + (long)(t.TotalSeconds * Stopwatch.Frequency) : long.MaxValue;
+        }
+
+        /// <summary>
+        /// The time left before the script's timeout, or null if it has no timeout.
+        /// </summary>
+        internal TimeSpan? TimeLeft => Deadline == long.MaxValue ? null : TimeSpan.FromSeconds((double)(Deadline - Stopwatch.GetTimestamp()) / Stopwatch.Frequency);
+
+        /// <summary>
+        /// Runs one slice of the script.
+        /// </summary>
+        /// <param name="steps">The most steps to run.</param>
+        /// <returns>True if the script stopped, false if it should be resumed.</returns>
+        internal bool RunSlice(int steps)
+        {
+            if (Stopwatch.GetTimestamp() >= Deadline)
+            {
+                Finish(ScriptTaskStatus.TimedOut);
+                return true;
+            }
+
+            Status = ScriptTaskStatus.Running;
+            Slices++;
+            SliceStart = Stopwatch.GetTimestamp();
+            SliceSteps = steps;
+            Interpreter.ScheduledTask = this;
+            Interpreter.TakeSteps();
+            try
+            {
+                if (Machine != null ? Machine.RunSlice(steps) : RunStatements(steps))
+                {
+                    Finish(ScriptTaskStatus.Completed);
+                    return true;
+                }
+            }
+            catch (ScriptStoppedException e)
+            {
+                Finish(e.Status);
+                return true;
+            }
+            catch (Exception e)
+            {
+                Exception = e;
+                Finish(ScriptTaskStatus.Faulted);
+                return true;
+            }
+            finally
+            {
+                Interpreter.ScheduledTask = null;
+                CpuTicks += Stopwatch.GetTimestamp() - SliceStart;
+            }
+
+            if (CpuBudget is TimeSpan budget && CpuTime >= budget)
+            {
+                Finish(ScriptTaskStatus.CpuBudgetExceeded);
+                return true;
+            }
+
+            Status = ScriptTaskStatus.Waiting;
+            return false;
+        }
+
+        /// <summary>
+        /// Runs the top-level statements of a script on the tree-walking interpreter until the slice's steps run out.
+        /// </summary>
+        /// <remarks>
+        /// A statement can't be paused, so the slice only ends between two statements. Each statement takes at least a
+        /// step, and the loop iterations and calls that the interpreter counts while it runs (see <see cref="Interpreter.CountStep"/>).
+        /// </remarks>
+        /// <param name="steps">The most steps to run.</param>
+        /// <returns>True if the script finished, false if it should be resumed.</returns>
+        private bool RunStatements(int steps)
+        {
+            while (NextStatement < Script.Count && steps > 0)
+            {
+                Interpreter.Interpret(Script[NextStatement++]);
+                steps -= Interpreter.TakeSteps() + 1;
+            }
+            return NextStatement == Script.Count;
+        }
+
+        /// <summary>
+        /// Stops the script in the middle of a slice if it went over its timeout or CPU budget, or the scheduler was disposed.
+        /// </summary>
+        /// <param name="steps">The steps that tree-walking code has run since it was called from the slice.</param>
+        /// <exception cref="ScriptStoppedException">Thrown if the script has to stop.</exception>
+        internal void CheckBudget(int steps)
+        {
+            if (Cancellation.IsCancellationRequested)
+            {
+                throw new ScriptStoppedException(ScriptTaskStatus.Canceled);
+            }
+
+            // Without a budget or a timeout, nothing else would stop a tree-walking function that never returns.
+            if (CpuBudget == null && Timeout == null && steps > SliceSteps)
+            {
+                throw new ScriptStoppedException(ScriptTaskStatus.SliceOverrun);
+            }
+
+            var now = Stopwatch.GetTimestamp();
+            if (now >= Deadline)
+            {
+                throw new ScriptStoppedException(ScriptTaskStatus.TimedOut);
+            }
+            if (CpuBudget is TimeSpan budget && TimeSpan.FromSeconds((double)(CpuTicks + now - SliceStart) / Stopwatch.Frequency) >= budget)
+            {
+                throw new ScriptStoppedException(ScriptTaskStatus.CpuBudgetExceeded);
+            }
+        }
+
+        /// <summary>
+        /// Blocks the worker for a pause that can't suspend the script, such as a <c>Dormi</c> in a tree-walking function.
+        /// </summary>
+        /// <remarks>
+        /// The pause ends at the script's timeout at the latest, and doesn't count against its CPU budget.
+        /// </remarks>
+        /// <param name="delay">How long to pause the script for.</param>
+        /// <exception cref="ScriptStoppedException">Thrown if the script reached its timeout.</exception>
+        internal void Block(TimeSpan delay)
+        {
+            var isTimingOut = false;
+            if (TimeLeft is TimeSpan timeLeft && timeLeft <= delay)
+            {
+                delay = timeLeft > TimeSpan.Zero ? timeLeft : TimeSpan.Zero;
+                isTimingOut = true;
+            }
+
+            var start = Stopwatch.GetTimestamp();
+            Cancellation.Token.WaitHandle.WaitOne(delay);
+            SliceStart += Stopwatch.GetTimestamp() - start;
+            if (Cancellation.IsCancellationRequested)
+            {
+                throw new ScriptStoppedException(ScriptTaskStatus.Canceled);
+            }
+
+            // The sleep might wake up a little before the deadline.
+            if (isTimingOut)
+            {
+                throw new ScriptStoppedException(ScriptTaskStatus.TimedOut);
+            }
+            CheckBudget(0);
+        }
+
+        /// <summary>
+        /// Asks the tree-walking code that the script is running, or a pause that is blocking its worker, to stop the script.
+        /// </summary>
+        /// <remarks>
+        /// The code stops the next time the interpreter checks the budget (see <see cref="Interpreter.CountStep"/>).
+        /// </remarks>
+        internal void Cancel()
+        {
+            Cancellation.Cancel();
+        }
+
+        /// <summary>
+        /// Marks the script as sleeping until it's put back in the queue.
+        /// </summary>
+        internal void MarkSleeping()
+        {
+            Status = ScriptTaskStatus.Sleeping;
+        }
+
+        /// <summary>
+        /// Stops the script for good.
+        /// </summary>
+        /// <param name="status">The final status of the script.</param>
+        internal void Finish(ScriptTaskStatus status)
+        {
+            Status = status;
+            CompletionSource.TrySetResult(status);
+        }
+    }
+}
@@ -0,0 +1,217 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue.Exceptions;
+
+namespace Giosue
+{
+    // Design comments:
+    // The scopes that the `Resolver` keeps while it walks the trees, pulled out so that
+    // `Arena.ArenaBuilder` can resolve variables the same way while the parser is still
+    // emitting nodes. Each scope maps the symbol of a variable to its slot; a variable that
+    // isn't in any scope is a global (a depth and slot of -1).
+    // A function's body runs after the rest of the block it's declared in has declared its
+    // variables, so it can use a local, or call a local function, that the block declares
+    // after it. The body is resolved before those declarations are seen, though, so a name
+    // in a function that isn't found is kept as pending, and when a scope outside of the
+    // function ends, every pending name that the scope declared is bound to its slot through
+    // the `bind` callback. A name that is still pending when the last scope ends is a global.
+    // A name that isn't in a function is never bound later: the code runs in order, so a
+    // variable declared after it can't have a value yet.
+    /// <summary>
+    /// The stack of scopes used to work out the depth and slot of every local variable.
+    /// </summary>
+    /// <typeparam name="TReference">The type of the nodes that use variables, which are bound when a name is resolved late.</typeparam>
+    internal sealed class ScopeStack<TReference>
+    {
+        /// <summary>
+        /// A use of a name in a function that was resolved as a global, which a scope outside of the function might still declare.
+        /// </summary>
+        private struct PendingName
+        {
+            public TReference Reference;
+            public int Symbol;
+
+            /// <summary>
+            /// The number of scopes when the name was used.
+            /// </summary>
+            public int ScopeCount;
+
+            /// <summary>
+            /// The index of the scope of the innermost function around the use; only scopes outside of it can bind the name.
+            /// </summary>
+            public int FunctionScope;
+        }
+
+        /// <summary>
+        /// The stack of scopes. Each scope maps the name of a variable to its slot.
+        /// </summary>
+        private readonly List<Dictionary<int, int>> Scopes = new();
+
+        /// <summary>
+        /// The indices in <see cref="Scopes"/> of the scopes that are function bodies, innermost last.
+        /// </summary>
+        private readonly List<int> FunctionScopes = new();
+
+        /// <summary>
+        /// The names used in functions that haven't been found in any scope yet.
+        /// </summary>
+        private readonly List<PendingName> PendingNames = new();
+
+        /// <summary>
+        /// Sets the depth and slot of a node whose name was resolved late.
+        /// </summary>
+        private readonly Action<TReference, int, int> Bind;
+
+        /// <summary>
+        /// Creates a new <see cref="ScopeStack{TReference}"/>.
+        /// </summary>
+        /// <param name="bind">Sets the depth and slot of a node whose name is resolved when a scope ends.</param>
+        public ScopeStack(Action<TReference, int, int> bind)
+        {
+            Bind = bind;
+        }
+
+        public void BeginScope()
+        {
+            Scopes.Add(new Dictionary<int, int>());
+        }
+
+        /// <summary>
+        /// Begins the scope of a function's parameters and body.
+        /// </summary>
+        public void BeginFunctionScope()
+        {
+            FunctionScopes.Add(Scopes.Count);
+            BeginScope();
+        }
+
+        public void EndScope()
+        {
+            var index = Scopes.Count - 1;
+            if (PendingNames.Count > 0)
+            {
+                BindPendingNames(index);
+            }
+
+            if (FunctionScopes.Count > 0 && FunctionScopes[^1] == index)
+            {
+                FunctionScopes.RemoveAt(FunctionScopes.Count - 1);
+            }
+            Scopes.RemoveAt(index);
+
+            if (Scopes.Count == 0)
+            {
+                // Whatever is still pending is a global.
+                PendingNames.Clear();
+            }
+        }
+
+        /// <summary>
+        /// Binds the pending names that a scope declared, now that it has declared all of its variables.
+        /// </summary>
+        /// <param name="index">The index of the scope in <see cref="Scopes"/>.</param>
+        private void BindPendingNames(int index)
+        {
+            var scope = Scopes[index];
+            var kept = 0;
+            for (int i = 0; i < PendingNames.Count; i++)
+            {
+                var pending = PendingNames[i];
+                if (pending.FunctionScope > index && scope.TryGetValue(pending.Symbol, out var slot))
+                {
+                    Bind(pending.Reference, pending.ScopeCount - 1 - index, slot);
+                }
+                else
+                {
+                    PendingNames[kept++] = pending;
+                }
+            }
+            PendingNames.RemoveRange(kept, PendingNames.Count - kept);
+        }
+
+        /// <summary>
+        /// Declares a variable in the innermost scope.
+        /// </summary>
+        /// <param name="name">The name of the variable.</param>
+        /// <returns>The slot of the variable, or -1 if the variable is a global.</returns>
+        /// <exception cref="EnvironmentException">Thrown if a local variable's name is a reserved keyword.</exception>
+        public int Declare(Token name)
+        {
+            if (Scopes.Count == 0)
+            {
+                return -1;
+            }
+
+            if (Environment.IsReservedWord(name.Symbol))
+            {
+                // The name of the variable is reserved.
+                throw new EnvironmentException(EnvironmentExceptionType.VariableNameIsReservedKeyword, $"Il nome della variable '{name.Lexeme}' è reservato.");
+            }
+
+            var scope = Scopes[^1];
+
+            // Declaring a variable twice in the same scope overwrites it,
+            // so it keeps the same slot.
+            if (!scope.TryGetValue(name.Symbol, out var slot))
+            {
+                slot = scope.Count;
+                scope[name.Symbol] = slot;
+            }
+            return slot;
+        }
+
+        /// <summary>
+        /// Finds the depth and slot of a variable.
+        /// </summary>
+        /// <remarks>
+        /// If the variable isn't found inside a function that is itself in a scope, <paramref name="reference"/> is bound later
+        /// if one of the scopes outside of the function declares the variable after all.
+        /// </remarks>
+        /// <param name="name">The name of the variable.</param>
+        /// <param name="reference">The node that uses the variable.</param>
+        /// <returns>The depth and slot of the variable, or (-1, -1) if the variable is a global, at least for now.</returns>
+        public (int Depth, int Slot) Resolve(Token name, TReference reference)
+        {
+            for (int i = Scopes.Count - 1; i >= 0; i--)
+            {
+                if (Scopes[i].TryGetValue(name.Symbol, out var slot))
+                {
+                    return (Scopes.Count - 1 - i, slot);
+                }
+            }
+
+            // Only a function declared inside some scope can see that scope's later variables.
+            if (FunctionScopes.Count > 0 && FunctionScopes[^1] > 0)
+            {
+                PendingNames.Add(new PendingName()
+                {
+                    Reference = reference,
+                    Symbol = name.Symbol,
+                    ScopeCount = Scopes.Count,
+                    FunctionScope = FunctionScopes[^1],
+                });
+            }
+            return (-1, -1);
+        }
+    }
+}
@@ -0,0 +1,173 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Security.Cryptography;
+using System.Text;
+
+namespace Giosue.Serialization
+{
+    // Design comments:
+    // A cache entry is the resolved statement tree of a script, so a hit skips the scanner,
+    // the parser and the resolver. Entries are named after a SHA-256 hash of the source and
+    // of the interpreter that wrote them (its version and the module version ID, which changes
+    // on every build), so editing the script or rebuilding the interpreter makes old entries
+    // unreachable instead of wrong.
+    // Entries are written to a temporary file and then moved into place, so processes
+    // that run the same script at the same time never see half-written entries.
+    /// <summary>
+    /// Stores the parsed and resolved statements of scripts on disk.
+    /// </summary>
+    public class ScriptCache
+    {
+        /// <summary>
+        /// The version of the cache format.
+        /// </summary>
+        /// <remarks>
+        /// Change this whenever <see cref="TreeWriter"/> or the generated serializers change the way they write trees.
+        /// </remarks>
+        public const int FormatVersion = 3;
+
+        private const string FileExtension = ".gsuc";
+
+        private static readonly byte[] Magic = Encoding.ASCII.GetBytes("GSUC");
+
+        /// <summary>
+        /// The version of the interpreter that wrote an entry.
+        /// </summary>
+        private static readonly string InterpreterVersion =
+            $"{typeof(ScriptCache).Assembly.GetName().Version}+{typeof(ScriptCache).Module.ModuleVersionId}";
+
+        /// <summary>
+        /// The default directory for the cache.
+        /// </summary>
+        public static string DefaultDirectory => Path.Combine(System.Environment.GetFolderPath(System.Environment.SpecialFolder.LocalApplicationData), "Giosue", "Cache");
+
+        /// <summary>
+        /// The directory that holds the cache entries.
+        /// </summary>
+        public string Directory { get; }
+
+        /// <summary>
+        /// Creates a new <see cref="ScriptCache"/>.
+        /// </summary>
+        /// <param name="directory">The directory that holds the cache entries. It is created when the first entry is saved.</param>
+        public ScriptCache(string directory)
+        {
+            // The directory for a {nameof(ScriptCache)} cannot be null.
+            Directory = directory ?? throw new ArgumentNullException(nameof(directory), $"La cartella per una {nameof(ScriptCache)} non può essere nulla.");
+        }
+
+        /// <summary>
+        /// Computes the key of a script.
+        /// </summary>
+        /// <param name="source">The contents of the script file.</param>
+        /// <returns>The key of the script.</returns>
+        public static string ComputeKey(byte[] source)
+        {
+            using var sha = SHA256.Create();
+            var version = Encoding.UTF8.GetBytes(InterpreterVersion);
+            sha.TransformBlock(version, 0, version.Length, null, 0);
+            sha.TransformFinalBlock(source, 0, source.Length);
+            return Convert.ToHexString(sha.Hash);
+        }
+
+        private string PathOf(string key)
+        {
+            return Path.Combine(Directory, key + FileExtension);
+        }
+
+        /// <summary>
+        /// Tries to load the statements of a script.
+        /// </summary>
+        /// <remarks>
+        /// An entry that is missing, unreadable or written by another version of the interpreter is a miss.
+        /// </remarks>
+        /// <param name="key">The key of the script.</param>
+        /// <param name="statements">The resolved statements of the script.</param>
+        /// <returns>True if the statements were found, false otherwise.</returns>
+        public bool TryLoad(string key, out List<Statements.Statement> statements)
+        {
+            statements = null;
+
+            try
+            {
+                using var stream = new FileStream(PathOf(key), FileMode.Open, FileAccess.Read, FileShare.Read, 4096, FileOptions.SequentialScan);
+                using var reader = new TreeReader(stream);
+
+                var magic = new byte[Magic.Length];
+                if (stream.Read(magic, 0, magic.Length) != magic.Length || !magic.SequenceEqual(Magic))
+                {
+                    return false;
+                }
+                if (reader.ReadInt32() != FormatVersion || reader.ReadString() != InterpreterVersion)
+                {
+                    return false;
+                }
+
+                statements = reader.ReadStatementList();
+                return true;
+            }
+            catch (Exception e) when (e is IOException || e is UnauthorizedAccessException || e is InvalidDataException)
+            {
+                // FileNotFoundException and EndOfStreamException are both IOExceptions.
+                statements = null;
+                return false;
+            }
+        }
+
+        /// <summary>
+        /// Tries to save the statements of a script.
+        /// </summary>
+        /// <param name="key">The key of the script.</param>
+        /// <param name="statements">The statements of the script, after they have been run through a <see cref="Resolver"/>.</param>
+        /// <returns>True if the statements were saved, false otherwise.</returns>
+        public bool TrySave(string key, List<Statements.Statement> statements)
+        {
+            var temporaryPath = Path.Combine(Directory, $"{key}.{Guid.NewGuid():N}.tmp");
+
+            try
+            {
+                System.IO.Directory.CreateDirectory(Directory);
+
+                using (var stream = new FileStream(temporaryPath, FileMode.CreateNew, FileAccess.Write))
+                using (var writer = new TreeWriter(stream))
+                {
+                    stream.Write(Magic, 0, Magic.Length);
+                    writer.WriteInt32(FormatVersion);
+                    writer.WriteString(InterpreterVersion);
+                    writer.WriteStatementList(statements);
+                }
+
+                File.Move(temporaryPath, PathOf(key), overwrite: true);
+                return true;
+            }
+            catch (Exception e) when (e is IOException || e is UnauthorizedAccessException)
+            {
+                if (File.Exists(temporaryPath))
+                {
+                    File.Delete(temporaryPath);
+                }
+                return false;
+            }
+        }
+    }
+}
@@ -0,0 +1,150 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Serialization
+{
+    /// <summary>
+    /// Reads statement and expression trees written by a <see cref="TreeWriter"/>.
+    /// </summary>
+    public class TreeReader : IDisposable
+    {
+        private readonly BinaryReader Reader;
+
+        /// <summary>
+        /// Creates a new <see cref="TreeReader"/>.
+        /// </summary>
+        /// <param name="stream">The stream to read from. It is left open when the <see cref="TreeReader"/> is disposed.</param>
+        public TreeReader(Stream stream)
+        {
+            Reader = new BinaryReader(stream, Encoding.UTF8, leaveOpen: true);
+        }
+
+        /// <inheritdoc/>
+        public void Dispose()
+        {
+            Reader.Dispose();
+        }
+
+        /// <summary>
+        /// Reads the tag that tells which kind of tree follows.
+        /// </summary>
+        /// <returns>The tag.</returns>
+        public byte ReadTag()
+        {
+            return Reader.ReadByte();
+        }
+
+        public int ReadInt32()
+        {
+            return Reader.ReadInt32();
+        }
+
+        public string ReadString()
+        {
+            return Reader.ReadString();
+        }
+
+        public Token ReadToken()
+        {
+            if (!Reader.ReadBoolean())
+            {
+                return null;
+            }
+
+            var type = (TokenType)Reader.ReadInt32();
+            var lexeme = Reader.ReadString();
+            var literal = ReadLiteral();
+            var line = Reader.ReadInt32();
+            var hasSymbol = Reader.ReadBoolean();
+
+            if (hasSymbol)
+            {
+                // Intern the lexeme again; this also gives the token the interned string.
+                var symbol = SymbolTable.Intern(lexeme);
+                return new Token(type, SymbolTable.NameOf(symbol), literal, line, symbol);
+            }
+            return new Token(type, lexeme, literal, line);
+        }
+
+        /// <summary>
+        /// Reads the value of a literal.
+        /// </summary>
+        /// <returns>The literal.</returns>
+        /// <exception cref="InvalidDataException">Thrown if the type of the literal is unknown.</exception>
+        public object ReadLiteral()
+        {
+            var type = (LiteralType)Reader.ReadByte();
+            return type switch
+            {
+                LiteralType.Nil => null,
+                LiteralType.Bool => Reader.ReadBoolean(),
+                LiteralType.Int => Reader.ReadInt32(),
+                LiteralType.Double => Reader.ReadDouble(),
+                LiteralType.String => Reader.ReadString(),
+                _ => throw new InvalidDataException($"Unknown literal type {type}."),
+            };
+        }
+
+        public AST.Expression ReadExpression()
+        {
+            return AST.ExpressionSerializer.Read(this);
+        }
+
+        public Statements.Statement ReadStatement()
+        {
+            return Statements.StatementSerializer.Read(this);
+        }
+
+        public List<Token> ReadTokenList()
+        {
+            return ReadList(ReadToken);
+        }
+
+        public List<AST.Expression> ReadExpressionList()
+        {
+            return ReadList(ReadExpression);
+        }
+
+        public List<Statements.Statement> ReadStatementList()
+        {
+            return ReadList(ReadStatement);
+        }
+
+        private List<T> ReadList<T>(Func<T> readItem)
+        {
+            var count = Reader.ReadInt32();
+            if (count < 0)
+            {
+                throw new InvalidDataException($"Invalid list length {count}.");
+            }
+
+            var list = new List<T>(count);
+            for (int i = 0; i < count; i++)
+            {
+                list.Add(readItem());
+            }
+            return list;
+        }
+    }
+}
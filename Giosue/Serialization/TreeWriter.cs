@@ -0,0 +1,172 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Serialization
+{
+    // Design comments:
+    // The `TreeWriter` knows how to write the leaves of a tree (tokens, literals and numbers).
+    // The trees themselves are written by `AST.ExpressionSerializer` and
+    // `Statements.StatementSerializer`, which are generated by the ASTGenerator from the same
+    // definitions as the tree classes, so the format can't drift away from the classes.
+    /// <summary>
+    /// Writes statement and expression trees to a stream.
+    /// </summary>
+    /// <seealso cref="TreeReader"/>
+    public class TreeWriter : IDisposable
+    {
+        private readonly BinaryWriter Writer;
+
+        /// <summary>
+        /// Creates a new <see cref="TreeWriter"/>.
+        /// </summary>
+        /// <param name="stream">The stream to write to. It is left open when the <see cref="TreeWriter"/> is disposed.</param>
+        public TreeWriter(Stream stream)
+        {
+            Writer = new BinaryWriter(stream, Encoding.UTF8, leaveOpen: true);
+        }
+
+        /// <inheritdoc/>
+        public void Dispose()
+        {
+            Writer.Dispose();
+        }
+
+        /// <summary>
+        /// Writes the tag that tells which kind of tree follows.
+        /// </summary>
+        /// <param name="tag">The tag.</param>
+        public void WriteTag(byte tag)
+        {
+            Writer.Write(tag);
+        }
+
+        public void WriteInt32(int value)
+        {
+            Writer.Write(value);
+        }
+
+        public void WriteString(string value)
+        {
+            Writer.Write(value);
+        }
+
+        public void WriteToken(Token token)
+        {
+            if (token == null)
+            {
+                Writer.Write(false);
+                return;
+            }
+
+            Writer.Write(true);
+            Writer.Write((int)token.Type);
+            Writer.Write(token.Lexeme);
+            WriteLiteral(token.Literal);
+            Writer.Write(token.Line);
+
+            // Symbols are only valid in the process that interned them,
+            // so only whether the token has one is written.
+            Writer.Write(token.Symbol != SymbolTable.None);
+        }
+
+        /// <summary>
+        /// Writes the value of a literal.
+        /// </summary>
+        /// <param name="literal">The literal, which must be null, a <see cref="bool"/>, <see cref="int"/>, <see cref="double"/> or <see cref="string"/>.</param>
+        /// <exception cref="NotSupportedException">Thrown if <paramref name="literal"/> has any other type.</exception>
+        public void WriteLiteral(object literal)
+        {
+            switch (literal)
+            {
+                case null:
+                    Writer.Write((byte)LiteralType.Nil);
+                    break;
+                case bool b:
+                    Writer.Write((byte)LiteralType.Bool);
+                    Writer.Write(b);
+                    break;
+                case int i:
+                    Writer.Write((byte)LiteralType.Int);
+                    Writer.Write(i);
+                    break;
+                case double d:
+                    Writer.Write((byte)LiteralType.Double);
+                    Writer.Write(d);
+                    break;
+                case string s:
+                    Writer.Write((byte)LiteralType.String);
+                    Writer.Write(s);
+                    break;
+                default:
+                    throw new NotSupportedException($"Unable to write a literal of type {literal.GetType()}.");
+            }
+        }
+
+        public void WriteExpression(AST.Expression expression)
+        {
+            AST.ExpressionSerializer.Write(this, expression);
+        }
+
+        public void WriteStatement(Statements.Statement statement)
+        {
+            Statements.StatementSerializer.Write(this, statement);
+        }
+
+        public void WriteTokenList(List<Token> tokens)
+        {
+            WriteList(tokens, WriteToken);
+        }
+
+        public void WriteExpressionList(List<AST.Expression> expressions)
+        {
+            WriteList(expressions, WriteExpression);
+        }
+
+        public void WriteStatementList(List<Statements.Statement> statements)
+        {
+            WriteList(statements, WriteStatement);
+        }
+
+        private void WriteList<T>(List<T> list, Action<T> writeItem)
+        {
+            Writer.Write(list.Count);
+            foreach (var item in list)
+            {
+                writeItem(item);
+            }
+        }
+    }
+
+    /// <summary>
+    /// The type of a literal written by a <see cref="TreeWriter"/>.
+    /// </summary>
+    internal enum LiteralType : byte
+    {
+        Nil,
+        Bool,
+        Int,
+        Double,
+        String,
+    }
+}
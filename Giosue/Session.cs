@@ -0,0 +1,177 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading.Tasks;
+using Giosue.Bytecode;
+using SourceManager;
+
+namespace Giosue
+{
+    // Design comments:
+    // A session keeps one interpreter, and so one global scope, alive for as long as the
+    // host wants to keep feeding it code, such as a REPL or an application that runs
+    // snippets. Every input defines its globals in that one scope, so looking up a global
+    // costs the same after the thousandth input as after the first.
+    // Each input is scanned, parsed, optimized, resolved and run one top-level statement at
+    // a time. The optimizer never folds casts here, because a later input could redefine
+    // them. Compiled scripts run on one virtual machine that uses the same globals.
+    // A session can also start from a `GlobalsSnapshot` of another session, such as one that
+    // has run a prelude, instead of from only the builtins.
+    /// <summary>
+    /// Runs pieces of code one after another against the same global variables.
+    /// </summary>
+    public class Session
+    {
+        /// <summary>
+        /// The interpreter that runs the code and holds the globals.
+        /// </summary>
+        public Interpreter Interpreter { get; }
+
+        /// <summary>
+        /// The global variables of the session.
+        /// </summary>
+        public Environment Globals => Interpreter.Globals;
+
+        private readonly Optimizer Optimizer = new();
+
+        private readonly Resolver Resolver = new();
+
+        private VirtualMachine VirtualMachine = null;
+
+        /// <summary>
+        /// Creates a new <see cref="Session"/> with only the builtins defined.
+        /// </summary>
+        public Session()
+        {
+            Interpreter = new Interpreter();
+        }
+
+        /// <summary>
+        /// Creates a new <see cref="Session"/> whose globals start as the ones in a snapshot.
+        /// </summary>
+        /// <param name="snapshot">The snapshot of the globals.</param>
+        public Session(GlobalsSnapshot snapshot)
+        {
+            Interpreter = snapshot.Fork();
+        }
+
+        /// <summary>
+        /// Takes a snapshot of the global variables, which new sessions can start from.
+        /// </summary>
+        /// <returns>The snapshot.</returns>
+        public GlobalsSnapshot Snapshot()
+        {
+            return Interpreter.Snapshot();
+        }
+
+        /// <summary>
+        /// Runs code.
+        /// </summary>
+        /// <remarks>
+        /// The statements before an error have already run when the exception is thrown.
+        /// </remarks>
+        /// <param name="code">The code to run.</param>
+        /// <exception cref="Exceptions.ScannerException">Thrown if the code cannot be scanned.</exception>
+        /// <exception cref="Exceptions.ParserException">Thrown if the code cannot be parsed.</exception>
+        /// <exception cref="Exceptions.EnvironmentException">Thrown if a variable is misused.</exception>
+        /// <exception cref="Exceptions.InterpreterException">Thrown if the code fails while running.</exception>
+        public void Run(string code)
+        {
+            using var source = new StringSource(code);
+            Run(source);
+        }
+
+        /// <summary>
+        /// Runs the code in a source, one top-level statement at a time.
+        /// </summary>
+        /// <remarks>
+        /// The statements before an error have already run when the exception is thrown.
+        /// </remarks>
+        /// <param name="source">The source of the code.</param>
+        /// <exception cref="Exceptions.ScannerException">Thrown if the code cannot be scanned.</exception>
+        /// <exception cref="Exceptions.ParserException">Thrown if the code cannot be parsed.</exception>
+        /// <exception cref="Exceptions.EnvironmentException">Thrown if a variable is misused.</exception>
+        /// <exception cref="Exceptions.InterpreterException">Thrown if the code fails while running.</exception>
+        public void Run(Source source)
+        {
+            var parser = new Parser(new Scanner(source).EnumerateTokens());
+            foreach (var statement in parser.ParseStatements())
+            {
+                var prepared = Prepare(statement);
+                if (prepared != null)
+                {
+                    Interpreter.Interpret(prepared);
+                }
+            }
+        }
+
+        /// <summary>
+        /// Optimizes and resolves one top-level statement so it can be run in this session.
+        /// </summary>
+        /// <param name="statement">The parsed statement.</param>
+        /// <returns>The statement to run, or null if the statement does nothing.</returns>
+        /// <exception cref="Exceptions.EnvironmentException">Thrown if a local variable's name is a reserved keyword.</exception>
+        public Statements.Statement Prepare(Statements.Statement statement)
+        {
+            var optimized = Optimizer.Optimize(statement);
+            if (optimized != null)
+            {
+                Resolver.Resolve(optimized);
+            }
+            return optimized;
+        }
+
+        /// <summary>
+        /// Runs statements that have already been resolved.
+        /// </summary>
+        /// <param name="statements">The resolved statements.</param>
+        /// <exception cref="Exceptions.EnvironmentException">Thrown if a variable is misused.</exception>
+        /// <exception cref="Exceptions.InterpreterException">Thrown if the code fails while running.</exception>
+        public void Run(List<Statements.Statement> statements)
+        {
+            Interpreter.Interpret(statements);
+        }
+
+        /// <summary>
+        /// Runs statements that have been resolved and then added to a <see cref="Arena.SyntaxArena"/>.
+        /// </summary>
+        /// <param name="statements">The statements in the arena.</param>
+        /// <exception cref="Exceptions.EnvironmentException">Thrown if a variable is misused.</exception>
+        /// <exception cref="Exceptions.InterpreterException">Thrown if the code fails while running.</exception>
+        public void Run(Arena.NodeList statements)
+        {
+            Interpreter.Interpret(statements);
+        }
+
+        /// <summary>
+        /// Runs a compiled script on the session's <see cref="Bytecode.VirtualMachine"/>.
+        /// </summary>
+        /// <param name="script">The compiled script.</param>
+        /// <exception cref="Exceptions.EnvironmentException">Thrown if a variable is misused.</exception>
+        /// <exception cref="Exceptions.InterpreterException">Thrown if the code fails while running.</exception>
+        public void Run(BytecodeFunction script)
+        {
+            VirtualMachine ??= new VirtualMachine(Interpreter);
+            VirtualMachine.Run(script);
+        }
+    }
+}
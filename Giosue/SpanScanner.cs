@@ -0,0 +1,420 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Numerics;
+using System.Runtime.InteropServices;
+using System.Text;
+using Giosue.Exceptions;
+using Giosue.Profiling;
+
+namespace Giosue
+{
+    // Design comments:
+    // The `Scanner` reads one character at a time through the virtual methods of a `Source`,
+    // which works for any source but costs a few calls per character. When a source has all
+    // of its characters in memory (see `Source.TryGetRemainingCharacters`), the scanner hands
+    // them to a `SpanScanner` instead, which indexes into them directly.
+    // Every ASCII character is looked up once in `Classes` to decide what kind of token it
+    // starts; anything else can only appear in a string or a comment. Runs of blanks are
+    // skipped a vector at a time, and comments and strings are skipped with `IndexOf`, which
+    // the runtime vectorizes. Punctuation and operators use a lexeme from `Lexemes` instead
+    // of a new string, and only identifier-shaped spans are looked up in the `SymbolTable`.
+    // The tokens, errors and the order in which they appear are exactly the same as the
+    // `Scanner`'s; the tokens are scanned one at a time as they are asked for.
+    /// <summary>
+    /// Scans tokens from characters that are all in memory.
+    /// </summary>
+    internal class SpanScanner
+    {
+        /// <summary>
+        /// What a character can start.
+        /// </summary>
+        private enum CharacterClass : byte
+        {
+            /// <summary>
+            /// Nothing; the character can only appear in a string or a comment.
+            /// </summary>
+            Invalid,
+
+            /// <summary>
+            /// A space, tab or carriage return.
+            /// </summary>
+            Blank,
+
+            NewLine,
+
+            /// <summary>
+            /// A token that is always one character long.
+            /// </summary>
+            SingleCharacter,
+
+            /// <summary>
+            /// A token that is one character long, or two if it's followed by <see cref="SecondCharacters"/>.
+            /// </summary>
+            Operator,
+
+            /// <summary>
+            /// A minus sign or the start of a comment.
+            /// </summary>
+            Minus,
+
+            Quote,
+            Digit,
+
+            /// <summary>
+            /// A letter or an underscore.
+            /// </summary>
+            IdentifierStart,
+        }
+
+        private const int AsciiLength = 128;
+
+        private const char StringTerminator = '"';
+
+        private static readonly CharacterClass[] Classes = new CharacterClass[AsciiLength];
+
+        /// <summary>
+        /// The type of the token that a <see cref="CharacterClass.SingleCharacter"/> or <see cref="CharacterClass.Operator"/> is on its own.
+        /// </summary>
+        private static readonly TokenType[] SingleTypes = new TokenType[AsciiLength];
+
+        /// <summary>
+        /// The character that turns an <see cref="CharacterClass.Operator"/> into a two-character token.
+        /// </summary>
+        private static readonly char[] SecondCharacters = new char[AsciiLength];
+
+        /// <summary>
+        /// The type of the two-character token that starts with an <see cref="CharacterClass.Operator"/>.
+        /// </summary>
+        private static readonly TokenType[] DoubleTypes = new TokenType[AsciiLength];
+
+        /// <summary>
+        /// The lexemes of one-character tokens, and of two-character tokens at <see cref="DoubleLexemes"/>.
+        /// </summary>
+        private static readonly string[] Lexemes = new string[AsciiLength];
+
+        private static readonly string[] DoubleLexemes = new string[AsciiLength];
+
+        private static readonly Vector<ushort> Spaces = new(' ');
+        private static readonly Vector<ushort> Tabs = new('\t');
+        private static readonly Vector<ushort> CarriageReturns = new('\r');
+        private static readonly Vector<ushort> AllBlank = new(ushort.MaxValue);
+
+        static SpanScanner()
+        {
+            Classes[' '] = CharacterClass.Blank;
+            Classes['\t'] = CharacterClass.Blank;
+            Classes['\r'] = CharacterClass.Blank;
+            Classes['\n'] = CharacterClass.NewLine;
+            Classes['-'] = CharacterClass.Minus;
+            Classes[StringTerminator] = CharacterClass.Quote;
+
+            var singleCharacterTokens = new (char, TokenType)[]
+            {
+                ('(', TokenType.LeftParenthesis),
+                (')', TokenType.RightParenthesis),
+                ('{', TokenType.LeftBrace),
+                ('}', TokenType.RightBrace),
+                (',', TokenType.Comma),
+                ('.', TokenType.Dot),
+                (';', TokenType.Semicolon),
+                ('+', TokenType.Plus),
+                ('*', TokenType.Star),
+                ('/', TokenType.Slash),
+                ('@', TokenType.At),
+                ('-', TokenType.Minus),
+            };
+            foreach (var (c, type) in singleCharacterTokens)
+            {
+                if (Classes[c] == CharacterClass.Invalid)
+                {
+                    Classes[c] = CharacterClass.SingleCharacter;
+                }
+                SingleTypes[c] = type;
+                Lexemes[c] = c.ToString();
+            }
+
+            var operators = new (char, char, TokenType, TokenType)[]
+            {
+                ('!', '=', TokenType.Bang, TokenType.BangEqual),
+                ('=', '=', TokenType.Equal, TokenType.EqualEqual),
+                ('<', '=', TokenType.Less, TokenType.LessEqual),
+                ('>', '=', TokenType.Greater, TokenType.GreaterEqual),
+                ('&', '&', TokenType.And, TokenType.AndAnd),
+                ('|', '|', TokenType.Pipe, TokenType.PipePipe),
+                ('^', '^', TokenType.Caret, TokenType.CaretCaret),
+            };
+            foreach (var (c, second, singleType, doubleType) in operators)
+            {
+                Classes[c] = CharacterClass.Operator;
+                SingleTypes[c] = singleType;
+                SecondCharacters[c] = second;
+                DoubleTypes[c] = doubleType;
+                Lexemes[c] = c.ToString();
+                DoubleLexemes[c] = new string(new[] { c, second });
+            }
+
+            for (var c = '0'; c <= '9'; c++)
+            {
+                Classes[c] = CharacterClass.Digit;
+            }
+            for (var c = 'a'; c <= 'z'; c++)
+            {
+                Classes[c] = CharacterClass.IdentifierStart;
+                Classes[char.ToUpperInvariant(c)] = CharacterClass.IdentifierStart;
+            }
+            Classes['_'] = CharacterClass.IdentifierStart;
+        }
+
+        /// <summary>
+        /// The characters to scan.
+        /// </summary>
+        private ReadOnlyMemory<char> Characters { get; }
+
+        /// <summary>
+        /// The index of the next character to scan.
+        /// </summary>
+        private int Position = 0;
+
+        /// <summary>
+        /// The line that the current character is on.
+        /// </summary>
+        private int Line = 1;
+
+        /// <summary>
+        /// Creates a new <see cref="SpanScanner"/>.
+        /// </summary>
+        /// <param name="characters">The characters to scan.</param>
+        public SpanScanner(ReadOnlyMemory<char> characters)
+        {
+            Characters = characters;
+        }
+
+        /// <summary>
+        /// Scans the tokens one at a time.
+        /// </summary>
+        /// <remarks>
+        /// The last token is always <see cref="TokenType.EOF"/>.
+        /// </remarks>
+        /// <returns>The scanned tokens.</returns>
+        /// <exception cref="ScannerException">Thrown if a token can't be scanned.</exception>
+        public IEnumerable<Token> EnumerateTokens()
+        {
+            Token token;
+            var scannedTokens = new CounterBatch(GiosueCounter.TokensScanned);
+            while ((token = ScanToken(Characters.Span)) != null)
+            {
+                if (GiosueEventSource.IsCounting)
+                {
+                    scannedTokens.Increment();
+                }
+                yield return token;
+            }
+
+            scannedTokens.Flush();
+            yield return new Token(TokenType.EOF, "", null, Line);
+        }
+
+        /// <summary>
+        /// Skips any blanks, newlines and comments, then scans one token.
+        /// </summary>
+        /// <param name="text">The characters to scan.</param>
+        /// <returns>The scanned token, or null if there are no more tokens.</returns>
+        private Token ScanToken(ReadOnlySpan<char> text)
+        {
+            while (Position < text.Length)
+            {
+                var c = text[Position];
+                var characterClass = c < AsciiLength ? Classes[c] : CharacterClass.Invalid;
+                switch (characterClass)
+                {
+                    case CharacterClass.Blank:
+                        Position = SkipBlanks(text, Position + 1);
+                        continue;
+                    case CharacterClass.NewLine:
+                        Line++;
+                        Position++;
+                        continue;
+                    case CharacterClass.Minus:
+                        if (Position + 1 < text.Length && text[Position + 1] == '-')
+                        {
+                            // Skip to the newline, which is left for the next iteration so the line is counted.
+                            var length = text[(Position + 2)..].IndexOf('\n');
+                            Position = length < 0 ? text.Length : Position + 2 + length;
+                            continue;
+                        }
+                        Position++;
+                        return new Token(TokenType.Minus, Lexemes[c], null, Line);
+                    case CharacterClass.SingleCharacter:
+                        Position++;
+                        return new Token(SingleTypes[c], Lexemes[c], null, Line);
+                    case CharacterClass.Operator:
+                        if (Position + 1 < text.Length && text[Position + 1] == SecondCharacters[c])
+                        {
+                            Position += 2;
+                            return new Token(DoubleTypes[c], DoubleLexemes[c], null, Line);
+                        }
+                        Position++;
+                        return new Token(SingleTypes[c], Lexemes[c], null, Line);
+                    case CharacterClass.Quote:
+                        return String(text);
+                    case CharacterClass.Digit:
+                        return Number(text);
+                    case CharacterClass.IdentifierStart:
+                        return Identifier(text);
+                    default:
+                        // Unexpected character '{c}'
+                        throw new ScannerException(ScannerExceptionType.UnexpectedCharacter, Line, $"Carattere inatteso '{c}'");
+                }
+            }
+
+            return null;
+        }
+
+        /// <summary>
+        /// Finds the end of a run of spaces, tabs and carriage returns.
+        /// </summary>
+        /// <param name="text">The characters to scan.</param>
+        /// <param name="position">The index to start at.</param>
+        /// <returns>The index of the first character after the run.</returns>
+        private static int SkipBlanks(ReadOnlySpan<char> text, int position)
+        {
+            if (Vector.IsHardwareAccelerated)
+            {
+                var characters = MemoryMarshal.Cast<char, ushort>(text);
+                while (position + Vector<ushort>.Count <= characters.Length)
+                {
+                    var block = new Vector<ushort>(characters[position..]);
+                    var blanks = Vector.Equals(block, Spaces) | Vector.Equals(block, Tabs) | Vector.Equals(block, CarriageReturns);
+                    if (!Vector.EqualsAll(blanks, AllBlank))
+                    {
+                        // The run ends in this block; find where one character at a time.
+                        break;
+                    }
+                    position += Vector<ushort>.Count;
+                }
+            }
+
+            while (position < text.Length && text[position] < AsciiLength && Classes[text[position]] == CharacterClass.Blank)
+            {
+                position++;
+            }
+            return position;
+        }
+
+        /// <summary>
+        /// Scans a string.
+        /// </summary>
+        /// <param name="text">The characters to scan.</param>
+        /// <returns>The string token.</returns>
+        private Token String(ReadOnlySpan<char> text)
+        {
+            var start = Position;
+            var contentStart = start + 1;
+            var length = text[contentStart..].IndexOfAny(StringTerminator, '\n');
+
+            if (length >= 0 && text[contentStart + length] == '\n')
+            {
+                // TODO: Turn this into a custom form of GiosueException down the line.
+                // Multi-line strings are not supported.
+                throw new NotSupportedException("È vietato creare una stringa su più di una fila.");
+            }
+            if (length < 0)
+            {
+                // Unterminated string
+                throw new ScannerException(ScannerExceptionType.UnterminatedString, Line, "Stringa senza fine.");
+            }
+
+            Position = contentStart + length + 1;
+            var lexeme = new string(text[start..Position]);
+            return new Token(TokenType.String, lexeme, lexeme[1..^1], Line);
+        }
+
+        /// <summary>
+        /// Scans a number (integer or float).
+        /// </summary>
+        /// <param name="text">The characters to scan.</param>
+        /// <returns>The number token.</returns>
+        private Token Number(ReadOnlySpan<char> text)
+        {
+            var start = Position;
+            Position = SkipDigits(text, Position + 1);
+
+            // Like the Scanner, a number followed by a '.' is a float even if no digits come after the '.'.
+            // The '.' is only part of the number if digits come after it.
+            var hasFractionalPart = Position < text.Length && text[Position] == '.';
+            if (hasFractionalPart && Position + 1 < text.Length && IsDigit(text[Position + 1]))
+            {
+                Position = SkipDigits(text, Position + 1);
+            }
+
+            var lexemeSpan = text[start..Position];
+            var lexeme = new string(lexemeSpan);
+            if (hasFractionalPart)
+            {
+                if (!double.TryParse(lexemeSpan, out var @double))
+                {
+                    // Could not parse '{lexeme}' to {nameof(Double)}
+                    throw new ScannerException(ScannerExceptionType.MalformedNumericLiteral, Line, $"Non poteva trasformare '{lexeme}' a {nameof(Double)}");
+                }
+                return new Token(TokenType.Float, lexeme, @double, Line);
+            }
+
+            if (!int.TryParse(lexemeSpan, out var @int))
+            {
+                // Could not parse '{lexeme}' to {nameof(Int32)}
+                throw new ScannerException(ScannerExceptionType.MalformedNumericLiteral, Line, $"Non poteva trasformare '{lexeme}' a {nameof(Int32)}");
+            }
+            return new Token(TokenType.Integer, lexeme, @int, Line);
+        }
+
+        /// <summary>
+        /// Scans an identifier (user-defined or keyword).
+        /// </summary>
+        /// <param name="text">The characters to scan.</param>
+        /// <returns>The identifier or keyword token.</returns>
+        private Token Identifier(ReadOnlySpan<char> text)
+        {
+            var start = Position++;
+            while (Position < text.Length && text[Position] < AsciiLength && Classes[text[Position]] is CharacterClass.IdentifierStart or CharacterClass.Digit)
+            {
+                Position++;
+            }
+
+            var symbol = SymbolTable.Intern(text[start..Position]);
+            return new Token(SymbolTable.TokenTypeOf(symbol), SymbolTable.NameOf(symbol), null, Line, symbol);
+        }
+
+        private static int SkipDigits(ReadOnlySpan<char> text, int position)
+        {
+            while (position < text.Length && IsDigit(text[position]))
+            {
+                position++;
+            }
+            return position;
+        }
+
+        private static bool IsDigit(char c)
+        {
+            return (uint)(c - '0') <= 9;
+        }
+    }
+}
@@ -31,7 +31,7 @@ namespace Giosue.Statements
     {
         public List<Statements.Statement> Statements { get; }
     
-        public Block(List<Statements.Statement> statements)
+        public Block(List<Statements.Statement> statements) : base(AST.NodeKind.BlockStatement)
         {
             this.Statements = statements;
         }
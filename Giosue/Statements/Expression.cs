@@ -31,7 +31,7 @@ namespace Giosue.Statements
     {
         public AST.Expression Expr { get; }
     
-        public Expression(AST.Expression expression)
+        public Expression(AST.Expression expression) : base(AST.NodeKind.ExpressionStatement)
         {
             this.Expr = expression;
         }
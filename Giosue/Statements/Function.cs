@@ -32,8 +32,9 @@ namespace Giosue.Statements
         public Token Name { get; }
         public List<Token> Parameters { get; }
         public List<Statement> Body { get; }
+        public int Slot { get; set; } = -1;
     
-        public Function(Token name, List<Token> parameters, List<Statement> body)
+        public Function(Token name, List<Token> parameters, List<Statement> body) : base(AST.NodeKind.FunctionStatement)
         {
             this.Name = name;
             this.Parameters = parameters;
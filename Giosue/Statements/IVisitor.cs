@@ -34,6 +34,7 @@ namespace Giosue.Statements
         public T VisitBlockStatement(Block statement);
         public T VisitIfStatement(If statement);
         public T VisitWhileStatement(While statement);
+        public T VisitReturnStatement(Return statement);
         public T VisitFunctionStatement(Function statement);
     }
 }
\ No newline at end of file
@@ -33,7 +33,7 @@ namespace Giosue.Statements
         public Statements.Statement ThenBranch { get; }
         public Statements.Statement ElseBranch { get; }
     
-        public If(AST.Expression condition, Statements.Statement thenBranch, Statements.Statement ElseBranch)
+        public If(AST.Expression condition, Statements.Statement thenBranch, Statements.Statement ElseBranch) : base(AST.NodeKind.IfStatement)
         {
             this.Condition = condition;
             this.ThenBranch = thenBranch;
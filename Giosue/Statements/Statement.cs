@@ -29,6 +29,13 @@ namespace Giosue.Statements
 {
     public abstract class Statement
     {
+        public AST.NodeKind Kind { get; }
+        
+        protected Statement(AST.NodeKind kind)
+        {
+            Kind = kind;
+        }
+        
         public abstract T Accept<T>(IVisitor<T> visitor);
     }
 }
\ No newline at end of file
@@ -0,0 +1,90 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Statements;
+using System.Runtime.CompilerServices;
+
+namespace Giosue.Statements
+{
+    public static class StatementDispatcher
+    {
+        public static T Accept<T, TVisitor>(Statement statement, ref TVisitor visitor)
+            where TVisitor : struct, IVisitor<T>
+        {
+            switch (statement.Kind)
+            {
+                case AST.NodeKind.ExpressionStatement:
+                    return visitor.VisitExpressionStatement(Unsafe.As<Expression>(statement));
+                case AST.NodeKind.VarStatement:
+                    return visitor.VisitVarStatement(Unsafe.As<Var>(statement));
+                case AST.NodeKind.BlockStatement:
+                    return visitor.VisitBlockStatement(Unsafe.As<Block>(statement));
+                case AST.NodeKind.IfStatement:
+                    return visitor.VisitIfStatement(Unsafe.As<If>(statement));
+                case AST.NodeKind.WhileStatement:
+                    return visitor.VisitWhileStatement(Unsafe.As<While>(statement));
+                case AST.NodeKind.ReturnStatement:
+                    return visitor.VisitReturnStatement(Unsafe.As<Return>(statement));
+                case AST.NodeKind.FunctionStatement:
+                    return visitor.VisitFunctionStatement(Unsafe.As<Function>(statement));
+                default:
+                    // Unknown node kind.
+                    throw new NotSupportedException($"Tipo di nodo sconosciuto: {statement.Kind}.");
+            }
+        }
+        
+        public static void Accept<TVisitor>(Statement statement, ref TVisitor visitor)
+            where TVisitor : struct, IVoidVisitor
+        {
+            switch (statement.Kind)
+            {
+                case AST.NodeKind.ExpressionStatement:
+                    visitor.VisitExpressionStatement(Unsafe.As<Expression>(statement));
+                    return;
+                case AST.NodeKind.VarStatement:
+                    visitor.VisitVarStatement(Unsafe.As<Var>(statement));
+                    return;
+                case AST.NodeKind.BlockStatement:
+                    visitor.VisitBlockStatement(Unsafe.As<Block>(statement));
+                    return;
+                case AST.NodeKind.IfStatement:
+                    visitor.VisitIfStatement(Unsafe.As<If>(statement));
+                    return;
+                case AST.NodeKind.WhileStatement:
+                    visitor.VisitWhileStatement(Unsafe.As<While>(statement));
+                    return;
+                case AST.NodeKind.ReturnStatement:
+                    visitor.VisitReturnStatement(Unsafe.As<Return>(statement));
+                    return;
+                case AST.NodeKind.FunctionStatement:
+                    visitor.VisitFunctionStatement(Unsafe.As<Function>(statement));
+                    return;
+                default:
+                    // Unknown node kind.
+                    throw new NotSupportedException($"Tipo di nodo sconosciuto: {statement.Kind}.");
+            }
+        }
+    }
+}
\ No newline at end of file
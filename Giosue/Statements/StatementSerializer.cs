@@ -0,0 +1,147 @@
+// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+// 
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+// 
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+// 
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+// This code was generated by the AST and Statement generator.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using Giosue;
+using Giosue.Statements;
+using System.IO;
+using Giosue.Serialization;
+
+namespace Giosue.Statements
+{
+    public static class StatementSerializer
+    {
+        public static void Write(TreeWriter writer, Statement node)
+        {
+            switch (node)
+            {
+                case null:
+                    writer.WriteTag(0);
+                    break;
+                case Expression expressionNode:
+                    writer.WriteTag(1);
+                    writer.WriteExpression(expressionNode.Expr);
+                    break;
+                case Var varNode:
+                    writer.WriteTag(2);
+                    writer.WriteToken(varNode.Name);
+                    writer.WriteExpression(varNode.Initializer);
+                    writer.WriteInt32(varNode.Slot);
+                    break;
+                case Block blockNode:
+                    writer.WriteTag(3);
+                    writer.WriteStatementList(blockNode.Statements);
+                    break;
+                case If ifNode:
+                    writer.WriteTag(4);
+                    writer.WriteExpression(ifNode.Condition);
+                    writer.WriteStatement(ifNode.ThenBranch);
+                    writer.WriteStatement(ifNode.ElseBranch);
+                    break;
+                case While whileNode:
+                    writer.WriteTag(5);
+                    writer.WriteToken(whileNode.Keyword);
+                    writer.WriteExpression(whileNode.Condition);
+                    writer.WriteStatement(whileNode.Body);
+                    break;
+                case Return returnNode:
+                    writer.WriteTag(6);
+                    writer.WriteToken(returnNode.Keyword);
+                    writer.WriteExpression(returnNode.Value);
+                    break;
+                case Function functionNode:
+                    writer.WriteTag(7);
+                    writer.WriteToken(functionNode.Name);
+                    writer.WriteTokenList(functionNode.Parameters);
+                    writer.WriteStatementList(functionNode.Body);
+                    writer.WriteInt32(functionNode.Slot);
+                    break;
+                default:
+                    throw new NotSupportedException($"Unknown statement {node.GetType()}.");
+            }
+        }
+        
+        public static Statement Read(TreeReader reader)
+        {
+            var tag = reader.ReadTag();
+            switch (tag)
+            {
+                case 0:
+                    return null;
+                case 1:
+                    {
+                        var expression = reader.ReadExpression();
+                        return new Expression(expression);
+                    }
+                case 2:
+                    {
+                        var name = reader.ReadToken();
+                        var initializer = reader.ReadExpression();
+                        var slot = reader.ReadInt32();
+                        return new Var(name, initializer)
+                        {
+                            Slot = slot,
+                        };
+                    }
+                case 3:
+                    {
+                        var statements = reader.ReadStatementList();
+                        return new Block(statements);
+                    }
+                case 4:
+                    {
+                        var condition = reader.ReadExpression();
+                        var thenBranch = reader.ReadStatement();
+                        var ElseBranch = reader.ReadStatement();
+                        return new If(condition, thenBranch, ElseBranch);
+                    }
+                case 5:
+                    {
+                        var keyword = reader.ReadToken();
+                        var condition = reader.ReadExpression();
+                        var body = reader.ReadStatement();
+                        return new While(keyword, condition, body);
+                    }
+                case 6:
+                    {
+                        var keyword = reader.ReadToken();
+                        var value = reader.ReadExpression();
+                        return new Return(keyword, value);
+                    }
+                case 7:
+                    {
+                        var name = reader.ReadToken();
+                        var parameters = reader.ReadTokenList();
+                        var body = reader.ReadStatementList();
+                        var slot = reader.ReadInt32();
+                        return new Function(name, parameters, body)
+                        {
+                            Slot = slot,
+                        };
+                    }
+                default:
+                    throw new InvalidDataException($"Unknown statement tag {tag}.");
+            }
+        }
+    }
+}
\ No newline at end of file
@@ -31,8 +31,9 @@ namespace Giosue.Statements
     {
         public Token Name { get; }
         public AST.Expression Initializer { get; }
+        public int Slot { get; set; } = -1;
     
-        public Var(Token name, AST.Expression initializer)
+        public Var(Token name, AST.Expression initializer) : base(AST.NodeKind.VarStatement)
         {
             this.Name = name;
             this.Initializer = initializer;
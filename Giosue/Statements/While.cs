@@ -29,11 +29,13 @@ namespace Giosue.Statements
 {
     public class While : Statement
     {
+        public Token Keyword { get; }
         public AST.Expression Condition { get; }
         public Statements.Statement Body { get; }
     
-        public While(AST.Expression condition, Statements.Statement body)
+        public While(Token keyword, AST.Expression condition, Statements.Statement body) : base(AST.NodeKind.WhileStatement)
         {
+            this.Keyword = keyword;
             this.Condition = condition;
             this.Body = body;
         }
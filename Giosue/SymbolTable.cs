@@ -0,0 +1,281 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+using System.Threading;
+
+namespace Giosue
+{
+    // Design comments:
+    // Every identifier and keyword is interned once into an integer symbol. The scanner looks
+    // names up straight from the characters of the source (a span), so an identifier that has
+    // been seen before doesn't allocate a new string; the token gets the interned string and
+    // its symbol. Everything after the scanner (the resolver, environments and the compiler)
+    // compares and hashes symbols instead of strings.
+    // A keyword's token type and whether the name is reserved are stored with the symbol, so
+    // one lookup answers all three questions.
+    // The table is shared by every scanner in the process. Looking up a name that is already
+    // in the table doesn't take a lock, so scanners on different threads don't wait on each
+    // other; only adding a name does. The entries and buckets are kept together in a `Table`:
+    // a new entry is written before it's linked into its bucket, and growing the table builds
+    // a new `Table` and publishes it whole, so a reader sees either the old table or the new
+    // one, and never a half-written entry.
+    // Symbols are never removed, because any tree, chunk or environment may still hold one.
+    // The table grows with the number of distinct names a process has seen, not with the
+    // amount of code it runs: each name costs its string and one entry, and a name that is
+    // seen again costs nothing. A long-lived host that runs generated code with unbounded
+    // names should run it in a separate process.
+    /// <summary>
+    /// Interns identifiers and keywords into integer symbols.
+    /// </summary>
+    /// <remarks>
+    /// Symbols live as long as the process, so the table only grows.
+    /// </remarks>
+    public static class SymbolTable
+    {
+        /// <summary>
+        /// The symbol of a token that is not an identifier or keyword.
+        /// </summary>
+        public const int None = -1;
+
+        private const int InitialCapacity = 256;
+
+        private struct Entry
+        {
+            public string Name;
+            public int HashCode;
+
+            /// <summary>
+            /// The index of the next entry in the same bucket, or -1.
+            /// </summary>
+            public int Next;
+
+            public TokenType Type;
+            public bool IsReserved;
+        }
+
+        /// <summary>
+        /// The entries and the buckets that index them.
+        /// </summary>
+        private sealed class Table
+        {
+            public readonly Entry[] Entries;
+
+            /// <summary>
+            /// The index of the first entry in each bucket, plus one, so that zero is an empty bucket.
+            /// </summary>
+            public readonly int[] Buckets;
+
+            public Table(int capacity)
+            {
+                Entries = new Entry[capacity];
+                Buckets = new int[capacity];
+            }
+        }
+
+        /// <summary>
+        /// Taken to add a name to the table.
+        /// </summary>
+        private static readonly object Lock = new();
+
+        /// <summary>
+        /// The current table. Only replaced, by <see cref="Grow(Table)"/>, while <see cref="Lock"/> is held.
+        /// </summary>
+        private static Table Symbols = new(InitialCapacity);
+
+        /// <summary>
+        /// The number of entries in use. Only used while <see cref="Lock"/> is held.
+        /// </summary>
+        private static int Count = 0;
+
+        static SymbolTable()
+        {
+            var keywords = new Dictionary<string, TokenType>()
+            {
+                { "var", TokenType.Var },
+                { "fun", TokenType.Fun },
+                { "oppure", TokenType.Oppure },
+                { "falso", TokenType.Falso },
+                { "se", TokenType.Se },
+                { "niente", TokenType.Niente },
+                { "vero", TokenType.Vero },
+                { "mentre", TokenType.Mentre },
+                { "ritorna", TokenType.Ritorna },
+            };
+            foreach (var (name, type) in keywords)
+            {
+                var symbol = Intern(name);
+                Symbols.Entries[symbol].Type = type;
+            }
+
+            var reservedWords = new[] { "intero", "virgola", "mentre", "vero", "falso", "se", "oppure", "bool", "niente", "ritorna" };
+            foreach (var name in reservedWords)
+            {
+                var symbol = Intern(name);
+                Symbols.Entries[symbol].IsReserved = true;
+            }
+        }
+
+        /// <summary>
+        /// Gets the symbol of a name, adding the name to the table if it's new.
+        /// </summary>
+        /// <param name="name">The name.</param>
+        /// <returns>The symbol of the name.</returns>
+        public static int Intern(string name)
+        {
+            return Intern(name, name);
+        }
+
+        /// <summary>
+        /// Gets the symbol of a name, adding the name to the table if it's new.
+        /// </summary>
+        /// <remarks>
+        /// A new <see cref="string"/> is only allocated the first time a name is seen.
+        /// </remarks>
+        /// <param name="name">The name.</param>
+        /// <returns>The symbol of the name.</returns>
+        public static int Intern(ReadOnlySpan<char> name)
+        {
+            return Intern(name, null);
+        }
+
+        /// <summary>
+        /// Gets the symbol of a name, adding the name to the table if it's new.
+        /// </summary>
+        /// <param name="name">The name.</param>
+        /// <param name="nameString">The name as a <see cref="string"/> if the caller already has one, otherwise null.</param>
+        /// <returns>The symbol of the name.</returns>
+        private static int Intern(ReadOnlySpan<char> name, string nameString)
+        {
+            var hashCode = string.GetHashCode(name);
+            if (TryFind(Volatile.Read(ref Symbols), name, hashCode, out var symbol))
+            {
+                return symbol;
+            }
+
+            lock (Lock)
+            {
+                // Another thread may have added the name, or grown the table, since it was searched.
+                var table = Symbols;
+                if (TryFind(table, name, hashCode, out symbol))
+                {
+                    return symbol;
+                }
+
+                if (Count == table.Entries.Length)
+                {
+                    table = Grow(table);
+                }
+
+                symbol = Count;
+                var bucket = (hashCode & int.MaxValue) % table.Buckets.Length;
+                table.Entries[symbol] = new Entry()
+                {
+                    Name = nameString ?? new string(name),
+                    HashCode = hashCode,
+                    Next = table.Buckets[bucket] - 1,
+                    Type = TokenType.Identifier,
+                    IsReserved = false,
+                };
+
+                // Link the entry into its bucket only once it's written, so readers that don't take the lock never see a half-written entry.
+                Volatile.Write(ref table.Buckets[bucket], symbol + 1);
+                Count++;
+                return symbol;
+            }
+        }
+
+        /// <summary>
+        /// Searches a table for a name.
+        /// </summary>
+        /// <param name="table">The table.</param>
+        /// <param name="name">The name.</param>
+        /// <param name="hashCode">The hash code of the name.</param>
+        /// <param name="symbol">The symbol of the name, or <see cref="None"/> if the name isn't in the table.</param>
+        /// <returns>True if the name is in the table, false otherwise.</returns>
+        private static bool TryFind(Table table, ReadOnlySpan<char> name, int hashCode, out int symbol)
+        {
+            var entries = table.Entries;
+            for (var i = Volatile.Read(ref table.Buckets[(hashCode & int.MaxValue) % table.Buckets.Length]) - 1; i >= 0; i = entries[i].Next)
+            {
+                if (entries[i].HashCode == hashCode && name.SequenceEqual(entries[i].Name))
+                {
+                    symbol = i;
+                    return true;
+                }
+            }
+
+            symbol = None;
+            return false;
+        }
+
+        /// <summary>
+        /// Doubles the size of the table and rehashes every entry.
+        /// </summary>
+        /// <param name="table">The current table, which is left unchanged for readers that are still using it.</param>
+        /// <returns>The new table.</returns>
+        private static Table Grow(Table table)
+        {
+            var grown = new Table(table.Entries.Length * 2);
+            Array.Copy(table.Entries, grown.Entries, Count);
+            for (int i = 0; i < Count; i++)
+            {
+                var bucket = (grown.Entries[i].HashCode & int.MaxValue) % grown.Buckets.Length;
+                grown.Entries[i].Next = grown.Buckets[bucket] - 1;
+                grown.Buckets[bucket] = i + 1;
+            }
+
+            // Publish the new table whole, after every entry has been copied into it.
+            Volatile.Write(ref Symbols, grown);
+            return grown;
+        }
+
+        /// <summary>
+        /// Gets the name of a symbol.
+        /// </summary>
+        /// <param name="symbol">The symbol.</param>
+        /// <returns>The name of the symbol.</returns>
+        public static string NameOf(int symbol)
+        {
+            return Volatile.Read(ref Symbols).Entries[symbol].Name;
+        }
+
+        /// <summary>
+        /// Gets the type of token that a symbol is scanned as.
+        /// </summary>
+        /// <param name="symbol">The symbol.</param>
+        /// <returns>The keyword's token type, or <see cref="TokenType.Identifier"/> if the symbol is not a keyword.</returns>
+        public static TokenType TokenTypeOf(int symbol)
+        {
+            return Volatile.Read(ref Symbols).Entries[symbol].Type;
+        }
+
+        /// <summary>
+        /// Tests if a symbol is reserved and cannot be used as the name of a variable.
+        /// </summary>
+        /// <param name="symbol">The symbol.</param>
+        /// <returns>True if the symbol is reserved, false otherwise.</returns>
+        public static bool IsReserved(int symbol)
+        {
+            return Volatile.Read(ref Symbols).Entries[symbol].IsReserved;
+        }
+    }
+}
@@ -0,0 +1,238 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Runtime.CompilerServices;
+using System.Text;
+using Giosue.Exceptions;
+
+namespace Giosue.Tiering
+{
+    // Design comments:
+    // The code made by the `FunctionCompiler` calls these methods for everything that isn't
+    // a plain load or store, which keeps the compiler small and the semantics in C#.
+    // Each operator first checks for two ints and then for two doubles and handles those
+    // inline; anything else goes to `Operators`, so errors and the less common types behave
+    // exactly as they do in the interpreter. The `Is...` comparisons return a bool so that a
+    // condition doesn't build a `GiosueValue` just to test it.
+    /// <summary>
+    /// The operations used by compiled functions.
+    /// </summary>
+    internal static class CompiledRuntime
+    {
+        #region Arithmetic
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static GiosueValue Add(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt + right.AsInt;
+            }
+            if (left.IsDouble && right.IsDouble)
+            {
+                return left.AsDouble + right.AsDouble;
+            }
+            return Operators.Binary(TokenType.Plus, left, right);
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static GiosueValue Subtract(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt - right.AsInt;
+            }
+            if (left.IsDouble && right.IsDouble)
+            {
+                return left.AsDouble - right.AsDouble;
+            }
+            return Operators.Binary(TokenType.Minus, left, right);
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static GiosueValue Multiply(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt * right.AsInt;
+            }
+            if (left.IsDouble && right.IsDouble)
+            {
+                return left.AsDouble * right.AsDouble;
+            }
+            return Operators.Binary(TokenType.Star, left, right);
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static GiosueValue Divide(GiosueValue left, GiosueValue right)
+        {
+            // Dividing two ints gives a double.
+            if (left.IsInt && right.IsInt)
+            {
+                return (double)left.AsInt / (double)right.AsInt;
+            }
+            if (left.IsDouble && right.IsDouble)
+            {
+                return left.AsDouble / right.AsDouble;
+            }
+            return Operators.Binary(TokenType.Slash, left, right);
+        }
+
+        #endregion Arithmetic
+
+        #region Comparisons
+
+        // Doubles are compared with CompareTo, like Operators.CompareNumbers, so NaN sorts first.
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static bool IsLess(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt < right.AsInt;
+            }
+            return Operators.CompareNumbers(left, right) < 0;
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static bool IsLessOrEqual(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt <= right.AsInt;
+            }
+            return Operators.CompareNumbers(left, right) <= 0;
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static bool IsGreater(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt > right.AsInt;
+            }
+            return Operators.CompareNumbers(left, right) > 0;
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static bool IsGreaterOrEqual(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt >= right.AsInt;
+            }
+            return Operators.CompareNumbers(left, right) >= 0;
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static bool IsEqual(GiosueValue left, GiosueValue right)
+        {
+            if (left.IsInt && right.IsInt)
+            {
+                return left.AsInt == right.AsInt;
+            }
+            return Operators.AreEqual(left, right);
+        }
+
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static bool IsNotEqual(GiosueValue left, GiosueValue right)
+        {
+            return !IsEqual(left, right);
+        }
+
+        #endregion Comparisons
+
+        #region Variables
+
+        /// <summary>
+        /// Assigns a local variable of a compiled function a value.
+        /// </summary>
+        /// <remarks>
+        /// Like <see cref="Environment.AssignAt(int, int, string, GiosueValue)"/>, the value is only updated if it has the same type as the old value.
+        /// </remarks>
+        /// <param name="variable">The variable.</param>
+        /// <param name="value">The variable's new value.</param>
+        /// <param name="name">The name of the variable, used for error messages.</param>
+        /// <exception cref="EnvironmentException">Thrown if the types don't match.</exception>
+        [MethodImpl(MethodImplOptions.AggressiveInlining)]
+        public static void Assign(ref GiosueValue variable, GiosueValue value, string name)
+        {
+            if (!value.HasSameTypeAs(variable))
+            {
+                // The variable '{name}' is undefined
+                throw new EnvironmentException(EnvironmentExceptionType.UndefinedVariable, $"La variablie '{name}' è imprecisato.");
+            }
+            variable = value;
+        }
+
+        #endregion Variables
+
+        #region Calls
+
+        /// <summary>
+        /// Checks the number of arguments of a call to a Giosue function before the arguments are evaluated, as the interpreter does.
+        /// </summary>
+        /// <param name="callee">The value being called.</param>
+        /// <param name="argumentCount">The number of arguments.</param>
+        /// <exception cref="InterpreterException">Thrown if <paramref name="callee"/> is a Giosue function with a different number of parameters.</exception>
+        public static void CheckArity(GiosueValue callee, int argumentCount)
+        {
+            if (callee.TryGetObject<GiosueFunction>(out var function) && function.Arity != argumentCount)
+            {
+                // It's impossible to that number of parameters with that function.
+                throw new InterpreterException(InterpreterExceptionType.WrongNumberOfArgumentsPassedToFunction, $"È vietato usare quello numero di parametri con quello funzione.");
+            }
+        }
+
+        /// <summary>
+        /// Calls a value.
+        /// </summary>
+        /// <param name="interpreter">The interpreter that is running the compiled function.</param>
+        /// <param name="callee">The value being called.</param>
+        /// <param name="arguments">The values of the arguments.</param>
+        /// <returns>The value returned by the call.</returns>
+        /// <exception cref="InterpreterException">Thrown if <paramref name="callee"/> can't be called with <paramref name="arguments"/>.</exception>
+        public static GiosueValue Call(Interpreter interpreter, GiosueValue callee, GiosueValue[] arguments)
+        {
+            // The arity of a Giosue function was checked by CheckArity.
+            if (callee.TryGetObject<GiosueFunction>(out var function))
+            {
+                return function.Call(interpreter, arguments);
+            }
+
+            if (callee.TryGetObject<IGiosueCallable>(out var callable))
+            {
+                if (callable.Arity != arguments.Length)
+                {
+                    // It's impossible to that number of parameters with that function.
+                    throw new InterpreterException(InterpreterExceptionType.WrongNumberOfArgumentsPassedToFunction, $"È vietato usare quello numero di parametri con quello funzione.");
+                }
+
+                return callable.Call(interpreter, new List<GiosueValue>(arguments));
+            }
+
+            // It's impossible to use that object as a function.
+            throw new InterpreterException(InterpreterExceptionType.AttemptToCallNonCallableObject, "Non è possible usare quello oggeto come una funzione.");
+        }
+
+        #endregion Calls
+    }
+}
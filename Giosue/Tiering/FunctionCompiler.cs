@@ -0,0 +1,442 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Linq.Expressions;
+using System.Reflection;
+using System.Text;
+
+namespace Giosue.Tiering
+{
+    // Design comments:
+    // The compiler turns the body of one function into a LINQ expression tree, which .NET
+    // compiles to IL. It supports arithmetic, comparisons, `se`, `mentre`, local variables,
+    // `ritorna` and calls; anything else (a nested function, the object expressions, or a
+    // `var` that isn't directly in a block) makes `TryCompile` return null and the function
+    // stays interpreted.
+    // Because a compiled function can't declare a closure, nothing can see its environments,
+    // so its local variables become .NET locals instead of environment slots. The resolver
+    // already gave each local a depth and a slot, and depth 0 is the innermost scope; the
+    // compiler keeps a stack of scopes that maps each slot to a local. A depth that goes past
+    // the function's own scopes reaches into the closure, which is read through the
+    // `Environment` as usual, and a global is looked up by name in the globals of the
+    // interpreter that calls the function.
+    // Values stay `GiosueValue`s; the operators in `CompiledRuntime` test for ints and
+    // doubles before falling back to `Operators`.
+    /// <summary>
+    /// Compiles the body of a Giosue function to .NET code.
+    /// </summary>
+    internal class FunctionCompiler : AST.IVisitor<Expression>, Statements.IVisitor<Expression>
+    {
+        private static readonly MethodInfo IsTruthyMethod = typeof(Operators).GetMethod(nameof(Operators.IsTruthy));
+        private static readonly MethodInfo BinaryMethod = typeof(Operators).GetMethod(nameof(Operators.Binary));
+        private static readonly MethodInfo LogicalMethod = typeof(Operators).GetMethod(nameof(Operators.Logical));
+        private static readonly MethodInfo UnaryMethod = typeof(Operators).GetMethod(nameof(Operators.Unary));
+        private static readonly MethodInfo AssignMethod = typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.Assign));
+        private static readonly MethodInfo CheckArityMethod = typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.CheckArity));
+        private static readonly MethodInfo CallMethod = typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.Call));
+        private static readonly MethodInfo GetValueMethod = typeof(Environment).GetMethod(nameof(Environment.GetValue), new[] { typeof(int) });
+        private static readonly MethodInfo AssignIfExistsMethod = typeof(Environment).GetMethod(nameof(Environment.AssignIfExists), new[] { typeof(int), typeof(GiosueValue) });
+        private static readonly FieldInfo GlobalsField = typeof(Interpreter).GetField(nameof(Interpreter.Globals), BindingFlags.Instance | BindingFlags.NonPublic);
+        private static readonly MethodInfo GetAtMethod = typeof(Environment).GetMethod(nameof(Environment.GetAt));
+        private static readonly MethodInfo AssignAtMethod = typeof(Environment).GetMethod(nameof(Environment.AssignAt));
+        private static readonly MethodInfo EmptyArgumentsMethod = typeof(Array).GetMethod(nameof(Array.Empty)).MakeGenericMethod(typeof(GiosueValue));
+
+        /// <summary>
+        /// The operators that have a method in <see cref="CompiledRuntime"/>, and whether the method returns a bool.
+        /// </summary>
+        private static readonly Dictionary<TokenType, (MethodInfo Method, bool IsComparison)> BinaryMethods = new()
+        {
+            { TokenType.Plus, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.Add)), false) },
+            { TokenType.Minus, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.Subtract)), false) },
+            { TokenType.Star, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.Multiply)), false) },
+            { TokenType.Slash, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.Divide)), false) },
+            { TokenType.Less, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.IsLess)), true) },
+            { TokenType.LessEqual, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.IsLessOrEqual)), true) },
+            { TokenType.Greater, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.IsGreater)), true) },
+            { TokenType.GreaterEqual, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.IsGreaterOrEqual)), true) },
+            { TokenType.EqualEqual, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.IsEqual)), true) },
+            { TokenType.BangEqual, (typeof(CompiledRuntime).GetMethod(nameof(CompiledRuntime.IsNotEqual)), true) },
+        };
+
+        private readonly ParameterExpression InterpreterParameter = Expression.Parameter(typeof(Interpreter), "interpreter");
+        private readonly ParameterExpression ClosureParameter = Expression.Parameter(typeof(Environment), "closure");
+        private readonly ParameterExpression ArgumentsParameter = Expression.Parameter(typeof(GiosueValue[]), "arguments");
+        private readonly LabelTarget ReturnLabel = Expression.Label(typeof(GiosueValue), "return");
+
+        /// <summary>
+        /// The locals of each scope of the function, indexed by slot. The first scope holds the parameters.
+        /// </summary>
+        private readonly List<List<ParameterExpression>> Scopes = new();
+
+        /// <summary>
+        /// Every local of the function.
+        /// </summary>
+        private readonly List<ParameterExpression> Locals = new();
+
+        /// <summary>
+        /// Indicates if the function uses something that can't be compiled.
+        /// </summary>
+        private bool IsUnsupported = false;
+
+        private FunctionCompiler()
+        {
+
+        }
+
+        /// <summary>
+        /// Compiles a function.
+        /// </summary>
+        /// <remarks>
+        /// The function must have been run through a <see cref="Resolver"/> first.
+        /// </remarks>
+        /// <param name="declaration">The declaration of the function.</param>
+        /// <returns>The compiled function, or null if the function can't be compiled.</returns>
+        public static CompiledFunction TryCompile(Statements.Function declaration)
+        {
+            return new FunctionCompiler().Compile(declaration);
+        }
+
+        private CompiledFunction Compile(Statements.Function declaration)
+        {
+            // The parameters and the body share one scope, as they share one environment in the interpreter.
+            var body = new List<Expression>();
+            BeginScope();
+            for (int i = 0; i < declaration.Parameters.Count; i++)
+            {
+                var parameter = DeclareLocal(i, declaration.Parameters[i].Lexeme);
+                body.Add(Expression.Assign(parameter, Expression.ArrayIndex(ArgumentsParameter, Expression.Constant(i))));
+            }
+            body.AddRange(declaration.Body.Select(CompileStatement));
+            EndScope();
+
+            // A function that ends without ritorna returns niente.
+            body.Add(Expression.Label(ReturnLabel, Expression.Default(typeof(GiosueValue))));
+
+            if (IsUnsupported)
+            {
+                return null;
+            }
+
+            var lambda = Expression.Lambda<CompiledFunction>(
+                Expression.Block(typeof(GiosueValue), Locals, body),
+                declaration.Name.Lexeme,
+                new[] { InterpreterParameter, ClosureParameter, ArgumentsParameter });
+            return lambda.Compile();
+        }
+
+        /// <summary>
+        /// Marks the function as impossible to compile.
+        /// </summary>
+        /// <returns>An expression to use in place of the unsupported one.</returns>
+        private Expression Unsupported()
+        {
+            IsUnsupported = true;
+            return Expression.Default(typeof(GiosueValue));
+        }
+
+        private Expression CompileStatement(Statements.Statement statement)
+        {
+            return statement.Accept(this);
+        }
+
+        private Expression CompileExpression(AST.Expression expression)
+        {
+            return expression.Accept(this);
+        }
+
+        /// <summary>
+        /// Compiles an expression that is tested for truth, such as the condition of an if statement.
+        /// </summary>
+        /// <param name="expression">The expression.</param>
+        /// <returns>An expression of type <see cref="bool"/>.</returns>
+        private Expression CompileCondition(AST.Expression expression)
+        {
+            if (expression is AST.Binary binary && BinaryMethods.TryGetValue(binary.Operator.Type, out var method) && method.IsComparison)
+            {
+                return Expression.Call(method.Method, CompileExpression(binary.Left), CompileExpression(binary.Right));
+            }
+            return Expression.Call(IsTruthyMethod, CompileExpression(expression));
+        }
+
+        /// <summary>
+        /// Compiles the branch of an if or while statement.
+        /// </summary>
+        /// <param name="statement">The branch.</param>
+        /// <returns>The compiled branch.</returns>
+        private Expression CompileBranch(Statements.Statement statement)
+        {
+            // A variable declared by a branch that isn't a block belongs to the enclosing scope,
+            // but only exists if the branch runs.
+            if (statement is Statements.Var)
+            {
+                return Unsupported();
+            }
+            return CompileStatement(statement);
+        }
+
+        #region Scopes
+
+        private void BeginScope()
+        {
+            Scopes.Add(new List<ParameterExpression>());
+        }
+
+        private void EndScope()
+        {
+            Scopes.RemoveAt(Scopes.Count - 1);
+        }
+
+        /// <summary>
+        /// Gets the local for a slot in the innermost scope, creating it if the slot is new.
+        /// </summary>
+        /// <param name="slot">The slot given to the variable by the <see cref="Resolver"/>.</param>
+        /// <param name="name">The name of the variable.</param>
+        /// <returns>The local.</returns>
+        private ParameterExpression DeclareLocal(int slot, string name)
+        {
+            var scope = Scopes[^1];
+            while (scope.Count <= slot)
+            {
+                scope.Add(null);
+            }
+
+            // Declaring a variable twice in the same scope overwrites it.
+            if (scope[slot] == null)
+            {
+                scope[slot] = Expression.Variable(typeof(GiosueValue), name);
+                Locals.Add(scope[slot]);
+            }
+            return scope[slot];
+        }
+
+        /// <summary>
+        /// Finds the local that a resolved variable refers to.
+        /// </summary>
+        /// <param name="depth">The depth of the variable.</param>
+        /// <param name="slot">The slot of the variable.</param>
+        /// <param name="local">The local, or null if the variable is in the closure.</param>
+        /// <returns>True if the variable is a local of the function or in the closure, false if it can't be compiled.</returns>
+        private bool TryFindLocal(int depth, int slot, out ParameterExpression local)
+        {
+            local = null;
+            if (depth >= Scopes.Count)
+            {
+                return true;
+            }
+
+            var scope = Scopes[Scopes.Count - 1 - depth];
+            local = slot < scope.Count ? scope[slot] : null;
+            return local != null;
+        }
+
+        #endregion Scopes
+
+        #region AST visitors
+
+        Expression AST.IVisitor<Expression>.VisitAssignExpression(AST.Assign expression)
+        {
+            var value = CompileExpression(expression.Value);
+            Expression assignment;
+            if (expression.Depth < 0)
+            {
+                assignment = Expression.Call(Expression.Field(InterpreterParameter, GlobalsField), AssignIfExistsMethod, Expression.Constant(expression.Name.Symbol), value);
+            }
+            else if (!TryFindLocal(expression.Depth, expression.Slot, out var local))
+            {
+                return Unsupported();
+            }
+            else if (local != null)
+            {
+                assignment = Expression.Call(AssignMethod, local, value, Expression.Constant(expression.Name.Lexeme));
+            }
+            else
+            {
+                // The closure is the parent of the function's outermost scope.
+                assignment = Expression.Call(ClosureParameter, AssignAtMethod,
+                    Expression.Constant(expression.Depth - Scopes.Count),
+                    Expression.Constant(expression.Slot),
+                    Expression.Constant(expression.Name.Lexeme),
+                    value);
+            }
+
+            return Expression.Block(assignment, Expression.Default(typeof(GiosueValue)));
+        }
+
+        Expression AST.IVisitor<Expression>.VisitBinaryExpression(AST.Binary expression)
+        {
+            var left = CompileExpression(expression.Left);
+            var right = CompileExpression(expression.Right);
+            if (!BinaryMethods.TryGetValue(expression.Operator.Type, out var method))
+            {
+                return Expression.Call(BinaryMethod, Expression.Constant(expression.Operator.Type), left, right);
+            }
+
+            Expression result = Expression.Call(method.Method, left, right);
+            return method.IsComparison ? Expression.Convert(result, typeof(GiosueValue)) : result;
+        }
+
+        Expression AST.IVisitor<Expression>.VisitCallExpression(AST.Call expression)
+        {
+            var callee = Expression.Variable(typeof(GiosueValue), "callee");
+            Expression arguments = expression.Arguments.Count == 0
+                ? Expression.Call(EmptyArgumentsMethod)
+                : Expression.NewArrayInit(typeof(GiosueValue), expression.Arguments.Select(CompileExpression));
+
+            return Expression.Block(typeof(GiosueValue), new[] { callee },
+                Expression.Assign(callee, CompileExpression(expression.Callee)),
+                Expression.Call(CheckArityMethod, callee, Expression.Constant(expression.Arguments.Count)),
+                Expression.Call(CallMethod, InterpreterParameter, callee, arguments));
+        }
+
+        Expression AST.IVisitor<Expression>.VisitGetExpression(AST.Get expression)
+        {
+            return Unsupported();
+        }
+
+        Expression AST.IVisitor<Expression>.VisitGroupingExpression(AST.Grouping expression)
+        {
+            return CompileExpression(expression.Expression);
+        }
+
+        Expression AST.IVisitor<Expression>.VisitLiteralExpression(AST.Literal expression)
+        {
+            // Build the value in the code rather than capturing a GiosueValue, which the compiled code would have to unbox.
+            return expression.Value switch
+            {
+                null => Expression.Default(typeof(GiosueValue)),
+                bool or int or double or string => Expression.Convert(Expression.Constant(expression.Value), typeof(GiosueValue)),
+                _ => Unsupported(),
+            };
+        }
+
+        Expression AST.IVisitor<Expression>.VisitLogicalExpression(AST.Logical expression)
+        {
+            // Logical operators don't short-circuit.
+            return Expression.Call(LogicalMethod, Expression.Constant(expression.Operator.Type),
+                CompileExpression(expression.Left), CompileExpression(expression.Right));
+        }
+
+        Expression AST.IVisitor<Expression>.VisitSetExpression(AST.Set expression)
+        {
+            return Unsupported();
+        }
+
+        Expression AST.IVisitor<Expression>.VisitSuperExpression(AST.Super expression)
+        {
+            return Unsupported();
+        }
+
+        Expression AST.IVisitor<Expression>.VisitThisExpression(AST.This expression)
+        {
+            return Unsupported();
+        }
+
+        Expression AST.IVisitor<Expression>.VisitUnaryExpression(AST.Unary expression)
+        {
+            return Expression.Call(UnaryMethod, Expression.Constant(expression.Operator.Type), CompileExpression(expression.Right));
+        }
+
+        Expression AST.IVisitor<Expression>.VisitVariableExpression(AST.Variable expression)
+        {
+            if (expression.Depth < 0)
+            {
+                return Expression.Call(Expression.Field(InterpreterParameter, GlobalsField), GetValueMethod, Expression.Constant(expression.Name.Symbol));
+            }
+
+            if (!TryFindLocal(expression.Depth, expression.Slot, out var local))
+            {
+                return Unsupported();
+            }
+
+            return local ?? (Expression)Expression.Call(ClosureParameter, GetAtMethod,
+                Expression.Constant(expression.Depth - Scopes.Count),
+                Expression.Constant(expression.Slot),
+                Expression.Constant(expression.Name.Lexeme));
+        }
+
+        #endregion AST visitors
+
+        #region Statement visitors
+
+        Expression Statements.IVisitor<Expression>.VisitExpressionStatement(Statements.Expression statement)
+        {
+            return CompileExpression(statement.Expr);
+        }
+
+        Expression Statements.IVisitor<Expression>.VisitVarStatement(Statements.Var statement)
+        {
+            // The initializer is compiled first so that it still sees any variable with the same name from an outer scope.
+            var value = statement.Initializer == null ? Expression.Default(typeof(GiosueValue)) : CompileExpression(statement.Initializer);
+            if (statement.Slot < 0)
+            {
+                return Unsupported();
+            }
+            return Expression.Assign(DeclareLocal(statement.Slot, statement.Name.Lexeme), value);
+        }
+
+        Expression Statements.IVisitor<Expression>.VisitBlockStatement(Statements.Block statement)
+        {
+            BeginScope();
+            var statements = statement.Statements.Select(CompileStatement).ToList();
+            EndScope();
+            return statements.Count == 0 ? Expression.Empty() : Expression.Block(statements);
+        }
+
+        Expression Statements.IVisitor<Expression>.VisitIfStatement(Statements.If statement)
+        {
+            var condition = CompileCondition(statement.Condition);
+            var thenBranch = CompileBranch(statement.ThenBranch);
+            if (statement.ElseBranch == null)
+            {
+                return Expression.IfThen(condition, thenBranch);
+            }
+            return Expression.IfThenElse(condition, thenBranch, CompileBranch(statement.ElseBranch));
+        }
+
+        Expression Statements.IVisitor<Expression>.VisitWhileStatement(Statements.While statement)
+        {
+            // The interpreter reports a missing condition when the loop runs.
+            if (statement.Condition == null)
+            {
+                return Unsupported();
+            }
+
+            var breakLabel = Expression.Label("break");
+            return Expression.Loop(
+                Expression.IfThenElse(CompileCondition(statement.Condition), CompileBranch(statement.Body), Expression.Break(breakLabel)),
+                breakLabel);
+        }
+
+        Expression Statements.IVisitor<Expression>.VisitReturnStatement(Statements.Return statement)
+        {
+            var value = statement.Value == null ? Expression.Default(typeof(GiosueValue)) : CompileExpression(statement.Value);
+            return Expression.Return(ReturnLabel, value);
+        }
+
+        Expression Statements.IVisitor<Expression>.VisitFunctionStatement(Statements.Function statement)
+        {
+            // A closure would need the function's environments.
+            return Unsupported();
+        }
+
+        #endregion Statement visitors
+    }
+}
@@ -0,0 +1,169 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace Giosue.Tiering
+{
+    /// <summary>
+    /// The body of a function compiled to .NET code.
+    /// </summary>
+    /// <param name="interpreter">The interpreter that called the function.</param>
+    /// <param name="closure">The environment the function was declared in.</param>
+    /// <param name="arguments">The values of the arguments, one for each parameter.</param>
+    /// <returns>The value returned by the function.</returns>
+    internal delegate GiosueValue CompiledFunction(Interpreter interpreter, Environment closure, GiosueValue[] arguments);
+
+    // Design comments:
+    // Most functions are called a few times and are cheapest to interpret. A function that
+    // is called often is worth compiling: the interpreter counts the calls to each function
+    // declaration, and the call that reaches `Threshold` compiles the declaration with a
+    // `FunctionCompiler`. The count is kept per declaration rather than per `GiosueFunction`,
+    // so a function that is declared again on every call of its parent still gets hot.
+    // A declaration is compiled at most once. If it uses something the compiler doesn't
+    // support, it is interpreted from then on.
+    // Each `GiosueFunction` keeps its `FunctionTier` and, once there is one, the compiled
+    // delegate, so a call to a compiled function doesn't look anything up.
+    // Compiled code doesn't enter the profiler, so nothing is compiled while the interpreter
+    // has a `Profiler`.
+    /// <summary>
+    /// Compiles the functions that an <see cref="Interpreter"/> calls often.
+    /// </summary>
+    public class TieredCompilation
+    {
+        /// <summary>
+        /// The number of calls after which a function is compiled if no threshold is given.
+        /// </summary>
+        public const int DefaultThreshold = 100;
+
+        /// <summary>
+        /// The number of calls after which a function is compiled.
+        /// </summary>
+        public int Threshold { get; }
+
+        /// <summary>
+        /// The number of functions that have been compiled.
+        /// </summary>
+        public int CompiledCount { get; private set; } = 0;
+
+        /// <summary>
+        /// The number of hot functions that couldn't be compiled and are still interpreted.
+        /// </summary>
+        public int InterpretedCount { get; private set; } = 0;
+
+        private readonly Dictionary<Statements.Function, FunctionTier> Tiers = new();
+
+        /// <summary>
+        /// Creates a new <see cref="TieredCompilation"/>.
+        /// </summary>
+        /// <param name="threshold">The number of calls after which a function is compiled; 1 compiles every function when it's first called.</param>
+        public TieredCompilation(int threshold = DefaultThreshold)
+        {
+            if (threshold < 1)
+            {
+                // The threshold must be at least 1.
+                throw new ArgumentOutOfRangeException(nameof(threshold), threshold, "La soglia deve essere almeno 1.");
+            }
+
+            Threshold = threshold;
+        }
+
+        /// <summary>
+        /// Gets the tier of a function declaration.
+        /// </summary>
+        /// <param name="declaration">The declaration of the function.</param>
+        /// <returns>The tier that counts the calls to <paramref name="declaration"/>.</returns>
+        internal FunctionTier GetTier(Statements.Function declaration)
+        {
+            if (!Tiers.TryGetValue(declaration, out var tier))
+            {
+                tier = new FunctionTier(this, declaration);
+                Tiers.Add(declaration, tier);
+            }
+            return tier;
+        }
+
+        /// <summary>
+        /// Compiles a declaration that has become hot.
+        /// </summary>
+        /// <param name="declaration">The declaration of the function.</param>
+        /// <returns>The compiled function, or null if the declaration can't be compiled.</returns>
+        internal CompiledFunction Compile(Statements.Function declaration)
+        {
+            var compiled = FunctionCompiler.TryCompile(declaration);
+            if (compiled != null)
+            {
+                CompiledCount++;
+            }
+            else
+            {
+                InterpretedCount++;
+            }
+            return compiled;
+        }
+    }
+
+    /// <summary>
+    /// Counts the calls to one function declaration and holds its compiled code.
+    /// </summary>
+    internal class FunctionTier
+    {
+        private readonly TieredCompilation Owner;
+        private readonly Statements.Function Declaration;
+
+        /// <summary>
+        /// The number of calls so far, until the function is compiled.
+        /// </summary>
+        private int Calls = 0;
+
+        /// <summary>
+        /// Indicates if the function has been compiled or was found to be impossible to compile.
+        /// </summary>
+        private bool IsTiered = false;
+
+        /// <summary>
+        /// The compiled function, or null if it hasn't been compiled.
+        /// </summary>
+        public CompiledFunction Compiled { get; private set; } = null;
+
+        public FunctionTier(TieredCompilation owner, Statements.Function declaration)
+        {
+            Owner = owner;
+            Declaration = declaration;
+        }
+
+        /// <summary>
+        /// Counts a call to the function, compiling it if the call reaches the threshold.
+        /// </summary>
+        /// <returns>The compiled function, or null if the call should be interpreted.</returns>
+        public CompiledFunction RecordCall()
+        {
+            if (IsTiered || ++Calls < Owner.Threshold)
+            {
+                return Compiled;
+            }
+
+            IsTiered = true;
+            Compiled = Owner.Compile(Declaration);
+            return Compiled;
+        }
+    }
+}
@@ -29,12 +29,23 @@ namespace Giosue
         public object Literal { get; }
         public int Line { get; }
 
-        public Token(TokenType type, string lexeme, object literal, int line)
+        /// <summary>
+        /// The interned symbol of an identifier or keyword, or <see cref="SymbolTable.None"/>.
+        /// </summary>
+        public int Symbol { get; }
+
+        public Token(TokenType type, string lexeme, object literal, int line) : this(type, lexeme, literal, line, SymbolTable.None)
+        {
+
+        }
+
+        public Token(TokenType type, string lexeme, object literal, int line, int symbol)
         {
             Type = type;
             Lexeme = lexeme;
             Literal = literal;
             Line = line;
+            Symbol = symbol;
         }
 
         public override string ToString()
@@ -272,6 +272,13 @@ namespace Giosue
         /// </remarks>
         Mentre,
 
+        /// <summary>
+        /// The keyword <c>ritorna</c>.
+        /// </summary>
+        /// <remarks>
+        /// The equivalent of <c>return</c>.
+        /// </remarks>
+        Ritorna,
 
         /// <summary>
         /// The end-of-file character.
@@ -0,0 +1,81 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Collections.Generic;
+using System.Linq;
+using System.Text;
+
+namespace Giosue
+{
+    /// <summary>
+    /// Makes the tree classes for a <see cref="Parser"/>.
+    /// </summary>
+    public sealed class TreeBuilder : ISyntaxBuilder<AST.Expression, Statements.Statement>
+    {
+        public AST.Expression NoExpression => null;
+
+        public Statements.Statement NoStatement => null;
+
+        public AST.Expression Literal(object value) => new AST.Literal(value);
+
+        public AST.Expression Grouping(AST.Expression expression) => new AST.Grouping(expression);
+
+        public AST.Expression Variable(Token name) => new AST.Variable(name);
+
+        public bool TryGetVariableName(AST.Expression expression, out Token name)
+        {
+            name = (expression as AST.Variable)?.Name;
+            return name != null;
+        }
+
+        public AST.Expression Assign(Token name, AST.Expression value) => new AST.Assign(name, value);
+
+        public AST.Expression Binary(AST.Expression left, Token @operator, AST.Expression right) => new AST.Binary(left, @operator, right);
+
+        public AST.Expression Logical(AST.Expression left, Token @operator, AST.Expression right) => new AST.Logical(left, @operator, right);
+
+        public AST.Expression Unary(Token @operator, AST.Expression right) => new AST.Unary(@operator, right);
+
+        public AST.Expression Call(AST.Expression callee, Token paren, List<AST.Expression> arguments) => new AST.Call(callee, paren, arguments);
+
+        public Statements.Statement Expression(AST.Expression expression) => new Statements.Expression(expression);
+
+        public Statements.Statement Var(Token name, AST.Expression initializer) => new Statements.Var(name, initializer);
+
+        public void BeginBlock()
+        {
+
+        }
+
+        public Statements.Statement Block(List<Statements.Statement> statements) => new Statements.Block(statements);
+
+        public Statements.Statement If(AST.Expression condition, Statements.Statement thenBranch, Statements.Statement elseBranch) => new Statements.If(condition, thenBranch, elseBranch);
+
+        public Statements.Statement While(Token keyword, AST.Expression condition, Statements.Statement body) => new Statements.While(keyword, condition, body);
+
+        public Statements.Statement Return(Token keyword, AST.Expression value) => new Statements.Return(keyword, value);
+
+        public void BeginFunction(Token name, List<Token> parameters)
+        {
+
+        }
+
+        public Statements.Statement Function(Token name, List<Token> parameters, List<Statements.Statement> body) => new Statements.Function(name, parameters, body);
+    }
+}
@@ -39,7 +39,7 @@ namespace SourceManager
         /// <summary>
         /// The length of the internal buffer for characters read.
         /// </summary>
-        private const int BufferLength = 10000;
+        public const int BufferLength = 10000;
 
         /// <summary>
         /// The source stream for the data.
@@ -127,8 +127,9 @@ namespace SourceManager
         /// </summary>
         private void ReadNextIntoBuffer()
         {
-            // First check that the token is not too long.
-            if (CurrentTokenLength >= BufferLength)
+            // First check that the token is not too long. If the token starts
+            // at the front of the buffer, there is no room to read anything.
+            if (TokenStartIndex == 0)
             {
                 // The current token is too long. The maximum token length is {BufferLength}.
                 throw new TokenTooLongException(CurrentToken, $"Il token corrente è troppo lungo. La lunghezza massima per un token è {BufferLength}.");
@@ -139,13 +140,11 @@ namespace SourceManager
             _currentToken = null;
 
             // First, move the current token to the beginning of the
-            // buffer.
-            for (int i = TokenStartIndex, bufferFront = 0; 
-                i < CurrentCharacterIndex; 
-                i++, bufferFront++)
-            {
-                Buffer[bufferFront] = Buffer[i];
-            }
+            // buffer, along with any characters after it that haven't
+            // been consumed yet (PeekNext reads before the buffer is
+            // used up).
+            var keptLength = BufferLength - TokenStartIndex;
+            Array.Copy(Buffer, TokenStartIndex, Buffer, 0, keptLength);
 
             // For debugging
             var oldTokenLength = CurrentTokenLength;
@@ -163,14 +162,15 @@ namespace SourceManager
                 throw new Exception($"Le lunghezze dei token non sono uguali. Primo:{oldTokenLength} Dopo:{CurrentTokenLength}");
             }
 
-            var charactersToRead = BufferLength - CurrentTokenLength;
+            var charactersToRead = BufferLength - keptLength;
 
-            var charactersRead = Reader.ReadBlock(Buffer, CurrentCharacterIndex, charactersToRead);
+            var charactersRead = Reader.ReadBlock(Buffer, keptLength, charactersToRead);
             
-            // If all characters read fit in the buffer, then set the end of the buffer.
-            if (charactersRead <= charactersToRead)
+            // If fewer characters were read than asked for, the end of the file is
+            // in the buffer, so set the end of the buffer.
+            if (charactersRead < charactersToRead)
             {
-                BufferEndIndex = CurrentTokenLength + charactersRead;
+                BufferEndIndex = keptLength + charactersRead;
             }
         }
 
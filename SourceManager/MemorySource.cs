@@ -0,0 +1,221 @@
+﻿// Giosue language interpreter
+// The interpreter for the Giosue programming language.
+// Copyright (C) 2021  Anthony Webster
+//
+// This program is free software; you can redistribute it and/or modify
+// it under the terms of the GNU General Public License as published by
+// the Free Software Foundation; either version 2 of the License, or
+// (at your option) any later version.
+//
+// This program is distributed in the hope that it will be useful,
+// but WITHOUT ANY WARRANTY; without even the implied warranty of
+// MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+// GNU General Public License for more details.
+//
+// You should have received a copy of the GNU General Public License along
+// with this program; if not, write to the Free Software Foundation, Inc.,
+// 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+
+using System;
+using System.Buffers;
+using System.Collections.Generic;
+using System.IO;
+using System.Linq;
+using System.Text;
+
+namespace SourceManager
+{
+    // Design comments:
+    // The `MemorySource` works over characters that are all in memory at once, so unlike
+    // the `FileSource` it never refills a buffer, never moves the current token around and
+    // has no limit on the length of a token. The current token is a slice of `Characters`
+    // and is only copied to a string when `CurrentToken` is used.
+    // `FromFile` decodes a whole file into an array rented from `ArrayPool<char>.Shared`;
+    // the array is returned to the pool when the source is disposed. The array is as long
+    // as the file is in bytes, so a file can't be longer than the largest array.
+    /// <summary>
+    /// Represents a source whose characters are all in memory.
+    /// </summary>
+    public class MemorySource : Source
+    {
+        /// <summary>
+        /// The largest number of bytes that <see cref="FromFile(string)"/> can read, which is the largest length of a
+        /// <see cref="char"/> array.
+        /// </summary>
+        public const long MaximumFileLength = 0x7FFFFFC7;
+
+        /// <summary>
+        /// The characters of the source.
+        /// </summary>
+        private ReadOnlyMemory<char> Characters { get; }
+
+        /// <summary>
+        /// The array that backs <see cref="Characters"/> if it was rented from <see cref="ArrayPool{T}.Shared"/>, otherwise null.
+        /// </summary>
+        private char[] RentedArray { get; set; } = null;
+
+        /// <summary>
+        /// The starting index of the current token.
+        /// </summary>
+        protected override int TokenStartIndex { get; set; } = 0;
+
+        /// <summary>
+        /// The index of the current character.
+        /// </summary>
+        protected override int CurrentCharacterIndex { get; set; } = 0;
+
+        /// <inheritdoc/>
+        public override bool IsAtEnd => CurrentCharacterIndex >= Characters.Length;
+
+        /// <inheritdoc/>
+        public override string CurrentToken
+        {
+            get
+            {
+                if (_currentToken == null)
+                {
+                    _currentToken = new string(CurrentTokenSpan);
+                }
+
+                return _currentToken;
+            }
+        }
+
+        /// <inheritdoc/>
+        public override ReadOnlySpan<char> CurrentTokenSpan => Characters.Span[TokenStartIndex..CurrentCharacterIndex];
+
+        /// <summary>
+        /// Creates a new <see cref="MemorySource"/>.
+        /// </summary>
+        /// <param name="characters">The characters that provide a source for the <see cref="MemorySource"/>.</param>
+        public MemorySource(ReadOnlyMemory<char> characters) : base()
+        {
+            Characters = characters;
+        }
+
+        /// <summary>
+        /// Creates a new <see cref="MemorySource"/> over an array rented from <see cref="ArrayPool{T}.Shared"/>.
+        /// </summary>
+        /// <param name="rentedArray">The rented array.</param>
+        /// <param name="length">The number of characters used in <paramref name="rentedArray"/>.</param>
+        private MemorySource(char[] rentedArray, int length) : this(new ReadOnlyMemory<char>(rentedArray, 0, length))
+        {
+            RentedArray = rentedArray;
+        }
+
+        /// <summary>
+        /// Creates a new <see cref="MemorySource"/> that holds all of the characters in a file.
+        /// </summary>
+        /// <remarks>
+        /// The encoding of the file is detected from its byte order mark; UTF-8 is used if there isn't one.
+        /// </remarks>
+        /// <param name="path">The path of the file.</param>
+        /// <returns>The <see cref="MemorySource"/>.</returns>
+        /// <exception cref="IOException">Thrown if the file is longer than <see cref="MaximumFileLength"/> bytes.</exception>
+        public static MemorySource FromFile(string path)
+        {
+            using var stream = new FileStream(path, FileMode.Open, FileAccess.Read, FileShare.Read, 4096, FileOptions.SequentialScan);
+            if (stream.Length > MaximumFileLength)
+            {
+                // The file is too big ({stream.Length} bytes). The maximum length is {MaximumFileLength} bytes.
+                throw new IOException($"Il file è troppo grande ({stream.Length} byte). La lunghezza massima è {MaximumFileLength} byte.");
+            }
+
+            using var reader = new StreamReader(stream, Encoding.UTF8, detectEncodingFromByteOrderMarks: true);
+
+            // UTF-8, UTF-16 and UTF-32 never decode to more characters than there are bytes.
+            var buffer = ArrayPool<char>.Shared.Rent((int)Math.Max(stream.Length, 1));
+            try
+            {
+                var length = 0;
+                int charactersRead;
+                while ((charactersRead = reader.Read(buffer, length, buffer.Length - length)) > 0)
+                {
+                    length += charactersRead;
+                }
+                return new MemorySource(buffer, length);
+            }
+            catch
+            {
+                ArrayPool<char>.Shared.Return(buffer);
+                throw;
+            }
+        }
+
+        /// <inheritdoc/>
+        public override bool TryGetRemainingCharacters(out ReadOnlyMemory<char> characters)
+        {
+            characters = Characters[CurrentCharacterIndex..];
+            return true;
+        }
+
+        /// <inheritdoc/>
+        public override void Dispose()
+        {
+            if (RentedArray != null)
+            {
+                ArrayPool<char>.Shared.Return(RentedArray);
+                RentedArray = null;
+            }
+        }
+
+        /// <inheritdoc/>
+        public override bool Advance(out char consumed)
+        {
+            consumed = default;
+            _currentToken = null;
+
+            if (IsAtEnd)
+            {
+                return false;
+            }
+
+            consumed = Characters.Span[CurrentCharacterIndex++];
+            return true;
+        }
+
+        /// <inheritdoc/>
+        public override bool AdvanceIfMatches(char c, out char consumed)
+        {
+            consumed = default;
+
+            if (!Peek(out var current) || current != c)
+            {
+                return false;
+            }
+
+            // This is safe because Peek already checked if
+            // we reached the end of the source.
+            Advance(out consumed);
+            return true;
+        }
+
+        /// <inheritdoc/>
+        public override bool Peek(out char current)
+        {
+            current = default;
+
+            if (IsAtEnd)
+            {
+                return false;
+            }
+
+            current = Characters.Span[CurrentCharacterIndex];
+            return true;
+        }
+
+        /// <inheritdoc/>
+        public override bool PeekNext(out char next)
+        {
+            next = default;
+
+            if (CurrentCharacterIndex + 1 >= Characters.Length)
+            {
+                return false;
+            }
+
+            next = Characters.Span[CurrentCharacterIndex + 1];
+            return true;
+        }
+    }
+}
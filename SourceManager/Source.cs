@@ -58,6 +58,14 @@ namespace SourceManager
         /// </summary>
         public abstract string CurrentToken { get; }
 
+        /// <summary>
+        /// The current token, without copying it to a new <see cref="string"/> if the source can avoid it.
+        /// </summary>
+        /// <remarks>
+        /// The span is only valid until the <see cref="Source"/> is advanced or the token is cleared.
+        /// </remarks>
+        public virtual ReadOnlySpan<char> CurrentTokenSpan => CurrentToken;
+
         protected Source()
         {
             TokenStartIndex = 0;
@@ -75,6 +83,21 @@ namespace SourceManager
             CurrentCharacterIndex = TokenStartIndex;
         }
 
+        /// <summary>
+        /// Gets the characters that haven't been consumed, if the source has them all in memory at once.
+        /// </summary>
+        /// <remarks>
+        /// This lets a reader go through the characters directly instead of calling <see cref="Advance(out char)"/>
+        /// for each one. The characters are not consumed, and they are only valid until the source is disposed.
+        /// </remarks>
+        /// <param name="characters">The characters that haven't been consumed.</param>
+        /// <returns>True if the characters are all in memory, false otherwise.</returns>
+        public virtual bool TryGetRemainingCharacters(out ReadOnlyMemory<char> characters)
+        {
+            characters = default;
+            return false;
+        }
+
         /// <inheritdoc/>
         public abstract void Dispose();
 
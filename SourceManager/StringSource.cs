@@ -58,6 +58,9 @@ namespace SourceManager
             } 
         }
 
+        /// <inheritdoc/>
+        public override ReadOnlySpan<char> CurrentTokenSpan => Source.AsSpan(TokenStartIndex, CurrentCharacterIndex - TokenStartIndex);
+
         /// <summary>
         /// Creates a new <see cref="StringSource"/>.
         /// </summary>
@@ -107,6 +110,13 @@ namespace SourceManager
             return true;
         }
 
+        /// <inheritdoc/>
+        public override bool TryGetRemainingCharacters(out ReadOnlyMemory<char> characters)
+        {
+            characters = Source.AsMemory(CurrentCharacterIndex);
+            return true;
+        }
+
         /// <inheritdoc/>
         public override void Dispose()
         {